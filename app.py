@@ -10,6 +10,13 @@ src_path = os.path.join(current_dir, 'src')
 if src_path not in sys.path:
     sys.path.insert(0, src_path)
 
+try:
+    from src.utils.profiler import timed, start_rerun, finish_rerun
+    from src.utils.firestore_trace import current_session_id, start_render, finish_render
+except ImportError:
+    from utils.profiler import timed, start_rerun, finish_rerun
+    from utils.firestore_trace import current_session_id, start_render, finish_render
+
 def safe_import():
     """Importa módulos com tratamento de erro"""
     try:
@@ -175,7 +182,7 @@ def show_error_page(error_message: str, error_details: Optional[str] = None):
             safe_set_session_state('show_config', True)
             st.rerun()
 
-def main():
+def run_app():
     """Função principal com tratamento robusto de erros"""
     try:
         # Configuração da página
@@ -214,7 +221,8 @@ def main():
         """, unsafe_allow_html=True)
         
         # Verificar saúde da aplicação
-        health_issues = check_app_health()
+        with timed('check_app_health'):
+            health_issues = check_app_health()
         if health_issues:
             show_error_page(
                 "Problemas detectados na inicialização",
@@ -223,20 +231,24 @@ def main():
             return
         
         # Limpar estados problemáticos
-        cleanup_session_state()
+        with timed('cleanup_session_state'):
+            cleanup_session_state()
         
         # Inicializar session state
-        initialize_session_state()
+        with timed('initialize_session_state'):
+            initialize_session_state()
         
         # Importar módulos
-        modules = safe_import()
+        with timed('safe_import'):
+            modules = safe_import()
         if not modules:
             show_error_page("Erro na importação de módulos")
             return
         
         # Verificar configuração do Firebase
         try:
-            config_status = modules['check_firebase_config']()
+            with timed('check_firebase_config'):
+                config_status = modules['check_firebase_config']()
             config_ok = all(config_status.values()) if isinstance(config_status, dict) else False
         except Exception as e:
             st.warning(f"⚠️ Erro ao verificar configuração Firebase: {str(e)}")
@@ -278,12 +290,14 @@ def main():
         
         # Roteamento principal
         try:
-            if safe_get_session_state('authentication_status', False):
-                # Usuário logado - mostrar navegação principal
-                modules['show_main_navigation']()
-            else:
-                # Usuário não logado - mostrar página de login
-                modules['show_login_page']()
+            with timed('routing'):
+                if safe_get_session_state('authentication_status', False):
+                    # Usuário logado - mostrar navegação principal
+                    modules['show_main_navigation']()
+                else:
+                    # Usuário não logado - mostrar página de login
+                    with timed('login', kind='page'):
+                        modules['show_login_page']()
                 
         except KeyError as e:
             show_error_page(
@@ -309,5 +323,24 @@ def main():
             st.session_state.clear()
             st.rerun()
 
+def main():
+    """Executa o app registrando o tempo e as operações do Firestore do rerun"""
+    page = (safe_get_session_state('current_page', 'dashboard')
+            if safe_get_session_state('authentication_status', False) else 'login')
+    start_rerun(page)
+    start_render(current_session_id(), page)
+    try:
+        run_app()
+    finally:
+        finish_render()
+        finish_rerun()
+
+    try:
+        from src.pages.profiler_panel import is_profiler_panel_enabled, show_profiler_panel
+    except ImportError:
+        from pages.profiler_panel import is_profiler_panel_enabled, show_profiler_panel
+    if is_profiler_panel_enabled():
+        show_profiler_panel()
+
 if __name__ == "__main__":
     main()
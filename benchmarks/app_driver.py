@@ -0,0 +1,138 @@
+"""
+Script executado pelo AppTest no teste de carga (benchmarks/load_test.py)
+
+Com bench_action == 'app' roda o app normal (login, dashboard). As demais
+ações chamam direto as mesmas funções que as páginas usam, dentro do
+contexto do script (ProjectManager depende do session_state), e contam as
+operações de armazenamento como um render com o nome da ação.
+"""
+import os
+import pickle
+import sys
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, 'src')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import app
+from src.utils.firestore_trace import current_session_id, finish_render, last_render, start_render
+
+OPS = ('reads', 'writes', 'deletes', 'bytes_read', 'bytes_written')
+
+
+def _state_bytes() -> int:
+    """Tamanho serializado do session_state (aproximação da memória da sessão)"""
+    total = 0
+    for value in st.session_state.to_dict().values():
+        try:
+            total += len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            total += sys.getsizeof(value)
+    return total
+
+
+def _add_ops():
+    """Acumula as operações do render no rerun atual (o login faz st.rerun no meio)"""
+    render = last_render() or {}
+    ops = st.session_state.get('bench_ops') or dict.fromkeys(OPS, 0)
+    st.session_state.bench_ops = {name: ops[name] + render.get(name, 0) for name in OPS}
+
+
+def _upload(pm, uid: str, params: dict):
+    success, project_id = pm.create_project(uid, {
+        'name': f"Carga {uid[:6]}",
+        'description': "Projeto do teste de carga",
+        'expected_savings': 10000.0,
+        'start_date': '2024-01-01',
+        'target_end_date': '2024-06-01'
+    })
+    if not success:
+        raise RuntimeError(project_id)
+
+    rng = np.random.default_rng(params.get('seed', 0))
+    rows = params.get('rows', 1000)
+    data = pd.DataFrame({
+        'valor': rng.normal(10, 1, rows),
+        'temperatura': rng.normal(80, 5, rows),
+        'turno': rng.choice(['A', 'B', 'C'], rows),
+        'data': pd.date_range('2024-01-01', periods=rows, freq='min').astype(str)
+    })
+    if not pm.save_uploaded_data(project_id, data, 'carga.csv'):
+        raise RuntimeError("Falha ao salvar os dados")
+    st.session_state.bench_project_id = project_id
+
+
+def _capability(pm, uid: str, params: dict):
+    from src.pages.measure_tools import _calculate_capability_advanced
+
+    project_id = st.session_state.bench_project_id
+    data = pm.get_uploaded_data(project_id)
+    results = _calculate_capability_advanced(data['valor'], lsl=7.0, usl=13.0)
+    pm.update_project(project_id, {
+        'measure.process_capability.data': {k: (float(v) if v is not None else None) for k, v in results.items()},
+        'measure.process_capability.completed': True
+    })
+
+
+def _measurements(pm, uid: str, params: dict):
+    from src.utils.measurement_store import MeasurementStore
+
+    project_id = st.session_state.bench_project_id
+    store = MeasurementStore(project_id, db=pm.db, user_uid=uid)
+    point = st.session_state.get('bench_point') or {
+        'id': 'ponto_carga', 'name': "Diâmetro", 'metric': 'mm', 'target': 10.0,
+        'lower_limit': 7.0, 'upper_limit': 13.0, 'chart_type': 'I-MR'
+    }
+    rng = np.random.default_rng(params.get('seed', 0))
+    count = params.get('measurements', 100)
+    start = pd.Timestamp('2024-03-01')
+    store.append_many(point, [
+        {'value': float(value), 'timestamp': (start + pd.Timedelta(minutes=i)).isoformat()}
+        for i, value in enumerate(rng.normal(10, 1, count))
+    ])
+    st.session_state.bench_point = point
+
+
+def _report(pm, uid: str, params: dict):
+    from src.utils.report_content import executive_report
+    from src.utils.report_export import export_report
+
+    project = pm.get_project(st.session_state.bench_project_id)
+    stats = pm.get_project_statistics(project)
+    progress = pm.calculate_project_progress(project)
+    title, blocks = executive_report(project, stats, progress,
+                                     {'charts': True, 'metrics': True, 'timeline': True, 'roi': True})
+    result = export_report(title, blocks, params.get('report_format', 'HTML'))
+    st.session_state.bench_report_bytes = len(result['data'])
+
+
+ACTIONS = {
+    'upload': _upload,
+    'capability': _capability,
+    'measurements': _measurements,
+    'report': _report
+}
+
+action = st.session_state.get('bench_action', 'app')
+
+if action == 'app':
+    try:
+        app.main()
+    finally:
+        _add_ops()
+else:
+    from src.utils.project_manager import ProjectManager
+
+    start_render(current_session_id(), action)
+    try:
+        ACTIONS[action](ProjectManager(), st.session_state.user_data['uid'], st.session_state.get('bench_params', {}))
+    finally:
+        finish_render()
+        _add_ops()
+
+st.session_state.bench_state_bytes = _state_bytes()
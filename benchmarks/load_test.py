@@ -0,0 +1,250 @@
+"""
+Teste de carga headless: N usuários simulados numa instância
+
+Cada usuário é uma sessão do AppTest (benchmarks/app_driver.py) sobre o
+backend local (STORAGE_BACKEND=local), então nada depende de rede. Roteiro
+por usuário: login, dashboard, upload de dataset, capacidade do processo,
+medições dos pontos de controle e relatório executivo.
+
+O AppTest não é thread-safe (troca o Runtime global a cada execução), então
+os reruns das sessões concorrentes passam por uma fila: a latência medida é
+espera + execução, e o tempo de serviço (só execução) também é registrado.
+Com o backend local não há E/S de rede, então o trabalho é limitado pela CPU
+e pelo GIL, como num servidor Streamlit real executando as sessões em threads.
+
+Saída: latência p50/p95 por ação e geral (cada ação é um rerun), memória por
+sessão (session_state serializado e crescimento do RSS do processo dividido
+pelos usuários) e operações de armazenamento (leituras, gravações e bytes)
+por ação, medidas pelo rastreamento do cliente do Firestore.
+
+Uso:
+    python benchmarks/load_test.py --users 20 --concurrency 5 --rows 5000 --output carga.json
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DRIVER = os.path.join(ROOT, 'benchmarks', 'app_driver.py')
+
+ACTIONS = ['login', 'dashboard', 'upload', 'capability', 'measurements', 'report']
+
+PASSWORD = "carga-123456"
+
+OPS = ('reads', 'writes', 'deletes', 'bytes_read', 'bytes_written')
+
+_run_lock = threading.Lock()
+
+
+def _rss_mb() -> float:
+    """Pico de RSS do processo (ru_maxrss: KB no Linux, bytes no macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _configure(args):
+    """Backend local e fila de tarefas isolados antes de importar o app"""
+    directory = tempfile.mkdtemp(prefix='greenbelt_load_')
+    os.environ['STORAGE_BACKEND'] = 'local'
+    os.environ.setdefault('LOCAL_STORE_PATH', args.store or os.path.join(directory, 'local_store.db'))
+    os.environ.setdefault('JOB_QUEUE_DB', os.path.join(directory, 'report_jobs.db'))
+    for path in (ROOT, os.path.join(ROOT, 'src')):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    os.chdir(ROOT)
+
+
+class SimulatedUser:
+    def __init__(self, index: int, args):
+        from streamlit.testing.v1 import AppTest
+
+        self.email = f"carga{index:04d}@exemplo.com"
+        self.app = AppTest.from_file(DRIVER, default_timeout=args.timeout)
+        self.app.session_state['bench_params'] = {
+            'rows': args.rows, 'measurements': args.measurements,
+            'report_format': args.report_format, 'seed': index
+        }
+        self.samples: List[Dict] = []
+
+    def _run(self, action: str):
+        start = time.perf_counter()
+        with _run_lock:
+            started = time.perf_counter()
+            self.app.session_state['bench_ops'] = None
+            self.app.run()
+            ops = self.app.session_state['bench_ops'] or {}
+        finished = time.perf_counter()
+
+        error = None
+        if self.app.exception:
+            error = self.app.exception[0].message
+        elif self.app.error:
+            error = self.app.error[0].value
+        self.samples.append({
+            'action': action,
+            'seconds': finished - start,
+            'service': finished - started,
+            'error': error,
+            **{name: ops.get(name, 0) for name in OPS}
+        })
+
+    def _login(self):
+        inputs = {}
+        for widget in self.app.text_input:
+            inputs.setdefault(widget.label, widget)  # o primeiro formulário é o de login
+        inputs["📧 Email"].input(self.email)
+        inputs["🔒 Senha"].input(PASSWORD)
+        next(button for button in self.app.button if button.label == "🚀 Entrar").click()
+        self._run('login')
+
+    def scenario(self):
+        self.app.session_state['bench_action'] = 'app'
+        with _run_lock:
+            self.app.run()
+        self._login()
+        self._run('dashboard')
+        for action in ACTIONS[2:]:
+            self.app.session_state['bench_action'] = action
+            self._run(action)
+
+    @property
+    def state_bytes(self) -> int:
+        return self.app.session_state['bench_state_bytes'] if 'bench_state_bytes' in self.app.session_state else 0
+
+
+def _percentile(values: List[float], q: float) -> float:
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+def summarize(users: List[SimulatedUser], baseline_rss: float, elapsed: float, args) -> Dict:
+    samples = [sample for user in users for sample in user.samples]
+    actions = {}
+    for action in ACTIONS:
+        rows = [s for s in samples if s['action'] == action]
+        if not rows:
+            continue
+        ok = [s for s in rows if not s['error']]
+        latency = [s['seconds'] for s in ok]
+        actions[action] = {
+            'runs': len(rows),
+            'errors': len(rows) - len(ok),
+            'p50_ms': _percentile(latency, 50) * 1000,
+            'p95_ms': _percentile(latency, 95) * 1000,
+            'max_ms': max(latency, default=0.0) * 1000,
+            'service_p50_ms': _percentile([s['service'] for s in ok], 50) * 1000,
+            **{name: float(np.mean([s[name] for s in rows])) for name in OPS}
+        }
+
+    latencies = [s['seconds'] for s in samples if not s['error']]
+    service = [s['service'] for s in samples if not s['error']]
+    state_bytes = [user.state_bytes for user in users]
+    return {
+        'generated_at': datetime.now().isoformat(),
+        'config': {'users': args.users, 'concurrency': args.concurrency, 'rows': args.rows,
+                   'measurements': args.measurements, 'report_format': args.report_format},
+        'elapsed_s': elapsed,
+        'reruns': len(samples),
+        'errors': [{'action': s['action'], 'error': s['error']} for s in samples if s['error']][:20],
+        'overall': {
+            'p50_ms': _percentile(latencies, 50) * 1000,
+            'p95_ms': _percentile(latencies, 95) * 1000,
+            'service_p50_ms': _percentile(service, 50) * 1000,
+            'service_p95_ms': _percentile(service, 95) * 1000,
+            'throughput_rps': len(samples) / elapsed if elapsed else 0.0
+        },
+        'memory': {
+            'session_state_kb_mean': float(np.mean(state_bytes)) / 1024 if state_bytes else 0.0,
+            'session_state_kb_max': max(state_bytes, default=0) / 1024,
+            'rss_baseline_mb': baseline_rss,
+            'rss_peak_mb': _rss_mb(),
+            'rss_per_session_mb': (_rss_mb() - baseline_rss) / max(len(users), 1)
+        },
+        'actions': actions
+    }
+
+
+def print_summary(result: Dict):
+    print(f"\n{result['config']['users']} usuário(s), concorrência {result['config']['concurrency']}, "
+          f"{result['reruns']} reruns em {result['elapsed_s']:.1f}s "
+          f"({result['overall']['throughput_rps']:.1f}/s)")
+    overall = result['overall']
+    print(f"Latência geral: p50 {overall['p50_ms']:.0f} ms | p95 {overall['p95_ms']:.0f} ms "
+          f"(execução: p50 {overall['service_p50_ms']:.0f} ms | p95 {overall['service_p95_ms']:.0f} ms)")
+    memory = result['memory']
+    print(f"Memória por sessão: session_state {memory['session_state_kb_mean']:.0f} KB (máx "
+          f"{memory['session_state_kb_max']:.0f} KB) | RSS {memory['rss_per_session_mb']:.1f} MB")
+    print(f"\n{'Ação':<14}{'p50 ms':>9}{'p95 ms':>9}{'exec ms':>9}{'erros':>7}{'leit.':>8}{'grav.':>8}{'KB lidos':>10}{'KB grav.':>10}")
+    for action, row in result['actions'].items():
+        print(f"{action:<14}{row['p50_ms']:>9.0f}{row['p95_ms']:>9.0f}{row['service_p50_ms']:>9.0f}{row['errors']:>7}"
+              f"{row['reads']:>8.1f}{row['writes'] + row['deletes']:>8.1f}"
+              f"{row['bytes_read'] / 1024:>10.1f}{row['bytes_written'] / 1024:>10.1f}")
+    for error in result['errors']:
+        print(f"❌ {error['action']}: {error['error']}")
+
+
+def main(argv=None) -> Dict:
+    parser = argparse.ArgumentParser(description="Teste de carga headless do Green Belt")
+    parser.add_argument('--users', type=int, default=10, help="usuários simulados")
+    parser.add_argument('--concurrency', type=int, default=5, help="usuários executando ao mesmo tempo")
+    parser.add_argument('--rows', type=int, default=1000, help="linhas do dataset enviado")
+    parser.add_argument('--measurements', type=int, default=100, help="medições por usuário")
+    parser.add_argument('--report-format', default='HTML', help="formato do relatório (PDF, HTML, Word, Markdown)")
+    parser.add_argument('--timeout', type=float, default=120, help="limite por rerun (s)")
+    parser.add_argument('--store', help="arquivo SQLite do backend local (padrão: temporário)")
+    parser.add_argument('--output', help="grava o resultado em JSON")
+    args = parser.parse_args(argv)
+    for name in ('store', 'output'):
+        if getattr(args, name):
+            setattr(args, name, os.path.abspath(getattr(args, name)))
+
+    _configure(args)
+    from src.utils.local_store import LocalAuth, get_local_store
+
+    auth = LocalAuth(get_local_store())
+    users = []
+    for index in range(args.users):
+        user = SimulatedUser(index, args)
+        auth.sign_up_with_email_password(user.email, PASSWORD)
+        users.append(user)
+
+    baseline_rss = _rss_mb()
+    failures = []
+    failures_lock = threading.Lock()
+
+    def run(user: SimulatedUser):
+        try:
+            user.scenario()
+        except Exception as e:
+            with failures_lock:
+                failures.append(f"{user.email}: {e}")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="usuario") as pool:
+        list(pool.map(run, users))
+    elapsed = time.perf_counter() - start
+
+    result = summarize(users, baseline_rss, elapsed, args)
+    result['failures'] = failures
+    print_summary(result)
+    for failure in failures:
+        print(f"❌ {failure}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(result, file, ensure_ascii=False, indent=2)
+        print(f"\nResultado gravado em {args.output}")
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,372 @@
+"""
+Micro-benchmarks das funções quentes, com comparação contra uma linha de base
+
+Mede as funções chamadas a cada upload, análise ou renderização do painel:
+capacidade do processo, conversão de DataFrames para o Firestore (ida e
+volta), conversão de tipos numpy, progresso do projeto, problemas de
+qualidade do upload, correlações significativas e formatação de moeda.
+
+Roda num processo Python comum: sem servidor Streamlit (as chamadas de st.*
+fora de um script só registram log) e sem projeto Firebase (backend local,
+os métodos do ProjectManager são chamados sem abrir o banco).
+
+Os dados são sintéticos e parametrizados por linhas (1k a 1M) e colunas
+(5 a 500); combinações acima de --max-cells são puladas. O progresso usa
+uma grade própria de documentos de projeto (100 a 10k). Cada caso mede o
+tempo por chamada (mínimo e mediana de várias repetições, com o número de
+chamadas por repetição calibrado pelo timeit).
+
+Uso:
+    python benchmarks/micro.py --quick --output micro.json
+    python benchmarks/micro.py --baseline benchmarks/baseline.json --update-baseline
+    python benchmarks/micro.py --baseline benchmarks/baseline.json --tolerance 0.25
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ROWS = [1_000, 10_000, 100_000, 1_000_000]
+COLUMNS = [5, 50, 500]
+
+QUICK_ROWS = [1_000, 10_000]
+QUICK_COLUMNS = [5, 50]
+
+# Documentos de projeto (progresso): escala do portfólio, não do dataset
+PROJECTS = [100, 1_000, 10_000]
+QUICK_PROJECTS = [100, 1_000]
+
+# Linhas x colunas acima das quais o caso é pulado (1M x 5, 100k x 50 e 10k x 500 cabem)
+MAX_CELLS = 5_000_000
+
+# Aumento do tempo mediano tolerado em relação à linha de base
+TOLERANCE = 0.25
+
+
+def _configure():
+    """Backend local e logs do Streamlit silenciados antes de importar o app"""
+    os.environ.setdefault('STORAGE_BACKEND', 'local')
+    os.environ.setdefault('LOCAL_STORE_PATH', ':memory:')
+    os.environ.setdefault('STREAMLIT_LOGGER_LEVEL', 'error')
+    for path in (ROOT, os.path.join(ROOT, 'src')):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    os.chdir(ROOT)
+
+
+# Dados sintéticos (gerados uma vez por forma e reaproveitados entre benchmarks)
+
+_datasets: Dict[Tuple[int, int], pd.DataFrame] = {}
+
+
+def dataset(rows: int, cols: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Tabela mista como um upload típico: 60% float (com 2% de faltantes),
+    20% inteiros, 10% categorias de texto e 10% datas em texto
+    """
+    key = (rows, cols)
+    if key not in _datasets:
+        rng = np.random.default_rng(seed)
+        data = {}
+        for index in range(cols):
+            kind = index % 10
+            name = f"col_{index:03d}"
+            if kind < 6:
+                values = rng.normal(10 + index, 1 + index % 3, rows)
+                values[rng.random(rows) < 0.02] = np.nan
+                data[name] = values
+            elif kind < 8:
+                data[name] = rng.integers(0, 1000, rows)
+            elif kind == 8:
+                data[name] = rng.choice(np.array(['A', 'B', 'C', 'D']), rows).astype(object)
+            else:
+                data[name] = pd.date_range('2024-01-01', periods=rows, freq='min').astype(str)
+        _datasets[key] = pd.DataFrame(data)
+    return _datasets[key]
+
+
+def correlation_matrix(cols: int, seed: int = 0) -> pd.DataFrame:
+    """Matriz de correlação com fatores latentes (parte dos pares passa de |r| > 0.3)"""
+    rng = np.random.default_rng(seed)
+    rows = 500
+    factors = rng.normal(size=(rows, max(cols // 10, 1)))
+    loadings = rng.normal(size=(factors.shape[1], cols)) * (rng.random((factors.shape[1], cols)) < 0.3)
+    values = factors @ loadings + rng.normal(size=(rows, cols))
+    return pd.DataFrame(values, columns=[f"var_{i:03d}" for i in range(cols)]).corr()
+
+
+def project_document(seed: int) -> Dict:
+    """Documento de projeto com ferramentas concluídas e pendentes em todas as fases"""
+    from src.utils.project_manager import PHASE_TOOLS
+
+    rng = np.random.default_rng(seed)
+    return {
+        phase: {tool: {'completed': bool(rng.random() < 0.5), 'data': {'notes': "x" * 50}}
+                for tool in tools}
+        for phase, tools in PHASE_TOOLS.items()
+    }
+
+
+def _project_manager():
+    from src.utils.project_manager import ProjectManager
+
+    return ProjectManager.__new__(ProjectManager)  # sem banco nem sessão
+
+
+def _upload_tool():
+    from src.pages.measure_tools import FileUploadTool
+
+    return FileUploadTool.__new__(FileUploadTool)  # _identify_quality_issues não usa o estado
+
+
+# Benchmarks: setup(rows, cols) monta os argumentos (fora da medição) e devolve a chamada medida
+
+def _capability(rows: int, cols: int) -> Callable:
+    from src.pages.measure_tools import _calculate_capability_advanced
+
+    data = pd.Series(np.random.default_rng(0).normal(10, 1, rows))
+    return lambda: _calculate_capability_advanced(data, lsl=7.0, usl=13.0)
+
+
+def _prepare_dataframe(rows: int, cols: int) -> Callable:
+    pm, df = _project_manager(), dataset(rows, cols)
+    return lambda: pm._prepare_dataframe_for_firestore(df)
+
+
+def _restore_dataframe(rows: int, cols: int) -> Callable:
+    pm = _project_manager()
+    data = pm._prepare_dataframe_for_firestore(dataset(rows, cols))
+    return lambda: pm._restore_dataframe_from_firestore(data)
+
+
+def _convert_numpy(rows: int, cols: int) -> Callable:
+    pm, df = _project_manager(), dataset(rows, cols).select_dtypes('number')
+    columns = list(df.columns)
+    records = [dict(zip(columns, row)) for row in df.to_numpy()]  # escalares numpy
+    return lambda: pm._convert_numpy_types({'records': records, 'stats': df.mean().to_numpy()})
+
+
+def _progress(projects: int, cols: int) -> Callable:
+    pm = _project_manager()
+    documents = [project_document(seed) for seed in range(projects)]
+    return lambda: [pm.calculate_project_progress(document) for document in documents]
+
+
+def _quality_issues(rows: int, cols: int) -> Callable:
+    tool, df = _upload_tool(), dataset(rows, cols)
+    return lambda: tool._identify_quality_issues(df)
+
+
+def _correlations(rows: int, cols: int) -> Callable:
+    from src.utils.correlation import significant_correlations
+
+    matrix = correlation_matrix(cols)
+    return lambda: significant_correlations(matrix)
+
+
+def _currency(rows: int, cols: int) -> Callable:
+    from src.utils.formatters import format_currency
+
+    values = np.random.default_rng(0).uniform(-1e6, 1e7, rows).tolist()
+    return lambda: [format_currency(value) for value in values]
+
+
+# nome -> (setup, forma): 'table' varia linhas e colunas, 'rows' só linhas, 'columns' só colunas,
+# 'projects' só a quantidade de documentos de projeto (grade própria, --projects)
+BENCHMARKS: Dict[str, Tuple[Callable, str]] = {
+    'capability': (_capability, 'rows'),
+    'prepare_dataframe': (_prepare_dataframe, 'table'),
+    'restore_dataframe': (_restore_dataframe, 'table'),
+    'convert_numpy_types': (_convert_numpy, 'table'),
+    'project_progress': (_progress, 'projects'),
+    'quality_issues': (_quality_issues, 'table'),
+    'significant_correlations': (_correlations, 'columns'),
+    'format_currency': (_currency, 'rows'),
+}
+
+
+def cases(names: List[str], rows: List[int], cols: List[int], max_cells: int,
+          projects: List[int]) -> List[Tuple[str, int, int]]:
+    """Combinações (benchmark, linhas, colunas) dentro do limite de células"""
+    result = []
+    for name in names:
+        shape = BENCHMARKS[name][1]
+        if shape == 'projects':
+            grid = [(p, 1) for p in projects]
+        elif shape == 'rows':
+            grid = [(r, 1) for r in rows]
+        elif shape == 'columns':
+            grid = [(0, c) for c in cols]
+        else:
+            grid = [(r, c) for r in rows for c in cols]
+        result.extend((name, r, c) for r, c in grid if max(r, 1) * c <= max_cells)
+    return result
+
+
+def case_key(name: str, rows: int, cols: int) -> str:
+    return f"{name}[{rows}x{cols}]"
+
+
+def measure(call: Callable, repeat: int, budget: float) -> Dict:
+    """Tempo por chamada: chamadas por repetição calibradas (>= 0.2s) e repetições limitadas ao orçamento"""
+    timer = timeit.Timer(call)
+    number, elapsed = timer.autorange()
+    repeat = max(1, min(repeat, int(budget / max(elapsed, 1e-9))))
+    timings = [elapsed / number]  # a rodada da calibração conta como a primeira repetição
+    if repeat > 1:
+        timings += [t / number for t in timer.repeat(repeat=repeat - 1, number=number)]
+    return {
+        'min_s': min(timings),
+        'median_s': statistics.median(timings),
+        'number': number,
+        'repeat': len(timings)
+    }
+
+
+def environment() -> Dict:
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def run(selected: List[Tuple[str, int, int]], repeat: int, budget: float) -> Dict:
+    results = {}
+    for name, rows, cols in selected:
+        key = case_key(name, rows, cols)
+        try:
+            call = BENCHMARKS[name][0](rows, cols)
+            results[key] = dict(measure(call, repeat, budget), name=name, rows=rows, cols=cols)
+            print(f"{key:<44}{results[key]['median_s'] * 1000:>12.3f} ms  (mín {results[key]['min_s'] * 1000:.3f} ms, "
+                  f"{results[key]['repeat']}x{results[key]['number']})", flush=True)
+        except Exception as e:
+            results[key] = {'name': name, 'rows': rows, 'cols': cols, 'error': str(e)}
+            print(f"❌ {key}: {e}", flush=True)
+    return {'generated_at': datetime.now().isoformat(), 'environment': environment(), 'results': results}
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> Dict:
+    """
+    Compara a mediana de cada caso com a da linha de base
+
+    Returns:
+        dict com 'regressions', 'improvements', 'unchanged' e 'missing'
+        (casos sem linha de base); cada item traz baseline, atual e razão
+    """
+    report = {'regressions': [], 'improvements': [], 'unchanged': [], 'missing': []}
+    reference = baseline.get('results', {})
+    for key, result in current['results'].items():
+        if 'error' in result:
+            report['regressions'].append({'case': key, 'error': result['error']})
+            continue
+        base = reference.get(key)
+        if not base or 'median_s' not in base:
+            report['missing'].append(key)
+            continue
+        ratio = result['median_s'] / base['median_s'] if base['median_s'] else float('inf')
+        item = {'case': key, 'baseline_ms': base['median_s'] * 1000, 'current_ms': result['median_s'] * 1000,
+                'ratio': ratio}
+        if ratio > 1 + tolerance:
+            report['regressions'].append(item)
+        elif ratio < 1 / (1 + tolerance):
+            report['improvements'].append(item)
+        else:
+            report['unchanged'].append(item)
+    return report
+
+
+def print_comparison(report: Dict, tolerance: float):
+    print(f"\nComparação com a linha de base (tolerância {tolerance:.0%}):")
+    for title, items in (("Regressões", report['regressions']), ("Melhorias", report['improvements'])):
+        for item in items:
+            if 'error' in item:
+                print(f"❌ {item['case']}: {item['error']}")
+            else:
+                print(f"{'❌' if title == 'Regressões' else '✅'} {item['case']}: {item['baseline_ms']:.3f} ms -> "
+                      f"{item['current_ms']:.3f} ms ({item['ratio']:.2f}x)")
+    print(f"{len(report['regressions'])} regressão(ões), {len(report['improvements'])} melhoria(s), "
+          f"{len(report['unchanged'])} dentro da tolerância, {len(report['missing'])} sem linha de base")
+
+
+def _load(path: str) -> Optional[Dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def _save(path: str, data: Dict):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(data, file, ensure_ascii=False, indent=2)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks das funções quentes do Green Belt")
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), help="benchmarks a executar (padrão: todos)")
+    parser.add_argument('--rows', type=int, nargs='+', help=f"linhas (padrão: {ROWS})")
+    parser.add_argument('--cols', type=int, nargs='+', help=f"colunas (padrão: {COLUMNS})")
+    parser.add_argument('--projects', type=int, nargs='+', help=f"documentos de projeto do progresso (padrão: {PROJECTS})")
+    parser.add_argument('--max-cells', type=int, default=MAX_CELLS, help="pula casos com mais linhas x colunas")
+    parser.add_argument('--quick', action='store_true', help=f"grade reduzida ({QUICK_ROWS} x {QUICK_COLUMNS})")
+    parser.add_argument('--repeat', type=int, default=5, help="repetições por caso")
+    parser.add_argument('--budget', type=float, default=5.0, help="tempo máximo de repetições por caso (s)")
+    parser.add_argument('--output', help="grava o resultado em JSON")
+    parser.add_argument('--baseline', help="linha de base em JSON para comparar")
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="grava o resultado na linha de base (mantém os casos não executados)")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help="aumento tolerado da mediana (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+    for name in ('output', 'baseline'):
+        if getattr(args, name):
+            setattr(args, name, os.path.abspath(getattr(args, name)))
+
+    _configure()
+    rows = args.rows or (QUICK_ROWS if args.quick else ROWS)
+    cols = args.cols or (QUICK_COLUMNS if args.quick else COLUMNS)
+    projects = args.projects or (QUICK_PROJECTS if args.quick else PROJECTS)
+    selected = cases(args.only or list(BENCHMARKS), rows, cols, args.max_cells, projects)
+    print(f"{len(selected)} caso(s)\n")
+
+    result = run(selected, args.repeat, args.budget)
+    if args.output:
+        _save(args.output, result)
+        print(f"\nResultado gravado em {args.output}")
+
+    if not args.baseline:
+        return 0
+
+    baseline = _load(args.baseline)
+    if args.update_baseline:
+        merged = dict(result, results=dict((baseline or {}).get('results', {}), **{
+            key: value for key, value in result['results'].items() if 'error' not in value
+        }))
+        _save(args.baseline, merged)
+        print(f"Linha de base atualizada em {args.baseline}")
+        return 0
+
+    if baseline is None:
+        print(f"❌ Linha de base não encontrada: {args.baseline} (crie com --update-baseline)")
+        return 2
+    report = compare(result, baseline, args.tolerance)
+    print_comparison(report, args.tolerance)
+    if args.output:
+        _save(args.output, dict(result, comparison=report))
+    return 1 if report['regressions'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,8 +6,22 @@ import firebase_admin
 from firebase_admin import credentials, firestore, auth
 import requests
 
+try:
+    from src.utils.firestore_trace import trace_client
+    from src.utils.local_store import LocalAuth, get_local_store
+except ImportError:
+    from utils.firestore_trace import trace_client
+    from utils.local_store import LocalAuth, get_local_store
+
 load_dotenv()
 
+# "firestore" (padrão) ou "local" (SQLite, sem rede - ver src/utils/local_store.py)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "firestore").lower()
+
+def is_local_backend():
+    """Armazenamento e autenticação locais no lugar do Firebase"""
+    return STORAGE_BACKEND == "local"
+
 # Configuração do Firebase para autenticação REST API
 firebase_config = {
     "apiKey": st.secrets.get("FIREBASE_API_KEY", os.getenv("FIREBASE_API_KEY")),
@@ -62,7 +76,23 @@ def get_project_id():
     return None
 
 def initialize_firebase():
-    """Inicializa o Firebase Admin SDK"""
+    """Inicializa o Firebase Admin SDK (cliente com rastreamento de leituras/gravações)"""
+    if is_local_backend():
+        return trace_client(get_local_store())
+    return trace_client(_initialize_firestore_client())
+
+def get_firestore_client():
+    """Cliente do backend configurado (Firestore ou local)"""
+    return initialize_firebase()
+
+def get_auth_client():
+    """Autenticação do backend configurado: REST do Firebase ou contas locais"""
+    if is_local_backend():
+        return LocalAuth(get_local_store())
+    return FirebaseRestAuth()
+
+def _initialize_firestore_client():
+    """Inicializa o Firebase Admin SDK e devolve o cliente do Firestore"""
     try:
         # Verificar se já foi inicializado - SEM DEBUG
         if firebase_admin._apps:
@@ -152,6 +182,9 @@ def test_firebase_connection():
         if not db:
             return False, "Firebase não inicializado"
         
+        if is_local_backend():
+            return True, f"Backend local: {db.path}"
+        
         project_id = get_project_id()
         if project_id:
             return True, f"Conexão estabelecida com projeto: {project_id}"
@@ -266,6 +299,9 @@ class FirebaseRestAuth:
 
 def check_firebase_config():
     """Verifica se as configurações do Firebase estão corretas"""
+    if is_local_backend():
+        return {"Backend local": True}
+    
     config_status = {
         "API Key": bool(firebase_config.get("apiKey")),
         "Auth Domain": bool(firebase_config.get("authDomain")),
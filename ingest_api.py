@@ -0,0 +1,159 @@
+"""
+API HTTP de ingestão de medições dos pontos de controle
+
+Executa ao lado do app Streamlit, sem interface:
+
+    # Firestore (ou emulador: defina FIRESTORE_EMULATOR_HOST=localhost:8080)
+    python ingest_api.py --port 8600
+
+    # Backend local do app (mesmo local_store.db do STORAGE_BACKEND=local)
+    STORAGE_BACKEND=local python ingest_api.py --port 8600
+
+    # Stand-in local em SQLite (arquivo próprio, não lido pelo app)
+    python ingest_api.py --sqlite measurements.db
+
+Endpoints:
+    GET  /health
+    PUT  /projects/{project_id}/control-points/{point_id}               configuração do ponto
+    POST /projects/{project_id}/control-points/{point_id}/measurements  lote de medições
+         corpo: {"measurements": [{"value": 12.3, "timestamp": "2024-03-15T10:30:00"}]}
+         cabeçalho opcional: Idempotency-Key
+
+Com INGEST_API_KEY definida, as requisições devem enviar o cabeçalho X-API-Key.
+"""
+import argparse
+import json
+import logging
+import os
+import re
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from dotenv import load_dotenv
+
+from config.firebase_config import is_local_backend
+from src.utils.ingestion import (IngestionError, IngestionService, MAX_BATCH_SIZE,
+                                 MAX_INFLIGHT, firestore_plans_loader)
+from src.utils.local_store import get_local_store
+from src.utils.measurement_store import FirestoreMeasurementBackend, SQLiteMeasurementBackend
+
+
+load_dotenv()
+logger = logging.getLogger("ingest_api")
+
+POINT_PATH = re.compile(r"^/projects/([^/]+)/control-points/([^/]+)$")
+MEASUREMENTS_PATH = re.compile(r"^/projects/([^/]+)/control-points/([^/]+)/measurements$")
+
+# Limite do corpo da requisição (bytes)
+MAX_BODY_SIZE = 2 * 1024 * 1024
+
+
+def build_service(sqlite_path=None, max_batch=MAX_BATCH_SIZE, max_inflight=MAX_INFLIGHT) -> IngestionService:
+    """
+    Cria o serviço sobre SQLite, o backend local do app ou Firestore
+    (respeita FIRESTORE_EMULATOR_HOST)
+    """
+    if sqlite_path:
+        return IngestionService(SQLiteMeasurementBackend(sqlite_path), max_batch=max_batch, max_inflight=max_inflight)
+
+    if is_local_backend():
+        # Mesmo arquivo do app (LOCAL_STORE_PATH): as medições aparecem na execução offline
+        db = get_local_store()
+    else:
+        from google.cloud import firestore
+
+        db = firestore.Client(project=os.getenv("FIREBASE_PROJECT_ID") or os.getenv("GOOGLE_CLOUD_PROJECT"))
+    return IngestionService(FirestoreMeasurementBackend(db), plans_loader=firestore_plans_loader(db),
+                            max_batch=max_batch, max_inflight=max_inflight)
+
+
+class IngestHandler(BaseHTTPRequestHandler):
+    service: IngestionService = None
+    api_key: str = ""
+
+    def _send(self, status: int, body: dict, headers: dict = None):
+        data = json.dumps(body, ensure_ascii=False, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _authorized(self) -> bool:
+        if self.api_key and self.headers.get("X-API-Key") != self.api_key:
+            self._send(401, {'error': "X-API-Key inválida"})
+            return False
+        return True
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_SIZE:
+            raise IngestionError("Corpo da requisição muito grande", status=413)
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            raise IngestionError("JSON inválido")
+
+    def _handle(self, action):
+        if not self._authorized():
+            return
+        try:
+            status, body = action()
+            self._send(status, body)
+        except IngestionError as e:
+            headers = {"Retry-After": str(e.retry_after)} if e.retry_after else None
+            self._send(e.status, {'error': str(e)}, headers)
+        except Exception as e:
+            logger.exception("Erro na ingestão")
+            self._send(500, {'error': str(e)})
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, {'status': 'ok'})
+        else:
+            self._send(404, {'error': "Rota não encontrada"})
+
+    def do_PUT(self):
+        match = POINT_PATH.match(self.path)
+        if not match:
+            self._send(404, {'error': "Rota não encontrada"})
+            return
+        self._handle(lambda: (200, self.service.register_point(*match.groups(), self._read_json())))
+
+    def do_POST(self):
+        match = MEASUREMENTS_PATH.match(self.path)
+        if not match:
+            self._send(404, {'error': "Rota não encontrada"})
+            return
+        idempotency_key = self.headers.get("Idempotency-Key")
+        self._handle(lambda: (201, self.service.ingest(*match.groups(), self._read_json(), idempotency_key)))
+
+    def log_message(self, format, *args):
+        logger.info("%s - %s", self.address_string(), format % args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API de ingestão de medições dos pontos de controle")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--sqlite", help="Arquivo SQLite (stand-in local do Firestore)")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument("--max-inflight", type=int, default=MAX_INFLIGHT)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    IngestHandler.service = build_service(args.sqlite, args.max_batch, args.max_inflight)
+    IngestHandler.api_key = os.getenv("INGEST_API_KEY", "")
+
+    server = ThreadingHTTPServer((args.host, args.port), IngestHandler)
+    logger.info("API de ingestão em http://%s:%s", args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
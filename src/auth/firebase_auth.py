@@ -1,12 +1,12 @@
 import streamlit as st
 import time
 import re
-from config.firebase_config import FirebaseRestAuth, initialize_firebase, check_firebase_config
+from config.firebase_config import get_auth_client, initialize_firebase, check_firebase_config
 
 class FirebaseAuth:
     def __init__(self):
         try:
-            self.auth = FirebaseRestAuth()
+            self.auth = get_auth_client()
             self.db = initialize_firebase()
         except Exception as e:
             st.error(f"❌ Erro na configuração do Firebase: {str(e)}")
@@ -6,6 +6,7 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
+import os
 import warnings
 
 # Suprimir warnings
@@ -20,9 +21,10 @@ except ImportError:
     st.warning("⚠️ Scipy não disponível. Algumas análises estatísticas estarão limitadas.")
 
 try:
-    from sklearn.preprocessing import StandardScaler
-    from sklearn.decomposition import PCA
-    from sklearn.cluster import KMeans
+    try:
+        from src.utils.multivariate import PCA_METHODS, MultivariateError, explore, standardized_profiles
+    except ImportError:
+        from utils.multivariate import PCA_METHODS, MultivariateError, explore, standardized_profiles
     SKLEARN_AVAILABLE = True
 except ImportError:
     SKLEARN_AVAILABLE = False
@@ -37,6 +39,19 @@ except ImportError:
         st.error("❌ Não foi possível importar ProjectManager")
         st.stop()
 
+try:
+    from src.utils.hypothesis_tests import ALPHA, dataset_version, results_frame, run_hypothesis_tests
+    from src.utils.regression import RegressionError, build_formula, coefficients_frame, fit_model, stepwise
+    from src.utils.pareto import aggregate, pareto_table, stratified_pareto, vital_few
+    from src.utils.correlation import SIGNIFICANT_THRESHOLD, classify_strength, significant_correlations
+    from src.utils.project_manager import PHASE_TOOLS
+except ImportError:
+    from utils.hypothesis_tests import ALPHA, dataset_version, results_frame, run_hypothesis_tests
+    from utils.regression import RegressionError, build_formula, coefficients_frame, fit_model, stepwise
+    from utils.pareto import aggregate, pareto_table, stratified_pareto, vital_few
+    from utils.correlation import SIGNIFICANT_THRESHOLD, classify_strength, significant_correlations
+    from utils.project_manager import PHASE_TOOLS
+
 
 class AnalyzePhaseManager:
     """Gerenciador principal da fase Analyze com melhor organização e funcionalidades"""
@@ -153,10 +168,11 @@ class StatisticalAnalysis:
     
     def _show_analysis_tabs(self, df: pd.DataFrame, numeric_columns: List[str]):
         """Mostra as abas de análise"""
-        tab1, tab2, tab3, tab4 = st.tabs([
+        tab1, tab2, tab3, tab4, tab5 = st.tabs([
             "📈 Estatísticas Descritivas",
             "🔗 Análise de Correlação", 
             "📊 Distribuições",
+            "🧭 Análise Multivariada",
             "📋 Relatório Completo"
         ])
         
@@ -170,6 +186,9 @@ class StatisticalAnalysis:
             self._show_distribution_analysis(df, numeric_columns)
         
         with tab4:
+            self._show_multivariate_analysis(df, numeric_columns)
+        
+        with tab5:
             self._show_comprehensive_report(df, numeric_columns)
         
         # Botões de ação
@@ -296,34 +315,9 @@ class StatisticalAnalysis:
         """Mostra correlações mais significativas"""
         st.write("#### 🎯 Correlações Mais Significativas")
         
-        # Encontrar correlações fortes
-        correlations = []
-        
-        for i in range(len(corr_matrix.columns)):
-            for j in range(i + 1, len(corr_matrix.columns)):
-                corr_value = corr_matrix.iloc[i, j]
-                
-                if not pd.isna(corr_value):
-                    abs_corr = abs(corr_value)
-                    
-                    if abs_corr > 0.3:  # Correlações moderadas ou fortes
-                        strength = self._classify_correlation_strength(abs_corr)
-                        direction = "Positiva" if corr_value > 0 else "Negativa"
-                        
-                        correlations.append({
-                            'Variável 1': corr_matrix.columns[i],
-                            'Variável 2': corr_matrix.columns[j],
-                            'Correlação': corr_value,
-                            'Força': strength,
-                            'Direção': direction
-                        })
-        
-        if correlations:
-            df_corr = pd.DataFrame(correlations)
-            df_corr = df_corr.reindex(
-                df_corr['Correlação'].abs().sort_values(ascending=False).index
-            )
-            
+        df_corr = significant_correlations(corr_matrix)
+
+        if not df_corr.empty:
             st.dataframe(df_corr.round(4), use_container_width=True)
             
             # Insights automáticos
@@ -332,20 +326,11 @@ class StatisticalAnalysis:
                 st.info(f"🔗 **Correlação mais forte:** {strongest['Variável 1']} e {strongest['Variável 2']} "
                        f"({strongest['Correlação']:.3f} - {strongest['Força']} {strongest['Direção']})")
         else:
-            st.info("📊 Nenhuma correlação significativa encontrada (|r| > 0.3)")
+            st.info(f"📊 Nenhuma correlação significativa encontrada (|r| > {SIGNIFICANT_THRESHOLD})")
     
     def _classify_correlation_strength(self, abs_corr: float) -> str:
         """Classifica a força da correlação"""
-        if abs_corr >= 0.8:
-            return "Muito Forte"
-        elif abs_corr >= 0.6:
-            return "Forte"
-        elif abs_corr >= 0.4:
-            return "Moderada"
-        elif abs_corr >= 0.2:
-            return "Fraca"
-        else:
-            return "Muito Fraca"
+        return classify_strength(abs_corr)
     
     def _show_detailed_correlation_analysis(self, df: pd.DataFrame, numeric_columns: List[str]):
         """Análise detalhada de correlações específicas"""
@@ -637,6 +622,113 @@ class StatisticalAnalysis:
         except Exception as e:
             st.error(f"Erro nos testes de normalidade: {str(e)}")
     
+    def _show_multivariate_analysis(self, df: pd.DataFrame, numeric_columns: List[str]):
+        """PCA e agrupamento para explorar causas com várias variáveis ao mesmo tempo"""
+        st.write("### 🧭 Análise Multivariada (PCA + Clusters)")
+        
+        if not SKLEARN_AVAILABLE:
+            st.error("❌ Scikit-learn não está disponível. Instale com: pip install scikit-learn")
+            return
+        
+        if len(numeric_columns) < 2:
+            st.info("São necessárias pelo menos 2 variáveis numéricas para a análise multivariada")
+            return
+        
+        columns = st.multiselect(
+            "Variáveis",
+            numeric_columns,
+            default=numeric_columns[:20],
+            key=f"mv_columns_{self.project_id}"
+        )
+        if len(columns) < 2:
+            st.info("💡 Selecione ao menos duas variáveis")
+            return
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            n_components = st.slider("Componentes", 2, max(3, min(10, len(columns))), 2,
+                                     key=f"mv_components_{self.project_id}")
+        with col2:
+            n_clusters = st.slider("Clusters", 2, 10, 3, key=f"mv_clusters_{self.project_id}")
+        with col3:
+            method = st.selectbox("Método da PCA", list(PCA_METHODS.keys()),
+                                  format_func=lambda x: PCA_METHODS[x], key=f"mv_method_{self.project_id}")
+        with col4:
+            n_threads = st.number_input("Threads", min_value=1, max_value=os.cpu_count() or 1,
+                                        value=os.cpu_count() or 1, key=f"mv_threads_{self.project_id}",
+                                        help="Limite de threads de cálculo usadas no ajuste")
+        
+        try:
+            with st.spinner("Ajustando PCA e clusters..."):
+                result = explore(df, columns, n_components, n_clusters, method, int(n_threads))
+        except MultivariateError as e:
+            st.warning(f"⚠️ {str(e)}")
+            return
+        
+        explained = result['explained_variance']
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Observações", f"{result['n']:,}")
+        with col2:
+            st.metric("Variância explicada", f"{sum(explained):.1%}")
+        with col3:
+            st.metric("Silhueta", f"{result['silhouette']:.3f}" if result['silhouette'] is not None else "N/A")
+        with col4:
+            st.metric("Algoritmo", result['clustering'])
+        st.caption(f"PCA: {PCA_METHODS[result['method']]}")
+        
+        # Biplot: eixos escolhidos sem reajustar (resultado em cache)
+        pcs = list(result['loadings'].columns)
+        col1, col2 = st.columns(2)
+        with col1:
+            x_pc = st.selectbox("Eixo X", pcs, index=0, key=f"mv_x_{self.project_id}")
+        with col2:
+            y_pc = st.selectbox("Eixo Y", pcs, index=1, key=f"mv_y_{self.project_id}")
+        
+        scores, labels = result['scores'], result['labels']
+        sample = np.random.default_rng(0).choice(len(scores), min(len(scores), 5000), replace=False)
+        x_idx, y_idx = pcs.index(x_pc), pcs.index(y_pc)
+        
+        fig = px.scatter(
+            x=scores[sample, x_idx], y=scores[sample, y_idx],
+            color=[f"Cluster {label + 1}" for label in labels[sample]],
+            labels={'x': f"{x_pc} ({explained[x_idx]:.1%})", 'y': f"{y_pc} ({explained[y_idx]:.1%})", 'color': ''},
+            title="Biplot", opacity=0.6
+        )
+        loadings = result['loadings']
+        scale = np.abs(scores[sample][:, [x_idx, y_idx]]).max() / max(np.abs(loadings[[x_pc, y_pc]].to_numpy()).max(), 1e-9)
+        for variable, row in loadings.iterrows():
+            fig.add_annotation(
+                x=row[x_pc] * scale, y=row[y_pc] * scale, ax=0, ay=0,
+                xref='x', yref='y', axref='x', ayref='y',
+                text=variable, showarrow=True, arrowhead=2, arrowcolor='black', font=dict(size=11)
+            )
+        fig.update_layout(height=550)
+        st.plotly_chart(fig, use_container_width=True)
+        if len(sample) < len(scores):
+            st.caption(f"Gráfico com amostra de {len(sample):,} de {len(scores):,} observações")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            fig = px.bar(x=pcs, y=explained, title="Variância Explicada por Componente",
+                         labels={'x': '', 'y': 'Proporção'})
+            fig.update_layout(height=350)
+            st.plotly_chart(fig, use_container_width=True)
+        
+        with col2:
+            profile = standardized_profiles(result)
+            fig = px.imshow(profile, color_continuous_scale='RdBu_r', zmin=-2, zmax=2, aspect='auto',
+                            title="Perfil dos Clusters (desvios-padrão da média)")
+            fig.update_layout(height=350)
+            st.plotly_chart(fig, use_container_width=True)
+        
+        st.write("#### 📋 Perfil dos Clusters (médias)")
+        st.dataframe(result['profiles'].round(4), use_container_width=True)
+        
+        with st.expander("🔢 Cargas das componentes"):
+            st.dataframe(loadings.round(4), use_container_width=True)
+    
     def _show_comprehensive_report(self, df: pd.DataFrame, numeric_columns: List[str]):
         """Relatório abrangente da análise"""
         st.write("### 📋 Relatório Completo da Análise Estatística")
@@ -804,6 +896,686 @@ class StatisticalAnalysis:
                     st.error("❌ Dados não encontrados. Carregue os dados primeiro.")
 
 
+class HypothesisTestingTool:
+    """Bateria de testes de hipótese: um fator contra várias respostas"""
+    
+    # Fatores com mais níveis que isso não são oferecidos (provavelmente identificadores)
+    MAX_FACTOR_LEVELS = 30
+    
+    def __init__(self, manager: AnalyzePhaseManager):
+        self.manager = manager
+        self.project_id = manager.project_id
+        self.data = manager.initialize_session_data('hypothesis_tests', {
+            'factor': None,
+            'responses': [],
+            'results': {}
+        })
+    
+    def show(self):
+        """Interface principal dos testes de hipótese"""
+        st.markdown("## 🧪 Testes de Hipótese")
+        st.markdown("Verifique se um fator (máquina, turno, fornecedor...) afeta as variáveis de resposta.")
+        
+        if not SCIPY_AVAILABLE:
+            st.error("❌ Scipy não está disponível. Instale com: pip install scipy")
+            return
+        
+        df = self.manager.get_uploaded_data()
+        if df is None:
+            st.warning("⚠️ **Dados não encontrados**")
+            st.info("Primeiro faça upload dos dados na fase **Measure** para realizar os testes.")
+            return
+        
+        numeric_columns = df.select_dtypes(include=[np.number]).columns.tolist()
+        factor_columns = [c for c in df.columns if 2 <= df[c].nunique() <= self.MAX_FACTOR_LEVELS]
+        categorical_columns = [c for c in factor_columns if c not in numeric_columns]
+        
+        if not numeric_columns or not factor_columns:
+            st.error("❌ São necessárias ao menos uma coluna numérica e uma coluna de fator (2 a "
+                     f"{self.MAX_FACTOR_LEVELS} níveis)")
+            return
+        
+        self._show_status()
+        config = self._show_configuration(df, factor_columns, numeric_columns, categorical_columns)
+        
+        if config and (config['responses'] or config['categorical']):
+            results = run_hypothesis_tests(df, **config)
+            self._show_results(results)
+            self._show_action_buttons(df, config, results)
+        else:
+            st.info("💡 Selecione ao menos uma variável de resposta")
+    
+    def _show_status(self):
+        """Mostra status da ferramenta"""
+        if self.manager.is_tool_completed('hypothesis_tests'):
+            st.success("✅ **Testes de hipótese concluídos**")
+        else:
+            st.info("⏳ **Testes em desenvolvimento**")
+    
+    def _show_configuration(self, df: pd.DataFrame, factor_columns: List[str],
+                            numeric_columns: List[str], categorical_columns: List[str]) -> Optional[Dict]:
+        """Seleção do fator e das respostas"""
+        st.markdown("### ⚙️ Configuração")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            saved_factor = self.data.get('factor')
+            factor = st.selectbox(
+                "Fator (grupos)",
+                factor_columns,
+                index=factor_columns.index(saved_factor) if saved_factor in factor_columns else 0,
+                key=f"ht_factor_{self.project_id}"
+            )
+        
+        with col2:
+            response_options = [c for c in numeric_columns if c != factor]
+            responses = st.multiselect(
+                "Variáveis de resposta (numéricas)",
+                response_options,
+                default=[c for c in self.data.get('responses', []) if c in response_options] or response_options[:5],
+                key=f"ht_responses_{self.project_id}"
+            )
+        
+        levels = sorted(df[factor].dropna().unique().tolist(), key=str)
+        
+        with st.expander("🔧 Testes adicionais"):
+            col3, col4 = st.columns(2)
+            
+            with col3:
+                second_options = [c for c in factor_columns if c != factor and c not in responses]
+                second_factor = st.selectbox(
+                    "Segundo fator (ANOVA de 2 fatores)",
+                    [None] + second_options,
+                    format_func=lambda x: "Nenhum" if x is None else x,
+                    key=f"ht_second_factor_{self.project_id}"
+                )
+                
+                paired_reference = st.selectbox(
+                    "Referência para t pareado",
+                    [None] + responses,
+                    format_func=lambda x: "Nenhuma" if x is None else x,
+                    key=f"ht_paired_{self.project_id}",
+                    help="Cada resposta é comparada linha a linha com esta coluna (ex.: antes x depois)"
+                )
+            
+            with col4:
+                categorical = st.multiselect(
+                    "Colunas categóricas (qui-quadrado)",
+                    [c for c in categorical_columns if c != factor],
+                    key=f"ht_categorical_{self.project_id}"
+                )
+                
+                pair = None
+                if len(levels) > 2:
+                    pair = st.multiselect(
+                        "Dois níveis para o teste t",
+                        levels,
+                        max_selections=2,
+                        key=f"ht_levels_{self.project_id}"
+                    )
+        
+        return {
+            'factor': factor,
+            'responses': responses,
+            'second_factor': second_factor,
+            'categorical': categorical,
+            'paired_reference': paired_reference,
+            'levels': pair if pair and len(pair) == 2 else None
+        }
+    
+    def _show_results(self, results: Dict[str, List[Dict]]):
+        """Tabela de resultados e resumo das diferenças significativas"""
+        st.markdown("### 📊 Resultados")
+        
+        frame = results_frame(results)
+        if frame.empty:
+            st.info("Nenhum teste pôde ser calculado com os dados selecionados")
+            return
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Testes executados", len(frame))
+        with col2:
+            st.metric("Significativos", int((frame['Significativo'] == "✅ Sim").sum()))
+        with col3:
+            st.metric("Nível de significância", f"{ALPHA:.0%}")
+        
+        selected_tests = st.multiselect(
+            "Filtrar testes",
+            list(dict.fromkeys(frame['Teste'])),
+            key=f"ht_filter_{self.project_id}"
+        )
+        if selected_tests:
+            frame = frame[frame['Teste'].isin(selected_tests)]
+        
+        st.dataframe(
+            frame,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'Estatística': st.column_config.NumberColumn(format="%.4f"),
+                'p-valor': st.column_config.NumberColumn(format="%.4f"),
+                'Tamanho do efeito': st.column_config.NumberColumn(format="%.3f")
+            }
+        )
+        st.caption("Tamanho do efeito: η² (ANOVA), η² parcial (2 fatores), d de Cohen (t), V de Cramér (qui-quadrado)")
+        
+        significant = {
+            item['response'] for item in results.get('anova', []) + results.get('kruskal', [])
+            if item['significant']
+        }
+        if significant:
+            st.success(f"✅ O fator afeta significativamente: {', '.join(sorted(significant))}")
+        
+        unequal = [item['response'] for item in results.get('levene', []) if item['significant']]
+        if unequal:
+            st.warning(f"⚠️ Variâncias diferentes entre os grupos em: {', '.join(unequal)} "
+                       "— prefira Kruskal-Wallis/Welch à ANOVA nessas respostas")
+    
+    def _show_action_buttons(self, df: pd.DataFrame, config: Dict, results: Dict[str, List[Dict]]):
+        """Botões de ação"""
+        st.divider()
+        
+        save_data = dict(config, results=results,
+                         dataset_version=dataset_version(df, list(df.columns)),
+                         analysis_date=datetime.now().isoformat())
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            if st.button("💾 Salvar Testes", key=f"save_hypothesis_tests_{self.project_id}"):
+                self.data.update(save_data)
+                if self.manager.save_tool_data('hypothesis_tests', self.data, False):
+                    st.success("💾 Testes de hipótese salvos com sucesso!")
+                else:
+                    st.error("❌ Erro ao salvar testes")
+        
+        with col2:
+            if st.button("✅ Finalizar Testes de Hipótese", key=f"complete_hypothesis_tests_{self.project_id}"):
+                self.data.update(save_data)
+                if self.manager.save_tool_data('hypothesis_tests', self.data, True):
+                    st.success("✅ Testes de hipótese finalizados com sucesso!")
+                    st.balloons()
+                else:
+                    st.error("❌ Erro ao finalizar testes")
+
+
+class RegressionTool:
+    """Regressão linear múltipla com VIF e seleção stepwise"""
+    
+    MAX_CATEGORY_LEVELS = 30
+    
+    # A partir deste número de linhas o ajuste em float32 vem ativado
+    FLOAT32_ROWS = 200_000
+    
+    def __init__(self, manager: AnalyzePhaseManager):
+        self.manager = manager
+        self.project_id = manager.project_id
+        self.data = manager.initialize_session_data('regression_analysis', {
+            'response': None,
+            'predictors': [],
+            'interactions': [],
+            'model': {}
+        })
+    
+    def show(self):
+        """Interface principal da regressão"""
+        st.markdown("## 📈 Regressão Múltipla")
+        st.markdown("Quantifique o efeito de várias variáveis de entrada (X) sobre a variável de saída (Y).")
+        
+        if not SCIPY_AVAILABLE:
+            st.error("❌ Scipy não está disponível. Instale com: pip install scipy")
+            return
+        
+        df = self.manager.get_uploaded_data()
+        if df is None:
+            st.warning("⚠️ **Dados não encontrados**")
+            st.info("Primeiro faça upload dos dados na fase **Measure** para ajustar modelos.")
+            return
+        
+        numeric_columns = df.select_dtypes(include=[np.number]).columns.tolist()
+        if not numeric_columns:
+            st.error("❌ Nenhuma coluna numérica encontrada nos dados")
+            return
+        
+        if self.manager.is_tool_completed('regression_analysis'):
+            st.success("✅ **Regressão concluída**")
+        else:
+            st.info("⏳ **Regressão em desenvolvimento**")
+        
+        config = self._show_configuration(df, numeric_columns)
+        if not config['terms']:
+            st.info("💡 Selecione ao menos uma variável X")
+            return
+        
+        try:
+            if config['method'] == 'stepwise':
+                selection = stepwise(df, config['response'], config['terms'], float32=config['float32'])
+                model = selection['model']
+                self._show_stepwise_history(selection)
+            else:
+                model = fit_model(df, build_formula(config['response'], config['terms']), config['float32'])
+        except RegressionError as e:
+            st.error(f"❌ {str(e)}")
+            return
+        
+        self._show_model(model)
+        self._show_action_buttons(df, config, model)
+    
+    def _show_configuration(self, df: pd.DataFrame, numeric_columns: List[str]) -> Dict:
+        """Seleção de Y, X, interações e método"""
+        st.markdown("### ⚙️ Modelo")
+        
+        col1, col2 = st.columns([1, 2])
+        
+        with col1:
+            saved_response = self.data.get('response')
+            response = st.selectbox(
+                "Variável de saída (Y)",
+                numeric_columns,
+                index=numeric_columns.index(saved_response) if saved_response in numeric_columns else 0,
+                key=f"reg_response_{self.project_id}"
+            )
+        
+        with col2:
+            options = [
+                c for c in df.columns
+                if c != response and (c in numeric_columns or df[c].nunique() <= self.MAX_CATEGORY_LEVELS)
+            ]
+            predictors = st.multiselect(
+                "Variáveis de entrada (X)",
+                options,
+                default=[c for c in self.data.get('predictors', []) if c in options],
+                key=f"reg_predictors_{self.project_id}",
+                help="Colunas categóricas entram como variáveis indicadoras"
+            )
+        
+        pairs = [f"{a}:{b}" for i, a in enumerate(predictors) for b in predictors[i + 1:]]
+        
+        col3, col4, col5 = st.columns([2, 1, 1])
+        
+        with col3:
+            interactions = st.multiselect(
+                "Interações",
+                pairs,
+                default=[p for p in self.data.get('interactions', []) if p in pairs],
+                key=f"reg_interactions_{self.project_id}"
+            )
+        
+        with col4:
+            method = st.radio(
+                "Método",
+                ['full', 'stepwise'],
+                format_func=lambda x: "Modelo completo" if x == 'full' else "Stepwise",
+                key=f"reg_method_{self.project_id}"
+            )
+        
+        with col5:
+            float32 = st.toggle(
+                "Ajuste em float32",
+                value=len(df) >= self.FLOAT32_ROWS,
+                key=f"reg_float32_{self.project_id}",
+                help="Metade da memória e mais rápido em bases grandes, com menor precisão numérica"
+            )
+        
+        terms = predictors + interactions
+        if terms:
+            st.code(build_formula(response, terms), language=None)
+        
+        return {'response': response, 'predictors': predictors, 'interactions': interactions,
+                'terms': terms, 'method': method, 'float32': float32}
+    
+    def _show_stepwise_history(self, selection: Dict):
+        """Passos da seleção stepwise"""
+        with st.expander(f"🔀 Seleção stepwise: {len(selection['terms'])} termo(s) selecionado(s)", expanded=True):
+            if selection['history']:
+                history = pd.DataFrame(selection['history']).rename(columns={
+                    'step': 'Passo', 'action': 'Ação', 'term': 'Termo', 'p_value': 'p-valor'
+                })
+                st.dataframe(history, use_container_width=True, hide_index=True)
+            else:
+                st.info("Nenhum termo atingiu o nível de entrada (α = 0,05)")
+    
+    def _show_model(self, model: Dict):
+        """Qualidade do ajuste, coeficientes e resíduos"""
+        st.markdown("### 📊 Resultados do Ajuste")
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("R²", f"{model['r2']:.4f}" if model['r2'] is not None else "N/A")
+        with col2:
+            st.metric("R² ajustado", f"{model['adj_r2']:.4f}" if model['adj_r2'] is not None else "N/A")
+        with col3:
+            st.metric("p-valor (F)", f"{model['f_p_value']:.4g}" if model['f_p_value'] is not None else "N/A")
+        with col4:
+            st.metric("Observações", f"{model['n']:,}")
+        
+        coefficients = coefficients_frame(model)
+        st.dataframe(
+            coefficients,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'Coeficiente': st.column_config.NumberColumn(format="%.4f"),
+                'Erro padrão': st.column_config.NumberColumn(format="%.4f"),
+                't': st.column_config.NumberColumn(format="%.3f"),
+                'p-valor': st.column_config.NumberColumn(format="%.4f"),
+                'VIF': st.column_config.NumberColumn(format="%.2f")
+            }
+        )
+        
+        high_vif = coefficients[coefficients['VIF'] > 5]['Termo'].tolist()
+        if high_vif:
+            st.warning(f"⚠️ Multicolinearidade (VIF > 5): {', '.join(high_vif)}")
+        
+        significant = [c['name'] for c in model['coefficients'][1:] if c['p_value'] is not None and c['p_value'] < ALPHA]
+        if significant:
+            st.success(f"✅ Termos significativos: {', '.join(significant)}")
+        
+        sample = model['residual_sample']
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            fig = px.scatter(x=sample['fitted'], y=sample['residual'], title="Resíduos vs Ajustados",
+                             labels={'x': 'Ajustado', 'y': 'Resíduo'})
+            fig.add_hline(y=0, line_dash="dash", line_color="red")
+            fig.update_layout(height=350)
+            st.plotly_chart(fig, use_container_width=True)
+        
+        with col2:
+            fig = px.histogram(x=sample['residual'], nbins=30, title="Distribuição dos Resíduos",
+                               labels={'x': 'Resíduo'})
+            fig.update_layout(height=350)
+            st.plotly_chart(fig, use_container_width=True)
+        
+        if len(sample['fitted']) < model['n']:
+            st.caption(f"Gráficos com amostra de {len(sample['fitted']):,} de {model['n']:,} observações")
+    
+    def _show_action_buttons(self, df: pd.DataFrame, config: Dict, model: Dict):
+        """Botões de ação"""
+        st.divider()
+        
+        save_data = {
+            'response': config['response'],
+            'predictors': config['predictors'],
+            'interactions': config['interactions'],
+            'method': config['method'],
+            'model': {key: value for key, value in model.items() if key != 'residual_sample'},
+            'dataset_version': dataset_version(df, list(df.columns)),
+            'analysis_date': datetime.now().isoformat()
+        }
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            if st.button("💾 Salvar Regressão", key=f"save_regression_{self.project_id}"):
+                self.data.update(save_data)
+                if self.manager.save_tool_data('regression_analysis', self.data, False):
+                    st.success("💾 Modelo de regressão salvo com sucesso!")
+                else:
+                    st.error("❌ Erro ao salvar modelo")
+        
+        with col2:
+            if st.button("✅ Finalizar Regressão", key=f"complete_regression_{self.project_id}"):
+                self.data.update(save_data)
+                if self.manager.save_tool_data('regression_analysis', self.data, True):
+                    st.success("✅ Regressão finalizada com sucesso!")
+                    st.balloons()
+                else:
+                    st.error("❌ Erro ao finalizar regressão")
+
+
+class ParetoTool:
+    """Análise de Pareto de defeitos/causas a partir dos dados carregados"""
+    
+    MAX_LEVELS = 200
+    
+    def __init__(self, manager: AnalyzePhaseManager):
+        self.manager = manager
+        self.project_id = manager.project_id
+        self.data = manager.initialize_session_data('pareto', {
+            'category': None,
+            'strata': [],
+            'weight_column': None,
+            'cutoff': 0.8,
+            'vital_few': []
+        })
+    
+    def show(self):
+        """Interface principal do Pareto"""
+        st.markdown("## 📊 Análise de Pareto")
+        st.markdown("Identifique os poucos vitais: as categorias responsáveis pela maior parte das ocorrências ou do custo.")
+        
+        df = self.manager.get_uploaded_data()
+        if df is None:
+            st.warning("⚠️ **Dados não encontrados**")
+            st.info("Primeiro faça upload dos dados na fase **Measure** para montar o Pareto.")
+            return
+        
+        numeric_columns = df.select_dtypes(include=[np.number]).columns.tolist()
+        categorical_columns = [
+            c for c in df.columns
+            if c not in numeric_columns and 1 < df[c].nunique() <= self.MAX_LEVELS
+        ]
+        if not categorical_columns:
+            st.error(f"❌ Nenhuma coluna categórica (2 a {self.MAX_LEVELS} categorias) encontrada nos dados")
+            return
+        
+        if self.manager.is_tool_completed('pareto'):
+            st.success("✅ **Análise de Pareto concluída**")
+        else:
+            st.info("⏳ **Análise em desenvolvimento**")
+        
+        config = self._show_configuration(categorical_columns, numeric_columns)
+        
+        columns = [config['category']] + config['strata']
+        aggregated = aggregate(df, columns, config['weight_column'])
+        
+        self._show_pareto(aggregated, config)
+        
+        if config['strata']:
+            self._show_stratification(aggregated, config)
+        
+        self._show_action_buttons(config)
+    
+    def _show_configuration(self, categorical_columns: List[str], numeric_columns: List[str]) -> Dict:
+        """Categoria, estratificação, medida e corte"""
+        st.markdown("### ⚙️ Configuração")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            saved = self.data.get('category')
+            category = st.selectbox(
+                "Categoria (defeito/causa)",
+                categorical_columns,
+                index=categorical_columns.index(saved) if saved in categorical_columns else 0,
+                key=f"pareto_category_{self.project_id}"
+            )
+            
+            weight_options = [None] + numeric_columns
+            saved_weight = self.data.get('weight_column')
+            weight_column = st.selectbox(
+                "Custo por ocorrência (opcional)",
+                weight_options,
+                index=weight_options.index(saved_weight) if saved_weight in weight_options else 0,
+                format_func=lambda x: "Nenhum (apenas contagem)" if x is None else x,
+                key=f"pareto_weight_{self.project_id}"
+            )
+        
+        with col2:
+            strata_options = [c for c in categorical_columns if c != category]
+            strata = st.multiselect(
+                "Estratificar por (ex.: linha, turno)",
+                strata_options,
+                default=[c for c in self.data.get('strata', []) if c in strata_options],
+                key=f"pareto_strata_{self.project_id}"
+            )
+            
+            cutoff = st.slider(
+                "Corte dos poucos vitais (%)",
+                min_value=50, max_value=95, step=5,
+                value=int(self.data.get('cutoff', 0.8) * 100),
+                key=f"pareto_cutoff_{self.project_id}"
+            ) / 100
+        
+        measure = 'count'
+        if weight_column:
+            measure = st.radio(
+                "Medida",
+                ['weight', 'count'],
+                format_func=lambda x: f"💰 Custo ({weight_column})" if x == 'weight' else "🔢 Ocorrências",
+                horizontal=True,
+                key=f"pareto_measure_{self.project_id}"
+            )
+        
+        return {'category': category, 'strata': strata, 'weight_column': weight_column,
+                'measure': measure, 'cutoff': cutoff}
+    
+    def _pareto_figure(self, table: pd.DataFrame, category: str, measure_label: str, cutoff: float,
+                       title: str) -> go.Figure:
+        """Barras + curva acumulada com a linha de corte"""
+        fig = make_subplots(specs=[[{"secondary_y": True}]])
+        fig.add_trace(
+            go.Bar(
+                x=table[category], y=table['value'], name=measure_label,
+                marker_color=np.where(table['vital'], '#d62728', '#1f77b4')
+            ),
+            secondary_y=False
+        )
+        fig.add_trace(
+            go.Scatter(x=table[category], y=table['cumulative'], name="% Acumulado",
+                       mode='lines+markers', line=dict(color='orange')),
+            secondary_y=True
+        )
+        fig.add_hline(y=cutoff * 100, line_dash="dash", line_color="gray", secondary_y=True)
+        fig.update_yaxes(title_text=measure_label, secondary_y=False)
+        fig.update_yaxes(title_text="% Acumulado", range=[0, 105], secondary_y=True)
+        fig.update_layout(title=title, height=420, showlegend=False)
+        return fig
+    
+    def _show_pareto(self, aggregated: pd.DataFrame, config: Dict):
+        """Pareto geral, com filtros pelos estratos"""
+        st.markdown("### 📊 Gráfico de Pareto")
+        
+        category, measure = config['category'], config['measure']
+        measure_label = "Custo" if measure == 'weight' else "Ocorrências"
+        
+        filters = {}
+        if config['strata']:
+            filter_columns = st.columns(len(config['strata']))
+            for column, stratum in zip(filter_columns, config['strata']):
+                with column:
+                    filters[stratum] = st.multiselect(
+                        f"Filtrar {stratum}",
+                        sorted(aggregated[stratum].unique().tolist()),
+                        key=f"pareto_filter_{stratum}_{self.project_id}"
+                    )
+        
+        max_categories = st.number_input(
+            "Máximo de categorias no gráfico (demais em \"Outros\")",
+            min_value=3, max_value=50, value=15,
+            key=f"pareto_max_categories_{self.project_id}"
+        )
+        
+        table = pareto_table(aggregated, category, measure, config['cutoff'], filters, int(max_categories))
+        if table.empty:
+            # Sem resultado para a configuração atual: não salvar o da anterior
+            st.session_state.pop(f"pareto_result_{self.project_id}", None)
+            st.info("Nenhum registro para os filtros selecionados")
+            return
+        table['value'] = table[measure]
+        
+        st.plotly_chart(
+            self._pareto_figure(table, category, measure_label, config['cutoff'], f"Pareto de {category}"),
+            use_container_width=True
+        )
+        
+        vital = vital_few(table, category)
+        share = table.loc[table['vital'], 'percent'].sum()
+        st.success(f"🎯 **Poucos vitais:** {len(vital)} de {len(table)} categorias respondem por "
+                   f"{share:.1f}% do total — {', '.join(vital)}")
+        
+        display = pd.DataFrame({category: table[category], 'Ocorrências': table['count']})
+        if config['weight_column']:
+            display['Custo'] = table['weight']
+        display['%'] = table['percent']
+        display['% Acumulado'] = table['cumulative']
+        display['Vital'] = table['vital'].map({True: "🎯", False: ""})
+        st.dataframe(display, use_container_width=True, hide_index=True, column_config={
+            'Custo': st.column_config.NumberColumn(format="%.2f"),
+            '%': st.column_config.NumberColumn(format="%.1f"),
+            '% Acumulado': st.column_config.NumberColumn(format="%.1f")
+        })
+        
+        st.session_state[f"pareto_result_{self.project_id}"] = {
+            'vital_few': vital,
+            'table': display.drop(columns='Vital').to_dict('records')
+        }
+    
+    def _show_stratification(self, aggregated: pd.DataFrame, config: Dict):
+        """Pareto da categoria dentro de cada nível de um estrato"""
+        st.markdown("### 🧩 Estratificação")
+        
+        stratum = st.selectbox("Comparar por", config['strata'], key=f"pareto_stratum_{self.project_id}")
+        category, measure = config['category'], config['measure']
+        
+        table = stratified_pareto(aggregated, category, stratum, measure, config['cutoff'])
+        table['value'] = table[measure]
+        levels = table[stratum].unique().tolist()
+        
+        summary = table.groupby(stratum, sort=False).agg(
+            total=(measure, 'sum'),
+            vitais=('vital', 'sum'),
+            principal=(category, 'first')
+        ).reset_index()
+        summary.columns = [stratum, "Total", "Poucos vitais", "Principal categoria"]
+        st.dataframe(summary, use_container_width=True, hide_index=True)
+        
+        selected = st.multiselect(
+            "Níveis exibidos",
+            levels,
+            default=levels[:4],
+            key=f"pareto_levels_{stratum}_{self.project_id}"
+        )
+        measure_label = "Custo" if measure == 'weight' else "Ocorrências"
+        for level in selected:
+            level_table = table[table[stratum] == level]
+            st.plotly_chart(
+                self._pareto_figure(level_table, category, measure_label, config['cutoff'],
+                                    f"{stratum} = {level}"),
+                use_container_width=True
+            )
+    
+    def _show_action_buttons(self, config: Dict):
+        """Botões de ação"""
+        st.divider()
+        
+        result = st.session_state.get(f"pareto_result_{self.project_id}", {})
+        save_data = dict(config, vital_few=result.get('vital_few', []), table=result.get('table', []),
+                         analysis_date=datetime.now().isoformat())
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            if st.button("💾 Salvar Pareto", key=f"save_pareto_{self.project_id}"):
+                self.data.update(save_data)
+                if self.manager.save_tool_data('pareto', self.data, False):
+                    st.success("💾 Análise de Pareto salva com sucesso!")
+                else:
+                    st.error("❌ Erro ao salvar análise")
+        
+        with col2:
+            if st.button("✅ Finalizar Pareto", key=f"complete_pareto_{self.project_id}"):
+                self.data.update(save_data)
+                if self.manager.save_tool_data('pareto', self.data, True):
+                    st.success("✅ Análise de Pareto finalizada com sucesso!")
+                    st.balloons()
+                else:
+                    st.error("❌ Erro ao finalizar análise")
+
+
 class SimpleRootCauseAnalysis:
     """Versão simplificada da análise de causa raiz"""
     
@@ -993,6 +1765,9 @@ def show_analyze_tools(project_data: Dict):
     # Opções de ferramentas (versão simplificada)
     tool_options = {
         "statistical_analysis": ("📊", "Análise Estatística"),
+        "hypothesis_tests": ("🧪", "Testes de Hipótese"),
+        "regression_analysis": ("📈", "Regressão Múltipla"),
+        "pareto": ("🎯", "Análise de Pareto"),
         "root_cause_analysis": ("🔍", "Análise de Causa Raiz")
     }
     
@@ -1026,6 +1801,18 @@ def show_analyze_tools(project_data: Dict):
         statistical_analysis = StatisticalAnalysis(manager)
         statistical_analysis.show()
     
+    elif selected_tool == "hypothesis_tests":
+        hypothesis_tests = HypothesisTestingTool(manager)
+        hypothesis_tests.show()
+    
+    elif selected_tool == "regression_analysis":
+        regression = RegressionTool(manager)
+        regression.show()
+    
+    elif selected_tool == "pareto":
+        pareto = ParetoTool(manager)
+        pareto.show()
+    
     elif selected_tool == "root_cause_analysis":
         root_cause_analysis = SimpleRootCauseAnalysis(manager)
         root_cause_analysis.show()
@@ -1036,11 +1823,17 @@ def show_analyze_tools(project_data: Dict):
 
 
 def _show_analyze_progress(manager: AnalyzePhaseManager, tool_options: Dict, analyze_data: Dict):
-    """Mostra progresso geral da fase Analyze"""
+    """
+    Mostra progresso geral da fase Analyze
+    
+    O progresso conta só as ferramentas obrigatórias (PHASE_TOOLS, as mesmas do
+    dashboard e dos relatórios); as demais aparecem como extras opcionais.
+    """
     st.markdown("### 📊 Progresso da Fase Analyze")
     
-    total_tools = len(tool_options)
-    completed_tools = sum(1 for key in tool_options.keys() if manager.is_tool_completed(key))
+    required = PHASE_TOOLS['analyze']
+    total_tools = len(required)
+    completed_tools = sum(1 for key in required if manager.is_tool_completed(key))
     
     # Barra de progresso
     progress = (completed_tools / total_tools) * 100
@@ -1057,6 +1850,12 @@ def _show_analyze_progress(manager: AnalyzePhaseManager, tool_options: Dict, ana
         else:
             st.info(f"⏳ {progress:.0f}%")
     
+    optional = [key for key in tool_options if key not in required]
+    if optional:
+        st.caption("➕ Extras opcionais (não contam no progresso): " + " | ".join(
+            f"{'✅' if manager.is_tool_completed(key) else '⏳'} {tool_options[key][1]}" for key in optional
+        ))
+    
     # Conclusão da fase
     if progress == 100:
         st.success("🎉 **Parabéns! Fase Analyze concluída com sucesso!**")
@@ -10,8 +10,9 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Dict, List, Optional
 import warnings
 
 warnings.filterwarnings('ignore')
@@ -25,6 +26,32 @@ except ImportError:
         st.error("❌ Erro ao importar ProjectManager")
         st.stop()
 
+try:
+    from src.utils.spc import (SPC_CHART_TYPES, NELSON_RULES, SPCMonitor, compute_chart,
+                               measurement_status, measurement_statuses, violated_rules,
+                               point_spc_params, monitor_for_point)
+    from src.utils.measurement_store import MeasurementStore, empty_summary
+    from src.utils.bulk_import import (render_bulk_import, validate_measurements,
+                                       exclude_existing, preview_import)
+    from src.utils.measurement_grid import GRID_PAGE_SIZE, render_measurement_grid
+    from src.utils.alerting import SINK_LABELS, TRIGGER_MATCHERS, dispatch_alerts, get_dispatcher
+except ImportError:
+    from utils.spc import (SPC_CHART_TYPES, NELSON_RULES, SPCMonitor, compute_chart,
+                           measurement_status, measurement_statuses, violated_rules,
+                           point_spc_params, monitor_for_point)
+    from utils.measurement_store import MeasurementStore, empty_summary
+    from utils.bulk_import import (render_bulk_import, validate_measurements,
+                                   exclude_existing, preview_import)
+    from utils.measurement_grid import GRID_PAGE_SIZE, render_measurement_grid
+    from utils.alerting import SINK_LABELS, TRIGGER_MATCHERS, dispatch_alerts, get_dispatcher
+
+
+# Medições por página na grade de um ponto de controle
+MEASUREMENTS_PAGE_SIZE = GRID_PAGE_SIZE
+
+# Janela de medições mais recentes usada nos gráficos e no ajuste inicial da carta
+CHART_WINDOW = 500
+
 
 class ControlPhaseManager:
     """Gerenciador da fase Control"""
@@ -103,6 +130,11 @@ class ControlPlanTool:
         self.manager = manager
         self.project_id = manager.project_id
         self.tool_name = "control_plan"
+        self.store = MeasurementStore(
+            self.project_id,
+            manager.project_manager.db,
+            manager.project_manager.user_uid
+        )
     
     def show(self):
         """Interface principal"""
@@ -126,6 +158,9 @@ class ControlPlanTool:
         
         control_data = st.session_state[session_key]
         
+        self._migrate_legacy_measurements(control_data, is_completed)
+        self.store.load_state(control_data.get('control_points', []))
+        
         # Tabs
         tab1, tab2 = st.tabs(["🎯 Pontos de Controle", "⚠️ Planos de Resposta"])
         
@@ -158,10 +193,23 @@ class ControlPlanTool:
                 else:
                     st.error("❌ Adicione pelo menos um ponto de controle")
     
+    def _migrate_legacy_measurements(self, control_data: Dict, is_completed: bool):
+        """Move medições gravadas no documento do projeto para a série temporal"""
+        migrated = [self.store.migrate_legacy(point) for point in control_data.get('control_points', [])]
+        
+        if any(migrated):
+            # Regravar o documento do projeto sem as listas de medições
+            self.manager.save_tool_data(self.tool_name, control_data, completed=is_completed)
+    
     def _show_control_points(self, control_data: Dict):
         """Gerenciar pontos de controle"""
         st.markdown("### 🎯 Pontos de Controle")
         
+        # Violações das regras de Nelson registradas antes do último st.rerun
+        flash = st.session_state.pop(f"control_flash_{self.project_id}", None)
+        if flash:
+            st.warning(flash)
+        
         # Adicionar novo ponto COM FORM
         with st.expander("➕ Adicionar Ponto", expanded=not control_data.get('control_points')):
             # USAR FORM para evitar re-renders
@@ -180,6 +228,22 @@ class ControlPlanTool:
                 
                 responsible = st.text_input("Responsável *")
                 
+                col3, col4 = st.columns(2)
+                
+                with col3:
+                    chart_type = st.selectbox(
+                        "Carta de Controle",
+                        list(SPC_CHART_TYPES.keys()),
+                        format_func=lambda x: SPC_CHART_TYPES[x]
+                    )
+                
+                with col4:
+                    subgroup_size = st.number_input(
+                        "Subgrupo / Tamanho da amostra",
+                        min_value=1, max_value=10000, value=5,
+                        help="Xbar-R/Xbar-S: medições por subgrupo (2-25). p, np, u: unidades inspecionadas por amostra."
+                    )
+                
                 submitted = st.form_submit_button("➕ Adicionar Ponto", use_container_width=True)
                 
                 if submitted:
@@ -194,11 +258,14 @@ class ControlPlanTool:
                             'upper_limit': float(upper_limit),
                             'responsible': responsible.strip(),
                             'status': 'Ativo',
-                            'measurements': [],
+                            'chart_type': chart_type,
+                            'subgroup_size': int(subgroup_size),
+                            'summary': empty_summary(),
                             'created_at': datetime.now().isoformat()
                         }
                         
                         control_data['control_points'].append(new_point)
+                        self.store.sync_point(new_point)
                         st.success(f"✅ Ponto '{point_name}' adicionado!")
                         st.rerun()
                     else:
@@ -208,176 +275,341 @@ class ControlPlanTool:
         if control_data.get('control_points'):
             st.markdown("##### 📊 Pontos Definidos")
             
-            for idx, point in enumerate(control_data['control_points']):
-                point_id = point.get('id', f"point_{idx}")
+            points = control_data['control_points']
+            
+            # Só o ponto escolhido lê a série (página de medições e carta)
+            idx = st.selectbox(
+                "Ponto de controle:",
+                range(len(points)),
+                format_func=lambda i: f"🎯 {points[i]['name']} ({points[i].get('status', 'Ativo')})",
+                key=f"control_point_selector_{self.project_id}"
+            )
+            point = points[idx]
+            point_id = point.get('id', f"point_{idx}")
+            
+            col1, col2 = st.columns([2, 1])
+            
+            with col1:
+                st.write(f"**Métrica:** {point['metric']} ({point.get('unit', '')})")
+                st.write(f"**Meta:** {point.get('target', 0)}")
+                st.write(f"**Limites:** [{point.get('lower_limit', 0)} - {point.get('upper_limit', 0)}]")
+                st.write(f"**Responsável:** {point.get('responsible', 'N/A')}")
+                st.write(f"**Carta:** {SPC_CHART_TYPES.get(point.get('chart_type', 'imr'))}")
                 
-                with st.expander(f"🎯 {point['name']} ({point.get('status', 'Ativo')})"):
-                    col1, col2 = st.columns([2, 1])
-                    
-                    with col1:
-                        st.write(f"**Métrica:** {point['metric']} ({point.get('unit', '')})")
-                        st.write(f"**Meta:** {point.get('target', 0)}")
-                        st.write(f"**Limites:** [{point.get('lower_limit', 0)} - {point.get('upper_limit', 0)}]")
-                        st.write(f"**Responsável:** {point.get('responsible', 'N/A')}")
+                frozen = st.checkbox(
+                    "🔒 Congelar limites (Fase II)",
+                    value=bool((point.get('spc_state') or {}).get('frozen', False)),
+                    key=f"freeze_{idx}_{point_id}"
+                )
+                self._set_frozen(point, frozen)
+            
+            with col2:
+                # Adicionar medição
+                new_value = st.number_input(
+                    "Nova medição:",
+                    key=f"meas_val_{idx}_{point_id}",
+                    step=0.01,
+                    label_visibility="collapsed"
+                )
+                
+                if st.button("➕ Adicionar", key=f"add_meas_{idx}_{point_id}"):
+                    measurement = self._append_measurement(control_data['control_points'][idx], new_value)
                     
-                    with col2:
-                        # Adicionar medição
-                        new_value = st.number_input(
-                            "Nova medição:",
-                            key=f"meas_val_{idx}_{point_id}",
-                            step=0.01,
-                            label_visibility="collapsed"
+                    if measurement['rules']:
+                        st.session_state[f"control_flash_{self.project_id}"] = (
+                            f"⚠️ {point['name']}: " + "; ".join(NELSON_RULES[r] for r in measurement['rules'])
                         )
-                        
-                        if st.button("➕ Adicionar", key=f"add_meas_{idx}_{point_id}"):
-                            if 'measurements' not in control_data['control_points'][idx]:
-                                control_data['control_points'][idx]['measurements'] = []
-                            
-                            status = self._check_status(new_value, point)
-                            
-                            control_data['control_points'][idx]['measurements'].append({
-                                'id': f"meas_{int(datetime.now().timestamp() * 1000)}",
-                                'date': datetime.now().date().isoformat(),
-                                'value': float(new_value),
-                                'status': status,
-                                'timestamp': datetime.now().isoformat()
-                            })
-                            
-                            st.success("✅ Medição adicionada!")
-                            st.rerun()
-                        
-                        # Botão de exclusão do ponto
-                        if st.button("🗑️ Remover Ponto", key=f"del_pt_{idx}_{point_id}"):
-                            control_data['control_points'].pop(idx)
-                            st.success("✅ Ponto removido!")
-                            st.rerun()
-                    
-                    # Mostrar medições
-                    measurements = point.get('measurements', [])
-                    if measurements:
-                        st.markdown("---")
-                        st.markdown("**📋 Medições:**")
-                        
-                        for m_idx, meas in enumerate(measurements):
-                            meas_id = meas.get('id', f"meas_{m_idx}")
-                            meas_date = datetime.fromisoformat(meas['date']).strftime('%d/%m/%Y')
-                            
-                            col_m1, col_m2, col_m3, col_m4, col_m5 = st.columns([2, 2, 1, 1, 1])
-                            
-                            with col_m1:
-                                st.write(f"📅 {meas_date}")
-                            
-                            with col_m2:
-                                st.write(f"**{meas['value']} {point.get('unit', '')}**")
-                            
-                            with col_m3:
-                                status = meas.get('status', 'OK')
-                                if status == 'OK':
-                                    st.success("✅")
-                                elif status == 'WARNING':
-                                    st.warning("⚠️")
-                                else:
-                                    st.error("🚨")
-                            
-                            with col_m4:
-                                if st.button("✏️", key=f"edit_meas_{idx}_{m_idx}_{meas_id}"):
-                                    st.session_state[f"editing_{idx}_{m_idx}"] = True
-                                    st.rerun()
-                            
-                            with col_m5:
-                                if st.button("🗑️", key=f"del_meas_{idx}_{m_idx}_{meas_id}"):
-                                    control_data['control_points'][idx]['measurements'].pop(m_idx)
-                                    st.success("✅ Removida!")
-                                    st.rerun()
-                            
-                            # Modo edição
-                            if st.session_state.get(f"editing_{idx}_{m_idx}", False):
-                                with st.container():
-                                    col_e1, col_e2, col_e3 = st.columns([2, 2, 1])
-                                    
-                                    with col_e1:
-                                        new_date = st.date_input(
-                                            "Data:",
-                                            value=datetime.fromisoformat(meas['date']).date(),
-                                            key=f"edit_date_{idx}_{m_idx}_{meas_id}"
-                                        )
-                                    
-                                    with col_e2:
-                                        new_val = st.number_input(
-                                            "Valor:",
-                                            value=float(meas['value']),
-                                            key=f"edit_val_{idx}_{m_idx}_{meas_id}",
-                                            step=0.01
-                                        )
-                                    
-                                    with col_e3:
-                                        if st.button("💾", key=f"save_edit_{idx}_{m_idx}_{meas_id}"):
-                                            new_status = self._check_status(new_val, point)
-                                            
-                                            control_data['control_points'][idx]['measurements'][m_idx] = {
-                                                'id': meas_id,
-                                                'date': new_date.isoformat(),
-                                                'value': float(new_val),
-                                                'status': new_status,
-                                                'timestamp': datetime.now().isoformat()
-                                            }
-                                            
-                                            del st.session_state[f"editing_{idx}_{m_idx}"]
-                                            st.success("✅ Atualizado!")
-                                            st.rerun()
-                        
-                        # Gráfico
-                        if len(measurements) >= 2:
-                            self._plot_chart(point, measurements)
-                    else:
-                        st.info("📝 Nenhuma medição registrada")
+                    self._notify(point, [measurement], control_data.get('response_plans', []))
+                    st.success("✅ Medição adicionada!")
+                    st.rerun()
+                
+                # Botão de exclusão do ponto
+                if st.button("🗑️ Remover Ponto", key=f"del_pt_{idx}_{point_id}"):
+                    self.store.delete_point(point_id)
+                    control_data['control_points'].pop(idx)
+                    st.success("✅ Ponto removido!")
+                    st.rerun()
+            
+            self._show_bulk_import(point, control_data.get('response_plans', []))
+            
+            # Resumo (mantido no documento do projeto)
+            summary = point.get('summary') or empty_summary()
+            if summary['count']:
+                col_s1, col_s2, col_s3, col_s4 = st.columns(4)
+                col_s1.metric("Medições", summary['count'])
+                col_s2.metric("Média", f"{summary['mean']:.2f}")
+                col_s3.metric("Última", f"{summary['last_value']:.2f}")
+                col_s4.metric("Alertas", summary.get('alerts', 0))
+                
+                self._show_measurements_page(point)
+                
+                # Gráfico
+                if summary['count'] >= 2:
+                    self._plot_chart(point, self._chart_window(point))
+            else:
+                st.info("📝 Nenhuma medição registrada")
         else:
             st.info("💡 Adicione o primeiro ponto de controle")
     
-    def _check_status(self, value: float, point: Dict) -> str:
-        """Verifica status da medição"""
-        ucl = point.get('upper_limit', float('inf'))
-        lcl = point.get('lower_limit', float('-inf'))
-        target = point.get('target', 0)
+    def _chart_window(self, point: Dict) -> List[Dict]:
+        """
+        Medições da carta: por padrão a cauda 'recent' do documento do ponto
+        (sem leituras); as últimas CHART_WINDOW sob demanda, em cache na sessão
+        até o resumo do ponto mudar
+        """
+        point_id = point['id']
+        recent = point.get('recent') or []
+        full = st.toggle(f"📈 Últimas {CHART_WINDOW} medições", key=f"chart_full_{self.project_id}_{point_id}")
+        if not full and len(recent) >= 2:
+            return recent
+        
+        summary = point.get('summary') or {}
+        version = (summary.get('last_timestamp'), summary.get('count'), summary.get('mean'))
+        cache_key = f"chart_window_{self.project_id}_{point_id}"
+        cached = st.session_state.get(cache_key)
+        if not cached or cached[0] != version:
+            cached = (version, self.store.recent(point_id, CHART_WINDOW))
+            st.session_state[cache_key] = cached
+        return cached[1]
+    
+    def _show_bulk_import(self, point: Dict, response_plans: List[Dict]):
+        """Importação em lote (CSV/XLSX/colar) com status e regras calculados no lote"""
+        point_id = point['id']
+        
+        if not st.toggle("📥 Importar em lote", key=f"bulk_toggle_{self.project_id}_{point_id}"):
+            return
+        
+        raw_df = render_bulk_import(f"cp_{self.project_id}_{point_id}")
+        if raw_df is None:
+            return
+        
+        try:
+            batch, messages = validate_measurements(raw_df)
+        except ValueError as e:
+            st.error(f"❌ {str(e)}")
+            return
+        
+        # Duplicatas contra a série: apenas o intervalo de datas do lote é consultado
+        if not batch.empty:
+            existing = self.store.query(point_id, start=batch['timestamp'].min(), end=batch['timestamp'].max())
+            batch, message = exclude_existing(batch, [m['timestamp'] for m in existing])
+            if message:
+                messages.append(message)
+        
+        if batch.empty:
+            preview_import(batch, messages)
+            return
+        
+        # Regras e status do lote inteiro em uma passada (sobre uma cópia do estado)
+        monitor = self._get_monitor(point)
+        values = batch['value'].to_numpy()
+        rule_lists = monitor.append_many(values)
+        statuses = measurement_statuses(values, point, rule_lists)
+        
+        preview_import(batch, messages, {
+            'status': statuses,
+            'regras': [", ".join(str(r) for r in rules) for rules in rule_lists]
+        })
+        
+        if st.button(f"📥 Importar {len(batch)} medições", key=f"bulk_commit_{self.project_id}_{point_id}", type="primary"):
+            measurements = [
+                {'timestamp': ts, 'date': date, 'value': float(value), 'status': status, 'rules': rules}
+                for ts, date, value, status, rules in zip(
+                    batch['timestamp'], batch['date'], values, statuses, rule_lists
+                )
+            ]
+            
+            point['spc_state'] = monitor.to_state()
+            self.store.append_many(point, measurements)
+            self._notify(point, measurements, response_plans)
+            
+            violations = sum(1 for rules in rule_lists if rules)
+            if violations:
+                st.session_state[f"control_flash_{self.project_id}"] = (
+                    f"⚠️ {point['name']}: {violations} medição(ões) importada(s) violam regras de Nelson"
+                )
+            st.success(f"✅ {len(measurements)} medições importadas!")
+            st.rerun()
+    
+    def _show_measurements_page(self, point: Dict):
+        """Página de medições lida da série temporal (mais recentes primeiro)"""
+        point_id = point['id']
+        cursors_key = f"meas_cursors_{self.project_id}_{point_id}"
+        cursors = st.session_state.setdefault(cursors_key, [None])
+        
+        measurements, next_cursor = self.store.page(point_id, MEASUREMENTS_PAGE_SIZE, cursors[-1])
+        
+        st.markdown("---")
+        st.markdown(f"**📋 Medições** (página {len(cursors)})")
         
-        if value > ucl or value < lcl:
-            return 'ALERT'
-        elif target != 0 and abs(value - target) / abs(target) > 0.1:
-            return 'WARNING'
+        changes = render_measurement_grid(
+            f"meas_{self.project_id}_{point_id}_{len(cursors)}",
+            measurements,
+            unit=point.get('unit', ''),
+            show_status=True
+        )
+        
+        if changes:
+            by_id = {meas['id']: meas for meas in measurements}
+            updates = {
+                meas_id: dict(fields, status=self._check_status(fields['value'], point, by_id[meas_id].get('rules')))
+                for meas_id, fields in changes['updated'].items()
+            }
+            
+            self.store.apply_changes(point, updates, changes['deleted'])
+            self._reset_spc_state(point)
+            st.success(f"✅ {len(updates)} medição(ões) atualizada(s), {len(changes['deleted'])} removida(s)!")
+            st.rerun()
+        
+        # Paginação por cursor
+        col_p1, col_p2 = st.columns(2)
+        with col_p1:
+            if len(cursors) > 1 and st.button("⬅️ Mais recentes", key=f"meas_prev_{point_id}"):
+                cursors.pop()
+                st.rerun()
+        with col_p2:
+            if next_cursor and st.button("Mais antigas ➡️", key=f"meas_next_{point_id}"):
+                cursors.append(next_cursor)
+                st.rerun()
+    
+    def _get_monitor(self, point: Dict) -> SPCMonitor:
+        """Recupera o monitor incremental do ponto (ajustando no histórico se necessário)"""
+        return monitor_for_point(
+            point,
+            lambda: [m['value'] for m in self.store.recent(point['id'], CHART_WINDOW)]
+        )
+    
+    def _append_measurement(self, point: Dict, value: float) -> Dict:
+        """Adiciona medição avaliando apenas o novo ponto na carta"""
+        monitor = self._get_monitor(point)
+        result = monitor.append(float(value))
+        rules = result['rules'] if result else []
+        
+        measurement = {
+            'date': datetime.now().date().isoformat(),
+            'value': float(value),
+            'status': self._check_status(value, point, rules),
+            'rules': rules,
+            'timestamp': datetime.now().isoformat()
+        }
+        
+        point['spc_state'] = monitor.to_state()
+        return self.store.append(point, measurement)
+    
+    def _reset_spc_state(self, point: Dict):
+        """Descarta o estado incremental após edição/remoção do histórico"""
+        frozen = bool((point.get('spc_state') or {}).get('frozen', False))
+        point['spc_state'] = None
+        if frozen:
+            self._set_frozen(point, True)
         else:
-            return 'OK'
+            self.store.sync_point(point)
+    
+    def _set_frozen(self, point: Dict, frozen: bool):
+        """Congela/libera os limites calculados do ponto"""
+        current = bool((point.get('spc_state') or {}).get('frozen', False))
+        if frozen == current and point.get('spc_state'):
+            return
+        if not frozen and not point.get('spc_state'):
+            return
+        
+        monitor = self._get_monitor(point)
+        monitor.freeze(frozen)
+        point['spc_state'] = monitor.to_state()
+        self.store.sync_point(point)
+    
+    def _notify(self, point: Dict, measurements: List[Dict], response_plans: List[Dict]):
+        """Enfileira os alertas dos planos de resposta acionados (entrega em segundo plano)"""
+        events = dispatch_alerts(self.project_id, point, measurements, response_plans)
+        for event in events:
+            st.toast(f"🔔 {event['trigger']} ({event['severity']}) - {point['name']}")
+    
+    def _check_status(self, value: float, point: Dict, rules: Optional[List[int]] = None) -> str:
+        """Verifica status da medição (especificação + regras de Nelson)"""
+        return measurement_status(float(value), point, rules)
     
     def _plot_chart(self, point: Dict, measurements: List[Dict]):
-        """Plota gráfico de controle"""
-        dates = [datetime.fromisoformat(m['date']) for m in measurements]
-        values = [float(m['value']) for m in measurements]
+        """Plota carta de controle com limites calculados a partir dos dados"""
+        chart_type = point.get('chart_type', 'imr')
+        values = np.array([float(m['value']) for m in measurements])
         
-        fig = go.Figure()
+        try:
+            chart = compute_chart(chart_type, values, **point_spc_params(point))
+        except ValueError as e:
+            st.info(f"📈 {str(e)}")
+            return
+        
+        statistic = chart['statistic']
+        x_axis = np.arange(1, len(statistic) + 1)
+        rules_per_point = violated_rules(chart['rules'])
+        secondary = chart['secondary']
+        
+        if secondary is not None:
+            fig = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.08,
+                                row_heights=[0.65, 0.35])
+        else:
+            fig = go.Figure()
         
-        colors = ['green' if m['status'] == 'OK' else 'orange' if m['status'] == 'WARNING' else 'red' 
-                  for m in measurements]
+        colors = ['red' if 1 in r else 'orange' if r else 'green' for r in rules_per_point]
+        hover = [", ".join(f"Regra {rule}" for rule in r) or "OK" for r in rules_per_point]
+        
+        primary_kwargs = {'row': 1, 'col': 1} if secondary is not None else {}
         
         fig.add_trace(go.Scatter(
-            x=dates,
-            y=values,
+            x=x_axis,
+            y=statistic,
             mode='lines+markers',
-            name='Medições',
+            name=SPC_CHART_TYPES[chart_type].split(' ')[0],
             line=dict(color='blue', width=2),
-            marker=dict(size=8, color=colors)
-        ))
-        
-        fig.add_hline(y=point['target'], line_dash="solid", line_color="green", annotation_text="Meta")
-        fig.add_hline(y=point['upper_limit'], line_dash="dash", line_color="red", annotation_text="LSC")
-        fig.add_hline(y=point['lower_limit'], line_dash="dash", line_color="red", annotation_text="LIC")
+            marker=dict(size=8, color=colors),
+            text=hover,
+            hovertemplate="%{x}: %{y:.4f}<br>%{text}<extra></extra>"
+        ), **primary_kwargs)
+        
+        for line, name, dash, color in [(chart['center'], 'LC', 'solid', 'green'),
+                                         (chart['ucl'], 'LSC', 'dash', 'red'),
+                                         (chart['lcl'], 'LIC', 'dash', 'red')]:
+            fig.add_trace(go.Scatter(
+                x=x_axis, y=line, mode='lines', name=name,
+                line=dict(color=color, dash=dash, width=1, shape='hv')
+            ), **primary_kwargs)
+        
+        # Limites de especificação do ponto (quando aplicáveis à estatística)
+        if chart_type in ('imr', 'xbar_r', 'xbar_s', 'ewma') and point.get('upper_limit', 0) > point.get('lower_limit', 0):
+            fig.add_hline(y=point['upper_limit'], line_dash="dot", line_color="purple",
+                          annotation_text="LSE", **primary_kwargs)
+            fig.add_hline(y=point['lower_limit'], line_dash="dot", line_color="purple",
+                          annotation_text="LIE", **primary_kwargs)
+        
+        if secondary is not None:
+            sec_x = np.arange(1, len(secondary['statistic']) + 1)
+            fig.add_trace(go.Scatter(
+                x=sec_x, y=secondary['statistic'], mode='lines+markers',
+                name=secondary['name'], line=dict(color='gray', width=1)
+            ), row=2, col=1)
+            fig.add_hline(y=secondary['center'], line_color="green", row=2, col=1)
+            fig.add_hline(y=secondary['ucl'], line_dash="dash", line_color="red", row=2, col=1)
+            if secondary['lcl'] > 0:
+                fig.add_hline(y=secondary['lcl'], line_dash="dash", line_color="red", row=2, col=1)
         
         fig.update_layout(
-            title=f"Gráfico de Controle - {point['name']}",
-            xaxis_title="Data",
+            title=f"Carta {SPC_CHART_TYPES[chart_type]} - {point['name']}",
+            xaxis_title="Amostra",
             yaxis_title=f"{point['metric']} ({point.get('unit', '')})",
-            height=350
+            height=450 if secondary is not None else 350,
+            showlegend=False
         )
         
         st.plotly_chart(fig, use_container_width=True)
+        
+        # Resumo das violações
+        violations = {rule: int(flags.sum()) for rule, flags in chart['rules'].items() if flags.any()}
+        if violations:
+            st.warning("⚠️ **Regras violadas:** " + "; ".join(
+                f"{NELSON_RULES[rule]} ({count}x)" for rule, count in violations.items()
+            ))
+        else:
+            st.success("✅ Processo sob controle estatístico")
     
     def _show_response_plans(self, control_data: Dict):
         """Planos de resposta"""
@@ -399,6 +631,14 @@ class ControlPlanTool:
                 description = st.text_area("Descrição:", height=80)
                 actions = st.text_area("Ações:", height=100)
                 
+                channels = st.multiselect(
+                    "Notificar via:",
+                    options=list(SINK_LABELS.keys()),
+                    default=['log'],
+                    format_func=lambda c: SINK_LABELS[c],
+                    help="Disparado automaticamente para os gatilhos 'Fora dos limites' e 'Tendência negativa' (só tendências que afastam da meta)"
+                )
+                
                 submitted = st.form_submit_button("⚠️ Adicionar Plano", use_container_width=True)
                 
                 if submitted:
@@ -409,6 +649,7 @@ class ControlPlanTool:
                             'severity': severity,
                             'description': description,
                             'actions': actions,
+                            'channels': channels,
                             'created_at': datetime.now().isoformat()
                         })
                         st.success("✅ Plano adicionado!")
@@ -428,10 +669,27 @@ class ControlPlanTool:
                     st.write(f"**Descrição:** {plan['description']}")
                     st.write(f"**Ações:** {plan['actions']}")
                     
+                    if plan['trigger'] in TRIGGER_MATCHERS:
+                        channels = ", ".join(SINK_LABELS.get(c, c) for c in plan.get('channels') or ['log'])
+                        st.caption(f"🔔 Automático · {channels}")
+                    
                     if st.button("🗑️ Remover", key=f"del_plan_{idx}_{plan_id}"):
                         control_data['response_plans'].pop(idx)
                         st.success("✅ Plano removido!")
                         st.rerun()
+        
+        # Alertas entregues recentemente
+        recent_alerts = get_dispatcher().recent(self.project_id)
+        if recent_alerts:
+            st.markdown("##### 🔔 Alertas Recentes")
+            st.dataframe(pd.DataFrame([{
+                'Data': alert['created_at'][:16].replace('T', ' '),
+                'Ponto': alert['point_name'],
+                'Gatilho': alert['trigger'],
+                'Severidade': alert['severity'],
+                'Medições': len(alert['measurements']),
+                'Entrega': ", ".join(f"{c}: {s}" for c, s in alert['delivery'].items())
+            } for alert in recent_alerts]), use_container_width=True, hide_index=True)
 
 
 class StandardDocumentationTool:
@@ -8,6 +8,16 @@ from src.auth.firebase_auth import FirebaseAuth
 from src.utils.navigation import NavigationManager
 from src.utils.project_manager import ProjectManager
 from src.utils.formatters import format_currency, format_date_br, format_number_br
+from src.utils.portfolio import load_portfolio_points, portfolio_frame
+
+# Validade do cache da visão de portfólio (segundos)
+PORTFOLIO_CACHE_TTL = 60
+
+
+@st.cache_data(ttl=PORTFOLIO_CACHE_TTL, show_spinner=False)
+def _cached_portfolio_points(user_uid, _db):
+    """Documentos de ponto do usuário (cache curto compartilhado entre reruns)"""
+    return load_portfolio_points(_db, user_uid)
 
 def show_dashboard():
     """Dashboard principal do sistema"""
@@ -31,6 +41,7 @@ def show_dashboard():
         if st.button("🔄 Atualizar", use_container_width=True, key="refresh_dashboard"):
             if 'cached_projects' in st.session_state:
                 del st.session_state.cached_projects
+            _cached_portfolio_points.clear()
             st.rerun()
     
     with col3:
@@ -159,6 +170,8 @@ def show_projects_overview(projects, project_manager, user_data):
         if len(filtered_projects) > 1:
             st.divider()
             show_projects_analytics(filtered_projects)
+        
+        show_spc_portfolio(projects, project_manager, user_data)
     else:
         st.info("Nenhum projeto encontrado com os filtros aplicados.")
     
@@ -643,3 +656,65 @@ def show_projects_analytics(projects):
                 f"{avg_days} dias",
                 delta=f"≈ {avg_days//30} meses" if avg_days > 0 else "N/A"
             )
+
+def show_spc_portfolio(projects, project_manager, user_data):
+    """Visão consolidada dos pontos de controle de todos os projetos"""
+    project_names = {p.get('id'): p.get('name', '') for p in projects}
+    
+    # Ignorar pontos de projetos excluídos
+    points = [p for p in _cached_portfolio_points(user_data['uid'], project_manager.db)
+              if p.get('project_id') in project_names]
+    if not points:
+        return
+    
+    st.divider()
+    st.markdown("### 🎯 Controle Estatístico do Portfólio")
+    
+    frame = portfolio_frame(points, project_names)
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("Pontos de Controle", len(frame))
+    
+    with col2:
+        st.metric("Em Alerta", int((frame['Status'] == "🚨 Alerta").sum()))
+    
+    with col3:
+        st.metric("Em Atenção", int((frame['Status'] == "⚠️ Atenção").sum()))
+    
+    with col4:
+        cpk_values = frame['Cpk'].dropna()
+        st.metric("Cpk Mediano", f"{cpk_values.median():.2f}" if len(cpk_values) else "N/A")
+    
+    col_f1, col_f2 = st.columns([1, 2])
+    
+    with col_f1:
+        only_issues = st.checkbox("Somente pontos com alerta/atenção", key="portfolio_only_issues")
+    
+    with col_f2:
+        selected_projects = st.multiselect(
+            "Projetos:",
+            options=sorted(frame['Projeto'].unique()),
+            key="portfolio_projects"
+        )
+    
+    if only_issues:
+        frame = frame[frame['Status'] != "✅ OK"]
+    if selected_projects:
+        frame = frame[frame['Projeto'].isin(selected_projects)]
+    
+    # Uma única tabela com sparklines: renderização constante para centenas de pontos
+    st.dataframe(
+        frame.drop(columns=['project_id', 'Atualizado']),
+        use_container_width=True,
+        hide_index=True,
+        height=min(600, 38 + 35 * max(len(frame), 1)),
+        column_config={
+            'Última': st.column_config.NumberColumn(format="%.2f"),
+            'Cpk': st.column_config.NumberColumn(help="Cpk de todo o histórico", format="%.2f"),
+            'Cpk recente': st.column_config.NumberColumn(help="Cpk das últimas medições", format="%.2f"),
+            'Últimas medições': st.column_config.LineChartColumn("Últimas medições", width="medium")
+        }
+    )
+    st.caption(f"🔄 Atualizado a cada {PORTFOLIO_CACHE_TTL}s ou pelo botão Atualizar")
@@ -2,27 +2,10 @@ import streamlit as st
 from typing import Dict, List
 from datetime import datetime
 
-# Importações das ferramentas das fases
 try:
-    from src.pages.improve_tools import show_improve_phase as show_improve_tools
+    from src.utils.lazy_loader import phase_tools
 except ImportError:
-    try:
-        from pages.improve_tools import show_improve_phase as show_improve_tools
-    except ImportError:
-        def show_improve_tools():
-            st.error("❌ Módulo improve_tools não encontrado")
-            st.info("Verifique se o arquivo improve_tools.py existe na pasta pages")
-
-# ✅ ADICIONAR ESTE IMPORT
-try:
-    from src.pages.control_tools import show_control_phase as show_control_tools
-except ImportError:
-    try:
-        from pages.control_tools import show_control_phase as show_control_tools
-    except ImportError:
-        def show_control_tools():
-            st.error("❌ Módulo control_tools não encontrado")
-            st.info("Verifique se o arquivo control_tools.py existe na pasta pages")
+    from utils.lazy_loader import phase_tools
 
 
 def show_dmaic_phase():
@@ -192,13 +175,10 @@ def show_phase_content(phase: str, project: Dict):
 def show_define_phase(project: Dict):
     """Mostrar fase Define"""
     try:
-        from src.pages.define_tools import show_define_tools
+        show_define_tools = phase_tools('define')
     except ImportError:
-        try:
-            from pages.define_tools import show_define_tools
-        except ImportError:
-            def show_define_tools(project):
-                st.error("❌ Módulo define_tools não encontrado")
+        def show_define_tools(project):
+            st.error("❌ Módulo define_tools não encontrado")
     
     st.markdown("## 🎯 Define - Definir")
     st.markdown("Defina claramente o problema, objetivos, escopo e equipe do projeto.")
@@ -232,13 +212,10 @@ def show_define_phase(project: Dict):
 def show_measure_phase(project: Dict):
     """Mostrar fase Measure"""
     try:
-        from src.pages.measure_tools import show_measure_tools
+        show_measure_tools = phase_tools('measure')
     except ImportError:
-        try:
-            from pages.measure_tools import show_measure_tools
-        except ImportError:
-            def show_measure_tools(project):
-                st.error("❌ Módulo measure_tools não encontrado")
+        def show_measure_tools(project):
+            st.error("❌ Módulo measure_tools não encontrado")
     
     st.markdown("## 📏 Measure - Medir")
     st.markdown("Meça o desempenho atual do processo e colete dados para análise.")
@@ -257,13 +234,10 @@ def show_measure_phase(project: Dict):
 def show_analyze_phase(project: Dict):
     """Mostrar fase Analyze"""
     try:
-        from src.pages.analyze_tools import show_analyze_tools
+        show_analyze_tools = phase_tools('analyze')
     except ImportError:
-        try:
-            from pages.analyze_tools import show_analyze_tools
-        except ImportError:
-            def show_analyze_tools(project):
-                st.error("❌ Módulo analyze_tools não encontrado")
+        def show_analyze_tools(project):
+            st.error("❌ Módulo analyze_tools não encontrado")
     
     st.markdown("## 🔍 Analyze - Analisar")
     st.markdown("Identifique as causas raiz dos problemas através de análise estatística e ferramentas de qualidade.")
@@ -317,7 +291,7 @@ def show_improve_phase(project: Dict):
     
     # Chamar as ferramentas da fase Improve
     try:
-        show_improve_tools()
+        phase_tools('improve')()
     except Exception as e:
         st.error(f"❌ Erro ao carregar ferramentas da fase Improve: {str(e)}")
         st.info("Verifique se o módulo improve_tools.py está configurado corretamente")
@@ -367,7 +341,7 @@ def show_control_phase(project: Dict):
     
     # Chamar as ferramentas da fase Control
     try:
-        show_control_tools()
+        phase_tools('control')()
     except Exception as e:
         st.error(f"❌ Erro ao carregar ferramentas da fase Control: {str(e)}")
         st.info("Verifique se o módulo control_tools.py está configurado corretamente")
@@ -21,6 +21,50 @@ except ImportError:
         st.error("❌ Não foi possível importar ProjectManager")
         st.stop()
 
+try:
+    from src.utils.bulk_import import render_bulk_import, validate_measurements, preview_import
+    from src.utils.measurement_grid import paginate, show_page_selector, render_measurement_grid
+    from src.utils.measurement_store import measurement_key, summarize, update_summary
+    from src.utils.comparison import compare_batch, effect_label
+    from src.utils.doe import (DEFAULT_GENERATORS, RESPONSE_COLUMN, ROMAN, analyze_design,
+                               generate_design, interaction_means, main_effects, resolution)
+except ImportError:
+    from utils.bulk_import import render_bulk_import, validate_measurements, preview_import
+    from utils.measurement_grid import paginate, show_page_selector, render_measurement_grid
+    from utils.measurement_store import measurement_key, summarize, update_summary
+    from utils.comparison import compare_batch, effect_label
+    from utils.doe import (DEFAULT_GENERATORS, RESPONSE_COLUMN, ROMAN, analyze_design,
+                           generate_design, interaction_means, main_effects, resolution)
+
+
+def _ensure_ids(items: List[Dict], prefix: str, points_field: str):
+    """Atribui IDs estáveis a métricas/KPIs e suas medições antigas (criadas sem ID)"""
+    for item in items:
+        if not item.get('id'):
+            item['id'] = f"{prefix}_{measurement_key(item.get('created_at'))}"
+        for data_point in item.get(points_field, []):
+            if not data_point.get('id'):
+                data_point['id'] = measurement_key(data_point.get('timestamp') or data_point.get('added_at'))
+
+
+def _metric_summary(metric: Dict) -> Dict:
+    """
+    Resumo acumulado da métrica (count, média, M2, min/max, último valor)
+
+    Mantido em cada inclusão/edição/exclusão; só é recalculado quando falta
+    ou não corresponde à quantidade de medições (dados antigos).
+    """
+    summary = metric.get('summary')
+    if not summary or summary.get('count') != len(metric.get('data_points') or []):
+        summary = summarize(metric.get('data_points') or [])
+        metric['summary'] = summary
+    return summary
+
+
+def _index_by_id(items: List[Dict]) -> Dict[str, Dict]:
+    """Índice id -> item (mesmos objetos da lista) para edição/exclusão O(1)"""
+    return {item['id']: item for item in items}
+
 
 class ImprovePhaseManager:
     """Gerenciador centralizado da fase Improve"""
@@ -2167,6 +2211,8 @@ class PilotImplementationTool:
         if 'measurements' not in pilot_data:
             pilot_data['measurements'] = []
         
+        _ensure_ids(pilot_data['measurements'], 'metric', 'data_points')
+        
         # Adicionar nova medição (código anterior permanece igual)
         with st.expander("➕ Adicionar Medição"):
             col1, col2 = st.columns(2)
@@ -2218,6 +2264,7 @@ class PilotImplementationTool:
             if st.button("📊 Adicionar Métrica", key=f"add_metric_{self.project_id}"):
                 if metric_name.strip():
                     pilot_data['measurements'].append({
+                        'id': f"metric_{measurement_key()}",
                         'name': metric_name,
                         'unit': metric_unit,
                         'frequency': metric_frequency,
@@ -2236,7 +2283,10 @@ class PilotImplementationTool:
         if pilot_data['measurements']:
             st.markdown("##### 📈 Métricas do Piloto")
             
-            for metric_index, metric in enumerate(pilot_data['measurements']):
+            for metric in pilot_data['measurements']:
+                metric_id = metric['id']
+                data_point_map = _index_by_id(metric.get('data_points', []))
+                
                 with st.expander(f"📊 **{metric['name']}** ({metric.get('unit', 'unidade')})"):
                     
                     # Informações da métrica
@@ -2257,36 +2307,37 @@ class PilotImplementationTool:
                         
                         new_date = st.date_input(
                             "Data:",
-                            key=f"new_metric_date_{metric_index}_{self.project_id}",
+                            key=f"new_metric_date_{metric_id}_{self.project_id}",
                             value=datetime.now().date()
                         )
                         
                         new_value = st.number_input(
                             "Valor:",
-                            key=f"new_metric_value_{metric_index}_{self.project_id}",
+                            key=f"new_metric_value_{metric_id}_{self.project_id}",
                             value=0.0
                         )
                         
-                        if st.button("➕ Adicionar Medição", key=f"add_data_point_{metric_index}_{self.project_id}"):
-                            if 'data_points' not in pilot_data['measurements'][metric_index]:
-                                pilot_data['measurements'][metric_index]['data_points'] = []
-                            
-                            pilot_data['measurements'][metric_index]['data_points'].append({
+                        if st.button("➕ Adicionar Medição", key=f"add_data_point_{metric_id}_{self.project_id}"):
+                            data_point = {
+                                'id': measurement_key(),
                                 'date': new_date.isoformat(),
                                 'value': float(new_value),
                                 'added_at': datetime.now().isoformat()
-                            })
+                            }
+                            summary = _metric_summary(metric)
+                            metric.setdefault('data_points', []).append(data_point)
+                            metric['summary'] = update_summary(summary, data_point)
                             
                             st.success("✅ Medição adicionada!")
                             st.rerun()
                     
                     with col_info3:
                         # Botão para remover métrica inteira
-                        if st.button("🗑️ Remover Métrica", key=f"remove_metric_{metric_index}_{self.project_id}"):
-                            confirm_key = f"confirm_delete_metric_{metric_index}_{self.project_id}"
+                        if st.button("🗑️ Remover Métrica", key=f"remove_metric_{metric_id}_{self.project_id}"):
+                            confirm_key = f"confirm_delete_metric_{metric_id}_{self.project_id}"
                             
                             if st.session_state.get(confirm_key, False):
-                                pilot_data['measurements'].pop(metric_index)
+                                pilot_data['measurements'] = [m for m in pilot_data['measurements'] if m['id'] != metric_id]
                                 # Limpar estado
                                 if confirm_key in st.session_state:
                                     del st.session_state[confirm_key]
@@ -2297,10 +2348,9 @@ class PilotImplementationTool:
                                 st.warning("⚠️ Clique novamente para confirmar")
                         
                         # Estatísticas da métrica
-                        data_points = metric.get('data_points', [])
-                        if data_points:
-                            values = [float(dp['value']) for dp in data_points]
-                            current_avg = sum(values) / len(values)
+                        summary = _metric_summary(metric)
+                        if summary['count']:
+                            current_avg = summary['mean']
                             
                             st.metric("Média Atual", f"{current_avg:.2f}")
                             
@@ -2314,6 +2364,8 @@ class PilotImplementationTool:
                                     st.success(f"📈 +{improvement:.1f}%")
                                 else:
                                     st.error(f"📉 {improvement:.1f}%")
+                    self._show_bulk_import(pilot_data, metric)
+                    
                     #####
                     # ✅ SEÇÃO DE MEDIÇÕES COM DELETE FUNCIONANDO
                     data_points = metric.get('data_points', [])
@@ -2322,155 +2374,34 @@ class PilotImplementationTool:
                         st.markdown("##### 📋 Medições Registradas")
                         
                         # ✅ MOSTRAR BOTÃO PARA RECARREGAR SE NECESSÁRIO
-                        if st.button("🔄 Atualizar Lista", key=f"refresh_measurements_{metric_index}_{self.project_id}"):
+                        if st.button("🔄 Atualizar Lista", key=f"refresh_measurements_{metric_id}_{self.project_id}"):
                             st.rerun()
                         
-                        # ✅ PROCESSAR CADA MEDIÇÃO COM ÍNDICE DIRETO
-                        for dp_idx in range(len(data_points)):
-                            # Verificar se o índice ainda existe (pode ter sido deletado)
-                            if dp_idx >= len(pilot_data['measurements'][metric_index]['data_points']):
-                                continue
-                                
-                            data_point = pilot_data['measurements'][metric_index]['data_points'][dp_idx]
-                            
-                            # Chave única para esta medição
-                            unique_id = f"m{metric_index}_dp{dp_idx}_{len(data_points)}_{self.project_id}"
-                            edit_key = f"editing_{unique_id}"
-                            delete_confirm_key = f"delete_confirm_{unique_id}"
-                            
-                            measurement_date = datetime.fromisoformat(data_point['date']).strftime('%d/%m/%Y')
-                            
-                            # Container para cada medição
-                            with st.container():
-                                # Verificar se está em modo de edição
-                                is_editing = st.session_state.get(edit_key, False)
-                                
-                                if is_editing:
-                                    # ✅ MODO EDIÇÃO
-                                    st.markdown(f"**✏️ Editando medição de {measurement_date}:**")
-                                    
-                                    col_edit1, col_edit2, col_edit3 = st.columns([2, 2, 2])
-                                    
-                                    with col_edit1:
-                                        edited_date = st.date_input(
-                                            "Nova Data:",
-                                            value=datetime.fromisoformat(data_point['date']).date(),
-                                            key=f"edit_date_{unique_id}"
-                                        )
-                                    
-                                    with col_edit2:
-                                        edited_value = st.number_input(
-                                            f"Novo Valor ({metric.get('unit', '')}):",
-                                            value=float(data_point['value']),
-                                            key=f"edit_value_{unique_id}",
-                                            step=0.01,
-                                            format="%.2f"
-                                        )
-                                    
-                                    with col_edit3:
-                                        col_save, col_cancel = st.columns(2)
-                                        
-                                        with col_save:
-                                            if st.button("💾", key=f"save_{unique_id}", help="Salvar"):
-                                                # Verificar se índice ainda é válido
-                                                if dp_idx < len(pilot_data['measurements'][metric_index]['data_points']):
-                                                    pilot_data['measurements'][metric_index]['data_points'][dp_idx] = {
-                                                        'date': edited_date.isoformat(),
-                                                        'value': float(edited_value),
-                                                        'added_at': data_point.get('added_at', datetime.now().isoformat()),
-                                                        'updated_at': datetime.now().isoformat()
-                                                    }
-                                                    
-                                                    # Limpar estado de edição
-                                                    if edit_key in st.session_state:
-                                                        del st.session_state[edit_key]
-                                                    
-                                                    st.success("✅ Medição atualizada!")
-                                                    st.rerun()
-                                        
-                                        with col_cancel:
-                                            if st.button("❌", key=f"cancel_{unique_id}", help="Cancelar"):
-                                                if edit_key in st.session_state:
-                                                    del st.session_state[edit_key]
-                                                st.rerun()
-                                
-                                else:
-                                    # ✅ MODO VISUALIZAÇÃO
-                                    col1, col2, col3, col4 = st.columns([2, 2, 1, 1])
-                                    
-                                    with col1:
-                                        st.write(f"📅 **{measurement_date}**")
-                                    
-                                    with col2:
-                                        st.write(f"**{data_point['value']} {metric.get('unit', '')}**")
-                                    
-                                    with col3:
-                                        if st.button("✏️", key=f"edit_{unique_id}", help="Editar"):
-                                            st.session_state[edit_key] = True
-                                            st.rerun()
-                                    
-                                    with col4:
-                                        # ✅ DELETE SUPER SIMPLIFICADO
-                                        delete_button_key = f"delete_{unique_id}"
-                                        
-                                        if st.button("🗑️", key=delete_button_key, help="Excluir medição"):
-                                            # Verificar se já foi confirmado
-                                            if st.session_state.get(delete_confirm_key, False):
-                                                # ✅ EXECUTAR DELETE DIRETO
-                                                try:
-                                                    # Verificar se ainda existe
-                                                    if dp_idx < len(pilot_data['measurements'][metric_index]['data_points']):
-                                                        # Remover diretamente pelo índice
-                                                        removed_item = pilot_data['measurements'][metric_index]['data_points'].pop(dp_idx)
-                                                        
-                                                        # Limpar TODOS os estados relacionados
-                                                        keys_to_remove = []
-                                                        for key in st.session_state.keys():
-                                                            if (f"m{metric_index}_dp" in key or 
-                                                                f"delete_confirm_m{metric_index}" in key or
-                                                                f"editing_m{metric_index}" in key):
-                                                                keys_to_remove.append(key)
-                                                        
-                                                        for key in keys_to_remove:
-                                                            try:
-                                                                del st.session_state[key]
-                                                            except:
-                                                                pass
-                                                        
-                                                        st.success(f"✅ Medição de {measurement_date} removida!")
-                                                        st.rerun()
-                                                    else:
-                                                        st.error("❌ Medição não encontrada")
-                                                except Exception as e:
-                                                    st.error(f"❌ Erro ao remover: {str(e)}")
-                                            else:
-                                                # Primeira vez - pedir confirmação
-                                                st.session_state[delete_confirm_key] = True
-                                                st.warning("⚠️ Clique novamente para confirmar exclusão")
-                                                # Auto-limpar confirmação após 10 segundos
-                                                import time
-                                                time.sleep(0.1)  # Pequena pausa para mostrar mensagem
-                                
-                                # Separador
-                                if dp_idx < len(data_points) - 1:
-                                    st.divider()
+                        # ✅ GRADE PAGINADA (um único widget por página)
+                        page_key = f"pilot_grid_page_{metric_id}_{self.project_id}"
+                        page_points, page, total_pages = paginate(data_points, page_key)
                         
-                        # ✅ BOTÃO DE EMERGÊNCIA PARA LIMPAR ESTADOS
-                        if st.button("🧹 Limpar Estados (se algo der errado)", key=f"emergency_clear_{metric_index}_{self.project_id}"):
-                            keys_to_remove = []
-                            for key in st.session_state.keys():
-                                if f"m{metric_index}_" in key:
-                                    keys_to_remove.append(key)
+                        changes = render_measurement_grid(
+                            f"pilot_{metric_id}_{self.project_id}_{page}",
+                            page_points,
+                            unit=metric.get('unit', '')
+                        )
+                        show_page_selector(page_key, total_pages, len(data_points))
+                        
+                        if changes:
+                            now = datetime.now().isoformat()
+                            for dp_id, fields in changes['updated'].items():
+                                data_point_map[dp_id].update(fields, updated_at=now)
+                            
+                            if changes['deleted']:
+                                deleted = set(changes['deleted'])
+                                metric['data_points'] = [dp for dp in data_points if dp['id'] not in deleted]
                             
-                            for key in keys_to_remove:
-                                try:
-                                    del st.session_state[key]
-                                except:
-                                    pass
+                            metric['summary'] = summarize(metric['data_points'])
                             
-                            st.success("🧹 Estados limpos!")
+                            st.success(f"✅ {len(changes['updated'])} medição(ões) atualizada(s), {len(changes['deleted'])} removida(s)!")
                             st.rerun()
-                    
+                        
                     else:
                         st.info("📝 Nenhuma medição registrada ainda.")
 
@@ -2537,6 +2468,147 @@ class PilotImplementationTool:
             st.info("📊 Nenhuma métrica definida ainda. Adicione métricas para acompanhar o piloto.")
     
     
+    def _show_bulk_import(self, pilot_data: Dict, metric: Dict):
+        """Importação em lote de medições de uma métrica do piloto"""
+        metric_key = f"{self.project_id}_{metric['id']}"
+        
+        if not st.toggle("📥 Importar em lote", key=f"pilot_bulk_toggle_{metric_key}"):
+            return
+        
+        raw_df = render_bulk_import(f"pilot_{metric_key}")
+        if raw_df is None:
+            return
+        
+        existing = [dp.get('timestamp') or dp['date'] for dp in metric.get('data_points', [])]
+        
+        try:
+            batch, messages = validate_measurements(raw_df, existing)
+        except ValueError as e:
+            st.error(f"❌ {str(e)}")
+            return
+        
+        preview_import(batch, messages)
+        
+        if not batch.empty and st.button(f"📥 Importar {len(batch)} medições", key=f"pilot_bulk_commit_{metric_key}", type="primary"):
+            now = datetime.now().isoformat()
+            new_points = [
+                {'id': measurement_key(ts), 'date': date, 'timestamp': ts, 'value': float(value), 'added_at': now}
+                for ts, date, value in zip(batch['timestamp'], batch['date'], batch['value'])
+            ]
+            
+            summary = _metric_summary(metric)
+            for data_point in new_points:
+                summary = update_summary(summary, data_point)
+            
+            metric.setdefault('data_points', []).extend(new_points)
+            metric['data_points'].sort(key=lambda dp: dp.get('timestamp') or dp['date'])
+            metric['summary'] = summary
+            
+            # Um único commit para o lote inteiro
+            is_completed = self.manager.is_tool_completed(self.tool_name)
+            if self.manager.save_tool_data(self.tool_name, pilot_data, completed=is_completed):
+                st.success(f"✅ {len(batch)} medições importadas!")
+                st.rerun()
+    
+    def _baseline_sources(self) -> Dict[str, Dict]:
+        """Fontes de baseline: colunas numéricas do upload do Measure e CTQs de baseline"""
+        sources = {}
+        
+        df = self.manager.project_manager.get_uploaded_data(self.project_id)
+        if df is not None:
+            for column in df.select_dtypes(include=[np.number]).columns:
+                sources[f"📊 Dados do Measure: {column}"] = {'type': 'column', 'name': str(column)}
+        
+        baseline_data = self.manager.project_data.get('measure', {}).get('baseline_data', {}).get('data', {})
+        for ctq in baseline_data.get('ctq_metrics') or []:
+            sources[f"🎯 CTQ: {ctq['name']} ({ctq['baseline']})"] = {'type': 'ctq', 'name': ctq['name'], 'value': ctq['baseline']}
+        
+        return sources
+    
+    def _show_statistical_comparison(self, pilot_data: Dict, results: Dict):
+        """Comparação estatística antes/depois de todas as métricas em uma chamada"""
+        metrics = [m for m in pilot_data['measurements'] if len(m.get('data_points') or []) >= 2]
+        if not metrics:
+            return
+        
+        st.markdown("##### 🔬 Comparação Estatística Antes/Depois")
+        
+        sources = self._baseline_sources()
+        default_label = "🔢 Valor baseline da métrica (t de uma amostra)"
+        labels = [default_label] + list(sources.keys())
+        df = None
+        
+        items = {}
+        with st.expander("⚙️ Fonte do baseline por métrica"):
+            for metric in metrics:
+                current = metric.get('baseline_source') or {}
+                current_label = next((label for label, source in sources.items() if source == current), default_label)
+                
+                label = st.selectbox(
+                    f"{metric['name']}:",
+                    labels,
+                    index=labels.index(current_label),
+                    key=f"baseline_source_{metric['id']}_{self.project_id}"
+                )
+                metric['baseline_source'] = sources.get(label)
+        
+        for metric in metrics:
+            source = metric.get('baseline_source') or {}
+            item = {
+                'after': [float(dp['value']) for dp in metric['data_points']],
+                'baseline_value': metric.get('baseline')
+            }
+            
+            if source.get('type') == 'column':
+                if df is None:
+                    df = self.manager.project_manager.get_uploaded_data(self.project_id)
+                if df is not None and source['name'] in df.columns:
+                    item['before'] = df[source['name']].to_numpy(dtype=float)
+            elif source.get('type') == 'ctq':
+                item['baseline_value'] = source['value']
+            
+            items[metric['id']] = item
+        
+        comparison = compare_batch(items)
+        
+        def fmt(value, digits=3):
+            return f"{value:.{digits}f}" if value is not None else "N/A"
+        
+        rows = []
+        for metric in metrics:
+            result = comparison[metric['id']]
+            if result.get('error'):
+                rows.append({'Métrica': metric['name'], 'Teste': result['error']})
+                continue
+            
+            two_sample = result['method'] == 'two_sample'
+            rows.append({
+                'Métrica': metric['name'],
+                'Teste': "Welch (2 amostras)" if two_sample else "t (1 amostra)",
+                'Antes': fmt(result['mean_before'], 2),
+                'Depois': fmt(result['mean_after'], 2),
+                'Diferença [IC 95%]': f"{fmt(result['diff'], 2)} [{fmt(result['ci_low'], 2)}; {fmt(result['ci_high'], 2)}]",
+                'p-valor': fmt(result['p_value'], 4),
+                't pooled p': fmt(result.get('p_pooled'), 4) if two_sample else "-",
+                'Mann-Whitney p': fmt(result.get('p_mannwhitney'), 4) if two_sample else "-",
+                'Levene p': fmt(result.get('p_levene'), 4) if two_sample else "-",
+                'F p': fmt(result.get('p_f'), 4) if two_sample else "-",
+                "d de Cohen": f"{fmt(result['cohen_d'], 2)} ({effect_label(result['cohen_d'])})",
+                'Significativo': '✅' if result['significant'] else '❌'
+            })
+            
+            results.setdefault('statistical_comparison', {})[metric['id']] = {
+                'metric': metric['name'],
+                'method': result['method'],
+                'p_value': result['p_value'],
+                'cohen_d': result['cohen_d'],
+                'significant': result['significant']
+            }
+        
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+        st.caption("Significância a 5%. Com amostra de baseline: Welch como teste principal; "
+                   "Levene/F indicam mudança na variabilidade.")
+    
 ################################################################################################################################################################################    
     def _show_results(self, pilot_data: Dict):
         """Análise dos resultados do piloto"""
@@ -2566,10 +2638,7 @@ class PilotImplementationTool:
             
             for metric in pilot_data['measurements']:
                 if metric.get('data_points'):
-                    data_points = metric['data_points']
-                    values = [dp['value'] for dp in data_points]
-                    
-                    current_avg = sum(values) / len(values)
+                    current_avg = _metric_summary(metric)['mean']
                     baseline = metric.get('baseline', 0)
                     target = metric.get('target', 0)
                     
@@ -2617,6 +2686,8 @@ class PilotImplementationTool:
                 with col_stats3:
                     success_rate = (targets_achieved / total_metrics) * 100 if total_metrics > 0 else 0
                     st.metric("Taxa de Sucesso", f"{success_rate:.1f}%")
+            
+            self._show_statistical_comparison(pilot_data, results)
         
         # Avaliação qualitativa
         st.markdown("##### 🎯 Avaliação Qualitativa")
@@ -3006,8 +3077,7 @@ class FullScaleImplementationTool:
                 
                 for metric in metrics_with_data:
                     if metric.get('data_points'):
-                        values = [dp['value'] for dp in metric['data_points']]
-                        current_avg = sum(values) / len(values)
+                        current_avg = _metric_summary(metric)['mean']
                         target = metric.get('target', 0)
                         baseline = metric.get('baseline', 0)
                         
@@ -3783,6 +3853,7 @@ class FullScaleImplementationTool:
             if st.button("📈 Adicionar KPI", key=f"add_kpi_{self.project_id}"):
                 if kpi_name.strip():
                     kpis.append({
+                        'id': f"kpi_{measurement_key()}",
                         'name': kpi_name,
                         'unit': kpi_unit,
                         'target': kpi_target,
@@ -3802,8 +3873,12 @@ class FullScaleImplementationTool:
         # Mostrar KPIs existentes
         if kpis:
             st.markdown("##### 📊 Dashboard de KPIs")
+            _ensure_ids(kpis, 'kpi', 'measurements')
             
-            for kpi_index, kpi in enumerate(kpis):
+            for kpi in kpis:
+                kpi_id = kpi['id']
+                measurement_map = _index_by_id(kpi.get('measurements', []))
+                
                 with st.expander(f"📈 **{kpi['name']}** (Meta: {kpi.get('target', 0)} {kpi.get('unit', '')})"):
                     
                     # Informações do KPI
@@ -3821,22 +3896,20 @@ class FullScaleImplementationTool:
                         
                         measurement_date = st.date_input(
                             "Data:",
-                            key=f"kpi_measurement_date_{kpi_index}_{self.project_id}",
+                            key=f"kpi_measurement_date_{kpi_id}_{self.project_id}",
                             value=datetime.now().date()
                         )
                         
                         measurement_value = st.number_input(
                             "Valor:",
-                            key=f"kpi_measurement_value_{kpi_index}_{self.project_id}",
+                            key=f"kpi_measurement_value_{kpi_id}_{self.project_id}",
                             value=0.0,
                             step=0.01
                         )
                         
-                        if st.button("➕ Adicionar Medição", key=f"add_kpi_measurement_{kpi_index}_{self.project_id}"):
-                            if 'measurements' not in implementation_data['monitoring_system']['kpis'][kpi_index]:
-                                implementation_data['monitoring_system']['kpis'][kpi_index]['measurements'] = []
-                            
-                            implementation_data['monitoring_system']['kpis'][kpi_index]['measurements'].append({
+                        if st.button("➕ Adicionar Medição", key=f"add_kpi_measurement_{kpi_id}_{self.project_id}"):
+                            kpi.setdefault('measurements', []).append({
+                                'id': measurement_key(),
                                 'date': measurement_date.isoformat(),
                                 'value': float(measurement_value),
                                 'added_at': datetime.now().isoformat()
@@ -3847,11 +3920,11 @@ class FullScaleImplementationTool:
                     
                     with col_info3:
                         # Remover KPI inteiro
-                        if st.button("🗑️ Remover KPI", key=f"remove_kpi_{kpi_index}_{self.project_id}"):
-                            confirm_key = f"confirm_delete_kpi_{kpi_index}_{self.project_id}"
+                        if st.button("🗑️ Remover KPI", key=f"remove_kpi_{kpi_id}_{self.project_id}"):
+                            confirm_key = f"confirm_delete_kpi_{kpi_id}_{self.project_id}"
                             
                             if st.session_state.get(confirm_key, False):
-                                implementation_data['monitoring_system']['kpis'].pop(kpi_index)
+                                implementation_data['monitoring_system']['kpis'] = [k for k in kpis if k['id'] != kpi_id]
                                 if confirm_key in st.session_state:
                                     del st.session_state[confirm_key]
                                 st.success("✅ KPI removido!")
@@ -3884,146 +3957,30 @@ class FullScaleImplementationTool:
                         st.markdown("##### 📋 Medições do KPI")
                         
                         # Botão para atualizar
-                        if st.button("🔄 Atualizar Medições", key=f"refresh_kpi_{kpi_index}_{self.project_id}"):
+                        if st.button("🔄 Atualizar Medições", key=f"refresh_kpi_{kpi_id}_{self.project_id}"):
                             st.rerun()
                         
-                        # Processar cada medição
-                        for measure_idx in range(len(measurements)):
-                            # Verificar se o índice ainda existe
-                            if measure_idx >= len(implementation_data['monitoring_system']['kpis'][kpi_index]['measurements']):
-                                continue
-                                
-                            measurement = implementation_data['monitoring_system']['kpis'][kpi_index]['measurements'][measure_idx]
-                            
-                            # Chave única para esta medição
-                            unique_id = f"kpi{kpi_index}_measure{measure_idx}_{len(measurements)}_{self.project_id}"
-                            edit_key = f"editing_{unique_id}"
-                            delete_confirm_key = f"delete_confirm_{unique_id}"
-                            
-                            measurement_date_str = datetime.fromisoformat(measurement['date']).strftime('%d/%m/%Y')
-                            
-                            # Container para cada medição
-                            with st.container():
-                                # Verificar se está em modo de edição
-                                is_editing = st.session_state.get(edit_key, False)
-                                
-                                if is_editing:
-                                    # ✅ MODO EDIÇÃO
-                                    st.markdown(f"**✏️ Editando medição de {measurement_date_str}:**")
-                                    
-                                    col_edit1, col_edit2, col_edit3 = st.columns([2, 2, 2])
-                                    
-                                    with col_edit1:
-                                        edited_date = st.date_input(
-                                            "Nova Data:",
-                                            value=datetime.fromisoformat(measurement['date']).date(),
-                                            key=f"edit_kpi_date_{unique_id}"
-                                        )
-                                    
-                                    with col_edit2:
-                                        edited_value = st.number_input(
-                                            f"Novo Valor ({kpi.get('unit', '')}):",
-                                            value=float(measurement['value']),
-                                            key=f"edit_kpi_value_{unique_id}",
-                                            step=0.01,
-                                            format="%.2f"
-                                        )
-                                    
-                                    with col_edit3:
-                                        col_save, col_cancel = st.columns(2)
-                                        
-                                        with col_save:
-                                            if st.button("💾", key=f"save_kpi_{unique_id}", help="Salvar"):
-                                                # Verificar se índice ainda é válido
-                                                if measure_idx < len(implementation_data['monitoring_system']['kpis'][kpi_index]['measurements']):
-                                                    implementation_data['monitoring_system']['kpis'][kpi_index]['measurements'][measure_idx] = {
-                                                        'date': edited_date.isoformat(),
-                                                        'value': float(edited_value),
-                                                        'added_at': measurement.get('added_at', datetime.now().isoformat()),
-                                                        'updated_at': datetime.now().isoformat()
-                                                    }
-                                                    
-                                                    # Limpar estado de edição
-                                                    if edit_key in st.session_state:
-                                                        del st.session_state[edit_key]
-                                                    
-                                                    st.success("✅ Medição atualizada!")
-                                                    st.rerun()
-                                        
-                                        with col_cancel:
-                                            if st.button("❌", key=f"cancel_kpi_{unique_id}", help="Cancelar"):
-                                                if edit_key in st.session_state:
-                                                    del st.session_state[edit_key]
-                                                st.rerun()
-                                
-                                else:
-                                    # ✅ MODO VISUALIZAÇÃO
-                                    col1, col2, col3, col4 = st.columns([2, 2, 1, 1])
-                                    
-                                    with col1:
-                                        st.write(f"📅 **{measurement_date_str}**")
-                                    
-                                    with col2:
-                                        st.write(f"**{measurement['value']} {kpi.get('unit', '')}**")
-                                    
-                                    with col3:
-                                        if st.button("✏️", key=f"edit_kpi_{unique_id}", help="Editar"):
-                                            st.session_state[edit_key] = True
-                                            st.rerun()
-                                    
-                                    with col4:
-                                        # ✅ DELETE PARA MEDIÇÕES DO KPI
-                                        if st.button("🗑️", key=f"delete_kpi_{unique_id}", help="Excluir medição"):
-                                            if st.session_state.get(delete_confirm_key, False):
-                                                try:
-                                                    # Verificar se ainda existe
-                                                    if measure_idx < len(implementation_data['monitoring_system']['kpis'][kpi_index]['measurements']):
-                                                        # Remover diretamente pelo índice
-                                                        implementation_data['monitoring_system']['kpis'][kpi_index]['measurements'].pop(measure_idx)
-                                                        
-                                                        # Limpar estados relacionados
-                                                        keys_to_remove = []
-                                                        for key in st.session_state.keys():
-                                                            if (f"kpi{kpi_index}_measure" in key or 
-                                                                f"delete_confirm_kpi{kpi_index}" in key or
-                                                                f"editing_kpi{kpi_index}" in key):
-                                                                keys_to_remove.append(key)
-                                                        
-                                                        for key in keys_to_remove:
-                                                            try:
-                                                                del st.session_state[key]
-                                                            except:
-                                                                pass
-                                                        
-                                                        st.success(f"✅ Medição de {measurement_date_str} removida!")
-                                                        st.rerun()
-                                                    else:
-                                                        st.error("❌ Medição não encontrada")
-                                                except Exception as e:
-                                                    st.error(f"❌ Erro ao remover: {str(e)}")
-                                            else:
-                                                # Primeira vez - pedir confirmação
-                                                st.session_state[delete_confirm_key] = True
-                                                st.warning("⚠️ Clique novamente para confirmar exclusão")
-                                
-                                # Separador
-                                if measure_idx < len(measurements) - 1:
-                                    st.divider()
+                        # Grade paginada (um único widget por página)
+                        page_key = f"kpi_grid_page_{kpi_id}_{self.project_id}"
+                        page_measurements, page, total_pages = paginate(measurements, page_key)
                         
-                        # ✅ BOTÃO DE LIMPEZA DE EMERGÊNCIA
-                        if st.button("🧹 Limpar Estados", key=f"emergency_clear_kpi_{kpi_index}_{self.project_id}"):
-                            keys_to_remove = []
-                            for key in st.session_state.keys():
-                                if f"kpi{kpi_index}_" in key:
-                                    keys_to_remove.append(key)
+                        changes = render_measurement_grid(
+                            f"kpi_{kpi_id}_{self.project_id}_{page}",
+                            page_measurements,
+                            unit=kpi.get('unit', '')
+                        )
+                        show_page_selector(page_key, total_pages, len(measurements))
+                        
+                        if changes:
+                            now = datetime.now().isoformat()
+                            for measurement_id, fields in changes['updated'].items():
+                                measurement_map[measurement_id].update(fields, updated_at=now)
                             
-                            for key in keys_to_remove:
-                                try:
-                                    del st.session_state[key]
-                                except:
-                                    pass
+                            if changes['deleted']:
+                                deleted = set(changes['deleted'])
+                                kpi['measurements'] = [m for m in measurements if m['id'] not in deleted]
                             
-                            st.success("🧹 Estados limpos!")
+                            st.success(f"✅ {len(changes['updated'])} medição(ões) atualizada(s), {len(changes['deleted'])} removida(s)!")
                             st.rerun()
                     
                     else:
@@ -4724,6 +4681,271 @@ class FullScaleImplementationTool:
         return True
 
 
+class DOETool:
+    """Planejamento de Experimentos (fatoriais de dois níveis)"""
+    
+    def __init__(self, manager: ImprovePhaseManager):
+        self.manager = manager
+        self.project_id = manager.project_id
+        self.tool_name = "doe"
+    
+    def show(self):
+        """Interface principal da ferramenta"""
+        st.markdown("## 🧬 Planejamento de Experimentos (DOE)")
+        st.markdown("Teste várias soluções/fatores de uma vez e identifique quais efeitos e interações realmente importam.")
+        
+        if self.manager.is_tool_completed(self.tool_name):
+            st.success("✅ **Experimento finalizado**")
+        else:
+            st.info("⏳ **Experimento em desenvolvimento**")
+        
+        session_key = f"{self.tool_name}_{self.project_id}"
+        if session_key not in st.session_state:
+            existing_data = self.manager.get_tool_data(self.tool_name)
+            st.session_state[session_key] = existing_data if existing_data else {
+                'factors': [],
+                'fraction': 0,
+                'replicates': 1,
+                'center_points': 0,
+                'design': [],
+                'analysis': {}
+            }
+        
+        doe_data = st.session_state[session_key]
+        
+        tab1, tab2, tab3 = st.tabs([
+            "⚙️ Fatores e Planejamento",
+            "🧪 Corridas",
+            "📈 Análise"
+        ])
+        
+        with tab1:
+            self._show_design_setup(doe_data)
+        
+        with tab2:
+            self._show_runs(doe_data)
+        
+        with tab3:
+            self._show_analysis(doe_data)
+        
+        self._show_action_buttons(doe_data)
+    
+    def _show_design_setup(self, doe_data: Dict):
+        """Definição dos fatores e geração do planejamento"""
+        st.markdown("#### ⚙️ Fatores")
+        
+        factors_df = pd.DataFrame(doe_data.get('factors') or [], columns=['name', 'low', 'high'])
+        edited = st.data_editor(
+            factors_df,
+            num_rows="dynamic",
+            use_container_width=True,
+            key=f"doe_factors_{self.project_id}",
+            column_config={
+                'name': st.column_config.TextColumn("Fator", required=True),
+                'low': st.column_config.NumberColumn("Nível baixo (-1)", required=True),
+                'high': st.column_config.NumberColumn("Nível alto (+1)", required=True)
+            }
+        )
+        factors = [
+            {'name': str(row['name']).strip(), 'low': float(row['low']), 'high': float(row['high'])}
+            for _, row in edited.dropna().iterrows() if str(row['name']).strip()
+        ]
+        k = len(factors)
+        
+        if k < 2:
+            st.info("💡 Cadastre de 2 a 7 fatores com seus níveis baixo e alto")
+            return
+        
+        invalid = [f['name'] for f in factors if f['low'] == f['high']]
+        if invalid or len({f['name'] for f in factors}) < k or k > 7:
+            st.error("❌ Use até 7 fatores com nomes únicos e níveis baixo/alto diferentes")
+            return
+        
+        col1, col2, col3 = st.columns(3)
+        
+        fractions = [0] + sorted(p for (kk, p) in DEFAULT_GENERATORS if kk == k)
+        with col1:
+            fraction = st.selectbox(
+                "Tipo de planejamento",
+                fractions,
+                index=fractions.index(doe_data.get('fraction', 0)) if doe_data.get('fraction', 0) in fractions else 0,
+                format_func=lambda p: f"Fatorial completo 2^{k} ({2 ** k} corridas)" if p == 0 else
+                f"Fracionado 2^({k}-{p}) ({2 ** (k - p)} corridas, resolução "
+                f"{ROMAN.get(resolution(DEFAULT_GENERATORS[(k, p)]), '?')})",
+                key=f"doe_fraction_{self.project_id}"
+            )
+        with col2:
+            replicates = st.number_input("Réplicas", min_value=1, max_value=10,
+                                         value=int(doe_data.get('replicates', 1)),
+                                         key=f"doe_replicates_{self.project_id}")
+        with col3:
+            center_points = st.number_input("Pontos centrais", min_value=0, max_value=20,
+                                            value=int(doe_data.get('center_points', 0)),
+                                            key=f"doe_center_{self.project_id}")
+        
+        if fraction:
+            st.caption(f"Geradores: {', '.join(DEFAULT_GENERATORS[(k, fraction)])}")
+        
+        total_runs = 2 ** (k - fraction) * replicates + center_points
+        st.info(f"📋 Total de corridas: **{total_runs}**")
+        
+        if st.button("🎲 Gerar Planejamento", key=f"doe_generate_{self.project_id}", type="primary"):
+            if doe_data.get('design') and any(r.get(RESPONSE_COLUMN) is not None for r in doe_data['design']):
+                st.warning("⚠️ As respostas registradas no planejamento anterior foram descartadas")
+            design = generate_design(factors, fraction=fraction, replicates=replicates, center_points=center_points)
+            doe_data.update({
+                'factors': factors,
+                'fraction': fraction,
+                'replicates': replicates,
+                'center_points': center_points,
+                'generators': DEFAULT_GENERATORS.get((k, fraction), []),
+                'design': design.astype(object).where(design.notna(), None).to_dict('records'),
+                'analysis': {}
+            })
+            st.success(f"✅ Planejamento com {len(design)} corridas gerado! Registre as respostas na aba Corridas.")
+    
+    def _show_runs(self, doe_data: Dict):
+        """Registro das respostas de cada corrida"""
+        st.markdown("#### 🧪 Corridas do Experimento")
+        
+        if not doe_data.get('design'):
+            st.info("💡 Gere o planejamento na aba de fatores")
+            return
+        
+        design = pd.DataFrame(doe_data['design'])
+        design[RESPONSE_COLUMN] = pd.to_numeric(design[RESPONSE_COLUMN], errors='coerce')
+        st.caption("Execute as corridas na ordem de execução (aleatorizada) e registre a resposta medida.")
+        
+        with st.form(f"doe_runs_form_{self.project_id}"):
+            edited = st.data_editor(
+                design,
+                use_container_width=True,
+                hide_index=True,
+                disabled=[c for c in design.columns if c != RESPONSE_COLUMN],
+                key=f"doe_runs_{self.project_id}",
+                column_config={RESPONSE_COLUMN: st.column_config.NumberColumn(RESPONSE_COLUMN, format="%.4f")}
+            )
+            submitted = st.form_submit_button("💾 Aplicar respostas")
+        
+        if submitted:
+            doe_data['design'] = edited.astype(object).where(edited.notna(), None).to_dict('records')
+            doe_data['analysis'] = {}
+            st.rerun()
+        
+        filled = int(design[RESPONSE_COLUMN].notna().sum())
+        st.progress(filled / len(design))
+        st.caption(f"{filled}/{len(design)} corridas com resposta")
+    
+    def _show_analysis(self, doe_data: Dict):
+        """Efeitos, significância e gráficos de efeitos"""
+        st.markdown("#### 📈 Análise do Experimento")
+        
+        design = pd.DataFrame(doe_data.get('design') or [])
+        factors = doe_data.get('factors') or []
+        if design.empty or design[RESPONSE_COLUMN].isna().all():
+            st.info("💡 Registre as respostas das corridas para analisar o experimento")
+            return
+        design[RESPONSE_COLUMN] = pd.to_numeric(design[RESPONSE_COLUMN], errors='coerce')
+        
+        try:
+            analysis = analyze_design(design, factors)
+        except ValueError as e:
+            st.warning(f"⚠️ {str(e)}")
+            return
+        doe_data['analysis'] = analysis
+        
+        effects = pd.DataFrame(analysis['effects'])
+        effects['significant'] = effects['p_value'].apply(lambda p: p is not None and p < 0.05)
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Corridas analisadas", analysis['n'])
+        with col2:
+            st.metric("Efeitos significativos", int(effects['significant'].sum()))
+        with col3:
+            st.metric("R²", f"{analysis['r2']:.4f}" if analysis.get('r2') is not None else "N/A")
+        
+        if analysis['method'] == 'Lenth':
+            st.caption("Planejamento sem graus de liberdade para o erro: significância pelo método de Lenth")
+        
+        # Pareto dos efeitos
+        ordered = effects.assign(magnitude=effects['effect'].abs()).sort_values('magnitude')
+        fig = px.bar(
+            ordered, x='magnitude', y='label', orientation='h',
+            color=ordered['significant'].map({True: 'Significativo', False: 'Não significativo'}),
+            color_discrete_map={'Significativo': '#d62728', 'Não significativo': '#7f7f7f'},
+            title="Pareto dos Efeitos (|efeito|)",
+            labels={'magnitude': '|Efeito|', 'label': '', 'color': ''}
+        )
+        fig.update_layout(height=max(300, 30 * len(ordered)))
+        st.plotly_chart(fig, use_container_width=True)
+        
+        table = pd.DataFrame({
+            'Termo': effects['label'],
+            'Efeito': effects['effect'],
+            'Coeficiente': effects['coef'],
+            'p-valor': effects['p_value'],
+            'Confundido com': effects['aliases'].apply(lambda a: ', '.join(a))
+        })
+        st.dataframe(table, use_container_width=True, hide_index=True, column_config={
+            'Efeito': st.column_config.NumberColumn(format="%.4f"),
+            'Coeficiente': st.column_config.NumberColumn(format="%.4f"),
+            'p-valor': st.column_config.NumberColumn(format="%.4f")
+        })
+        
+        # Gráfico de efeitos principais
+        means = main_effects(design, factors)
+        names = [f['name'] for f in factors]
+        fig = make_subplots(rows=1, cols=len(names), subplot_titles=names, shared_yaxes=True)
+        for i, name in enumerate(names, start=1):
+            subset = means[means['Fator'] == name]
+            fig.add_trace(go.Scatter(x=subset['Nível'], y=subset['Média'], mode='lines+markers',
+                                     name=name, showlegend=False), row=1, col=i)
+        fig.add_hline(y=design[RESPONSE_COLUMN].mean(), line_dash="dash", line_color="gray")
+        fig.update_layout(title="Efeitos Principais", height=350)
+        st.plotly_chart(fig, use_container_width=True)
+        
+        # Gráfico de interação
+        col1, col2 = st.columns(2)
+        with col1:
+            first = st.selectbox("Fator no eixo X", names, key=f"doe_inter_x_{self.project_id}")
+        with col2:
+            second = st.selectbox("Fator nas linhas", [n for n in names if n != first],
+                                  key=f"doe_inter_line_{self.project_id}")
+        
+        interaction = interaction_means(design, first, second)
+        fig = px.line(interaction, x=first, y='Média', color=interaction[second].astype(str), markers=True,
+                      title=f"Interação {first} × {second}", labels={'color': second})
+        fig.update_layout(height=350)
+        st.plotly_chart(fig, use_container_width=True)
+    
+    def _show_action_buttons(self, doe_data: Dict):
+        """Botões de ação"""
+        st.divider()
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            if st.button("💾 Salvar Experimento", key=f"save_{self.tool_name}_{self.project_id}"):
+                success = self.manager.save_tool_data(self.tool_name, doe_data, completed=False)
+                if success:
+                    st.success("💾 Experimento salvo!")
+                else:
+                    st.error("❌ Erro ao salvar")
+        
+        with col2:
+            if st.button("✅ Finalizar Experimento", key=f"complete_{self.tool_name}_{self.project_id}"):
+                if doe_data.get('analysis', {}).get('effects'):
+                    success = self.manager.save_tool_data(self.tool_name, doe_data, completed=True)
+                    if success:
+                        st.success("✅ Experimento finalizado!")
+                        st.balloons()
+                    else:
+                        st.error("❌ Erro ao finalizar")
+                else:
+                    st.error("❌ Registre as respostas e analise o experimento antes de finalizar")
+
+
 def show_improve_phase():
     """Interface principal da fase Improve"""
     st.title("🚀 Fase IMPROVE")
@@ -4746,14 +4968,14 @@ def show_improve_phase():
         ("💡 Desenvolvimento de Soluções", "solution_development", SolutionDevelopmentTool),
         ("📋 Plano de Ação", "action_plan", ActionPlanTool),
         ("🧪 Implementação Piloto", "pilot_implementation", PilotImplementationTool),
-        ("🚀 Implementação em Larga Escala", "full_implementation", FullScaleImplementationTool)
+        ("🚀 Implementação em Larga Escala", "full_implementation", FullScaleImplementationTool),
+        ("🧬 Planejamento de Experimentos", "doe", DOETool)
     ]
     
     # Mostrar status das ferramentas
-    col1, col2, col3, col4 = st.columns(4)
+    columns = st.columns(len(tools))
     
-    for i, (tool_name, tool_key, tool_class) in enumerate(tools):
-        col = [col1, col2, col3, col4][i]
+    for col, (tool_name, tool_key, tool_class) in zip(columns, tools):
         with col:
             is_completed = improve_manager.is_tool_completed(tool_key)
             if is_completed:
@@ -1,10 +1,6 @@
 import streamlit as st
 from typing import Dict
-from src.pages.dashboard import show_dashboard
-from src.pages.dmaic_phases import show_dmaic_phase
-from src.pages.projects import show_projects_page
-from src.pages.reports import show_reports_page
-from src.pages.help import show_help_page
+from src.utils.lazy_loader import page
 
 def show_main_navigation():
     """Controla a navegação principal da aplicação"""
@@ -19,21 +15,21 @@ def show_main_navigation():
     # Obter página atual
     current_page = st.session_state.get('current_page', 'dashboard')
     
-    # Roteamento de páginas
+    # Roteamento de páginas (módulo importado só na primeira visita)
     if current_page == 'dashboard':
-        show_dashboard()
+        page('dashboard')()
     elif current_page == 'projects':
-        show_projects_page()
+        page('projects')()
     elif current_page == 'dmaic':
-        show_dmaic_phase()
+        page('dmaic')()
     elif current_page == 'reports':
-        show_reports_page()
+        page('reports')()
     elif current_page == 'help':
-        show_help_page()
+        page('help')()
     else:
         # Página padrão
         st.session_state.current_page = 'dashboard'
-        show_dashboard()
+        page('dashboard')()
     
     # Renderizar navegação na sidebar (sempre visível)
     current_project = st.session_state.get('current_project')
@@ -5,6 +5,7 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
+from io import BytesIO
 from typing import Dict, List, Optional
 from src.utils.project_manager import ProjectManager
 import warnings
@@ -1417,6 +1418,76 @@ def _calculate_capability_advanced(data, lsl=None, usl=None):
         return None
 
 
+MSA_BLOCKING_OPTIONS = {
+    'none': "Sem blocagem",
+    'trial': "Por repetição",
+    'operator': "Por operador"
+}
+
+MSA_TEMPLATE_FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'XLSX': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+}
+
+
+def _generate_msa_template(num_operators: int, num_parts: int, num_trials: int,
+                           randomize: bool = True, blocking: str = 'trial',
+                           seed: Optional[int] = None) -> pd.DataFrame:
+    """Gera o template MSA (operador × peça × repetição) de forma vetorizada
+
+    A ordem de execução é sorteada dentro de cada bloco ('trial' ou 'operator');
+    sem blocagem o sorteio é feito sobre o estudo completo.
+    """
+    total = num_operators * num_parts * num_trials
+
+    # Produto cartesiano via repeat/tile (operador é o índice mais lento)
+    operators = np.repeat(np.arange(1, num_operators + 1), num_parts * num_trials)
+    parts = np.tile(np.repeat(np.arange(1, num_parts + 1), num_trials), num_operators)
+    trials = np.tile(np.arange(1, num_trials + 1), num_operators * num_parts)
+
+    if randomize:
+        rng = np.random.default_rng(seed)
+        block_keys = {'trial': trials, 'operator': operators}.get(blocking)
+
+        if block_keys is None:
+            order = rng.permutation(total)
+        else:
+            # Ordenar por bloco e, dentro do bloco, por uma chave aleatória
+            order = np.lexsort((rng.random(total), block_keys))
+
+        operators, parts, trials = operators[order], parts[order], trials[order]
+
+    template_df = pd.DataFrame({
+        'Ordem': np.arange(1, total + 1),
+        'Operador': pd.Categorical.from_codes(
+            operators - 1, [f'Op_{i}' for i in range(1, num_operators + 1)]
+        ),
+        'Peça': pd.Categorical.from_codes(
+            parts - 1, [f'Peça_{i}' for i in range(1, num_parts + 1)]
+        ),
+        'Repetição': trials,
+        'Medição': np.full(total, np.nan)
+    })
+
+    if randomize and blocking in ('trial', 'operator'):
+        template_df.insert(1, 'Bloco', trials if blocking == 'trial' else operators)
+
+    return template_df
+
+
+def _export_msa_template(template_df: pd.DataFrame, file_format: str = 'CSV') -> bytes:
+    """Serializa o template MSA em memória para o download_button"""
+    buffer = BytesIO()
+
+    if file_format == 'XLSX':
+        with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
+            template_df.to_excel(writer, index=False, sheet_name='MSA')
+    else:
+        template_df.to_csv(buffer, index=False, encoding='utf-8')
+
+    return buffer.getvalue()
+
+
 def show_msa_analysis(project_data: Dict):
     """MSA - Análise do Sistema de Medição - VERSÃO CORRIGIDA"""
     
@@ -1493,28 +1564,47 @@ def show_msa_analysis(project_data: Dict):
             key=f"msa_trials_{project_id}"
         )
     
+    # Opções do template
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        randomize = st.checkbox(
+            "🎲 Ordem aleatória",
+            value=True,
+            key=f"msa_randomize_{project_id}"
+        )
+    with col2:
+        blocking = st.selectbox(
+            "Blocagem",
+            list(MSA_BLOCKING_OPTIONS.keys()),
+            index=1,
+            format_func=lambda x: MSA_BLOCKING_OPTIONS[x],
+            key=f"msa_blocking_{project_id}",
+            disabled=not randomize
+        )
+    with col3:
+        template_format = st.selectbox(
+            "Formato",
+            list(MSA_TEMPLATE_FORMATS.keys()),
+            key=f"msa_format_{project_id}"
+        )
+
     # Gerar template
     if st.button("📥 Gerar Template MSA", key=f"gen_msa_template_{project_id}"):
-        template_data = []
-        for op in range(1, num_operators + 1):
-            for part in range(1, num_parts + 1):
-                for trial in range(1, num_trials + 1):
-                    template_data.append({
-                        'Operador': f'Op_{op}',
-                        'Peça': f'Peça_{part}',
-                        'Repetição': trial,
-                        'Medição': ''
-                    })
-        
-        template_df = pd.DataFrame(template_data)
-        st.dataframe(template_df.head(15))
-        
-        csv = template_df.to_csv(index=False)
+        template_df = _generate_msa_template(
+            num_operators, num_parts, num_trials,
+            randomize=randomize,
+            blocking=blocking
+        )
+
+        st.caption(f"📋 {len(template_df)} medições planejadas")
+        st.dataframe(template_df, use_container_width=True, height=300)
+
+        extension, mime = MSA_TEMPLATE_FORMATS[template_format]
         st.download_button(
             "📥 Download Template",
-            csv,
-            f"MSA_Template_{project_data.get('name', 'Projeto')}.csv",
-            "text/csv",
+            _export_msa_template(template_df, template_format),
+            f"MSA_Template_{project_data.get('name', 'Projeto')}.{extension}",
+            mime,
             key=f"download_msa_template_{project_id}"
         )
     
@@ -0,0 +1,145 @@
+import os
+
+import pandas as pd
+import streamlit as st
+
+try:
+    from src.utils import firestore_trace, profiler
+    from src.utils.lazy_loader import import_timings
+except ImportError:
+    from utils import firestore_trace, profiler
+    from utils.lazy_loader import import_timings
+
+
+def is_profiler_panel_enabled() -> bool:
+    """
+    Painel oculto: só aparece com ?profiler=<chave> igual a PROFILER_ADMIN_KEY
+
+    Sem PROFILER_ADMIN_KEY definida o painel fica desativado.
+    """
+    admin_key = os.getenv("PROFILER_ADMIN_KEY", "")
+    if not admin_key:
+        return False
+    try:
+        return st.query_params.get('profiler') == admin_key
+    except Exception:
+        return False
+
+
+def _stats_frame(kind: str) -> pd.DataFrame:
+    rows = profiler.stats(kind)
+    if not rows:
+        return pd.DataFrame()
+    frame = pd.DataFrame(rows)[['name', 'count', 'total', 'mean', 'max', 'last']]
+    frame.columns = ['Nome', 'Chamadas', 'Total (s)', 'Média (ms)', 'Máximo (ms)', 'Última (ms)']
+    for column in ['Média (ms)', 'Máximo (ms)', 'Última (ms)']:
+        frame[column] = frame[column] * 1000
+    return frame.round(3)
+
+
+def show_profiler_panel():
+    """Tempos por etapa, página e chamada ao Firestore, com exportação"""
+    st.markdown("---")
+    st.markdown("## ⏱️ Profiling")
+
+    if not profiler.ENABLED:
+        st.info("ℹ️ Instrumentação desativada (GB_PROFILING=0)")
+        return
+
+    reruns = profiler.recent_reruns()
+    if reruns:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Último rerun", f"{reruns[0]['seconds'] * 1000:.0f} ms")
+        with col2:
+            mean = sum(rerun['seconds'] for rerun in reruns) / len(reruns)
+            st.metric("Média (recentes)", f"{mean * 1000:.0f} ms")
+        with col3:
+            st.metric("Reruns registrados", len(reruns))
+
+    tabs = st.tabs([profiler.KINDS[kind] for kind in profiler.KINDS]
+                   + ["Reruns", "Importações", "Leituras/Gravações"])
+
+    for tab, kind in zip(tabs, profiler.KINDS):
+        with tab:
+            frame = _stats_frame(kind)
+            if frame.empty:
+                st.info("ℹ️ Nenhuma medição ainda")
+            else:
+                st.dataframe(frame, use_container_width=True, hide_index=True)
+
+    with tabs[-3]:
+        if reruns:
+            st.dataframe(pd.DataFrame([{
+                'Início': rerun['started_at'][11:19],
+                'Página': rerun['label'],
+                'Total (ms)': round(rerun['seconds'] * 1000, 1),
+                'Trechos': " | ".join(f"{span['name']} {span['seconds'] * 1000:.0f}" for span in rerun['spans'])
+            } for rerun in reruns]), use_container_width=True, hide_index=True)
+        else:
+            st.info("ℹ️ Nenhum rerun completo registrado")
+
+    with tabs[-2]:
+        timings = import_timings()
+        if timings:
+            st.dataframe(pd.DataFrame([{
+                'Módulo': timing['name'],
+                'Tempo (ms)': round(timing['seconds'] * 1000, 1),
+                'Módulos novos': timing['new_modules'],
+                'Pesados': ", ".join(timing['heavy'])
+            } for timing in timings]), use_container_width=True, hide_index=True)
+        else:
+            st.info("ℹ️ Nenhuma importação sob demanda registrada")
+
+    with tabs[-1]:
+        _show_firestore_usage()
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        if st.button("💾 Exportar JSON", key="profiler_export_json"):
+            st.success(f"✅ Gravado em {profiler.export('json')}")
+    with col2:
+        if st.button("💾 Exportar Prometheus", key="profiler_export_prom"):
+            st.success(f"✅ Gravado em {profiler.export('prometheus')}")
+    with col3:
+        st.download_button("📥 Baixar Prometheus", profiler.to_prometheus(), file_name="greenbelt_profile.prom",
+                           mime="text/plain", key="profiler_download_prom")
+    with col4:
+        if st.button("🧹 Zerar medições", key="profiler_reset"):
+            profiler.reset()
+            firestore_trace.reset()
+            st.rerun()
+
+
+def _show_firestore_usage():
+    """Leituras, gravações e bytes por sessão, por página da sessão atual e alertas N+1"""
+    sessions = firestore_trace.sessions()
+    if not sessions:
+        st.info("ℹ️ Nenhuma operação do Firestore registrada")
+        return
+
+    st.dataframe(pd.DataFrame([{
+        'Sessão': session['session'][:8],
+        'Renders': session.get('renders', 0),
+        'Leituras': session['reads'],
+        'Gravações': session['writes'] + session['deletes'],
+        'KB lidos': round(session['bytes_read'] / 1024, 1),
+        'KB gravados': round(session['bytes_written'] / 1024, 1),
+        'Alertas': len(session.get('flags', []))
+    } for session in sessions]), use_container_width=True, hide_index=True)
+
+    current = firestore_trace.session_summary(firestore_trace.current_session_id())
+    if not current:
+        return
+
+    st.markdown("**Sessão atual por página**")
+    st.dataframe(pd.DataFrame([{
+        'Página': name,
+        'Renders': page['renders'],
+        'Leituras/render': round(page['reads'] / page['renders'], 1),
+        'Gravações/render': round((page['writes'] + page['deletes']) / page['renders'], 1),
+        'KB lidos/render': round(page['bytes_read'] / 1024 / page['renders'], 1)
+    } for name, page in current['pages'].items()]), use_container_width=True, hide_index=True)
+
+    for flag in reversed(current['flags'][-10:]):
+        st.warning(f"⚠️ [{flag['page']}] {flag['message']}")
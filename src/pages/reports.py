@@ -9,6 +9,12 @@ from typing import Dict, List, Optional
 
 from src.utils.project_manager import ProjectManager
 from src.utils.formatters import format_currency, format_date_br, format_number_br
+from src.utils.report_content import custom_report, executive_report, phase_report
+from src.utils.report_export import EXPORT_FORMATS, export_report
+from src.utils.job_queue import STATUS_LABELS, cache_key, get_job_queue
+from src.utils.portfolio_report import bundle_key, portfolio_job, section_key
+from src.utils.appendix_export import appendix_bytes
+from src.utils.measurement_store import MeasurementStore
 
 def show_reports_page():
     """Página de relatórios científicos completa"""
@@ -33,6 +39,18 @@ def show_reports_page():
     
     st.divider()
     
+    mode = st.radio(
+        "Escopo",
+        ["📄 Projeto atual", "🗂️ Portfólio (todos os projetos)"],
+        horizontal=True,
+        key="reports_scope",
+        label_visibility="collapsed"
+    )
+    
+    if mode.startswith("🗂️"):
+        show_portfolio_report()
+        return
+    
     # Verificar se há projeto selecionado
     current_project = st.session_state.get('current_project')
     
@@ -173,13 +191,23 @@ def generate_executive_report(project: Dict, project_manager: ProjectManager):
     # Opções de exportação
     st.markdown("### 💾 Exportar Relatório")
     
+    export_format = st.selectbox("Formato", list(EXPORT_FORMATS.keys()), key="exec_format")
+    
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        if st.button("📄 Gerar PDF", use_container_width=True, type="primary", key="exec_pdf"):
-            with st.spinner("Gerando PDF..."):
-                st.info("🚧 Funcionalidade de exportação PDF será implementada em breve")
-                st.balloons()
+        if st.button(f"📄 Gerar {export_format}", use_container_width=True, type="primary", key="exec_pdf"):
+            options = {
+                'charts': include_charts,
+                'metrics': include_metrics,
+                'timeline': include_timeline,
+                'roi': include_roi
+            }
+            _export(project, 'executivo', export_format, options, executive_report,
+                    project,
+                    project_manager.get_project_statistics(project),
+                    project_manager.calculate_project_progress(project),
+                    options)
     
     with col2:
         if st.button("📊 Gerar PowerPoint", use_container_width=True, key="exec_ppt"):
@@ -191,6 +219,8 @@ def generate_executive_report(project: Dict, project_manager: ProjectManager):
             markdown_content = generate_executive_markdown(project, project_manager)
             st.code(markdown_content, language="markdown")
             st.success("✅ Markdown gerado! Copie o conteúdo acima.")
+    
+    _show_download(project, 'executivo')
 
 
 def show_executive_preview(project: Dict, project_manager: ProjectManager, options: Dict):
@@ -447,16 +477,22 @@ def generate_phase_report(project: Dict, project_manager: ProjectManager):
     st.divider()
     
     # Exportação
+    export_format = st.selectbox("Formato", list(EXPORT_FORMATS.keys()), key="phase_format")
+    
     col1, col2 = st.columns(2)
     
     with col1:
-        if st.button("📄 Gerar PDF da Fase", use_container_width=True, type="primary"):
-            st.info("🚧 Exportação PDF será implementada em breve")
+        if st.button(f"📄 Gerar {export_format} da Fase", use_container_width=True, type="primary"):
+            _export(project, f"fase_{selected_phase}", export_format, {'phase': selected_phase},
+                    phase_report, project, selected_phase, stats)
     
     with col2:
         if st.button("📋 Copiar Markdown", use_container_width=True):
-            st.code(f"# Relatório da Fase {phase_options[selected_phase]}\n\n...", language="markdown")
+            title, blocks = phase_report(project, selected_phase, stats)
+            st.code(export_report(title, blocks, 'Markdown')['data'].decode('utf-8'), language="markdown")
             st.success("✅ Markdown gerado!")
+    
+    _show_download(project, f"fase_{selected_phase}")
 
 
 def show_phase_preview(project: Dict, phase: str, phase_data: Dict, phase_stats: Dict):
@@ -613,23 +649,211 @@ def generate_custom_report(project: Dict, project_manager: ProjectManager):
     
     # Resumo da seleção
     selected_sections = []
-    if include_summary: selected_sections.append("Resumo Executivo")
-    if include_define: selected_sections.append("Define")
-    if include_measure: selected_sections.append("Measure")
-    if include_analyze: selected_sections.append("Analyze")
-    if include_improve: selected_sections.append("Improve")
-    if include_control: selected_sections.append("Control")
-    if include_results: selected_sections.append("Resultados")
-    if include_charts: selected_sections.append("Gráficos")
-    if include_data: selected_sections.append("Dados Brutos")
-    if include_appendix: selected_sections.append("Anexos")
+    if include_summary: selected_sections.append("summary")
+    if include_define: selected_sections.append("define")
+    if include_measure: selected_sections.append("measure")
+    if include_analyze: selected_sections.append("analyze")
+    if include_improve: selected_sections.append("improve")
+    if include_control: selected_sections.append("control")
+    if include_results: selected_sections.append("results")
+    if include_charts: selected_sections.append("charts")
+    if include_data: selected_sections.append("data")
+    if include_appendix: selected_sections.append("appendix")
     
     st.info(f"📋 Seções selecionadas: {len(selected_sections)}")
     
     if st.button("📄 Gerar Relatório Customizado", use_container_width=True, type="primary"):
-        with st.spinner("Gerando relatório..."):
-            st.success("🎉 Relatório customizado será implementado em breve!")
-            st.balloons()
+        if report_format not in EXPORT_FORMATS:
+            st.info(f"🚧 Exportação {report_format} será implementada em breve")
+        elif not selected_sections:
+            st.warning("⚠️ Selecione ao menos uma seção")
+        else:
+            data = project_manager.get_uploaded_data(project.get('id')) if include_data else None
+            _export(project, 'customizado', report_format, {'sections': selected_sections}, custom_report,
+                    project,
+                    project_manager.get_project_statistics(project),
+                    project_manager.calculate_project_progress(project),
+                    selected_sections,
+                    data)
+    
+    _show_download(project, 'customizado')
+    
+    if include_data or include_appendix:
+        st.markdown("#### 📎 Anexo em Excel")
+        st.caption("Dados brutos completos e tabelas das ferramentas (uma planilha por conjunto)")
+        
+        if st.button("📎 Gerar Anexo XLSX", use_container_width=True, key="custom_appendix_xlsx"):
+            data = project_manager.get_uploaded_data(project.get('id')) if include_data else None
+            store = None
+            if include_appendix:
+                store = MeasurementStore(project.get('id'), project_manager.db, project_manager.user_uid)
+            control = project.get('control', {}).get('control_plan', {}).get('data') or {}
+            options = {
+                'data': include_data,
+                'appendix': include_appendix,
+                'points': [(p.get('id'), p.get('summary')) for p in control.get('control_points', [])]
+            }
+            key = cache_key('report_anexo', project, options)
+            st.session_state[f"report_job_anexo_{project.get('id')}"] = get_job_queue().submit(
+                'report', _appendix_job, project, data, store, include_appendix,
+                label=f"Anexo XLSX - {project.get('name', '')}",
+                owner=st.session_state.get('user_data', {}).get('uid', ''),
+                key=key
+            )
+        
+        _show_download(project, 'anexo')
+
+
+def _report_job(context, export_format: str, build, *args) -> Dict:
+    """Tarefa em segundo plano: monta o conteúdo e exporta no formato pedido"""
+    context.update(0.1, "Montando conteúdo")
+    title, blocks = build(*args)
+    context.update(0.3, "Gerando gráficos e documento")
+    return export_report(title, blocks, export_format,
+                         checkpoint=lambda fraction, message: context.update(0.3 + 0.7 * fraction, message))
+
+
+def _appendix_job(context, project: Dict, data, store, include_tools: bool) -> Dict:
+    """Tarefa em segundo plano: anexo XLSX em modo de memória constante"""
+    context.update(0.1, "Gravando planilhas")
+    return appendix_bytes(project, data, store, include_tools)
+
+
+def _export(project: Dict, report: str, export_format: str, options: Dict, build, *args):
+    """
+    Enfileira a geração do relatório na fila em segundo plano
+    
+    Os dados (estatísticas, dados carregados) são lidos aqui, no script; a
+    tarefa só monta e exporta. O resultado fica em cache pelo updated_at do
+    projeto: repetir o pedido sem alterações no projeto é imediato.
+    """
+    key = cache_key(f"report_{report}", project, {'format': export_format, 'options': options})
+    job_id = get_job_queue().submit(
+        'report', _report_job, export_format, build, *args,
+        label=f"Relatório {report} ({export_format}) - {project.get('name', '')}",
+        owner=st.session_state.get('user_data', {}).get('uid', ''),
+        key=key
+    )
+    st.session_state[f"report_job_{report}_{project.get('id')}"] = job_id
+
+
+def _show_download(project: Dict, report: str):
+    """Estado da última tarefa do relatório do projeto"""
+    job_id = st.session_state.get(f"report_job_{report}_{project.get('id')}")
+    if job_id:
+        project_name = str(project.get('name', 'Projeto')).replace(' ', '_')
+        _show_job(job_id, f"report_{report}_{project.get('id')}", f"Relatorio_{report}_{project_name}")
+
+
+def _show_job(job_id: str, widget_key: str, file_stem: str):
+    """Progresso, cancelamento e download de uma tarefa da fila"""
+    queue = get_job_queue()
+    job = queue.get(job_id)
+    if not job:
+        return
+    
+    if job['status'] in ('queued', 'running'):
+        st.progress(job['progress'] or 0.0, text=f"{STATUS_LABELS[job['status']]} {job['message'] or ''}")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.button("🔄 Atualizar", use_container_width=True, key=f"refresh_{widget_key}")
+        with col2:
+            if st.button("⛔ Cancelar", use_container_width=True, key=f"cancel_{widget_key}"):
+                queue.cancel(job_id)
+                st.rerun()
+        return
+    
+    if job['status'] == 'failed':
+        st.error(f"❌ Erro ao gerar relatório: {job['error']}")
+        return
+    
+    if job['status'] == 'cancelled':
+        st.info("⛔ Geração cancelada")
+        return
+    
+    # O resultado (até dezenas de MB) é lido do SQLite uma vez por tarefa, não a cada rerun
+    loaded = st.session_state.get(f"report_result_{widget_key}")
+    if loaded and loaded[0] == job_id:
+        export = loaded[1]
+    else:
+        export = queue.result(job_id)
+        st.session_state[f"report_result_{widget_key}"] = (job_id, export)
+    if not export:
+        return
+    
+    if export['figures']:
+        st.caption(f"🖼️ {export['figures']} gráfico(s): {export['cached']} do cache, {export['rendered']} gerado(s)")
+        if export['rendered'] + export['cached'] < export['figures']:
+            st.warning("⚠️ Gráficos sem imagem estática (instale o kaleido); o HTML usa gráficos interativos")
+    if 'projects' in export:
+        st.caption(f"📦 {export['projects']} projeto(s): {export['generated']} gerado(s), "
+                   f"{export['skipped']} sem alteração reaproveitado(s)")
+    if 'sheets' in export:
+        st.caption(f"📑 {len(export['sheets'])} planilha(s), {sum(export['sheets'].values()):,} linha(s)")
+    if job['cached']:
+        st.caption("⚡ Nada mudou desde a última geração: arquivo reaproveitado")
+    
+    file_name = f"{file_stem}.{export['extension']}"
+    st.download_button(
+        f"📥 Download {file_name}",
+        export['data'],
+        file_name,
+        export['mime'],
+        use_container_width=True,
+        key=f"download_{widget_key}"
+    )
+
+
+def show_portfolio_report():
+    """Pacote mensal: um relatório executivo por projeto + consolidado, num ZIP"""
+    
+    st.markdown("### 🗂️ Relatório de Portfólio")
+    st.caption("Um relatório executivo por projeto e um consolidado, em um único arquivo ZIP")
+    
+    user_uid = st.session_state.get('user_data', {}).get('uid')
+    if not user_uid:
+        st.warning("⚠️ Faça login para gerar o relatório de portfólio")
+        return
+    
+    project_manager = ProjectManager()
+    summaries = project_manager.get_user_project_summaries(user_uid)
+    if not summaries:
+        st.info("📋 Nenhum projeto encontrado")
+        return
+    
+    export_format = st.selectbox("Formato dos relatórios", list(EXPORT_FORMATS.keys()), key="portfolio_format")
+    
+    queue = get_job_queue()
+    entries = [
+        {
+            'key': section_key(project, export_format),
+            'project': project,
+            'stats': project_manager.get_project_statistics(project, check_upload=False),
+            'progress': project_manager.calculate_project_progress(project)
+        }
+        for project in summaries
+    ]
+    unchanged = sum(1 for entry in entries if queue.has_result(entry['key']))
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("📁 Projetos", len(entries))
+    with col2:
+        st.metric("✏️ Alterados", len(entries) - unchanged)
+    with col3:
+        st.metric("♻️ Sem alteração", unchanged)
+    
+    if st.button("📦 Gerar Pacote do Portfólio", use_container_width=True, type="primary"):
+        st.session_state[f"portfolio_job_{user_uid}"] = queue.submit(
+            'portfolio', portfolio_job, entries, export_format, queue,
+            label=f"Portfólio ({export_format}) - {len(entries)} projetos",
+            owner=user_uid,
+            key=bundle_key(entries, export_format)
+        )
+    
+    job_id = st.session_state.get(f"portfolio_job_{user_uid}")
+    if job_id:
+        _show_job(job_id, f"portfolio_{user_uid}", f"Portfolio_{datetime.now().strftime('%Y-%m')}")
 
 
 def generate_executive_markdown(project: Dict, project_manager: ProjectManager) -> str:
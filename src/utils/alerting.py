@@ -0,0 +1,248 @@
+"""
+Motor de alertas do plano de controle
+
+Cada medição avaliada pela carta (status + regras de Nelson) é confrontada com
+os gatilhos dos planos de resposta. Os eventos gerados entram numa fila e são
+entregues por uma thread de fundo aos canais configurados (arquivo de log,
+SMTP local, webhook), sem bloquear a interface. Não depende do Streamlit, para
+ser reutilizado pela API de ingestão.
+"""
+import json
+import logging
+import os
+import queue
+import smtplib
+import threading
+from collections import deque
+from datetime import datetime
+from email.message import EmailMessage
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+
+logger = logging.getLogger(__name__)
+
+# Regras de Nelson que caracterizam tendência/deslocamento do processo
+TREND_RULES = {2, 3, 5, 6}
+
+
+def _adverse_trend(measurement: Dict, point: Dict) -> bool:
+    """
+    Regra de tendência que afasta o processo da meta
+
+    A medição precisa estar mais longe da meta do que a linha central (média
+    do ponto); deslocamentos em direção à meta são melhoria e não disparam.
+    Sem meta ou sem histórico não há como saber o sentido: qualquer tendência conta.
+    """
+    if not TREND_RULES.intersection(measurement.get('rules') or []):
+        return False
+
+    target = point.get('target')
+    summary = point.get('summary') or {}
+    if target is None or not summary.get('count'):
+        return True
+    return abs(measurement['value'] - target) > abs(summary['mean'] - target)
+
+
+# Gatilho do plano de resposta -> condição avaliada em cada medição (medição, ponto)
+TRIGGER_MATCHERS: Dict[str, Callable[[Dict, Dict], bool]] = {
+    "Fora dos limites": lambda m, point: m.get('status') == 'ALERT',
+    "Tendência negativa": _adverse_trend,
+}
+
+QUEUE_MAXSIZE = 1000
+HISTORY_SIZE = 200
+
+
+class LogSink:
+    """Grava os alertas em arquivo JSON Lines"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("ALERT_LOG_PATH", "control_alerts.log")
+
+    def send(self, event: Dict):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(event, ensure_ascii=False, default=str) + "\n")
+
+
+class SMTPSink:
+    """Envia e-mail por um servidor SMTP (por padrão o stand-in local na porta 1025)"""
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None,
+                 sender: Optional[str] = None, recipients: Optional[List[str]] = None):
+        self.host = host or os.getenv("ALERT_SMTP_HOST", "localhost")
+        self.port = int(port or os.getenv("ALERT_SMTP_PORT", 1025))
+        self.sender = sender or os.getenv("ALERT_SMTP_FROM", "alertas@greenbelt.local")
+        self.recipients = recipients or [r for r in os.getenv("ALERT_SMTP_TO", "").split(",") if r.strip()]
+
+    def send(self, event: Dict):
+        if not self.recipients:
+            return
+
+        message = EmailMessage()
+        message['Subject'] = f"[{event['severity']}] {event['trigger']} - {event['point_name']}"
+        message['From'] = self.sender
+        message['To'] = ", ".join(self.recipients)
+        message.set_content(format_event(event))
+
+        with smtplib.SMTP(self.host, self.port, timeout=10) as server:
+            server.send_message(message)
+
+
+class WebhookSink:
+    """POST do evento em JSON para uma URL (sem URL configurada, não faz nada)"""
+
+    def __init__(self, url: Optional[str] = None, timeout: float = 5.0):
+        self.url = url or os.getenv("ALERT_WEBHOOK_URL", "")
+        self.timeout = timeout
+
+    def send(self, event: Dict):
+        if not self.url:
+            return
+        response = requests.post(self.url, json=event, timeout=self.timeout)
+        response.raise_for_status()
+
+
+# Canais disponíveis nos planos de resposta
+SINK_LABELS = {
+    'log': "📄 Arquivo de log",
+    'email': "📧 E-mail",
+    'webhook': "🔗 Webhook"
+}
+
+
+def format_event(event: Dict) -> str:
+    """Texto legível de um evento de alerta"""
+    values = ", ".join(f"{m['value']} ({(m.get('timestamp') or '')[:16]})" for m in event['measurements'])
+    lines = [
+        f"Ponto de controle: {event['point_name']}",
+        f"Gatilho: {event['trigger']} (severidade {event['severity']})",
+        f"Medições: {values}",
+    ]
+    if event.get('rules'):
+        lines.append(f"Regras violadas: {', '.join(str(r) for r in event['rules'])}")
+    if event.get('actions'):
+        lines.append(f"Ações previstas: {event['actions']}")
+    return "\n".join(lines)
+
+
+def evaluate_alerts(project_id: str, point: Dict, measurements: List[Dict], plans: List[Dict]) -> List[Dict]:
+    """
+    Confronta medições já avaliadas com os gatilhos dos planos de resposta
+
+    Gera um evento por plano acionado, agrupando as medições do lote que o acionaram.
+    """
+    events = []
+
+    for plan in plans or []:
+        matcher = TRIGGER_MATCHERS.get(plan.get('trigger'))
+        if matcher is None:
+            continue
+
+        matched = [m for m in measurements if matcher(m, point)]
+        if not matched:
+            continue
+
+        events.append({
+            'project_id': project_id,
+            'point_id': point.get('id'),
+            'point_name': point.get('name', ''),
+            'plan_id': plan.get('id'),
+            'trigger': plan['trigger'],
+            'severity': plan.get('severity', 'Média'),
+            'actions': plan.get('actions', ''),
+            'channels': plan.get('channels') or ['log'],
+            'rules': sorted({rule for m in matched for rule in (m.get('rules') or [])}),
+            'measurements': [
+                {'value': m['value'], 'timestamp': m.get('timestamp'), 'status': m.get('status')}
+                for m in matched
+            ],
+            'created_at': datetime.now().isoformat()
+        })
+
+    return events
+
+
+class AlertDispatcher:
+    """Fila de eventos com entrega assíncrona aos canais"""
+
+    def __init__(self, sinks: Optional[Dict] = None, maxsize: int = QUEUE_MAXSIZE):
+        self.sinks = sinks if sinks is not None else {
+            'log': LogSink(),
+            'email': SMTPSink(),
+            'webhook': WebhookSink()
+        }
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.history = deque(maxlen=HISTORY_SIZE)
+        self.dropped = 0
+        self._worker = threading.Thread(target=self._run, name="alert-dispatcher", daemon=True)
+        self._worker.start()
+
+    def register_sink(self, name: str, sink):
+        """Adiciona/substitui um canal (objeto com método send(event))"""
+        self.sinks[name] = sink
+
+    def publish(self, events: List[Dict]) -> int:
+        """Enfileira eventos sem bloquear; retorna quantos foram aceitos"""
+        accepted = 0
+        for event in events:
+            try:
+                self.queue.put_nowait(event)
+                accepted += 1
+            except queue.Full:
+                self.dropped += 1
+                logger.warning("Fila de alertas cheia; evento descartado: %s", event.get('trigger'))
+        return accepted
+
+    def recent(self, project_id: Optional[str] = None, limit: int = 20) -> List[Dict]:
+        """Últimos eventos entregues (mais recentes primeiro)"""
+        events = [e for e in reversed(self.history) if project_id is None or e['project_id'] == project_id]
+        return events[:limit]
+
+    def flush(self):
+        """Aguarda a entrega dos eventos enfileirados (uso em scripts/testes)"""
+        self.queue.join()
+
+    def _run(self):
+        while True:
+            event = self.queue.get()
+            try:
+                self._deliver(event)
+            finally:
+                self.queue.task_done()
+
+    def _deliver(self, event: Dict):
+        delivery = {}
+        for channel in event.get('channels', []):
+            sink = self.sinks.get(channel)
+            if sink is None:
+                continue
+            try:
+                sink.send(event)
+                delivery[channel] = 'ok'
+            except Exception as e:
+                delivery[channel] = f"erro: {e}"
+                logger.warning("Falha ao enviar alerta via %s: %s", channel, e)
+        self.history.append(dict(event, delivery=delivery))
+
+
+_dispatcher: Optional[AlertDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher() -> AlertDispatcher:
+    """Dispatcher único por processo (compartilhado entre sessões)"""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = AlertDispatcher()
+        return _dispatcher
+
+
+def dispatch_alerts(project_id: str, point: Dict, measurements: List[Dict], plans: List[Dict]) -> List[Dict]:
+    """Avalia e enfileira os alertas das medições; retorna os eventos gerados"""
+    events = evaluate_alerts(project_id, point, measurements, plans)
+    if events:
+        get_dispatcher().publish(events)
+    return events
@@ -0,0 +1,183 @@
+"""
+Anexo do relatório em XLSX (dados brutos + tabelas das ferramentas)
+
+Uma planilha por conjunto: dados carregados, campos das ferramentas, cada
+lista de registros das ferramentas (stakeholders, ações, riscos, pontos de
+controle...) e a série de medições de cada ponto. O xlsxwriter roda em modo
+constant_memory: cada linha vai para o arquivo temporário da planilha assim
+que é escrita. Os dados são percorridos em blocos e as medições página a
+página, então exportar 500 mil linhas não cria uma cópia intermediária.
+"""
+import json
+import math
+import os
+import re
+import tempfile
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+
+try:
+    from src.utils.report_content import PHASES
+except ImportError:
+    from utils.report_content import PHASES
+
+
+XLSX_MIME = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Linhas convertidas por vez a partir do DataFrame
+CHUNK_ROWS = 5000
+
+# Medições lidas por página do armazenamento
+MEASUREMENT_PAGE = 1000
+
+# Limite de linhas de uma planilha do Excel (com cabeçalho)
+MAX_SHEET_ROWS = 1_048_576
+
+MEASUREMENT_COLUMNS = ['timestamp', 'value', 'operator', 'notes', 'key']
+
+
+def _sheet_name(name: str, used: Set[str]) -> str:
+    """Nome válido (até 31 caracteres, sem []:*?/\\) e único no arquivo"""
+    base = re.sub(r'[\[\]:*?/\\]', '-', name).strip() or "Planilha"
+    candidate, suffix = base[:31], 2
+    while candidate.lower() in used:
+        tag = f" ({suffix})"
+        candidate, suffix = base[:31 - len(tag)] + tag, suffix + 1
+    used.add(candidate.lower())
+    return candidate
+
+
+def _cell(value):
+    if isinstance(value, float) and not math.isfinite(value):
+        return None  # write_number não aceita NaN/inf
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    return value
+
+
+def _write_sheet(workbook, name: str, columns: List[str], rows: Iterable[Tuple], used: Set[str],
+                 header_format) -> int:
+    """Escreve as linhas em ordem (exigência do constant_memory); continua em nova planilha no limite"""
+    sheet, sheet_row, written = None, MAX_SHEET_ROWS, 0
+    for row in rows:
+        if sheet_row >= MAX_SHEET_ROWS:
+            sheet = workbook.add_worksheet(_sheet_name(name, used))
+            sheet.write_row(0, 0, columns, header_format)
+            sheet.freeze_panes(1, 0)
+            sheet_row = 1
+        sheet.write_row(sheet_row, 0, row)
+        sheet_row += 1
+        written += 1
+    if sheet is None:
+        sheet = workbook.add_worksheet(_sheet_name(name, used))
+        sheet.write_row(0, 0, columns, header_format)
+    return written
+
+
+def _frame_rows(data: pd.DataFrame) -> Iterator[Tuple]:
+    """Linhas do DataFrame bloco a bloco, com NaN/NaT e ±inf como célula vazia"""
+    for start in range(0, len(data), CHUNK_ROWS):
+        chunk = data.iloc[start:start + CHUNK_ROWS].replace([np.inf, -np.inf], np.nan)
+        chunk = chunk.astype(object).where(chunk.notna(), None)
+        yield from chunk.itertuples(index=False, name=None)
+
+
+def tool_tables(project: Dict) -> Tuple[List[Tuple], List[Tuple[str, List[str], List[Tuple]]]]:
+    """
+    Separa os dados das ferramentas em campos simples e tabelas
+
+    Returns:
+        (linhas Fase/Ferramenta/Campo/Valor, [(nome, colunas, linhas)] para
+         cada lista de registros)
+    """
+    fields, tables = [], []
+    for phase in PHASES:
+        for tool, content in project.get(phase, {}).items():
+            data = content.get('data') if isinstance(content, dict) else None
+            if isinstance(data, list):
+                data = {tool: data}
+            if not isinstance(data, dict):
+                continue
+            for field, value in data.items():
+                if isinstance(value, list) and value and all(isinstance(item, dict) for item in value):
+                    columns = list(dict.fromkeys(key for item in value for key in item))
+                    rows = [tuple(_cell(item.get(c)) for c in columns) for item in value]
+                    title = tool if field == tool else f"{tool} - {field}"
+                    tables.append((title.replace('_', ' ').title(), columns, rows))
+                else:
+                    fields.append((phase.title(), tool.replace('_', ' ').title(), field, _cell(value)))
+    return fields, tables
+
+
+def _measurement_rows(store, point_id: str) -> Iterator[Tuple]:
+    cursor = None
+    while True:
+        items, cursor = store.page(point_id, page_size=MEASUREMENT_PAGE, cursor=cursor, descending=False)
+        for item in items:
+            yield tuple(_cell(item.get(c)) for c in MEASUREMENT_COLUMNS)
+        if not cursor:
+            break
+
+
+def write_appendix(path: str, project: Dict, data: Optional[pd.DataFrame] = None, store=None,
+                   include_tools: bool = True) -> Dict[str, int]:
+    """
+    Grava o anexo em path
+
+    Args:
+        data: dados carregados do projeto (planilha "Dados")
+        store: MeasurementStore para as séries dos pontos de controle
+        include_tools: campos e tabelas das ferramentas
+
+    Returns:
+        linhas escritas por conjunto
+    """
+    workbook = xlsxwriter.Workbook(path, {
+        'constant_memory': True,
+        'default_date_format': 'dd/mm/yyyy hh:mm',
+        'remove_timezone': True,
+        'strings_to_formulas': False,
+        'strings_to_urls': False
+    })
+    header = workbook.add_format({'bold': True, 'bg_color': '#DDEBF7'})
+    used: Set[str] = set()
+    written: Dict[str, int] = {}
+
+    try:
+        if data is not None:
+            written['Dados'] = _write_sheet(workbook, "Dados", [str(c) for c in data.columns],
+                                            _frame_rows(data), used, header)
+
+        if include_tools:
+            fields, tables = tool_tables(project)
+            written['Ferramentas'] = _write_sheet(workbook, "Ferramentas", ['Fase', 'Ferramenta', 'Campo', 'Valor'],
+                                                  fields, used, header)
+            for title, columns, rows in tables:
+                written[title] = _write_sheet(workbook, title, columns, rows, used, header)
+
+        if store is not None:
+            control = project.get('control', {}).get('control_plan', {}).get('data') or {}
+            for point in control.get('control_points', []):
+                title = f"Medições - {point.get('name', point['id'])}"
+                written[title] = _write_sheet(workbook, title, MEASUREMENT_COLUMNS,
+                                              _measurement_rows(store, point['id']), used, header)
+    finally:
+        workbook.close()
+    return written
+
+
+def appendix_bytes(project: Dict, data: Optional[pd.DataFrame] = None, store=None,
+                   include_tools: bool = True) -> Dict:
+    """Anexo para o download_button: {'data', 'extension', 'mime', 'sheets'}"""
+    handle, path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(handle)
+    try:
+        sheets = write_appendix(path, project, data, store, include_tools)
+        with open(path, 'rb') as file:
+            content = file.read()
+    finally:
+        os.remove(path)
+    return {'data': content, 'extension': 'xlsx', 'mime': XLSX_MIME, 'figures': 0, 'sheets': sheets}
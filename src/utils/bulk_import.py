@@ -0,0 +1,191 @@
+"""
+Importação em lote de medições (CSV, XLSX ou texto colado)
+
+Usado pelos pontos de controle (Control) e pelas métricas do piloto (Improve):
+normaliza colunas de data/valor, valida e remove duplicatas por data/hora.
+"""
+from io import BytesIO, StringIO
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+import streamlit as st
+
+
+# Nomes aceitos para as colunas (comparação sem acento/maiúsculas)
+TIMESTAMP_COLUMNS = ['timestamp', 'data_hora', 'datahora', 'datetime', 'data', 'date', 'dia']
+VALUE_COLUMNS = ['valor', 'value', 'medicao', 'medição', 'resultado', 'measurement']
+
+
+def _normalize(name: str) -> str:
+    return (str(name).strip().lower()
+            .replace('ç', 'c').replace('ã', 'a').replace('á', 'a')
+            .replace('é', 'e').replace('í', 'i').replace('ó', 'o')
+            .replace(' ', '_').replace('/', '_'))
+
+
+def _find_column(columns, candidates: List[str]) -> Optional[str]:
+    normalized = {_normalize(col): col for col in columns}
+    for candidate in candidates:
+        if _normalize(candidate) in normalized:
+            return normalized[_normalize(candidate)]
+    return None
+
+
+def read_measurement_source(uploaded_file=None, pasted_text: str = '') -> pd.DataFrame:
+    """Lê o arquivo enviado ou o texto colado (separado por tab, ; ou ,)"""
+    if uploaded_file is not None:
+        if uploaded_file.name.lower().endswith(('.xlsx', '.xls')):
+            return pd.read_excel(BytesIO(uploaded_file.getvalue()))
+        return pd.read_csv(BytesIO(uploaded_file.getvalue()), sep=None, engine='python')
+
+    text = (pasted_text or '').strip()
+    if not text:
+        return pd.DataFrame()
+
+    # Texto colado do Excel vem separado por tabulação
+    sep = '\t' if '\t' in text else (';' if ';' in text else ',')
+    first_line = text.splitlines()[0]
+    has_header = any(ch.isalpha() for ch in first_line)
+    df = pd.read_csv(StringIO(text), sep=sep, header=0 if has_header else None)
+    if not has_header:
+        df.columns = ['data', 'valor'][:len(df.columns)] + [f'col_{i}' for i in range(2, len(df.columns))]
+    return df
+
+
+def validate_measurements(raw_df: pd.DataFrame, existing_timestamps=None) -> Tuple[pd.DataFrame, List[str]]:
+    """
+    Valida e normaliza as medições importadas
+
+    Args:
+        raw_df: DataFrame lido do arquivo/texto
+        existing_timestamps: Datas/horas já registradas (ISO), ignoradas na importação
+
+    Returns:
+        (DataFrame com colunas timestamp/date/value ordenado no tempo, lista de avisos)
+    """
+    messages = []
+
+    if raw_df is None or raw_df.empty:
+        return pd.DataFrame(columns=['timestamp', 'date', 'value']), ["Nenhuma linha encontrada"]
+
+    ts_col = _find_column(raw_df.columns, TIMESTAMP_COLUMNS)
+    value_col = _find_column(raw_df.columns, VALUE_COLUMNS)
+
+    if value_col is None:
+        raise ValueError(f"Coluna de valor não encontrada. Use uma de: {', '.join(VALUE_COLUMNS)}")
+    if ts_col is None:
+        raise ValueError(f"Coluna de data não encontrada. Use uma de: {', '.join(TIMESTAMP_COLUMNS)}")
+
+    values = raw_df[value_col]
+    if not pd.api.types.is_numeric_dtype(values):
+        # Aceitar decimal com vírgula (1.234,56)
+        text = values.astype(str).str.strip()
+        has_comma = text.str.contains(',', regex=False)
+        values = text.where(~has_comma, text.str.replace('.', '', regex=False).str.replace(',', '.', regex=False))
+    values = pd.to_numeric(values, errors='coerce')
+
+    timestamps = raw_df[ts_col]
+    if not pd.api.types.is_datetime64_any_dtype(timestamps):
+        text = timestamps.astype(str).str.strip()
+        # ISO (2024-03-15) primeiro; o restante no padrão brasileiro (15/03/2024)
+        is_iso = text.str.match(r'^\d{4}-\d{2}-\d{2}')
+        timestamps = pd.Series(pd.NaT, index=text.index, dtype='datetime64[ns]')
+        timestamps[is_iso] = pd.to_datetime(text[is_iso], errors='coerce', format='ISO8601')
+        timestamps[~is_iso] = pd.to_datetime(text[~is_iso], errors='coerce', dayfirst=True, format='mixed')
+
+    df = pd.DataFrame({'timestamp': timestamps, 'value': values})
+
+    invalid = df['timestamp'].isna() | df['value'].isna()
+    if invalid.any():
+        messages.append(f"{int(invalid.sum())} linha(s) com data ou valor inválido ignorada(s)")
+    df = df[~invalid]
+
+    duplicated = df.duplicated(subset='timestamp', keep='last')
+    if duplicated.any():
+        messages.append(f"{int(duplicated.sum())} linha(s) duplicada(s) no arquivo (mantida a última)")
+    df = df[~duplicated]
+
+    df = df.sort_values('timestamp', kind='stable')
+    if df['timestamp'].dt.tz is not None:
+        df['timestamp'] = df['timestamp'].dt.tz_localize(None)
+    iso = df['timestamp'].dt.strftime('%Y-%m-%dT%H:%M:%S')
+
+    result = pd.DataFrame({
+        'timestamp': iso.to_numpy(),
+        'date': df['timestamp'].dt.strftime('%Y-%m-%d').to_numpy(),
+        'value': df['value'].astype(float).to_numpy()
+    })
+
+    if existing_timestamps:
+        result, message = exclude_existing(result, existing_timestamps)
+        if message:
+            messages.append(message)
+
+    return result, messages
+
+
+def exclude_existing(df: pd.DataFrame, existing_timestamps) -> Tuple[pd.DataFrame, Optional[str]]:
+    """Remove do lote as medições cuja data/hora já está registrada"""
+    if df.empty or not existing_timestamps:
+        return df, None
+
+    existing = pd.to_datetime(pd.Series(list(existing_timestamps)), errors='coerce', format='ISO8601')
+    already = df['timestamp'].isin(set(existing.dropna().dt.strftime('%Y-%m-%dT%H:%M:%S')))
+    if not already.any():
+        return df, None
+
+    return (df[~already].reset_index(drop=True),
+            f"{int(already.sum())} medição(ões) já registrada(s) ignorada(s)")
+
+
+def render_bulk_import(key: str) -> Optional[pd.DataFrame]:
+    """Widget de importação (arquivo ou colar); retorna as linhas lidas ou None"""
+    source = st.radio(
+        "Origem dos dados:",
+        ["Arquivo (CSV/XLSX)", "Colar do Excel"],
+        horizontal=True,
+        key=f"bulk_source_{key}"
+    )
+
+    uploaded_file = None
+    pasted_text = ''
+
+    if source.startswith("Arquivo"):
+        uploaded_file = st.file_uploader(
+            "Arquivo com colunas Data e Valor",
+            type=['csv', 'xlsx'],
+            key=f"bulk_file_{key}"
+        )
+    else:
+        pasted_text = st.text_area(
+            "Cole as linhas (Data<TAB>Valor):",
+            height=150,
+            key=f"bulk_text_{key}",
+            placeholder="data\tvalor\n01/03/2024 06:00\t12,5\n01/03/2024 14:00\t12,8"
+        )
+
+    if uploaded_file is None and not pasted_text.strip():
+        return None
+
+    try:
+        return read_measurement_source(uploaded_file, pasted_text)
+    except Exception as e:
+        st.error(f"❌ Erro ao ler dados: {str(e)}")
+        return None
+
+
+def preview_import(df: pd.DataFrame, messages: List[str], extra_columns: Optional[Dict] = None):
+    """Mostra resumo e prévia da importação validada"""
+    for message in messages:
+        st.warning(f"⚠️ {message}")
+
+    if df.empty:
+        st.info("📝 Nenhuma medição nova para importar")
+        return
+
+    preview = df.copy()
+    for column, values in (extra_columns or {}).items():
+        preview[column] = values
+
+    st.success(f"✅ {len(df)} medição(ões) válida(s) de {df['date'].min()} a {df['date'].max()}")
+    st.dataframe(preview, use_container_width=True, height=250)
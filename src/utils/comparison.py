@@ -0,0 +1,250 @@
+"""
+Comparação estatística antes/depois (baseline x piloto)
+
+Todas as métricas são avaliadas em uma única chamada: as amostras são
+alinhadas em matrizes (uma linha por métrica, NaN como preenchimento) e os
+testes são calculados por linha de forma vetorizada. Os resultados ficam em
+cache pela versão dos dados de cada métrica, então apenas métricas alteradas
+são recalculadas.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+from scipy import stats
+
+
+ALPHA = 0.05
+CACHE_SIZE = 512
+
+_cache: OrderedDict = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _as_array(values) -> np.ndarray:
+    array = np.asarray(values if values is not None else [], dtype=float).ravel()
+    return array[np.isfinite(array)]
+
+
+def _pad(arrays: List[np.ndarray]) -> np.ndarray:
+    """Empilha amostras de tamanhos diferentes em matriz preenchida com NaN"""
+    width = max((len(a) for a in arrays), default=0)
+    matrix = np.full((len(arrays), max(width, 1)), np.nan)
+    for row, array in enumerate(arrays):
+        matrix[row, :len(array)] = array
+    return matrix
+
+
+def data_version(before: np.ndarray, after: np.ndarray, baseline_value: Optional[float]) -> str:
+    """Identificador da versão dos dados de uma métrica"""
+    digest = hashlib.sha1()
+    digest.update(before.tobytes())
+    digest.update(b'|')
+    digest.update(after.tobytes())
+    digest.update(repr(baseline_value).encode())
+    return digest.hexdigest()
+
+
+def _row_stats(matrix: np.ndarray):
+    n = np.sum(~np.isnan(matrix), axis=1).astype(float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.nansum(matrix, axis=1) / n
+        var = np.nansum((matrix - mean[:, None]) ** 2, axis=1) / (n - 1)
+    return n, mean, var
+
+
+def _tie_term(combined: np.ndarray) -> np.ndarray:
+    """Σ(t³ - t) dos empates de cada linha (correção da variância de Mann-Whitney)"""
+    rows, cols = combined.shape
+    ordered = np.sort(combined, axis=1)
+    valid = ~np.isnan(ordered)
+    row_ids = np.repeat(np.arange(rows), cols)[valid.ravel()]
+    values = ordered.ravel()[valid.ravel()]
+    if len(values) == 0:
+        return np.zeros(rows)
+
+    starts = np.ones(len(values), dtype=bool)
+    starts[1:] = (row_ids[1:] != row_ids[:-1]) | (values[1:] != values[:-1])
+    start_idx = np.flatnonzero(starts)
+    lengths = np.diff(np.append(start_idx, len(values))).astype(float)
+    return np.bincount(row_ids[start_idx], weights=lengths ** 3 - lengths, minlength=rows)
+
+
+def _two_sample(before: np.ndarray, after: np.ndarray) -> Dict[str, np.ndarray]:
+    """Testes de duas amostras vetorizados (linha i = métrica i)"""
+    n_b, mean_b, var_b = _row_stats(before)
+    n_a, mean_a, var_a = _row_stats(after)
+    sd_b, sd_a = np.sqrt(var_b), np.sqrt(var_a)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pooled = stats.ttest_ind_from_stats(mean_a, sd_a, n_a, mean_b, sd_b, n_b, equal_var=True)
+        welch = stats.ttest_ind_from_stats(mean_a, sd_a, n_a, mean_b, sd_b, n_b, equal_var=False)
+
+        se_welch = np.sqrt(var_a / n_a + var_b / n_b)
+        df_welch = se_welch ** 4 / ((var_a / n_a) ** 2 / (n_a - 1) + (var_b / n_b) ** 2 / (n_b - 1))
+        margin = stats.t.ppf(1 - ALPHA / 2, df_welch) * se_welch
+        diff = mean_a - mean_b
+
+        # Mann-Whitney (aproximação normal com correção de empates e de continuidade)
+        combined = np.hstack([after, before])
+        ranks = stats.rankdata(combined, axis=1, nan_policy='omit')
+        rank_sum_a = np.nansum(ranks[:, :after.shape[1]], axis=1)
+        u_a = rank_sum_a - n_a * (n_a + 1) / 2
+        n = n_a + n_b
+        sigma_u = np.sqrt(n_a * n_b / 12 * ((n + 1) - _tie_term(combined) / (n * (n - 1))))
+        z_u = (np.abs(u_a - n_a * n_b / 2) - 0.5) / sigma_u
+        p_mw = np.clip(2 * stats.norm.sf(z_u), 0, 1)
+
+        # Levene (Brown-Forsythe): t de duas amostras sobre |x - mediana|, F = t²
+        dev_a = np.abs(after - np.nanmedian(after, axis=1)[:, None])
+        dev_b = np.abs(before - np.nanmedian(before, axis=1)[:, None])
+        _, mean_da, var_da = _row_stats(dev_a)
+        _, mean_db, var_db = _row_stats(dev_b)
+        levene = stats.ttest_ind_from_stats(mean_da, np.sqrt(var_da), n_a, mean_db, np.sqrt(var_db), n_b)
+
+        # F de razão de variâncias (bilateral)
+        f_ratio = var_a / var_b
+        p_f = 2 * np.minimum(stats.f.cdf(f_ratio, n_a - 1, n_b - 1), stats.f.sf(f_ratio, n_a - 1, n_b - 1))
+
+        sd_pooled = np.sqrt(((n_a - 1) * var_a + (n_b - 1) * var_b) / (n - 2))
+        cohen_d = diff / sd_pooled
+        hedges_g = cohen_d * (1 - 3 / (4 * n - 9))
+        glass_delta = diff / sd_b
+        cles = u_a / (n_a * n_b)
+
+    return {
+        'n_before': n_b, 'n_after': n_a,
+        'mean_before': mean_b, 'mean_after': mean_a,
+        'std_before': sd_b, 'std_after': sd_a,
+        'diff': diff, 'ci_low': diff - margin, 'ci_high': diff + margin,
+        't_pooled': pooled.statistic, 'p_pooled': pooled.pvalue,
+        't_welch': welch.statistic, 'p_welch': welch.pvalue, 'df_welch': df_welch,
+        'u': u_a, 'p_mannwhitney': p_mw,
+        'levene': levene.statistic ** 2, 'p_levene': levene.pvalue,
+        'f_ratio': f_ratio, 'p_f': np.clip(p_f, 0, 1),
+        'cohen_d': cohen_d,
+        'hedges_g': hedges_g,
+        'glass_delta': glass_delta,
+        'cles': cles
+    }
+
+
+def _one_sample(after: np.ndarray, reference: np.ndarray) -> Dict[str, np.ndarray]:
+    """t de uma amostra contra o valor baseline digitado (sem amostra de referência)"""
+    n_a, mean_a, var_a = _row_stats(after)
+    sd_a = np.sqrt(var_a)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        se = sd_a / np.sqrt(n_a)
+        t_stat = (mean_a - reference) / se
+        p_value = 2 * stats.t.sf(np.abs(t_stat), n_a - 1)
+        margin = stats.t.ppf(1 - ALPHA / 2, n_a - 1) * se
+        diff = mean_a - reference
+
+    return {
+        'n_before': np.zeros(len(reference)), 'n_after': n_a,
+        'mean_before': reference, 'mean_after': mean_a,
+        'std_before': np.full(len(reference), np.nan), 'std_after': sd_a,
+        'diff': diff, 'ci_low': diff - margin, 'ci_high': diff + margin,
+        't_one_sample': t_stat, 'p_one_sample': p_value,
+        'cohen_d': diff / sd_a
+    }
+
+
+def _rows(results: Dict[str, np.ndarray], names: List[str], method: str) -> Dict[str, Dict]:
+    output = {}
+    for row, name in enumerate(names):
+        item = {'method': method}
+        for key, values in results.items():
+            value = float(values[row])
+            item[key] = value if np.isfinite(value) else None
+        output[name] = item
+    return output
+
+
+def _conclude(result: Dict) -> Dict:
+    """Conclusão principal: Welch (duas amostras) ou t de uma amostra"""
+    p_value = result.get('p_welch') if result['method'] == 'two_sample' else result.get('p_one_sample')
+    result['p_value'] = p_value
+    result['significant'] = p_value is not None and p_value < ALPHA
+    return result
+
+
+def compare_batch(items: Dict[str, Dict]) -> Dict[str, Dict]:
+    """
+    Compara antes/depois para várias métricas de uma vez
+
+    Args:
+        items: nome -> {'before': amostra baseline ou None,
+                        'after': medições do piloto,
+                        'baseline_value': valor baseline (usado sem amostra)}
+
+    Returns:
+        nome -> resultados (médias, IC da diferença, t/Welch/Mann-Whitney,
+        Levene/F e tamanhos de efeito); métricas sem dados suficientes
+        retornam {'error': ...}
+    """
+    prepared = {}
+    results = {}
+
+    for name, item in items.items():
+        before = _as_array(item.get('before'))
+        after = _as_array(item.get('after'))
+        baseline_value = item.get('baseline_value')
+
+        if len(after) < 2:
+            results[name] = {'error': "Mínimo de 2 medições do piloto"}
+            continue
+        if len(before) < 2 and baseline_value is None:
+            results[name] = {'error': "Sem dados de baseline"}
+            continue
+
+        version = data_version(before, after, None if len(before) >= 2 else baseline_value)
+        with _cache_lock:
+            cached = _cache.get(version)
+            if cached is not None:
+                _cache.move_to_end(version)
+                results[name] = dict(cached)
+                continue
+        prepared[name] = (version, before, after, baseline_value)
+
+    two_sample = [name for name, (_, before, _, _) in prepared.items() if len(before) >= 2]
+    one_sample = [name for name in prepared if name not in two_sample]
+
+    computed = {}
+    if two_sample:
+        computed.update(_rows(_two_sample(
+            _pad([prepared[name][1] for name in two_sample]),
+            _pad([prepared[name][2] for name in two_sample])
+        ), two_sample, 'two_sample'))
+    if one_sample:
+        computed.update(_rows(_one_sample(
+            _pad([prepared[name][2] for name in one_sample]),
+            np.array([float(prepared[name][3]) for name in one_sample])
+        ), one_sample, 'one_sample'))
+
+    with _cache_lock:
+        for name, result in computed.items():
+            result = _conclude(result)
+            _cache[prepared[name][0]] = result
+            results[name] = dict(result)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+    return results
+
+
+def effect_label(d: Optional[float]) -> str:
+    """Classificação de Cohen para o tamanho de efeito"""
+    if d is None:
+        return "N/A"
+    magnitude = abs(d)
+    if magnitude < 0.2:
+        return "Desprezível"
+    if magnitude < 0.5:
+        return "Pequeno"
+    if magnitude < 0.8:
+        return "Médio"
+    return "Grande"
@@ -0,0 +1,57 @@
+"""
+Correlações significativas de uma matriz de correlação
+
+Os pares do triângulo superior são filtrados de uma vez com numpy: com 500
+variáveis são ~125 mil pares, que o laço par a par com iloc levava segundos
+para percorrer.
+"""
+import numpy as np
+import pandas as pd
+
+
+# |r| acima do qual o par é listado (correlações moderadas ou fortes)
+SIGNIFICANT_THRESHOLD = 0.3
+
+# (limite inferior de |r|, rótulo), do mais forte para o mais fraco
+STRENGTH_LEVELS = [(0.8, "Muito Forte"), (0.6, "Forte"), (0.4, "Moderada"), (0.2, "Fraca")]
+
+COLUMNS = ['Variável 1', 'Variável 2', 'Correlação', 'Força', 'Direção']
+
+
+def classify_strength(abs_corr: float) -> str:
+    """Classifica a força da correlação pelo valor absoluto"""
+    for limit, label in STRENGTH_LEVELS:
+        if abs_corr >= limit:
+            return label
+    return "Muito Fraca"
+
+
+def significant_correlations(corr_matrix: pd.DataFrame, threshold: float = SIGNIFICANT_THRESHOLD) -> pd.DataFrame:
+    """
+    Pares com |r| > threshold, do mais forte para o mais fraco
+
+    Returns:
+        DataFrame com COLUMNS (vazio se nenhum par passar do limite)
+    """
+    values = corr_matrix.to_numpy(dtype=float)
+    rows, cols = np.triu_indices(len(corr_matrix.columns), k=1)
+    pairs = values[rows, cols]
+
+    mask = np.abs(pairs) > threshold  # NaN nunca passa
+    rows, cols, pairs = rows[mask], cols[mask], pairs[mask]
+    if len(pairs) == 0:
+        return pd.DataFrame(columns=COLUMNS)
+
+    order = np.argsort(-np.abs(pairs), kind='stable')
+    rows, cols, pairs = rows[order], cols[order], pairs[order]
+    absolute = np.abs(pairs)
+    names = np.asarray(corr_matrix.columns, dtype=object)
+
+    return pd.DataFrame({
+        'Variável 1': names[rows],
+        'Variável 2': names[cols],
+        'Correlação': pairs,
+        'Força': np.select([absolute >= limit for limit, _ in STRENGTH_LEVELS],
+                           [label for _, label in STRENGTH_LEVELS], "Muito Fraca"),
+        'Direção': np.where(pairs > 0, "Positiva", "Negativa")
+    })
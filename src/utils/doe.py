@@ -0,0 +1,211 @@
+"""
+Planejamento de experimentos (DOE) fatoriais de dois níveis
+
+Gera planejamentos fatoriais completos (2^k) e fracionados (2^(k-p)) com
+réplicas, pontos centrais e ordem de execução aleatória, e analisa os
+resultados: efeitos e estrutura de confundimento calculados de uma vez pela
+matriz de contrastes; significância pelo ajuste de regressão (em cache, via
+regression.fit_model) quando há graus de liberdade para o erro, ou pelo
+método de Lenth em planejamentos saturados.
+"""
+from itertools import combinations, product
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+try:
+    from src.utils.regression import RegressionError, build_formula, fit_model
+except ImportError:
+    from utils.regression import RegressionError, build_formula, fit_model
+
+
+FACTOR_LETTERS = "ABCDEFG"
+RESPONSE_COLUMN = "Resposta"
+STD_ORDER_COLUMN = "Ordem Padrão"
+RUN_ORDER_COLUMN = "Ordem de Execução"
+
+# Geradores de resolução máxima (Montgomery, tabela 8.14) por (k, p)
+DEFAULT_GENERATORS = {
+    (3, 1): ["C=AB"],
+    (4, 1): ["D=ABC"],
+    (5, 1): ["E=ABCD"],
+    (5, 2): ["D=AB", "E=AC"],
+    (6, 1): ["F=ABCDE"],
+    (6, 2): ["E=ABC", "F=BCD"],
+    (6, 3): ["D=AB", "E=AC", "F=BC"],
+    (7, 1): ["G=ABCDEF"],
+    (7, 2): ["F=ABCD", "G=ABDE"],
+    (7, 3): ["E=ABC", "F=BCD", "G=ACD"],
+    (7, 4): ["D=AB", "E=AC", "F=BC", "G=ABC"],
+}
+
+ROMAN = {3: "III", 4: "IV", 5: "V", 6: "VI", 7: "VII"}
+
+
+def defining_words(generators: List[str]) -> List[str]:
+    """Palavras da relação definidora (produtos de todos os subconjuntos de geradores)"""
+    base = [frozenset(g.replace('=', '')) for g in generators]
+    words = set()
+    for size in range(1, len(base) + 1):
+        for combo in combinations(base, size):
+            word = frozenset()
+            for letters in combo:
+                word = word.symmetric_difference(letters)
+            words.add(''.join(sorted(word)))
+    return sorted(words, key=lambda w: (len(w), w))
+
+
+def resolution(generators: List[str]) -> Optional[int]:
+    """Resolução do planejamento fracionado (None para fatorial completo)"""
+    words = defining_words(generators)
+    return min(len(w) for w in words) if words else None
+
+
+def _coded_runs(k: int, generators: List[str]) -> np.ndarray:
+    """Matriz codificada (-1/+1) em ordem padrão (primeiro fator alternando mais rápido)"""
+    base_count = k - len(generators)
+    runs = np.array(list(product([-1, 1], repeat=base_count)))[:, ::-1]
+    columns = {FACTOR_LETTERS[i]: runs[:, i] for i in range(base_count)}
+    for generator in generators:
+        letter, word = generator.split('=')
+        columns[letter] = np.prod([columns[c] for c in word], axis=0)
+    return np.column_stack([columns[FACTOR_LETTERS[i]] for i in range(k)])
+
+
+def generate_design(factors: List[Dict], fraction: int = 0, generators: Optional[List[str]] = None,
+                    replicates: int = 1, center_points: int = 0, randomize: bool = True,
+                    seed: Optional[int] = None) -> pd.DataFrame:
+    """
+    Planejamento fatorial 2^(k-p)
+
+    Args:
+        factors: [{'name', 'low', 'high'}] (até 7 fatores)
+        fraction: p (0 = fatorial completo)
+        generators: geradores (ex.: ["D=ABC"]); padrão de resolução máxima
+        replicates: réplicas de cada corrida
+        center_points: pontos centrais (apenas fatores numéricos)
+
+    Returns:
+        DataFrame com ordem padrão, ordem de execução, níveis reais e a coluna
+        Resposta vazia
+    """
+    k = len(factors)
+    if not 2 <= k <= len(FACTOR_LETTERS):
+        raise ValueError(f"Use de 2 a {len(FACTOR_LETTERS)} fatores")
+    if fraction:
+        generators = generators or DEFAULT_GENERATORS.get((k, fraction))
+        if not generators:
+            raise ValueError(f"Fração 2^({k}-{fraction}) não disponível")
+    coded = np.tile(_coded_runs(k, generators or []), (replicates, 1))
+    coded = np.vstack([coded, np.zeros((center_points, k))]) if center_points else coded
+
+    design = pd.DataFrame({STD_ORDER_COLUMN: np.arange(1, len(coded) + 1)})
+    for i, factor in enumerate(factors):
+        low, high = float(factor['low']), float(factor['high'])
+        design[factor['name']] = (low + high) / 2 + coded[:, i] * (high - low) / 2
+
+    order = np.random.default_rng(seed).permutation(len(design)) if randomize else np.arange(len(design))
+    design[RUN_ORDER_COLUMN] = np.empty(len(design), dtype=int)
+    design.loc[order, RUN_ORDER_COLUMN] = np.arange(1, len(design) + 1)
+    design[RESPONSE_COLUMN] = np.nan
+    return design.sort_values(RUN_ORDER_COLUMN).reset_index(drop=True)
+
+
+def coded_matrix(design: pd.DataFrame, factors: List[Dict]) -> pd.DataFrame:
+    """Níveis reais -> codificados (-1/+1, 0 no centro), colunas A, B, C..."""
+    coded = {}
+    for i, factor in enumerate(factors):
+        low, high = float(factor['low']), float(factor['high'])
+        coded[FACTOR_LETTERS[i]] = (design[factor['name']].astype(float) - (low + high) / 2) / ((high - low) / 2)
+    return pd.DataFrame(coded, index=design.index)
+
+
+def _lenth(effects: np.ndarray):
+    """Pseudo erro padrão de Lenth para planejamentos sem réplicas"""
+    magnitude = np.abs(effects)
+    s0 = 1.5 * np.median(magnitude)
+    pse = 1.5 * np.median(magnitude[magnitude < 2.5 * s0]) if np.any(magnitude < 2.5 * s0) else s0
+    dof = len(effects) / 3
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t_stat = effects / pse
+        return t_stat, 2 * stats.t.sf(np.abs(t_stat), dof), pse
+
+
+def analyze_design(design: pd.DataFrame, factors: List[Dict], response: str = RESPONSE_COLUMN,
+                   max_order: int = 2) -> Dict:
+    """
+    Efeitos, confundimentos e significância do experimento
+
+    Returns:
+        {'effects': [{'term', 'label', 'effect', 'coef', 'p_value', 'aliases'}],
+         'method': 'regressão' ou 'Lenth', 'r2', 'n'}
+    """
+    runs = design[design[response].notna()]
+    if len(runs) < 4:
+        raise ValueError("Informe a resposta de ao menos 4 corridas")
+
+    coded = coded_matrix(runs, factors)
+    y = runs[response].to_numpy(dtype=float)
+    letters = list(coded.columns)
+    names = {FACTOR_LETTERS[i]: f['name'] for i, f in enumerate(factors)}
+
+    candidates = [combo for size in range(1, min(len(letters), max(max_order, 3)) + 1)
+                  for combo in combinations(letters, size)]
+    contrasts = np.column_stack([coded[list(combo)].prod(axis=1).to_numpy() for combo in candidates])
+
+    # Confundimento: colunas de contraste iguais (ou opostas) nas corridas fatoriais
+    factorial = np.abs(contrasts).sum(axis=1) > 0
+    kept, aliases = [], {}
+    for j, combo in enumerate(candidates):
+        column = contrasts[factorial, j]
+        owner = next((i for i in kept if abs(column @ contrasts[factorial, i]) == len(column)), None)
+        if owner is not None:
+            aliases[owner].append(':'.join(combo))
+        elif len(combo) <= max_order:
+            kept.append(j)
+            aliases[j] = []
+
+    matrix = contrasts[:, kept]
+    weights = np.abs(matrix).sum(axis=0) / 2
+    effects = matrix.T @ y / weights
+    terms = [':'.join(candidates[j]) for j in kept]
+
+    result = {'n': int(len(runs)), 'r2': None}
+    model_data = coded.assign(y=y)
+    try:
+        model = fit_model(model_data, build_formula('y', terms))
+        coefficients = {c['name']: c for c in model['coefficients']}
+        p_values = [coefficients[term]['p_value'] for term in terms]
+        result.update(method='regressão', r2=model['r2'])
+    except RegressionError:
+        _, p_values, pse = _lenth(effects)
+        result.update(method='Lenth', pse=float(pse))
+
+    result['effects'] = [
+        {
+            'term': term,
+            'label': ' × '.join(names[letter] for letter in term.split(':')),
+            'effect': float(effects[i]),
+            'coef': float(effects[i] / 2),
+            'p_value': float(p_values[i]) if p_values[i] is not None and np.isfinite(p_values[i]) else None,
+            'aliases': [' × '.join(names[letter] for letter in alias.split(':')) for alias in aliases[kept[i]]]
+        }
+        for i, term in enumerate(terms)
+    ]
+    return result
+
+
+def main_effects(design: pd.DataFrame, factors: List[Dict], response: str = RESPONSE_COLUMN) -> pd.DataFrame:
+    """Média da resposta em cada nível de cada fator (um groupby sobre o formato longo)"""
+    names = [f['name'] for f in factors]
+    runs = design[design[response].notna()]
+    long = runs.melt(id_vars=[response], value_vars=names, var_name='Fator', value_name='Nível')
+    return long.groupby(['Fator', 'Nível'], sort=True)[response].mean().reset_index(name='Média')
+
+
+def interaction_means(design: pd.DataFrame, first: str, second: str, response: str = RESPONSE_COLUMN) -> pd.DataFrame:
+    """Média da resposta em cada combinação de níveis de dois fatores"""
+    runs = design[design[response].notna()]
+    return runs.groupby([first, second])[response].mean().reset_index(name='Média')
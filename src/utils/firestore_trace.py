@@ -0,0 +1,355 @@
+"""
+Rastreamento das operações do Firestore (leituras, gravações e bytes)
+
+initialize_firebase devolve o cliente embrulhado por trace_client: cada
+get/stream/get_all conta leituras (um documento lido = uma leitura, inclusive
+documento inexistente; agregações contam uma) e cada set/update/delete conta
+gravações, com o tamanho estimado do documento pela regra de tamanho do
+Firestore. As operações são atribuídas ao render atual (start_render /
+finish_render, chamados pelo app a cada rerun) e acumuladas por sessão;
+operações fora de um render (tarefas em segundo plano) vão para "background".
+
+Ao fim de cada render são sinalizados padrões N+1: muitas leituras
+individuais na mesma coleção, o mesmo documento lido mais de uma vez e muitas
+gravações avulsas que poderiam ir em batch. Com FIRESTORE_TRACE_DIR definido,
+o resumo da sessão é gravado em <dir>/session_<id>.json.
+
+Desative com FIRESTORE_TRACE=0.
+"""
+import json
+import os
+import threading
+from collections import Counter
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+
+ENABLED = os.getenv("FIRESTORE_TRACE", "1") != "0"
+
+# Leituras/gravações avulsas na mesma coleção, num render, a partir das quais sinalizar N+1
+N_PLUS_ONE_THRESHOLD = int(os.getenv("FIRESTORE_N_PLUS_ONE", "5"))
+
+# Alertas mantidos por sessão
+MAX_FLAGS = 50
+
+BACKGROUND = 'background'
+
+_sessions: Dict[str, Dict] = {}
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def document_size(value) -> int:
+    """Tamanho aproximado de um valor pela regra de armazenamento do Firestore"""
+    if value is None or isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float, datetime, date)):
+        return 8
+    if isinstance(value, str):
+        return len(value.encode('utf-8')) + 1
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(len(str(key).encode('utf-8')) + 1 + document_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(document_size(item) for item in value)
+    return 16
+
+
+def collection_pattern(path: str) -> str:
+    """projects/abc/control_points/p1/measurements -> projects/*/control_points/*/measurements"""
+    return "/".join(part if index % 2 == 0 else '*' for index, part in enumerate(path.split('/')))
+
+
+def _parent(path: str) -> str:
+    return collection_pattern(path.rsplit('/', 1)[0]) if '/' in path else path
+
+
+def _counters() -> Dict:
+    return {'reads': 0, 'writes': 0, 'deletes': 0, 'bytes_read': 0, 'bytes_written': 0, 'calls': 0}
+
+
+def _session(session_id: str) -> Dict:
+    session = _sessions.get(session_id)
+    if session is None:
+        session = _sessions[session_id] = dict(
+            _counters(), session=session_id, renders=0, pages={}, flags=[],
+            started_at=datetime.now().isoformat()
+        )
+    return session
+
+
+def _add(target: Dict, source: Dict):
+    for name in _counters():
+        target[name] = target.get(name, 0) + source[name]
+
+
+def _record(op: str, path: str, reads: int = 0, writes: int = 0, deletes: int = 0,
+            bytes_read: int = 0, bytes_written: int = 0, single: bool = False):
+    if not ENABLED:
+        return
+    entry = {'reads': reads, 'writes': writes, 'deletes': deletes,
+             'bytes_read': bytes_read, 'bytes_written': bytes_written, 'calls': 1}
+
+    render = getattr(_local, 'render', None)
+    if render is None:
+        with _lock:
+            _add(_session(BACKGROUND), entry)
+        return
+
+    _add(render, entry)
+    if single:
+        render['single'][(op, _parent(path))] += 1
+        if op == 'get':
+            render['documents'][path] += 1
+
+
+def start_render(session_id: str, page: str = ""):
+    """Abre a contagem do render da thread atual"""
+    if ENABLED:
+        _local.render = dict(_counters(), session=session_id, page=page,
+                             single=Counter(), documents=Counter())
+
+
+def _flags(render: Dict) -> List[Dict]:
+    flags = []
+    for (op, pattern), count in render['single'].items():
+        if count >= N_PLUS_ONE_THRESHOLD:
+            kind = "leituras" if op == 'get' else "gravações"
+            flags.append({'type': 'n_plus_one', 'op': op, 'collection': pattern, 'count': count,
+                          'message': f"N+1: {count} {kind} avulsas em {pattern}"})
+    for path, count in render['documents'].items():
+        if count > 1:
+            flags.append({'type': 'repeated_read', 'op': 'get', 'collection': _parent(path), 'count': count,
+                          'message': f"Documento {path} lido {count} vezes no mesmo render"})
+    return flags
+
+
+def finish_render() -> Optional[Dict]:
+    """
+    Fecha o render: acumula na sessão, sinaliza N+1 e grava o resumo
+
+    Returns:
+        contagem do render (com 'flags') ou None se não havia render aberto
+    """
+    render = getattr(_local, 'render', None)
+    if render is None:
+        return None
+    _local.render = None
+
+    flags = _flags(render)
+    result = {name: render[name] for name in _counters()}
+    result.update(page=render['page'], flags=flags)
+    _local.last_render = result
+
+    with _lock:
+        session = _session(render['session'])
+        _add(session, result)
+        session['renders'] += 1
+        session['updated_at'] = datetime.now().isoformat()
+        page = session['pages'].setdefault(render['page'] or '-', dict(_counters(), renders=0))
+        _add(page, result)
+        page['renders'] += 1
+        for flag in flags:
+            session['flags'].append(dict(flag, page=render['page'], at=session['updated_at']))
+        del session['flags'][:-MAX_FLAGS]
+        summary = json.loads(json.dumps(session))
+
+    directory = os.getenv("FIRESTORE_TRACE_DIR")
+    if directory:
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(directory, f"session_{render['session']}.json"), 'w', encoding='utf-8') as file:
+                json.dump(summary, file, ensure_ascii=False, indent=2)
+        except OSError:
+            pass
+    return result
+
+
+def last_render() -> Optional[Dict]:
+    """Contagem do último render fechado na thread atual"""
+    return getattr(_local, 'last_render', None)
+
+
+def session_summary(session_id: str) -> Optional[Dict]:
+    with _lock:
+        session = _sessions.get(session_id)
+        return json.loads(json.dumps(session)) if session else None
+
+
+def sessions() -> List[Dict]:
+    """Resumo de todas as sessões (e do background), da que mais leu para a que menos leu"""
+    with _lock:
+        rows = [json.loads(json.dumps(session)) for session in _sessions.values()]
+    return sorted(rows, key=lambda row: row['reads'], reverse=True)
+
+
+def reset():
+    with _lock:
+        _sessions.clear()
+
+
+def current_session_id() -> str:
+    """Id da sessão do Streamlit da thread atual ("local" fora do servidor)"""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        return ctx.session_id if ctx else "local"
+    except Exception:
+        return "local"
+
+
+def _unwrap(value):
+    return getattr(value, '_target', value)
+
+
+def _wrap(value, path: str):
+    """Consultas (inclusive de agregação) continuam rastreadas ao encadear métodos"""
+    if hasattr(value, 'stream') and not isinstance(value, (_TracedQuery, _TracedCollection)):
+        return _TracedQuery(value, path)
+    return value
+
+
+class _Traced:
+    def __init__(self, target, path: str = ""):
+        self._target = target
+        self._path = path
+
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+
+
+class _TracedQuery(_Traced):
+    """Consulta: cada documento retornado por stream/get é uma leitura"""
+
+    def __getattr__(self, name):
+        attribute = getattr(self._target, name)
+        if not callable(attribute):
+            return attribute
+
+        def call(*args, **kwargs):
+            return _wrap(attribute(*args, **kwargs), self._path)
+        return call
+
+    def _count(self, items):
+        """Registra ao terminar ou ao ser fechado (break, next(), retorno no primeiro resultado)"""
+        reads = size = 0
+        try:
+            for item in items:
+                if hasattr(item, 'to_dict'):
+                    reads += 1
+                    size += document_size(item.to_dict() or {}) + 32
+                else:
+                    reads = max(reads, 1)
+                yield item
+        finally:
+            _record('query', self._path, reads=max(reads, 1), bytes_read=size)
+
+    def stream(self, *args, **kwargs):
+        yield from self._count(self._target.stream(*args, **kwargs))
+
+    def get(self, *args, **kwargs):
+        return list(self._count(self._target.get(*args, **kwargs)))
+
+
+class _TracedCollection(_TracedQuery):
+    def document(self, document_id: Optional[str] = None):
+        reference = self._target.document(document_id) if document_id is not None else self._target.document()
+        return _TracedDocument(reference, f"{self._path}/{reference.id}")
+
+    def add(self, data: Dict, *args, **kwargs):
+        result = self._target.add(data, *args, **kwargs)
+        _record('add', self._path, writes=1, bytes_written=document_size(data), single=True)
+        return result
+
+
+class _TracedDocument(_Traced):
+    def collection(self, name: str):
+        return _TracedCollection(self._target.collection(name), f"{self._path}/{name}")
+
+    def get(self, *args, **kwargs):
+        snapshot = self._target.get(*args, **kwargs)
+        size = document_size(snapshot.to_dict() or {}) + 32 if snapshot.exists else 0
+        _record('get', self._path, reads=1, bytes_read=size, single=True)
+        return snapshot
+
+    def set(self, data: Dict, *args, **kwargs):
+        result = self._target.set(data, *args, **kwargs)
+        _record('set', self._path, writes=1, bytes_written=document_size(data), single=True)
+        return result
+
+    def update(self, fields: Dict, *args, **kwargs):
+        result = self._target.update(fields, *args, **kwargs)
+        _record('update', self._path, writes=1, bytes_written=document_size(fields), single=True)
+        return result
+
+    def delete(self, *args, **kwargs):
+        result = self._target.delete(*args, **kwargs)
+        _record('delete', self._path, deletes=1, single=True)
+        return result
+
+
+class _TracedBatch(_Traced):
+    """Gravações contadas no commit (não são avulsas para o N+1)"""
+
+    def __init__(self, target):
+        super().__init__(target)
+        self._pending = {'writes': 0, 'deletes': 0, 'bytes_written': 0}
+
+    def set(self, reference, data: Dict, *args, **kwargs):
+        self._pending['writes'] += 1
+        self._pending['bytes_written'] += document_size(data)
+        self._path = getattr(reference, '_path', self._path)
+        return self._target.set(_unwrap(reference), data, *args, **kwargs)
+
+    def update(self, reference, fields: Dict, *args, **kwargs):
+        self._pending['writes'] += 1
+        self._pending['bytes_written'] += document_size(fields)
+        self._path = getattr(reference, '_path', self._path)
+        return self._target.update(_unwrap(reference), fields, *args, **kwargs)
+
+    def delete(self, reference, *args, **kwargs):
+        self._pending['deletes'] += 1
+        self._path = getattr(reference, '_path', self._path)
+        return self._target.delete(_unwrap(reference), *args, **kwargs)
+
+    def commit(self, *args, **kwargs):
+        result = self._target.commit(*args, **kwargs)
+        _record('batch', self._path, **self._pending)
+        self._pending = {'writes': 0, 'deletes': 0, 'bytes_written': 0}
+        return result
+
+
+class TracedClient(_Traced):
+    """Cliente do Firestore com contagem de operações (o resto é repassado)"""
+
+    def collection(self, name: str):
+        return _TracedCollection(self._target.collection(name), name)
+
+    def collection_group(self, name: str):
+        return _TracedQuery(self._target.collection_group(name), f"**/{name}")
+
+    def document(self, path: str):
+        return _TracedDocument(self._target.document(path), path)
+
+    def batch(self):
+        return _TracedBatch(self._target.batch())
+
+    def get_all(self, references, *args, **kwargs):
+        references = list(references)
+        path = getattr(references[0], '_path', '') if references else ''
+        reads = size = 0
+        try:
+            for snapshot in self._target.get_all([_unwrap(ref) for ref in references], *args, **kwargs):
+                reads += 1
+                size += document_size(snapshot.to_dict() or {}) + 32 if snapshot.exists else 0
+                yield snapshot
+        finally:
+            _record('get_all', _parent(path) if path else path, reads=reads, bytes_read=size)
+
+
+def trace_client(client):
+    """Embrulha o cliente (None e clientes já embrulhados passam direto)"""
+    if not ENABLED or client is None or isinstance(client, TracedClient):
+        return client
+    return TracedClient(client)
@@ -0,0 +1,383 @@
+"""
+Testes de hipótese da fase Analyze
+
+Um fator (coluna categórica) é testado contra várias respostas de uma vez:
+médias, variâncias, medianas de desvio e postos de todas as respostas saem de
+uma única agregação groupby, e os testes (ANOVA, Kruskal-Wallis, Levene,
+Bartlett, t) são calculados de forma vetorizada sobre essa tabela, sem laços
+por par de colunas. Os resultados ficam em cache pela versão do conjunto de
+dados, então reexecutar a mesma configuração não recalcula nada.
+"""
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+
+ALPHA = 0.05
+CACHE_SIZE = 128
+
+TEST_LABELS = {
+    'anova': "ANOVA (1 fator)",
+    'anova_two_way': "ANOVA (2 fatores)",
+    'kruskal': "Kruskal-Wallis",
+    'levene': "Levene (Brown-Forsythe)",
+    'bartlett': "Bartlett",
+    't_two_sample': "t de duas amostras (Welch)",
+    't_paired': "t pareado",
+    'chi_square': "Qui-quadrado de independência"
+}
+
+_cache: OrderedDict = OrderedDict()
+_cache_lock = threading.Lock()
+
+# id(DataFrame) -> {(colunas, formato): versão}
+_versions: Dict[int, Dict[tuple, str]] = {}
+
+
+def dataset_version(df: pd.DataFrame, columns: Sequence[str]) -> str:
+    """
+    Identificador da versão dos dados das colunas usadas nos testes
+
+    O hash é memorizado por objeto DataFrame: os dados carregados na fase
+    Measure são substituídos por um novo objeto a cada upload (nunca alterados
+    no lugar), então as reexecuções da página não percorrem a base de novo.
+    """
+    key = (tuple(columns), df.shape)
+    with _cache_lock:
+        memo = _versions.get(id(df))
+        if memo is not None and key in memo:
+            return memo[key]
+
+    digest = hashlib.sha1()
+    digest.update(repr(list(columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df[list(columns)], index=False).to_numpy().tobytes())
+    version = digest.hexdigest()
+
+    with _cache_lock:
+        if id(df) not in _versions:
+            _versions[id(df)] = {}
+            weakref.finalize(df, _versions.pop, id(df), None)
+        _versions[id(df)][key] = version
+    return version
+
+
+def _value(value) -> Optional[float]:
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+
+def _row(test: str, response: str, statistic, p_value, dof, effect_size=None, **extra) -> Dict:
+    p_value = _value(p_value)
+    if not isinstance(dof, str):
+        dof = f"{round(float(dof), 2):g}" if np.isfinite(dof) else None
+    row = {
+        'test': test,
+        'response': response,
+        'statistic': _value(statistic),
+        'p_value': p_value,
+        'df': dof,
+        'effect_size': _value(effect_size) if effect_size is not None else None,
+        'significant': p_value is not None and p_value < ALPHA
+    }
+    row.update(extra)
+    return row
+
+
+def group_table(data: pd.DataFrame, factor: str, responses: List[str]) -> pd.DataFrame:
+    """
+    Agregação única por nível do fator
+
+    Colunas (tipo, resposta, estatística) com tipo em value (valores),
+    dev (|x - mediana do grupo|, para Levene) e rank (postos globais, para
+    Kruskal-Wallis) e estatística em count/mean/var.
+    """
+    values = data[responses]
+    wide = pd.concat({
+        'value': values,
+        'dev': (values - values.groupby(data[factor]).transform('median')).abs(),
+        'rank': values.rank()
+    }, axis=1)
+    return wide.groupby(data[factor], observed=True).agg(['count', 'mean', 'var'])
+
+
+def _moments(table: pd.DataFrame, kind: str, responses: List[str]):
+    """Matrizes (níveis x respostas) de contagem, média e variância"""
+    block = table[kind]
+    return tuple(
+        block.xs(stat, axis=1, level=1)[responses].to_numpy(dtype=float)
+        for stat in ('count', 'mean', 'var')
+    )
+
+
+def _oneway(n: np.ndarray, mean: np.ndarray, var: np.ndarray):
+    """F de um fator a partir das estatísticas por grupo (uma coluna por resposta)"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        total = n.sum(axis=0)
+        groups = (n > 0).sum(axis=0)
+        grand = np.nansum(n * mean, axis=0) / total
+        ss_between = np.nansum(n * (mean - grand) ** 2, axis=0)
+        ss_within = np.nansum((n - 1) * var, axis=0)
+        df_between, df_within = groups - 1, total - groups
+        f_stat = (ss_between / df_between) / (ss_within / df_within)
+        p_value = stats.f.sf(f_stat, df_between, df_within)
+        eta_squared = ss_between / (ss_between + ss_within)
+    return f_stat, p_value, df_between, df_within, eta_squared
+
+
+def _bartlett(n: np.ndarray, var: np.ndarray):
+    """Bartlett vetorizado; grupos com menos de 2 observações são ignorados"""
+    valid = n >= 2
+    n = np.where(valid, n, 0)
+    var = np.where(valid, var, np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        total, groups = n.sum(axis=0), valid.sum(axis=0)
+        pooled = np.nansum((n - 1) * var, axis=0) / (total - groups)
+        numerator = (total - groups) * np.log(pooled) - np.nansum((n - 1) * np.log(var), axis=0)
+        correction = 1 + (np.sum(np.where(valid, 1 / (n - 1), 0), axis=0) - 1 / (total - groups)) / (3 * (groups - 1))
+        statistic = numerator / correction
+        p_value = stats.chi2.sf(statistic, groups - 1)
+    return statistic, p_value, groups - 1
+
+
+def _kruskal(data: pd.DataFrame, responses: List[str], n: np.ndarray, mean_rank: np.ndarray):
+    """Kruskal-Wallis pelas somas de postos por grupo, com correção de empates"""
+    ties = (data[responses].melt(var_name='_response', value_name='_value')
+            .dropna().groupby(['_response', '_value']).size())
+    tie_term = (ties ** 3 - ties).groupby(level=0).sum().reindex(responses, fill_value=0).to_numpy(dtype=float)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        total = n.sum(axis=0)
+        groups = (n > 0).sum(axis=0)
+        rank_sums = n * mean_rank
+        h = 12 / (total * (total + 1)) * np.nansum(rank_sums ** 2 / n, axis=0) - 3 * (total + 1)
+        h = h / (1 - tie_term / (total ** 3 - total))
+        p_value = stats.chi2.sf(h, groups - 1)
+    return h, p_value, groups - 1
+
+
+def _two_sample(table: pd.DataFrame, responses: List[str], levels: Sequence):
+    """t de Welch entre dois níveis do fator (todas as respostas de uma vez)"""
+    n, mean, var = _moments(table.loc[list(levels)], 'value', responses)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        welch = stats.ttest_ind_from_stats(mean[0], np.sqrt(var[0]), n[0], mean[1], np.sqrt(var[1]), n[1],
+                                           equal_var=False)
+        se = np.sqrt(var[0] / n[0] + var[1] / n[1])
+        dof = se ** 4 / ((var[0] / n[0]) ** 2 / (n[0] - 1) + (var[1] / n[1]) ** 2 / (n[1] - 1))
+        pooled_sd = np.sqrt(((n[0] - 1) * var[0] + (n[1] - 1) * var[1]) / (n[0] + n[1] - 2))
+        cohen_d = (mean[0] - mean[1]) / pooled_sd
+    return welch.statistic, welch.pvalue, dof, cohen_d
+
+
+def _paired(data: pd.DataFrame, reference: str, responses: List[str]):
+    """t pareado de cada resposta contra a coluna de referência (mesma linha = mesmo item)"""
+    differences = data[responses].sub(data[reference], axis=0)
+    n = differences.count().to_numpy(dtype=float)
+    mean = differences.mean().to_numpy(dtype=float)
+    sd = differences.std().to_numpy(dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t_stat = mean / (sd / np.sqrt(n))
+        p_value = 2 * stats.t.sf(np.abs(t_stat), n - 1)
+    return t_stat, p_value, n - 1, mean / sd
+
+
+def _rss(design: np.ndarray, y: np.ndarray):
+    """Soma de quadrados dos resíduos para várias respostas (mínimos quadrados com múltiplos lados direitos)"""
+    coef, _, rank, _ = np.linalg.lstsq(design, y, rcond=None)
+    residuals = y - design @ coef
+    return np.sum(residuals ** 2, axis=0), rank
+
+
+def _two_way(data: pd.DataFrame, factor: str, second_factor: str, responses: List[str]) -> List[Dict]:
+    """
+    ANOVA de dois fatores com somas de quadrados Tipo II
+
+    Os modelos aninhados são ajustados uma vez para todas as respostas com o
+    mesmo padrão de valores ausentes. Sem réplicas por célula, a interação não
+    é estimável e o erro vem do modelo aditivo.
+    """
+    data = data.dropna(subset=[factor, second_factor])
+    dummies_a = pd.get_dummies(data[factor].astype(str), drop_first=True, dtype=float).to_numpy()
+    dummies_b = pd.get_dummies(data[second_factor].astype(str), drop_first=True, dtype=float).to_numpy()
+    interaction = (dummies_a[:, :, None] * dummies_b[:, None, :]).reshape(len(data), -1)
+    intercept = np.ones((len(data), 1))
+
+    patterns: Dict[bytes, List[str]] = {}
+    for response in responses:
+        patterns.setdefault(data[response].notna().to_numpy().tobytes(), []).append(response)
+
+    rows = []
+    for columns in patterns.values():
+        mask = data[columns[0]].notna().to_numpy()
+        y = data.loc[mask, columns].to_numpy(dtype=float)
+        a, b, ab = dummies_a[mask], dummies_b[mask], interaction[mask]
+        one = intercept[mask]
+
+        rss_a, rank_a = _rss(np.hstack([one, a]), y)
+        rss_b, rank_b = _rss(np.hstack([one, b]), y)
+        rss_additive, rank_additive = _rss(np.hstack([one, a, b]), y)
+        rss_full, rank_full = _rss(np.hstack([one, a, b, ab]), y)
+
+        df_error = len(y) - rank_full
+        with_interaction = df_error > 0 and rank_full > rank_additive
+        if not with_interaction:
+            rss_full, rank_full, df_error = rss_additive, rank_additive, len(y) - rank_additive
+
+        effects = [
+            (factor, rss_b - rss_additive, rank_additive - rank_b),
+            (second_factor, rss_a - rss_additive, rank_additive - rank_a)
+        ]
+        if with_interaction:
+            effects.append((f"{factor} × {second_factor}", rss_additive - rss_full, rank_full - rank_additive))
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mse = rss_full / df_error
+            for effect, ss, dof in effects:
+                f_stat = (ss / dof) / mse
+                p_value = stats.f.sf(f_stat, dof, df_error)
+                partial_eta = ss / (ss + rss_full)
+                for i, response in enumerate(columns):
+                    rows.append(_row('anova_two_way', response, f_stat[i], p_value[i],
+                                     f"{dof}, {df_error}", partial_eta[i], effect=effect))
+    return rows
+
+
+def _chi_square(data: pd.DataFrame, factor: str, categorical: List[str]) -> List[Dict]:
+    """Qui-quadrado de independência fator × cada coluna categórica (contagens em um groupby)"""
+    counts = (data[[factor] + categorical].astype({c: str for c in categorical})
+              .melt(id_vars=factor, var_name='_response', value_name='_value')
+              .dropna().groupby(['_response', factor, '_value'], observed=True).size())
+
+    rows = []
+    for column in categorical:
+        if column not in counts.index.get_level_values(0):
+            continue
+        table = counts.loc[column].unstack(fill_value=0).to_numpy()
+        if min(table.shape) < 2:
+            continue
+        chi2, p_value, dof, _ = stats.chi2_contingency(table)
+        cramers_v = np.sqrt(chi2 / (table.sum() * (min(table.shape) - 1)))
+        rows.append(_row('chi_square', column, chi2, p_value, dof, cramers_v))
+    return rows
+
+
+def _run(data: pd.DataFrame, factor: str, responses: List[str], second_factor: Optional[str],
+         categorical: List[str], paired_reference: Optional[str], levels: Optional[Sequence]) -> Dict[str, List[Dict]]:
+    results: Dict[str, List[Dict]] = {}
+    data = data[data[factor].notna()]
+
+    if responses:
+        table = group_table(data, factor, responses)
+        n, mean, var = _moments(table, 'value', responses)
+
+        f_stat, p_value, df_between, df_within, eta = _oneway(n, mean, var)
+        results['anova'] = [
+            _row('anova', r, f_stat[i], p_value[i], f"{df_between[i]:.0f}, {df_within[i]:.0f}", eta[i])
+            for i, r in enumerate(responses)
+        ]
+
+        n_dev, mean_dev, var_dev = _moments(table, 'dev', responses)
+        f_stat, p_value, df_between, df_within, _ = _oneway(n_dev, mean_dev, var_dev)
+        results['levene'] = [
+            _row('levene', r, f_stat[i], p_value[i], f"{df_between[i]:.0f}, {df_within[i]:.0f}")
+            for i, r in enumerate(responses)
+        ]
+
+        statistic, p_value, dof = _bartlett(n, var)
+        results['bartlett'] = [_row('bartlett', r, statistic[i], p_value[i], dof[i]) for i, r in enumerate(responses)]
+
+        n_rank, mean_rank, _ = _moments(table, 'rank', responses)
+        statistic, p_value, dof = _kruskal(data, responses, n_rank, mean_rank)
+        results['kruskal'] = [_row('kruskal', r, statistic[i], p_value[i], dof[i]) for i, r in enumerate(responses)]
+
+        if levels is None and len(table) == 2:
+            levels = list(table.index)
+        if levels is not None and len(levels) == 2 and all(level in table.index for level in levels):
+            t_stat, p_value, dof, cohen_d = _two_sample(table, responses, levels)
+            comparison = f"{levels[0]} vs {levels[1]}"
+            results['t_two_sample'] = [
+                _row('t_two_sample', r, t_stat[i], p_value[i], dof[i], cohen_d[i], effect=comparison)
+                for i, r in enumerate(responses)
+            ]
+
+        if second_factor:
+            results['anova_two_way'] = _two_way(data, factor, second_factor, responses)
+
+        paired = [r for r in responses if r != paired_reference]
+        if paired_reference and paired:
+            t_stat, p_value, dof, dz = _paired(data, paired_reference, paired)
+            results['t_paired'] = [
+                _row('t_paired', r, t_stat[i], p_value[i], dof[i], dz[i], effect=f"{r} - {paired_reference}")
+                for i, r in enumerate(paired)
+            ]
+
+    if categorical:
+        results['chi_square'] = _chi_square(data, factor, categorical)
+
+    return results
+
+
+def run_hypothesis_tests(df: pd.DataFrame, factor: str, responses: List[str],
+                         second_factor: Optional[str] = None, categorical: Optional[List[str]] = None,
+                         paired_reference: Optional[str] = None,
+                         levels: Optional[Sequence] = None) -> Dict[str, List[Dict]]:
+    """
+    Executa a bateria de testes do fator contra as respostas
+
+    Args:
+        df: dados carregados na fase Measure
+        factor: coluna categórica que define os grupos
+        responses: colunas numéricas testadas (ANOVA, Kruskal-Wallis,
+            Levene, Bartlett e, com dois níveis, t de Welch)
+        second_factor: segundo fator para a ANOVA de dois fatores
+        categorical: colunas categóricas para o qui-quadrado de independência
+        paired_reference: coluna de referência do t pareado
+        levels: dois níveis do fator para o t de duas amostras (obrigatório
+            quando o fator tem mais de dois níveis)
+
+    Returns:
+        teste -> lista de linhas {test, response, statistic, p_value, df,
+        effect_size, significant}
+    """
+    categorical = [c for c in (categorical or []) if c != factor]
+    columns = [factor] + list(responses) + categorical
+    columns += [c for c in (second_factor, paired_reference) if c and c not in columns]
+
+    key = (dataset_version(df, columns), factor, tuple(responses), second_factor, tuple(categorical),
+           paired_reference, tuple(levels) if levels else None)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            return cached
+
+    results = _run(df, factor, list(responses), second_factor, categorical, paired_reference, levels)
+
+    with _cache_lock:
+        _cache[key] = results
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return results
+
+
+def results_frame(results: Dict[str, List[Dict]]) -> pd.DataFrame:
+    """Tabela única para exibição (uma linha por teste x resposta x efeito)"""
+    rows = []
+    for test, items in results.items():
+        for item in items:
+            rows.append({
+                'Teste': TEST_LABELS.get(test, test),
+                'Resposta': item['response'],
+                'Efeito': item.get('effect', ''),
+                'Estatística': item['statistic'],
+                'GL': item['df'],
+                'p-valor': item['p_value'],
+                'Tamanho do efeito': item['effect_size'],
+                'Significativo': "✅ Sim" if item['significant'] else "❌ Não"
+            })
+    return pd.DataFrame(rows)
@@ -0,0 +1,220 @@
+"""
+Ingestão de medições sem interface (sistemas de chão de fábrica)
+
+Aplica às medições recebidas em lote a mesma lógica do ControlPlanTool:
+status pelos limites de especificação + regras de Nelson (SPCMonitor),
+gravação na série temporal do ponto e disparo dos planos de resposta.
+Inclui chaves de idempotência e controle de carga (backpressure).
+"""
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+try:
+    from src.utils.spc import measurement_statuses, monitor_for_point
+    from src.utils.measurement_store import MeasurementStore, POINT_FIELDS
+    from src.utils.alerting import dispatch_alerts
+except ImportError:
+    from utils.spc import measurement_statuses, monitor_for_point
+    from utils.measurement_store import MeasurementStore, POINT_FIELDS
+    from utils.alerting import dispatch_alerts
+
+
+MAX_BATCH_SIZE = 500
+MAX_INFLIGHT = 8
+IDEMPOTENCY_TTL = 24 * 3600
+IDEMPOTENCY_CACHE_SIZE = 10000
+
+# Histórico usado para ajustar a carta quando o ponto ainda não tem estado SPC
+HISTORY_WINDOW = 500
+
+
+class IngestionError(Exception):
+    """Erro de ingestão com o status HTTP correspondente"""
+
+    def __init__(self, message: str, status: int = 400, retry_after: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+def _idempotent_key(timestamp: str, idempotency_key: str, index: int) -> str:
+    """Chave ordenável determinística: reenvios do mesmo lote regravam os mesmos documentos"""
+    digest = hashlib.sha1(f"{idempotency_key}:{index}".encode()).hexdigest()[:6]
+    return f"{datetime.fromisoformat(timestamp).strftime('%Y%m%dT%H%M%S%f')}_{digest}"
+
+
+def parse_measurements(payload: Dict, max_batch: int = MAX_BATCH_SIZE) -> List[Dict]:
+    """Valida o corpo {"measurements": [{"value": ..., "timestamp": ...}]}"""
+    items = payload.get('measurements') if isinstance(payload, dict) else None
+    if not isinstance(items, list) or not items:
+        raise IngestionError("Corpo deve conter a lista 'measurements'")
+    if len(items) > max_batch:
+        raise IngestionError(f"Lote com {len(items)} medições excede o máximo de {max_batch}", status=413)
+
+    now = datetime.now().isoformat()
+    measurements = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            raise IngestionError(f"Medição {index}: objeto esperado")
+        try:
+            value = float(item['value'])
+        except (KeyError, TypeError, ValueError):
+            raise IngestionError(f"Medição {index}: 'value' numérico obrigatório")
+        if not math.isfinite(value):
+            raise IngestionError(f"Medição {index}: valor não finito")
+
+        timestamp = item.get('timestamp') or now
+        try:
+            moment = datetime.fromisoformat(str(timestamp))
+        except ValueError:
+            raise IngestionError(f"Medição {index}: 'timestamp' deve estar em ISO 8601")
+        if moment.tzinfo is not None:
+            # Converter para a hora local do servidor (o app grava horários locais sem fuso)
+            moment = moment.astimezone().replace(tzinfo=None)
+
+        measurements.append({'value': value, 'timestamp': moment.isoformat(), 'date': moment.date().isoformat()})
+
+    # Ordem cronológica para a carta de controle
+    return sorted(measurements, key=lambda m: m['timestamp'])
+
+
+class IngestionService:
+    """Recebe lotes de medições por ponto de controle"""
+
+    def __init__(self, backend, plans_loader: Optional[Callable[[str, Dict], List[Dict]]] = None,
+                 max_batch: int = MAX_BATCH_SIZE, max_inflight: int = MAX_INFLIGHT):
+        self.backend = backend
+        self.plans_loader = plans_loader or (lambda project_id, point: point.get('response_plans') or [])
+        self.max_batch = max_batch
+        self.slots = threading.BoundedSemaphore(max_inflight)
+        self.point_locks: Dict[tuple, threading.Lock] = {}
+        self.locks_guard = threading.Lock()
+        self.responses: OrderedDict = OrderedDict()
+        self.responses_guard = threading.Lock()
+
+    def _point_lock(self, project_id: str, point_id: str) -> threading.Lock:
+        with self.locks_guard:
+            return self.point_locks.setdefault((project_id, point_id), threading.Lock())
+
+    def _cached_response(self, cache_key: tuple) -> Optional[Dict]:
+        with self.responses_guard:
+            cached = self.responses.get(cache_key)
+            if cached and time.time() - cached[0] < IDEMPOTENCY_TTL:
+                return dict(cached[1], replayed=True)
+            return None
+
+    def _remember(self, cache_key: tuple, response: Dict):
+        with self.responses_guard:
+            self.responses[cache_key] = (time.time(), response)
+            while len(self.responses) > IDEMPOTENCY_CACHE_SIZE:
+                self.responses.popitem(last=False)
+
+    def register_point(self, project_id: str, point_id: str, fields: Dict) -> Dict:
+        """Cadastra/atualiza a configuração de um ponto (limites, carta, planos de resposta)"""
+        allowed = {key: fields[key] for key in POINT_FIELDS + ['response_plans'] if key in fields}
+        if not allowed.get('name'):
+            raise IngestionError("Campo 'name' obrigatório")
+        allowed.update({'project_id': project_id, 'point_id': point_id, 'updated_at': datetime.now().isoformat()})
+        self.backend.set_point(project_id, point_id, allowed)
+        return self.backend.get_point(project_id, point_id)
+
+    def ingest(self, project_id: str, point_id: str, payload: Dict,
+               idempotency_key: Optional[str] = None) -> Dict:
+        """
+        Valida, avalia (status + regras) e grava um lote de medições
+
+        Raises:
+            IngestionError: 400/413 para lote inválido, 404 para ponto inexistente,
+                429 quando a capacidade de processamento está esgotada
+        """
+        cache_key = (project_id, point_id, idempotency_key)
+        if idempotency_key:
+            cached = self._cached_response(cache_key)
+            if cached:
+                return cached
+
+        measurements = parse_measurements(payload, self.max_batch)
+
+        # Backpressure: recusar em vez de enfileirar quando todos os slots estão ocupados
+        if not self.slots.acquire(blocking=False):
+            raise IngestionError("Servidor ocupado, tente novamente", status=429, retry_after=1)
+
+        try:
+            with self._point_lock(project_id, point_id):
+                # Reenvio concorrente do mesmo lote pode ter terminado enquanto aguardava
+                if idempotency_key:
+                    cached = self._cached_response(cache_key)
+                    if cached:
+                        return cached
+
+                response = self._process(project_id, point_id, measurements, idempotency_key)
+
+                if idempotency_key:
+                    self._remember(cache_key, response)
+                return response
+        finally:
+            self.slots.release()
+
+    def _process(self, project_id: str, point_id: str, measurements: List[Dict],
+                 idempotency_key: Optional[str]) -> Dict:
+        point = self.backend.get_point(project_id, point_id)
+        if not point:
+            raise IngestionError(f"Ponto de controle '{point_id}' não encontrado", status=404)
+        point['id'] = point_id
+
+        store = MeasurementStore(project_id, user_uid=point.get('user_uid'), backend=self.backend)
+
+        duplicates = 0
+        if idempotency_key:
+            for index, measurement in enumerate(measurements):
+                measurement['key'] = _idempotent_key(measurement['timestamp'], idempotency_key, index)
+
+            # Reenvio após reinício do serviço: ignorar o que já foi gravado
+            keys = [m['key'] for m in measurements]
+            existing = {m['key'] for m in self.backend.query(project_id, point_id, min(keys), max(keys))}
+            duplicates = len(existing.intersection(keys))
+            measurements = [m for m in measurements if m['key'] not in existing]
+
+        stored = []
+        if measurements:
+            monitor = monitor_for_point(point, lambda: [m['value'] for m in store.recent(point_id, HISTORY_WINDOW)])
+            values = [m['value'] for m in measurements]
+            rule_lists = monitor.append_many(values)
+            statuses = measurement_statuses(values, point, rule_lists)
+
+            for measurement, status, rules in zip(measurements, statuses, rule_lists):
+                measurement['status'] = str(status)
+                measurement['rules'] = rules
+                measurement['source'] = 'api'
+
+            point['spc_state'] = monitor.to_state()
+            stored = store.append_many(point, measurements)
+
+        events = dispatch_alerts(project_id, point, stored, self.plans_loader(project_id, point)) if stored else []
+
+        return {
+            'accepted': len(stored),
+            'duplicates': duplicates,
+            'alerts': len(events),
+            'measurements': [
+                {'id': m['id'], 'timestamp': m['timestamp'], 'value': m['value'],
+                 'status': m['status'], 'rules': m['rules']}
+                for m in stored
+            ],
+            'summary': point.get('summary')
+        }
+
+
+def firestore_plans_loader(db) -> Callable[[str, Dict], List[Dict]]:
+    """Planos de resposta lidos do plano de controle salvo no documento do projeto"""
+    def load(project_id: str, point: Dict) -> List[Dict]:
+        doc = db.collection('projects').document(project_id).get()
+        data = doc.to_dict() if doc.exists else {}
+        control_plan = ((data.get('control') or {}).get('control_plan') or {}).get('data') or {}
+        return control_plan.get('response_plans') or []
+    return load
@@ -0,0 +1,248 @@
+"""
+Fila local de tarefas em segundo plano (relatórios e análises demoradas)
+
+As tarefas rodam num pool de threads do processo do servidor, fora do script
+do Streamlit: a sessão continua responsiva e um rerun não reinicia o
+trabalho, apenas consulta o estado. A tabela de tarefas e o cache de
+resultados ficam num arquivo SQLite. O cache é indexado por uma chave que
+inclui o updated_at do projeto, então pedir de novo o mesmo relatório de um
+projeto sem alterações devolve o resultado pronto.
+
+Cancelamento: tarefas na fila são descartadas; tarefas em execução param no
+próximo ponto de verificação (JobContext.update).
+"""
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+
+DEFAULT_WORKERS = 2
+
+# Resultados mantidos no cache (os mais antigos são descartados): quantidade e bytes
+RESULT_CACHE_SIZE = 500
+RESULT_CACHE_BYTES = int(os.getenv("JOB_RESULT_CACHE_MB", "512")) * 1024 * 1024
+
+STATUS_LABELS = {
+    'queued': "⏳ Na fila",
+    'running': "🔄 Em execução",
+    'done': "✅ Concluída",
+    'failed': "❌ Falhou",
+    'cancelled': "⛔ Cancelada"
+}
+
+FINISHED = ('done', 'failed', 'cancelled')
+
+_COLUMNS = ['id', 'kind', 'label', 'owner', 'cache_key', 'status', 'progress', 'message',
+            'error', 'cached', 'created_at', 'started_at', 'finished_at']
+
+
+class JobCancelled(Exception):
+    """Interrompe uma tarefa cujo cancelamento foi pedido"""
+
+
+def cache_key(kind: str, project: Dict, params: Optional[Dict] = None) -> str:
+    """Chave do cache: tipo + projeto + updated_at + hash dos parâmetros"""
+    digest = hashlib.sha1(json.dumps(params or {}, sort_keys=True, default=str).encode()).hexdigest()[:16]
+    return f"{kind}:{project.get('id')}:{project.get('updated_at', '')}:{digest}"
+
+
+class JobContext:
+    """Passado à função da tarefa para reportar progresso e verificar cancelamento"""
+
+    def __init__(self, queue: 'JobQueue', job_id: str):
+        self.queue = queue
+        self.job_id = job_id
+
+    @property
+    def cancelled(self) -> bool:
+        return self.job_id in self.queue._cancel_requests
+
+    def update(self, progress: float, message: str = ""):
+        """
+        Registra o progresso (0 a 1)
+
+        Raises:
+            JobCancelled: o cancelamento foi pedido
+        """
+        if self.cancelled:
+            raise JobCancelled()
+        self.queue._set(self.job_id, progress=float(min(max(progress, 0.0), 1.0)), message=message)
+
+
+class JobQueue:
+    """Pool de threads + tabela de tarefas e cache de resultados em SQLite"""
+
+    def __init__(self, path: Optional[str] = None, workers: int = DEFAULT_WORKERS):
+        self.path = path or os.getenv("JOB_QUEUE_DB", "report_jobs.db")
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._futures: Dict[str, Any] = {}
+        self._cancel_requests = set()
+
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, kind TEXT, label TEXT, owner TEXT, cache_key TEXT, status TEXT, "
+                "progress REAL, message TEXT, error TEXT, cached INTEGER, "
+                "created_at TEXT, started_at TEXT, finished_at TEXT)"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS jobs_owner ON jobs (owner, created_at)")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS results (cache_key TEXT PRIMARY KEY, data BLOB, created_at TEXT)"
+            )
+            # Tarefas de um processo anterior não podem ser retomadas (a função não é persistida)
+            self.conn.execute(
+                "UPDATE jobs SET status='failed', error='Interrompida pela reinicialização do servidor', "
+                "finished_at=? WHERE status IN ('queued', 'running')",
+                (datetime.now().isoformat(),)
+            )
+
+    def _set(self, job_id: str, **fields):
+        assignments = ", ".join(f"{name}=?" for name in fields)
+        with self.lock, self.conn:
+            self.conn.execute(f"UPDATE jobs SET {assignments} WHERE id=?", (*fields.values(), job_id))
+
+    def _insert(self, job: Dict):
+        with self.lock, self.conn:
+            self.conn.execute(
+                f"INSERT INTO jobs ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                [job.get(c) for c in _COLUMNS]
+            )
+
+    def cached_result(self, key: str) -> Optional[Any]:
+        with self.lock:
+            row = self.conn.execute("SELECT data FROM results WHERE cache_key=?", (key,)).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def has_result(self, key: str) -> bool:
+        with self.lock:
+            return self.conn.execute("SELECT 1 FROM results WHERE cache_key=?", (key,)).fetchone() is not None
+
+    def store_result(self, key: str, result: Any):
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+                              (key, pickle.dumps(result), datetime.now().isoformat()))
+            self.conn.execute(
+                "DELETE FROM results WHERE cache_key NOT IN "
+                "(SELECT cache_key FROM results ORDER BY created_at DESC LIMIT ?)",
+                (RESULT_CACHE_SIZE,)
+            )
+            # Total acumulado do mais novo para o mais antigo; o resultado recém-gravado sempre fica
+            self.conn.execute(
+                "DELETE FROM results WHERE cache_key != ? AND cache_key IN (SELECT cache_key FROM "
+                "(SELECT cache_key, SUM(LENGTH(data)) OVER (ORDER BY created_at DESC, rowid DESC) AS total "
+                "FROM results) WHERE total > ?)",
+                (key, RESULT_CACHE_BYTES)
+            )
+
+    def submit(self, kind: str, fn: Callable, *args, label: str = "", owner: str = "",
+               key: Optional[str] = None, **kwargs) -> str:
+        """
+        Enfileira fn(context, *args, **kwargs)
+
+        Com key: devolve na hora uma tarefa concluída se o resultado já está
+        no cache, ou a tarefa ativa com a mesma chave (reruns não duplicam).
+
+        Returns:
+            id da tarefa
+        """
+        if key:
+            with self.lock:
+                active = self.conn.execute(
+                    "SELECT id FROM jobs WHERE cache_key=? AND status IN ('queued', 'running') "
+                    "ORDER BY created_at DESC LIMIT 1", (key,)
+                ).fetchone()
+            if active:
+                return active[0]
+
+        now = datetime.now().isoformat()
+        job = {'id': uuid.uuid4().hex, 'kind': kind, 'label': label or kind, 'owner': owner,
+               'cache_key': key, 'status': 'queued', 'progress': 0.0, 'message': '',
+               'cached': 0, 'created_at': now}
+
+        if key and self.has_result(key):
+            job.update(status='done', progress=1.0, cached=1, message="Resultado do cache",
+                       started_at=now, finished_at=now)
+            self._insert(job)
+            return job['id']
+
+        self._insert(job)
+        self._futures[job['id']] = self.executor.submit(self._run, job['id'], key, fn, args, kwargs)
+        return job['id']
+
+    def _run(self, job_id: str, key: Optional[str], fn: Callable, args, kwargs):
+        try:
+            # Cancelada depois que a thread pegou a tarefa, mas antes de começar
+            if job_id in self._cancel_requests:
+                raise JobCancelled()
+            self._set(job_id, status='running', started_at=datetime.now().isoformat())
+            result = fn(JobContext(self, job_id), *args, **kwargs)
+            if key:
+                self.store_result(key, result)
+            else:
+                self.store_result(f"job:{job_id}", result)
+            self._set(job_id, status='done', progress=1.0, finished_at=datetime.now().isoformat())
+        except JobCancelled:
+            self._set(job_id, status='cancelled', finished_at=datetime.now().isoformat())
+        except Exception as e:
+            self._set(job_id, status='failed', error=str(e), finished_at=datetime.now().isoformat())
+        finally:
+            self._cancel_requests.discard(job_id)
+            self._futures.pop(job_id, None)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self.lock:
+            row = self.conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE id=?", (job_id,)).fetchone()
+        return dict(zip(_COLUMNS, row)) if row else None
+
+    def list_jobs(self, owner: Optional[str] = None, limit: int = 20) -> List[Dict]:
+        sql = f"SELECT {', '.join(_COLUMNS)} FROM jobs"
+        params: List = []
+        if owner is not None:
+            sql += " WHERE owner=?"
+            params.append(owner)
+        sql += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with self.lock:
+            return [dict(zip(_COLUMNS, row)) for row in self.conn.execute(sql, params)]
+
+    def result(self, job_id: str) -> Optional[Any]:
+        """Resultado de uma tarefa concluída (None se ainda não terminou ou falhou)"""
+        job = self.get(job_id)
+        if not job or job['status'] != 'done':
+            return None
+        return self.cached_result(job['cache_key'] or f"job:{job_id}")
+
+    def cancel(self, job_id: str) -> bool:
+        """Pede o cancelamento; False se a tarefa já terminou"""
+        job = self.get(job_id)
+        if not job or job['status'] in FINISHED:
+            return False
+        self._cancel_requests.add(job_id)
+        future = self._futures.get(job_id)
+        if future is not None and future.cancel():
+            self._cancel_requests.discard(job_id)
+            self._futures.pop(job_id, None)
+            self._set(job_id, status='cancelled', finished_at=datetime.now().isoformat())
+        return True
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Fila compartilhada pelo processo (todas as sessões do Streamlit)"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+        return _queue
@@ -0,0 +1,105 @@
+"""
+Registro de páginas e ferramentas com importação sob demanda
+
+Os módulos de página e das fases DMAIC (alguns com milhares de linhas e que
+trazem scipy, sklearn e plotly.subplots) só são importados na primeira
+navegação até eles; depois ficam em cache (sys.modules). Cada primeira
+importação é cronometrada, com o número de módulos novos que ela carregou,
+para acompanhar o custo de cold start.
+"""
+import importlib
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Set, Tuple
+
+try:
+    from src.utils.profiler import profiled
+except ImportError:
+    from utils.profiler import profiled
+
+# Página -> (módulo, função)
+PAGES: Dict[str, Tuple[str, str]] = {
+    'dashboard': ('src.pages.dashboard', 'show_dashboard'),
+    'projects': ('src.pages.projects', 'show_projects_page'),
+    'dmaic': ('src.pages.dmaic_phases', 'show_dmaic_phase'),
+    'reports': ('src.pages.reports', 'show_reports_page'),
+    'help': ('src.pages.help', 'show_help_page'),
+}
+
+# Fase DMAIC -> (módulo, função que mostra as ferramentas)
+PHASE_TOOLS: Dict[str, Tuple[str, str]] = {
+    'define': ('src.pages.define_tools', 'show_define_tools'),
+    'measure': ('src.pages.measure_tools', 'show_measure_tools'),
+    'analyze': ('src.pages.analyze_tools', 'show_analyze_tools'),
+    'improve': ('src.pages.improve_tools', 'show_improve_phase'),
+    'control': ('src.pages.control_tools', 'show_control_phase'),
+}
+
+# Bibliotecas pesadas destacadas na instrumentação
+HEAVY_MODULES = ['scipy', 'sklearn', 'plotly.subplots', 'statsmodels', 'fpdf', 'docx', 'xlsxwriter']
+
+_timings: Dict[str, Dict] = {}
+_lock = threading.RLock()
+
+
+def _prefixes(name: str) -> Set[str]:
+    """'src.pages.dashboard' -> {'src', 'src.pages', 'src.pages.dashboard'}"""
+    parts = name.split('.')
+    return {'.'.join(parts[:i]) for i in range(1, len(parts) + 1)}
+
+
+def load_module(name: str):
+    """
+    Importa o módulo (uma vez) registrando o tempo da primeira importação
+
+    Aceita o caminho com ou sem o prefixo "src." (mesma convenção de
+    fallback dos imports do projeto).
+    """
+    with _lock:
+        if name in _timings:
+            return sys.modules[_timings[name]['module']]
+
+        before = set(sys.modules)
+        start = time.perf_counter()
+        try:
+            module = importlib.import_module(name)
+        except ImportError as e:
+            # Só o próprio módulo (ou o pacote src) ausente; dependência faltando sobe com a causa real
+            if not name.startswith('src.') or e.name not in _prefixes(name):
+                raise
+            module = importlib.import_module(name[len('src.'):])
+        elapsed = time.perf_counter() - start
+
+        loaded = set(sys.modules) - before
+        _timings[name] = {
+            'module': module.__name__,
+            'seconds': elapsed,
+            'new_modules': len(loaded),
+            'heavy': [heavy for heavy in HEAVY_MODULES if heavy in loaded],
+            'loaded_at': datetime.now().isoformat()
+        }
+        return module
+
+
+def resolve(target: Tuple[str, str]) -> Callable:
+    module_name, attribute = target
+    return getattr(load_module(module_name), attribute)
+
+
+def page(name: str) -> Callable:
+    """Função de renderização da página (importa o módulo na primeira chamada), cronometrada"""
+    return profiled(name, kind='page')(resolve(PAGES[name]))
+
+
+def phase_tools(phase: str) -> Callable:
+    """Função que mostra as ferramentas da fase DMAIC, cronometrada"""
+    return profiled(f"{phase}_tools", kind='page')(resolve(PHASE_TOOLS[phase]))
+
+
+def import_timings() -> List[Dict]:
+    """Primeiras importações registradas, da mais lenta para a mais rápida"""
+    with _lock:
+        rows = [dict(timing, name=name) for name, timing in _timings.items()]
+    return sorted(rows, key=lambda row: row['seconds'], reverse=True)
@@ -0,0 +1,459 @@
+"""
+Backend local de armazenamento (substituto do Firestore e do Firebase Auth)
+
+Com STORAGE_BACKEND=local o app, o test_projects.py e os benchmarks rodam
+sem rede: initialize_firebase devolve um LocalFirestore e o FirebaseAuth usa
+o LocalAuth no lugar da API REST. Os dados ficam num arquivo SQLite
+(LOCAL_STORE_PATH, padrão local_store.db; ":memory:" para memória).
+
+A interface é o subconjunto do cliente do Firestore usado no projeto:
+- collection/document/collection_group, sub-coleções e get_all
+- get/set (com merge)/update (caminhos com ponto)/delete e batch
+- where (==, !=, <, <=, >, >=, in, not-in, array_contains,
+  array_contains_any), order_by, limit, start_after, select, stream/get
+- agregações count/sum/avg
+
+Os documentos são gravados serializados (pickle), preservando os tipos; as
+consultas carregam a coleção e filtram em Python, o que basta para testes e
+benchmarks locais.
+"""
+import copy
+import hashlib
+import os
+import pickle
+import secrets
+import sqlite3
+import threading
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+DEFAULT_PATH = "local_store.db"
+
+_MISSING = object()
+
+
+class LocalNotFound(Exception):
+    """update em documento inexistente (equivalente ao NotFound do Firestore)"""
+
+
+def _field(data: Dict, path: str):
+    value = data
+    for part in path.split('.'):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _set_field(data: Dict, path: str, value):
+    parts = path.split('.')
+    for part in parts[:-1]:
+        if not isinstance(data.get(part), dict):
+            data[part] = {}
+        data = data[part]
+    data[parts[-1]] = value
+
+
+def _merge(target: Dict, source: Dict):
+    for key, value in source.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge(target[key], value)
+        else:
+            target[key] = copy.deepcopy(value)
+
+
+def _project(data: Dict, fields: List[str]) -> Dict:
+    projected: Dict = {}
+    for path in fields:
+        value = _field(data, path)
+        if value is not _MISSING:
+            _set_field(projected, path, copy.deepcopy(value))
+    return projected
+
+
+def _compare(value, op: str, expected) -> bool:
+    if value is _MISSING:
+        return False
+    try:
+        if op == '==':
+            return value == expected
+        if op == '!=':
+            return value != expected
+        if op == '<':
+            return value < expected
+        if op == '<=':
+            return value <= expected
+        if op == '>':
+            return value > expected
+        if op == '>=':
+            return value >= expected
+        if op == 'in':
+            return value in expected
+        if op == 'not-in':
+            return value not in expected
+        if op == 'array_contains':
+            return isinstance(value, list) and expected in value
+        if op == 'array_contains_any':
+            return isinstance(value, list) and any(item in value for item in expected)
+    except TypeError:
+        return False
+    raise ValueError(f"Operador não suportado: {op}")
+
+
+def _order_value(value) -> Tuple:
+    """Ordenação entre tipos como no Firestore: nulo < booleano < número < texto < outros"""
+    if value is _MISSING or value is None:
+        return (0, 0)
+    if isinstance(value, bool):
+        return (1, value)
+    if isinstance(value, (int, float)):
+        return (2, value)
+    if isinstance(value, str):
+        return (3, value)
+    return (4, str(value))
+
+
+def _descending(direction) -> bool:
+    return str(direction).upper().endswith('DESCENDING')
+
+
+class LocalSnapshot:
+    def __init__(self, reference: 'LocalDocument', data: Optional[Dict]):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self) -> Optional[Dict]:
+        return copy.deepcopy(self._data) if self.exists else None
+
+    def get(self, field_path: str):
+        value = _field(self._data or {}, field_path)
+        if value is _MISSING:
+            raise KeyError(field_path)
+        return copy.deepcopy(value)
+
+
+class LocalDocument:
+    def __init__(self, store: 'LocalFirestore', path: str):
+        self._store = store
+        self.path = path
+        self.id = path.rsplit('/', 1)[-1]
+
+    @property
+    def parent(self) -> 'LocalCollection':
+        return LocalCollection(self._store, self.path.rsplit('/', 1)[0])
+
+    def collection(self, name: str) -> 'LocalCollection':
+        return LocalCollection(self._store, f"{self.path}/{name}")
+
+    def get(self, *args, **kwargs) -> LocalSnapshot:
+        return LocalSnapshot(self, self._store._read(self.path))
+
+    def set(self, data: Dict, merge: bool = False):
+        self._store._apply([('set', self.path, data, merge)])
+
+    def update(self, fields: Dict):
+        self._store._apply([('update', self.path, fields, False)])
+
+    def delete(self):
+        self._store._apply([('delete', self.path, None, False)])
+
+
+class _AggregationResult:
+    def __init__(self, alias: str, value):
+        self.alias = alias
+        self.value = value
+
+
+class LocalAggregation:
+    def __init__(self, query: 'LocalQuery', aggregations: List[Tuple[str, Optional[str], str]]):
+        self._query = query
+        self._aggregations = aggregations
+
+    def _add(self, kind: str, field: Optional[str], alias: Optional[str]) -> 'LocalAggregation':
+        alias = alias or f"field_{len(self._aggregations) + 1}"
+        return LocalAggregation(self._query, self._aggregations + [(kind, field, alias)])
+
+    def count(self, alias: Optional[str] = None):
+        return self._add('count', None, alias)
+
+    def sum(self, field_path: str, alias: Optional[str] = None):
+        return self._add('sum', field_path, alias)
+
+    def avg(self, field_path: str, alias: Optional[str] = None):
+        return self._add('avg', field_path, alias)
+
+    def stream(self, *args, **kwargs) -> Iterator[List[_AggregationResult]]:
+        documents = [snapshot._data for snapshot in self._query.stream()]
+        results = []
+        for kind, field, alias in self._aggregations:
+            if kind == 'count':
+                results.append(_AggregationResult(alias, len(documents)))
+                continue
+            values = [value for value in (_field(data, field) for data in documents)
+                      if isinstance(value, (int, float)) and not isinstance(value, bool)]
+            if kind == 'sum':
+                results.append(_AggregationResult(alias, sum(values)))
+            else:
+                results.append(_AggregationResult(alias, sum(values) / len(values) if values else None))
+        yield results
+
+    def get(self, *args, **kwargs) -> List[List[_AggregationResult]]:
+        return list(self.stream())
+
+
+class LocalQuery:
+    def __init__(self, store: 'LocalFirestore', parent: str, group: bool = False):
+        self._store = store
+        self._parent = parent
+        self._group = group
+        self._filters: List[Tuple[str, str, Any]] = []
+        self._orders: List[Tuple[str, bool]] = []
+        self._limit: Optional[int] = None
+        self._start_after = None
+        self._fields: Optional[List[str]] = None
+
+    def _copy(self, **changes) -> 'LocalQuery':
+        query = copy.copy(self)
+        query._filters = list(self._filters)
+        query._orders = list(self._orders)
+        for name, value in changes.items():
+            setattr(query, name, value)
+        return query
+
+    def where(self, field_path: Optional[str] = None, op_string: Optional[str] = None, value=None, filter=None):
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        query = self._copy()
+        query._filters.append((field_path, op_string, value))
+        return query
+
+    def order_by(self, field_path: str, direction: str = 'ASCENDING'):
+        query = self._copy()
+        query._orders.append((field_path, _descending(direction)))
+        return query
+
+    def limit(self, count: int):
+        return self._copy(_limit=count)
+
+    def start_after(self, document_fields):
+        if isinstance(document_fields, LocalSnapshot):
+            document_fields = document_fields._data or {}
+        return self._copy(_start_after=document_fields)
+
+    def select(self, field_paths: List[str]):
+        return self._copy(_fields=list(field_paths))
+
+    def count(self, alias: Optional[str] = None):
+        return LocalAggregation(self, []).count(alias)
+
+    def sum(self, field_path: str, alias: Optional[str] = None):
+        return LocalAggregation(self, []).sum(field_path, alias)
+
+    def avg(self, field_path: str, alias: Optional[str] = None):
+        return LocalAggregation(self, []).avg(field_path, alias)
+
+    def stream(self, *args, **kwargs) -> Iterator[LocalSnapshot]:
+        rows = self._store._scan(self._parent, self._group)
+        rows = [(path, data) for path, data in rows
+                if all(_compare(_field(data, f), op, v) for f, op, v in self._filters)]
+
+        rows.sort(key=lambda row: row[0])
+        for field, descending in reversed(self._orders):
+            rows = [row for row in rows if _field(row[1], field) is not _MISSING]
+            rows.sort(key=lambda row: _order_value(_field(row[1], field)), reverse=descending)
+
+        if self._start_after is not None and self._orders:
+            cursor = [self._start_after.get(field) for field, _ in self._orders]
+
+            def after(data: Dict) -> bool:
+                for (field, descending), bound in zip(self._orders, cursor):
+                    value, bound = _order_value(_field(data, field)), _order_value(bound)
+                    if value == bound:
+                        continue
+                    return (value < bound) if descending else (value > bound)
+                return False
+            rows = [row for row in rows if after(row[1])]
+
+        if self._limit is not None:
+            rows = rows[:self._limit]
+
+        for path, data in rows:
+            yield LocalSnapshot(LocalDocument(self._store, path),
+                                _project(data, self._fields) if self._fields is not None else data)
+
+    def get(self, *args, **kwargs) -> List[LocalSnapshot]:
+        return list(self.stream())
+
+
+class LocalCollection(LocalQuery):
+    def __init__(self, store: 'LocalFirestore', path: str):
+        super().__init__(store, path)
+        self.id = path.rsplit('/', 1)[-1]
+
+    def document(self, document_id: Optional[str] = None) -> LocalDocument:
+        return LocalDocument(self._store, f"{self._parent}/{document_id or uuid.uuid4().hex[:20]}")
+
+    def add(self, data: Dict, document_id: Optional[str] = None):
+        reference = self.document(document_id)
+        reference.set(data)
+        return None, reference
+
+
+class LocalBatch:
+    """Operações aplicadas juntas no commit (atomicamente)"""
+
+    def __init__(self, store: 'LocalFirestore'):
+        self._store = store
+        self._operations: List[Tuple] = []
+
+    def set(self, reference: LocalDocument, data: Dict, merge: bool = False):
+        self._operations.append(('set', reference.path, data, merge))
+
+    def update(self, reference: LocalDocument, fields: Dict):
+        self._operations.append(('update', reference.path, fields, False))
+
+    def delete(self, reference: LocalDocument):
+        self._operations.append(('delete', reference.path, None, False))
+
+    def commit(self):
+        operations, self._operations = self._operations, []
+        self._store._apply(operations)
+        return operations
+
+
+class LocalFirestore:
+    """Documentos num SQLite: (caminho, coleção pai, nome da coleção, dados)"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("LOCAL_STORE_PATH", DEFAULT_PATH)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents "
+                "(path TEXT PRIMARY KEY, parent TEXT, collection TEXT, data BLOB)"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS documents_parent ON documents (parent)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS documents_collection ON documents (collection)")
+
+    def collection(self, name: str) -> LocalCollection:
+        return LocalCollection(self, name)
+
+    def collection_group(self, name: str) -> LocalQuery:
+        return LocalQuery(self, name, group=True)
+
+    def document(self, path: str) -> LocalDocument:
+        return LocalDocument(self, path)
+
+    def batch(self) -> LocalBatch:
+        return LocalBatch(self)
+
+    def get_all(self, references, *args, **kwargs) -> Iterator[LocalSnapshot]:
+        for reference in references:
+            yield reference.get()
+
+    def collections(self) -> List[LocalCollection]:
+        with self.lock:
+            rows = self.conn.execute("SELECT DISTINCT parent FROM documents WHERE parent NOT LIKE '%/%'").fetchall()
+        return [LocalCollection(self, row[0]) for row in rows]
+
+    def _read(self, path: str) -> Optional[Dict]:
+        with self.lock:
+            row = self.conn.execute("SELECT data FROM documents WHERE path=?", (path,)).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def _scan(self, parent: str, group: bool) -> List[Tuple[str, Dict]]:
+        column = 'collection' if group else 'parent'
+        with self.lock:
+            rows = self.conn.execute(f"SELECT path, data FROM documents WHERE {column}=?", (parent,)).fetchall()
+        return [(path, pickle.loads(data)) for path, data in rows]
+
+    def _apply(self, operations: List[Tuple]):
+        """Aplica set/update/delete numa transação (tudo ou nada)"""
+        with self.lock, self.conn:
+            for kind, path, data, merge in operations:
+                row = self.conn.execute("SELECT data FROM documents WHERE path=?", (path,)).fetchone()
+                current = pickle.loads(row[0]) if row else None
+
+                if kind == 'delete':
+                    self.conn.execute("DELETE FROM documents WHERE path=?", (path,))
+                    continue
+                if kind == 'update':
+                    if current is None:
+                        raise LocalNotFound(f"Documento não encontrado: {path}")
+                    for field, value in data.items():
+                        _set_field(current, field, copy.deepcopy(value))
+                elif merge and current is not None:
+                    _merge(current, data)
+                else:
+                    current = copy.deepcopy(data)
+
+                parent = path.rsplit('/', 1)[0]
+                self.conn.execute("INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?)",
+                                  (path, parent, parent.rsplit('/', 1)[-1], pickle.dumps(current)))
+
+
+class LocalAuth:
+    """Contas locais com a mesma interface do FirebaseRestAuth"""
+
+    def __init__(self, store: LocalFirestore):
+        self.conn = store.conn
+        self.lock = store.lock
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS accounts (email TEXT PRIMARY KEY, uid TEXT, salt TEXT, password TEXT)"
+            )
+
+    @staticmethod
+    def _hash(password: str, salt: str) -> str:
+        return hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 10_000).hex()
+
+    def _tokens(self, uid: str, email: str) -> Dict:
+        return {'localId': uid, 'email': email, 'emailVerified': True,
+                'idToken': secrets.token_hex(16), 'refreshToken': secrets.token_hex(16)}
+
+    def sign_up_with_email_password(self, email, password):
+        email = email.strip().lower()
+        if len(password or '') < 6:
+            return False, "WEAK_PASSWORD"
+        salt, uid = secrets.token_hex(8), uuid.uuid4().hex[:28]
+        try:
+            with self.lock, self.conn:
+                self.conn.execute("INSERT INTO accounts VALUES (?, ?, ?, ?)",
+                                  (email, uid, salt, self._hash(password, salt)))
+        except sqlite3.IntegrityError:
+            return False, "EMAIL_EXISTS"
+        return True, self._tokens(uid, email)
+
+    def sign_in_with_email_password(self, email, password):
+        email = email.strip().lower()
+        with self.lock:
+            row = self.conn.execute("SELECT uid, salt, password FROM accounts WHERE email=?", (email,)).fetchone()
+        if not row or self._hash(password, row[1]) != row[2]:
+            return False, "INVALID_LOGIN_CREDENTIALS"
+        return True, self._tokens(row[0], email)
+
+    def send_password_reset_email(self, email):
+        return True, "Email enviado com sucesso"
+
+    def send_email_verification(self, id_token):
+        return True, "Email de verificação enviado"
+
+    def get_user_info(self, id_token):
+        return False, "Não disponível no backend local"
+
+
+_store: Optional[LocalFirestore] = None
+_store_lock = threading.Lock()
+
+
+def get_local_store() -> LocalFirestore:
+    """Armazenamento local compartilhado pelo processo"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = LocalFirestore()
+        return _store
@@ -0,0 +1,118 @@
+"""
+Tabela editável e paginada de medições
+
+Substitui a renderização linha a linha (st.columns + botões por medição) por um
+único st.data_editor por página: o custo de renderização depende do tamanho da
+página, não do histórico. Edições e exclusões são aplicadas em lote.
+"""
+from datetime import date, datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+import streamlit as st
+
+
+GRID_PAGE_SIZE = 50
+
+STATUS_ICONS = {'OK': '✅', 'WARNING': '⚠️', 'ALERT': '🚨'}
+
+
+def _to_date(value) -> Optional[date]:
+    if not value:
+        return None
+    return datetime.fromisoformat(str(value)).date()
+
+
+def paginate(items: Sequence, page_key: str, page_size: int = GRID_PAGE_SIZE) -> Tuple[List, int, int]:
+    """Fatia uma lista em memória conforme a página guardada em session_state"""
+    total_pages = max(1, -(-len(items) // page_size))
+    page = min(st.session_state.get(page_key, 1), total_pages)
+    st.session_state[page_key] = page
+    start = (page - 1) * page_size
+    return list(items[start:start + page_size]), page, total_pages
+
+
+def show_page_selector(page_key: str, total_pages: int, total_items: int):
+    """Seletor de página para listas em memória (usar após paginate)"""
+    if total_pages <= 1:
+        return
+
+    col_p1, col_p2 = st.columns([1, 3])
+    with col_p1:
+        # O próprio widget guarda a página (lida por paginate na próxima execução)
+        st.number_input("Página:", min_value=1, max_value=total_pages, key=page_key)
+    with col_p2:
+        st.caption(f"{total_items} medições · {total_pages} páginas")
+
+
+def measurements_frame(items: List[Dict], ids: Optional[List] = None, show_status: bool = False) -> pd.DataFrame:
+    """Monta o DataFrame da grade (índice = identificador da medição)"""
+    frame = pd.DataFrame({
+        'Data': [_to_date(item.get('date')) for item in items],
+        'Valor': [float(item['value']) for item in items],
+    }, index=pd.Index(ids if ids is not None else [item['id'] for item in items], name='id'))
+
+    if show_status:
+        frame['Status'] = [STATUS_ICONS.get(item.get('status', 'OK'), '') for item in items]
+        frame['Regras'] = [', '.join(str(rule) for rule in item.get('rules') or []) for item in items]
+
+    frame['Excluir'] = False
+    return frame
+
+
+def render_measurement_grid(key: str, items: List[Dict], unit: str = '', ids: Optional[List] = None,
+                            show_status: bool = False) -> Optional[Dict]:
+    """
+    Mostra uma página de medições em grade editável
+
+    Args:
+        key: Chave única do widget
+        items: Medições da página (dicts com date/value)
+        unit: Unidade exibida no cabeçalho do valor
+        ids: Identificadores das linhas (padrão: item['id'])
+        show_status: Exibir colunas de status/regras SPC
+
+    Returns:
+        {'updated': {id: {'date', 'value'}}, 'deleted': [ids]} quando o usuário
+        aplica alterações, ou None
+    """
+    if not items:
+        return None
+
+    original = measurements_frame(items, ids, show_status)
+
+    with st.form(f"grid_form_{key}"):
+        edited = st.data_editor(
+            original,
+            key=f"grid_{key}",
+            use_container_width=True,
+            hide_index=True,
+            num_rows="fixed",
+            disabled=[col for col in original.columns if col not in ('Data', 'Valor', 'Excluir')],
+            column_config={
+                'Data': st.column_config.DateColumn("📅 Data", format="DD/MM/YYYY", required=True),
+                'Valor': st.column_config.NumberColumn(f"Valor ({unit})" if unit else "Valor",
+                                                       step=0.01, required=True),
+                'Excluir': st.column_config.CheckboxColumn("🗑️", help="Marque para excluir")
+            }
+        )
+        submitted = st.form_submit_button("💾 Aplicar alterações")
+
+    if not submitted:
+        return None
+
+    deleted = edited.index[edited['Excluir']].tolist()
+    kept = edited[~edited['Excluir']]
+    base = original.loc[kept.index]
+    changed = (kept['Data'] != base['Data']) | (kept['Valor'] != base['Valor'])
+
+    updated = {
+        row_id: {'date': pd.Timestamp(row['Data']).date().isoformat(), 'value': float(row['Valor'])}
+        for row_id, row in kept[changed].iterrows()
+    }
+
+    if not updated and not deleted:
+        st.info("📝 Nenhuma alteração a aplicar")
+        return None
+
+    return {'updated': updated, 'deleted': deleted}
@@ -0,0 +1,630 @@
+"""
+Armazenamento das medições dos pontos de controle em série temporal
+
+Cada ponto de controle tem o documento projects/{project_id}/control_points/{point_id}
+(resumo estatístico + estado SPC) e a sub-coleção measurements, append-only,
+com chaves ordenadas pelo tempo. O documento do projeto guarda apenas o
+resumo. Sem Firestore, um backend local em session_state cumpre o mesmo papel;
+fora do Streamlit (API de ingestão), um arquivo SQLite.
+"""
+import bisect
+import json
+import math
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import streamlit as st
+
+
+# Firestore aceita até 500 operações por batch
+BATCH_SIZE = 450
+
+# Campos do ponto replicados no documento do ponto (consultas de portfólio)
+POINT_FIELDS = ['name', 'metric', 'unit', 'target', 'lower_limit', 'upper_limit',
+                'chart_type', 'subgroup_size', 'responsible', 'status']
+
+# Últimas medições mantidas no documento do ponto (sparklines do portfólio)
+RECENT_SIZE = 30
+
+
+def measurement_key(timestamp: Optional[str] = None) -> str:
+    """Gera chave ordenável pelo tempo (ex: 20240315T103000123456_a1b2c3)"""
+    moment = datetime.fromisoformat(timestamp) if timestamp else datetime.now()
+    return f"{moment.strftime('%Y%m%dT%H%M%S%f')}_{uuid.uuid4().hex[:6]}"
+
+
+def _key_bound(timestamp: Optional[str], upper: bool = False) -> Optional[str]:
+    """Converte data/hora ISO em limite de faixa sobre as chaves"""
+    if not timestamp:
+        return None
+    prefix = datetime.fromisoformat(str(timestamp)).strftime('%Y%m%dT%H%M%S%f')
+    return prefix + ('~' if upper else '')
+
+
+def empty_summary() -> Dict:
+    """Resumo estatístico vazio de um ponto"""
+    return {
+        'count': 0, 'mean': 0.0, 'm2': 0.0, 'min': None, 'max': None,
+        'last_value': None, 'last_timestamp': None, 'alerts': 0, 'warnings': 0
+    }
+
+
+def update_summary(summary: Optional[Dict], measurement: Dict) -> Dict:
+    """Atualiza o resumo com uma nova medição (Welford, O(1))"""
+    summary = dict(summary or empty_summary())
+    value = float(measurement['value'])
+
+    summary['count'] += 1
+    delta = value - summary['mean']
+    summary['mean'] += delta / summary['count']
+    summary['m2'] += delta * (value - summary['mean'])
+    summary['min'] = value if summary['min'] is None else min(summary['min'], value)
+    summary['max'] = value if summary['max'] is None else max(summary['max'], value)
+
+    timestamp = measurement.get('timestamp') or measurement.get('date')
+    if not summary['last_timestamp'] or (timestamp and timestamp >= summary['last_timestamp']):
+        summary['last_value'] = value
+        summary['last_timestamp'] = timestamp
+
+    if measurement.get('status') == 'ALERT':
+        summary['alerts'] += 1
+    elif measurement.get('status') == 'WARNING':
+        summary['warnings'] += 1
+
+    return summary
+
+
+def remove_from_summary(summary: Dict, measurement: Dict) -> Dict:
+    """
+    Retira uma medição do resumo (Welford inverso, O(1))
+
+    min/max não são ajustados: se o valor retirado era um extremo, o resumo
+    precisa ser recalculado pela série.
+    """
+    summary = dict(summary)
+    value = float(measurement['value'])
+    count = summary['count'] - 1
+    if count <= 0:
+        return empty_summary()
+
+    mean = (summary['count'] * summary['mean'] - value) / count
+    summary['m2'] = max(summary['m2'] - (value - mean) * (value - summary['mean']), 0.0)
+    summary['count'], summary['mean'] = count, mean
+
+    if measurement.get('status') == 'ALERT':
+        summary['alerts'] = max(summary['alerts'] - 1, 0)
+    elif measurement.get('status') == 'WARNING':
+        summary['warnings'] = max(summary['warnings'] - 1, 0)
+
+    return summary
+
+
+def summarize(measurements: List[Dict]) -> Dict:
+    """Calcula o resumo completo de uma lista de medições"""
+    if not measurements:
+        return empty_summary()
+
+    values = np.array([float(m['value']) for m in measurements])
+    statuses = [m.get('status') for m in measurements]
+    last = max(measurements, key=lambda m: m.get('timestamp') or m.get('date') or '')
+
+    return {
+        'count': int(len(values)),
+        'mean': float(values.mean()),
+        'm2': float(((values - values.mean()) ** 2).sum()),
+        'min': float(values.min()),
+        'max': float(values.max()),
+        'last_value': float(last['value']),
+        'last_timestamp': last.get('timestamp') or last.get('date'),
+        'alerts': statuses.count('ALERT'),
+        'warnings': statuses.count('WARNING')
+    }
+
+
+def recent_tail(recent: Optional[List[Dict]], measurements: List[Dict]) -> List[Dict]:
+    """Janela das últimas medições (valor/status/regras) em ordem cronológica"""
+    tail = list(recent or []) + [
+        {'value': float(m['value']), 'status': m.get('status', 'OK'), 'rules': m.get('rules') or [],
+         'timestamp': m.get('timestamp')}
+        for m in measurements
+    ]
+    tail.sort(key=lambda m: m.get('timestamp') or '')
+    return tail[-RECENT_SIZE:]
+
+
+def summary_std(summary: Dict) -> float:
+    """Desvio padrão amostral a partir do resumo"""
+    if not summary or summary.get('count', 0) < 2:
+        return 0.0
+    return math.sqrt(summary['m2'] / (summary['count'] - 1))
+
+
+class FirestoreMeasurementBackend:
+    """Sub-coleções de medições no Firestore"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def _point_ref(self, project_id: str, point_id: str):
+        return (self.db.collection('projects').document(project_id)
+                .collection('control_points').document(point_id))
+
+    def write(self, project_id: str, point_id: str, measurements: List[Dict], point_fields: Dict):
+        """Grava medições e o documento do ponto em batches"""
+        point_ref = self._point_ref(project_id, point_id)
+        collection = point_ref.collection('measurements')
+
+        for start in range(0, max(len(measurements), 1), BATCH_SIZE):
+            batch = self.db.batch()
+            for measurement in measurements[start:start + BATCH_SIZE]:
+                batch.set(collection.document(measurement['key']), measurement)
+            if start + BATCH_SIZE >= len(measurements):
+                batch.set(point_ref, point_fields, merge=True)
+            batch.commit()
+
+    def update(self, project_id: str, point_id: str, key: str, fields: Dict):
+        self._point_ref(project_id, point_id).collection('measurements').document(key).update(fields)
+
+    def get_many(self, project_id: str, point_id: str, keys: List[str]) -> Dict[str, Dict]:
+        """Medições pelas chaves, em uma única chamada"""
+        if not keys:
+            return {}
+        collection = self._point_ref(project_id, point_id).collection('measurements')
+        return {doc.id: doc.to_dict() for doc in self.db.get_all([collection.document(key) for key in keys])
+                if doc.exists}
+
+    def update_many(self, project_id: str, point_id: str, updates: Dict[str, Dict]):
+        collection = self._point_ref(project_id, point_id).collection('measurements')
+        items = list(updates.items())
+        for start in range(0, len(items), BATCH_SIZE):
+            batch = self.db.batch()
+            for key, fields in items[start:start + BATCH_SIZE]:
+                batch.update(collection.document(key), fields)
+            batch.commit()
+
+    def delete(self, project_id: str, point_id: str, keys: List[str]):
+        collection = self._point_ref(project_id, point_id).collection('measurements')
+        for start in range(0, len(keys), BATCH_SIZE):
+            batch = self.db.batch()
+            for key in keys[start:start + BATCH_SIZE]:
+                batch.delete(collection.document(key))
+            batch.commit()
+
+    def _range_query(self, project_id: str, point_id: str, start_key: Optional[str], end_key: Optional[str]):
+        query = self._point_ref(project_id, point_id).collection('measurements')
+        if start_key:
+            query = query.where('key', '>=', start_key)
+        if end_key:
+            query = query.where('key', '<=', end_key)
+        return query
+
+    def query(self, project_id: str, point_id: str, start_key: Optional[str] = None,
+              end_key: Optional[str] = None, limit: Optional[int] = None,
+              start_after: Optional[str] = None, descending: bool = False) -> List[Dict]:
+        # Mesmos valores de firestore.Query.DESCENDING/ASCENDING (aceitos também pelo backend local)
+        direction = 'DESCENDING' if descending else 'ASCENDING'
+        query = self._range_query(project_id, point_id, start_key, end_key).order_by('key', direction=direction)
+        if start_after:
+            query = query.start_after({'key': start_after})
+        if limit:
+            query = query.limit(limit)
+        return [doc.to_dict() for doc in query.stream()]
+
+    def aggregate(self, project_id: str, point_id: str, start_key: Optional[str] = None,
+                  end_key: Optional[str] = None) -> Dict:
+        """Agregação no servidor (count/sum/avg) sem transferir as medições"""
+        query = self._range_query(project_id, point_id, start_key, end_key)
+        aggregation = query.count(alias='count').sum('value', alias='sum').avg('value', alias='avg')
+
+        results = {}
+        for result in aggregation.get():
+            for item in result:
+                results[item.alias] = item.value
+        return {
+            'count': int(results.get('count') or 0),
+            'sum': float(results.get('sum') or 0.0),
+            'avg': float(results['avg']) if results.get('avg') is not None else None
+        }
+
+    def get_point(self, project_id: str, point_id: str) -> Optional[Dict]:
+        doc = self._point_ref(project_id, point_id).get()
+        return doc.to_dict() if doc.exists else None
+
+    def get_points(self, project_id: str, point_ids: List[str]) -> Dict[str, Dict]:
+        """Lê vários documentos de ponto em uma única chamada"""
+        refs = [self._point_ref(project_id, point_id) for point_id in point_ids]
+        return {doc.id: doc.to_dict() for doc in self.db.get_all(refs) if doc.exists}
+
+    def set_point(self, project_id: str, point_id: str, fields: Dict):
+        self._point_ref(project_id, point_id).set(fields, merge=True)
+
+    def list_points(self, user_uid: str) -> List[Dict]:
+        """Documentos de ponto de todos os projetos do usuário (uma consulta collection group)"""
+        query = self.db.collection_group('control_points').where('user_uid', '==', user_uid)
+        return [doc.to_dict() for doc in query.stream()]
+
+    def delete_point(self, project_id: str, point_id: str):
+        keys = [m['key'] for m in self.query(project_id, point_id)]
+        self.delete(project_id, point_id, keys)
+        self._point_ref(project_id, point_id).delete()
+
+
+class LocalMeasurementBackend:
+    """Stand-in local (session_state) com a mesma interface do Firestore"""
+
+    def __init__(self):
+        if 'local_measurement_store' not in st.session_state:
+            st.session_state.local_measurement_store = {}
+        self.storage = st.session_state.local_measurement_store
+
+    def _series(self, project_id: str, point_id: str) -> Dict:
+        return self.storage.setdefault((project_id, point_id), {'point': {}, 'keys': [], 'docs': {}})
+
+    def write(self, project_id: str, point_id: str, measurements: List[Dict], point_fields: Dict):
+        series = self._series(project_id, point_id)
+        for measurement in measurements:
+            key = measurement['key']
+            if key not in series['docs']:
+                bisect.insort(series['keys'], key)
+            series['docs'][key] = dict(measurement)
+        series['point'].update(point_fields)
+
+    def update(self, project_id: str, point_id: str, key: str, fields: Dict):
+        self._series(project_id, point_id)['docs'][key].update(fields)
+
+    def get_many(self, project_id: str, point_id: str, keys: List[str]) -> Dict[str, Dict]:
+        docs = self._series(project_id, point_id)['docs']
+        return {key: dict(docs[key]) for key in keys if key in docs}
+
+    def update_many(self, project_id: str, point_id: str, updates: Dict[str, Dict]):
+        docs = self._series(project_id, point_id)['docs']
+        for key, fields in updates.items():
+            docs[key].update(fields)
+
+    def delete(self, project_id: str, point_id: str, keys: List[str]):
+        series = self._series(project_id, point_id)
+        for key in keys:
+            if series['docs'].pop(key, None) is not None:
+                series['keys'].pop(bisect.bisect_left(series['keys'], key))
+
+    def _range(self, project_id: str, point_id: str, start_key: Optional[str], end_key: Optional[str]) -> List[str]:
+        keys = self._series(project_id, point_id)['keys']
+        lo = bisect.bisect_left(keys, start_key) if start_key else 0
+        hi = bisect.bisect_right(keys, end_key) if end_key else len(keys)
+        return keys[lo:hi]
+
+    def query(self, project_id: str, point_id: str, start_key: Optional[str] = None,
+              end_key: Optional[str] = None, limit: Optional[int] = None,
+              start_after: Optional[str] = None, descending: bool = False) -> List[Dict]:
+        keys = self._range(project_id, point_id, start_key, end_key)
+        if start_after:
+            if descending:
+                keys = keys[:bisect.bisect_left(keys, start_after)]
+            else:
+                keys = keys[bisect.bisect_right(keys, start_after):]
+        if descending:
+            keys = keys[::-1]
+        if limit:
+            keys = keys[:limit]
+        docs = self._series(project_id, point_id)['docs']
+        return [dict(docs[key]) for key in keys]
+
+    def aggregate(self, project_id: str, point_id: str, start_key: Optional[str] = None,
+                  end_key: Optional[str] = None) -> Dict:
+        docs = self._series(project_id, point_id)['docs']
+        values = np.array([float(docs[key]['value']) for key in self._range(project_id, point_id, start_key, end_key)])
+        return {
+            'count': int(len(values)),
+            'sum': float(values.sum()) if len(values) else 0.0,
+            'avg': float(values.mean()) if len(values) else None
+        }
+
+    def get_point(self, project_id: str, point_id: str) -> Optional[Dict]:
+        series = self.storage.get((project_id, point_id))
+        return dict(series['point']) if series else None
+
+    def get_points(self, project_id: str, point_ids: List[str]) -> Dict[str, Dict]:
+        points = {point_id: self.get_point(project_id, point_id) for point_id in point_ids}
+        return {point_id: point for point_id, point in points.items() if point}
+
+    def set_point(self, project_id: str, point_id: str, fields: Dict):
+        self._series(project_id, point_id)['point'].update(fields)
+
+    def list_points(self, user_uid: str) -> List[Dict]:
+        return [dict(series['point']) for series in self.storage.values()
+                if series['point'].get('user_uid') == user_uid]
+
+    def delete_point(self, project_id: str, point_id: str):
+        self.storage.pop((project_id, point_id), None)
+
+
+class SQLiteMeasurementBackend:
+    """Stand-in em arquivo SQLite com a mesma interface (uso fora do Streamlit)"""
+
+    def __init__(self, path: str = "measurements.db"):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS measurements ("
+                "project_id TEXT, point_id TEXT, key TEXT, value REAL, doc TEXT, "
+                "PRIMARY KEY (project_id, point_id, key))"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS control_points ("
+                "project_id TEXT, point_id TEXT, doc TEXT, PRIMARY KEY (project_id, point_id))"
+            )
+
+    def write(self, project_id: str, point_id: str, measurements: List[Dict], point_fields: Dict):
+        rows = [(project_id, point_id, m['key'], float(m['value']), json.dumps(m, default=str))
+                for m in measurements]
+        with self.lock, self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO measurements VALUES (?, ?, ?, ?, ?)", rows)
+            self._merge_point(project_id, point_id, point_fields)
+
+    def update(self, project_id: str, point_id: str, key: str, fields: Dict):
+        self.update_many(project_id, point_id, {key: fields})
+
+    def get_many(self, project_id: str, point_id: str, keys: List[str]) -> Dict[str, Dict]:
+        if not keys:
+            return {}
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT key, doc FROM measurements WHERE project_id=? AND point_id=? "
+                f"AND key IN ({', '.join('?' * len(keys))})",
+                [project_id, point_id, *keys]
+            ).fetchall()
+        return {key: json.loads(doc) for key, doc in rows}
+
+    def update_many(self, project_id: str, point_id: str, updates: Dict[str, Dict]):
+        with self.lock, self.conn:
+            for key, fields in updates.items():
+                row = self.conn.execute(
+                    "SELECT doc FROM measurements WHERE project_id=? AND point_id=? AND key=?",
+                    (project_id, point_id, key)
+                ).fetchone()
+                if row is None:
+                    continue
+                doc = dict(json.loads(row[0]), **fields)
+                self.conn.execute(
+                    "UPDATE measurements SET value=?, doc=? WHERE project_id=? AND point_id=? AND key=?",
+                    (float(doc['value']), json.dumps(doc, default=str), project_id, point_id, key)
+                )
+
+    def delete(self, project_id: str, point_id: str, keys: List[str]):
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "DELETE FROM measurements WHERE project_id=? AND point_id=? AND key=?",
+                [(project_id, point_id, key) for key in keys]
+            )
+
+    def _where(self, project_id: str, point_id: str, start_key: Optional[str], end_key: Optional[str]):
+        clauses, params = ["project_id=?", "point_id=?"], [project_id, point_id]
+        if start_key:
+            clauses.append("key>=?")
+            params.append(start_key)
+        if end_key:
+            clauses.append("key<=?")
+            params.append(end_key)
+        return " AND ".join(clauses), params
+
+    def query(self, project_id: str, point_id: str, start_key: Optional[str] = None,
+              end_key: Optional[str] = None, limit: Optional[int] = None,
+              start_after: Optional[str] = None, descending: bool = False) -> List[Dict]:
+        where, params = self._where(project_id, point_id, start_key, end_key)
+        if start_after:
+            where += " AND key<?" if descending else " AND key>?"
+            params.append(start_after)
+        sql = f"SELECT doc FROM measurements WHERE {where} ORDER BY key {'DESC' if descending else 'ASC'}"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self.lock:
+            return [json.loads(row[0]) for row in self.conn.execute(sql, params)]
+
+    def aggregate(self, project_id: str, point_id: str, start_key: Optional[str] = None,
+                  end_key: Optional[str] = None) -> Dict:
+        where, params = self._where(project_id, point_id, start_key, end_key)
+        with self.lock:
+            count, total, avg = self.conn.execute(
+                f"SELECT COUNT(*), SUM(value), AVG(value) FROM measurements WHERE {where}", params
+            ).fetchone()
+        return {'count': int(count), 'sum': float(total or 0.0), 'avg': float(avg) if avg is not None else None}
+
+    def _merge_point(self, project_id: str, point_id: str, fields: Dict):
+        row = self.conn.execute(
+            "SELECT doc FROM control_points WHERE project_id=? AND point_id=?", (project_id, point_id)
+        ).fetchone()
+        doc = dict(json.loads(row[0]) if row else {}, **fields)
+        self.conn.execute("INSERT OR REPLACE INTO control_points VALUES (?, ?, ?)",
+                          (project_id, point_id, json.dumps(doc, default=str)))
+
+    def get_point(self, project_id: str, point_id: str) -> Optional[Dict]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT doc FROM control_points WHERE project_id=? AND point_id=?", (project_id, point_id)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_points(self, project_id: str, point_ids: List[str]) -> Dict[str, Dict]:
+        points = {point_id: self.get_point(project_id, point_id) for point_id in point_ids}
+        return {point_id: point for point_id, point in points.items() if point}
+
+    def set_point(self, project_id: str, point_id: str, fields: Dict):
+        with self.lock, self.conn:
+            self._merge_point(project_id, point_id, fields)
+
+    def list_points(self, user_uid: str) -> List[Dict]:
+        with self.lock:
+            docs = [json.loads(row[0]) for row in self.conn.execute("SELECT doc FROM control_points")]
+        return [doc for doc in docs if doc.get('user_uid') == user_uid]
+
+    def delete_point(self, project_id: str, point_id: str):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM measurements WHERE project_id=? AND point_id=?", (project_id, point_id))
+            self.conn.execute("DELETE FROM control_points WHERE project_id=? AND point_id=?", (project_id, point_id))
+
+
+class MeasurementStore:
+    """Série temporal de medições por ponto de controle"""
+
+    def __init__(self, project_id: str, db=None, user_uid: Optional[str] = None, backend=None):
+        self.project_id = project_id
+        self.user_uid = user_uid
+        if backend is not None:
+            self.backend = backend
+        else:
+            self.backend = FirestoreMeasurementBackend(db) if db else LocalMeasurementBackend()
+
+    def _point_fields(self, point: Dict) -> Dict:
+        fields = {field: point.get(field) for field in POINT_FIELDS}
+        fields.update({
+            'project_id': self.project_id,
+            'user_uid': self.user_uid,
+            'point_id': point['id'],
+            'summary': point.get('summary') or empty_summary(),
+            'recent': point.get('recent') or [],
+            'spc_state': point.get('spc_state'),
+            'updated_at': datetime.now().isoformat()
+        })
+        return fields
+
+    def _prepare(self, measurement: Dict) -> Dict:
+        measurement = dict(measurement)
+        measurement.setdefault('timestamp', datetime.now().isoformat())
+        measurement.setdefault('key', measurement_key(measurement['timestamp']))
+        measurement['id'] = measurement['key']
+        measurement['value'] = float(measurement['value'])
+        return measurement
+
+    def append(self, point: Dict, measurement: Dict) -> Dict:
+        """Acrescenta uma medição e atualiza o resumo do ponto"""
+        return self.append_many(point, [measurement])[0]
+
+    def append_many(self, point: Dict, measurements: List[Dict]) -> List[Dict]:
+        """Acrescenta várias medições em batches, atualizando o resumo uma vez"""
+        prepared = [self._prepare(m) for m in measurements]
+        summary = point.get('summary') or empty_summary()
+        for measurement in prepared:
+            summary = update_summary(summary, measurement)
+        point['summary'] = summary
+        point['recent'] = recent_tail(point.get('recent'), prepared)
+
+        self.backend.write(self.project_id, point['id'], prepared, self._point_fields(point))
+        return prepared
+
+    def update(self, point: Dict, measurement_id: str, fields: Dict):
+        """Edita uma medição (a chave/tempo de registro é preservada)"""
+        self.apply_changes(point, {measurement_id: fields}, [])
+
+    def delete(self, point: Dict, measurement_ids: List[str]):
+        """Remove medições e ajusta o resumo"""
+        self.apply_changes(point, {}, measurement_ids)
+
+    def apply_changes(self, point: Dict, updates: Dict[str, Dict], deleted_ids: List[str]):
+        """
+        Aplica edições e exclusões em lote e ajusta o resumo uma única vez
+
+        Só as medições alteradas são lidas: os valores antigos saem do resumo
+        e os novos entram (Welford); a série inteira só é relida quando um
+        valor retirado era o mínimo ou o máximo.
+        """
+        deleted_ids = list(deleted_ids)
+        before = self.backend.get_many(self.project_id, point['id'], list(updates) + deleted_ids)
+        if updates:
+            self.backend.update_many(self.project_id, point['id'], updates)
+        if deleted_ids:
+            self.backend.delete(self.project_id, point['id'], deleted_ids)
+
+        summary = point.get('summary') or empty_summary()
+        removed = list(before.values())
+        if not summary['count'] or any(float(m['value']) in (summary['min'], summary['max']) for m in removed):
+            return self.refresh_summary(point)
+
+        for measurement in removed:
+            summary = remove_from_summary(summary, measurement)
+        for key, fields in updates.items():
+            if key in before:
+                summary = update_summary(summary, dict(before[key], **fields))
+
+        recent = self.recent(point['id'], RECENT_SIZE)
+        if recent:
+            summary['last_value'] = float(recent[-1]['value'])
+            summary['last_timestamp'] = recent[-1].get('timestamp') or recent[-1].get('date')
+        point['summary'] = summary
+        point['recent'] = recent_tail([], recent)
+        self.backend.set_point(self.project_id, point['id'], self._point_fields(point))
+        return summary
+
+    def delete_point(self, point_id: str):
+        """Remove o ponto e toda a sua série"""
+        self.backend.delete_point(self.project_id, point_id)
+
+    def refresh_summary(self, point: Dict) -> Dict:
+        """Recalcula o resumo do ponto a partir da série completa"""
+        measurements = self.query(point['id'])
+        point['summary'] = summarize(measurements)
+        point['recent'] = recent_tail([], measurements[-RECENT_SIZE:])
+        self.backend.set_point(self.project_id, point['id'], self._point_fields(point))
+        return point['summary']
+
+    def sync_point(self, point: Dict):
+        """Propaga metadados/estado SPC do ponto para o documento do ponto"""
+        self.backend.set_point(self.project_id, point['id'], self._point_fields(point))
+
+    def load_state(self, points: List[Dict]):
+        """
+        Atualiza resumo e estado SPC dos pontos a partir dos documentos de ponto
+
+        Medições gravadas fora da interface (API de ingestão) só atualizam o
+        documento do ponto; uma leitura em lote mantém a cópia local em dia.
+        """
+        docs = self.backend.get_points(self.project_id, [point['id'] for point in points if point.get('id')])
+        for point in points:
+            doc = docs.get(point.get('id'))
+            if doc:
+                point['summary'] = doc.get('summary') or point.get('summary')
+                point['recent'] = doc.get('recent') or point.get('recent') or []
+                point['spc_state'] = doc.get('spc_state')
+
+    def query(self, point_id: str, start: Optional[str] = None, end: Optional[str] = None,
+              limit: Optional[int] = None, descending: bool = False) -> List[Dict]:
+        """Medições de um intervalo de datas (ISO), em ordem temporal"""
+        return self.backend.query(self.project_id, point_id, _key_bound(start),
+                                  _key_bound(end, upper=True), limit=limit, descending=descending)
+
+    def page(self, point_id: str, page_size: int = 20, cursor: Optional[str] = None,
+             descending: bool = True) -> Tuple[List[Dict], Optional[str]]:
+        """Página de medições; retorna (itens, cursor da próxima página)"""
+        items = self.backend.query(self.project_id, point_id, limit=page_size + 1,
+                                   start_after=cursor, descending=descending)
+        next_cursor = items[page_size - 1]['key'] if len(items) > page_size else None
+        return items[:page_size], next_cursor
+
+    def recent(self, point_id: str, limit: int = 500) -> List[Dict]:
+        """Últimas medições em ordem cronológica (para gráficos)"""
+        return self.query(point_id, limit=limit, descending=True)[::-1]
+
+    def aggregate(self, point_id: str, start: Optional[str] = None, end: Optional[str] = None) -> Dict:
+        """Contagem, soma e média no intervalo, calculadas no backend"""
+        return self.backend.aggregate(self.project_id, point_id, _key_bound(start), _key_bound(end, upper=True))
+
+    def migrate_legacy(self, point: Dict) -> bool:
+        """Move medições antigas (lista no documento do projeto) para a série"""
+        legacy = point.pop('measurements', None)
+        if not legacy:
+            return False
+
+        for measurement in legacy:
+            # Preservar a data informada quando o registro foi feito depois
+            if measurement.get('date') and not measurement.get('timestamp', '').startswith(measurement['date']):
+                measurement['timestamp'] = f"{measurement['date']}T00:00:00"
+            measurement.pop('id', None)
+
+        point['summary'] = empty_summary()
+        self.append_many(point, legacy)
+        return True
@@ -0,0 +1,168 @@
+"""
+Exploração multivariada: PCA + agrupamento (clusters)
+
+As variáveis são padronizadas, projetadas nas componentes principais e
+agrupadas por k-means. A variante é escolhida pelo formato dos dados: PCA
+randomizada para bases largas, IncrementalPCA em lotes e MiniBatchKMeans para
+muitas linhas. O resultado (escores, cargas, rótulos e perfis) fica em cache
+pela versão dos dados + parâmetros, então biplot e perfis são redesenhados sem
+reajustar. O número de threads do BLAS/OpenMP é limitado pela configuração.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.decomposition import PCA, IncrementalPCA
+from sklearn.metrics import silhouette_score
+from sklearn.preprocessing import StandardScaler
+from threadpoolctl import threadpool_limits
+
+try:
+    from src.utils.hypothesis_tests import dataset_version
+except ImportError:
+    from utils.hypothesis_tests import dataset_version
+
+
+CACHE_SIZE = 8
+
+# Acima destes limites usam-se as variantes aproximadas/em lotes
+WIDE_FEATURES = 50
+LARGE_ROWS = 100_000
+MINIBATCH_ROWS = 20_000
+BATCH_SIZE = 10_000
+
+SILHOUETTE_SAMPLE = 5000
+
+PCA_METHODS = {
+    'auto': "Automático",
+    'full': "PCA completa",
+    'randomized': "PCA randomizada",
+    'incremental': "PCA incremental (em lotes)"
+}
+
+_cache: OrderedDict = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class MultivariateError(ValueError):
+    """Dados insuficientes para a análise multivariada"""
+
+
+def choose_pca_method(n_rows: int, n_features: int) -> str:
+    if n_rows >= LARGE_ROWS:
+        return 'incremental'
+    if n_features >= WIDE_FEATURES:
+        return 'randomized'
+    return 'full'
+
+
+def _pca(X: np.ndarray, n_components: int, method: str):
+    if method == 'incremental':
+        model = IncrementalPCA(n_components=n_components, batch_size=max(BATCH_SIZE, n_components * 5))
+        for start in range(0, len(X), model.batch_size):
+            batch = X[start:start + model.batch_size]
+            if len(batch) >= n_components:
+                model.partial_fit(batch)
+    else:
+        model = PCA(n_components=n_components, svd_solver=method, random_state=0)
+        model.fit(X)
+    return model
+
+
+def _kmeans(X: np.ndarray, n_clusters: int):
+    if len(X) >= MINIBATCH_ROWS:
+        return MiniBatchKMeans(n_clusters=n_clusters, batch_size=4096, n_init=3, random_state=0).fit(X)
+    return KMeans(n_clusters=n_clusters, n_init=10, random_state=0).fit(X)
+
+
+def _explore(df: pd.DataFrame, columns: List[str], n_components: int, n_clusters: int, method: str) -> Dict:
+    data = df[columns].dropna()
+    if len(data) <= max(n_components, n_clusters):
+        raise MultivariateError(f"Linhas completas insuficientes ({len(data)}) para a análise")
+
+    X = StandardScaler().fit_transform(data.to_numpy(dtype=np.float64)).astype(np.float32)
+    n_components = min(n_components, len(columns))
+    method = choose_pca_method(*X.shape) if method == 'auto' else method
+    if method == 'randomized' and n_components >= min(X.shape):
+        method = 'full'
+
+    pca = _pca(X, n_components, method)
+    scores = pca.transform(X).astype(np.float32)
+
+    # Agrupamento no espaço das componentes (menos ruído e mais rápido que no espaço original)
+    kmeans = _kmeans(scores, n_clusters)
+    labels = kmeans.labels_.astype(np.int32)
+
+    sample = np.random.default_rng(0).choice(len(scores), min(len(scores), SILHOUETTE_SAMPLE), replace=False)
+    silhouette = (float(silhouette_score(scores[sample], labels[sample]))
+                  if len(np.unique(labels[sample])) > 1 else None)
+
+    profiles = data.groupby(labels).mean()
+    profiles.insert(0, 'Tamanho', np.bincount(labels, minlength=n_clusters)[profiles.index])
+    profiles.index = [f"Cluster {i + 1}" for i in profiles.index]
+
+    return {
+        'method': method,
+        'columns': columns,
+        'n': int(len(data)),
+        'index': data.index,
+        'scores': scores,
+        'labels': labels,
+        'loadings': pd.DataFrame(
+            pca.components_.T * np.sqrt(pca.explained_variance_)[None, :],
+            index=columns,
+            columns=[f"PC{i + 1}" for i in range(n_components)]
+        ),
+        'explained_variance': pca.explained_variance_ratio_.tolist(),
+        'clustering': 'MiniBatchKMeans' if isinstance(kmeans, MiniBatchKMeans) else 'KMeans',
+        'inertia': float(kmeans.inertia_),
+        'silhouette': silhouette,
+        'profiles': profiles,
+        'overall': data.agg(['mean', 'std'])
+    }
+
+
+def explore(df: pd.DataFrame, columns: List[str], n_components: int = 2, n_clusters: int = 3,
+            method: str = 'auto', n_threads: Optional[int] = None) -> Dict:
+    """
+    PCA + k-means sobre as colunas numéricas, em cache
+
+    Args:
+        method: 'auto', 'full', 'randomized' ou 'incremental'
+        n_threads: limite de threads do BLAS/OpenMP durante o ajuste
+
+    Returns:
+        {'scores', 'labels', 'loadings', 'explained_variance', 'profiles',
+         'silhouette', 'method', 'clustering', ...}
+
+    Raises:
+        MultivariateError: menos de duas colunas ou linhas insuficientes
+    """
+    if len(columns) < 2:
+        raise MultivariateError("Selecione ao menos duas variáveis numéricas")
+
+    key = (dataset_version(df, columns), n_components, n_clusters, method)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            return cached
+
+    with threadpool_limits(limits=n_threads):
+        result = _explore(df, columns, n_components, n_clusters, method)
+
+    with _cache_lock:
+        _cache[key] = result
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
+
+
+def standardized_profiles(result: Dict) -> pd.DataFrame:
+    """Médias dos clusters em desvios-padrão da média geral (para o mapa de calor)"""
+    overall = result['overall']
+    std = overall.loc['std'].replace(0, 1.0)
+    return (result['profiles'].drop(columns='Tamanho') - overall.loc['mean']) / std
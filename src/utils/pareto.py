@@ -0,0 +1,115 @@
+"""
+Análise de Pareto de dados categóricos (defeitos, causas, reclamações)
+
+Os dados são lidos uma única vez: um groupby sobre a categoria e todas as
+colunas de estratificação escolhidas gera a tabela agregada (ocorrências e
+soma do custo), que fica em cache pela versão dos dados. Trocar a
+estratificação, a medida ou o corte apenas reagrupa essa tabela pequena.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+try:
+    from src.utils.hypothesis_tests import dataset_version
+except ImportError:
+    from utils.hypothesis_tests import dataset_version
+
+
+DEFAULT_CUTOFF = 0.8
+CACHE_SIZE = 64
+EMPTY_LABEL = "(vazio)"
+OTHERS_LABEL = "Outros"
+
+_cache: OrderedDict = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def aggregate(df: pd.DataFrame, columns: List[str], weight: Optional[str] = None) -> pd.DataFrame:
+    """
+    Contagens (e custo) por combinação das colunas categóricas, em cache
+
+    Returns:
+        DataFrame com as colunas categóricas (texto), 'count' e 'weight'
+        (igual a count quando não há coluna de custo)
+    """
+    used = list(columns) + ([weight] if weight else [])
+    key = (dataset_version(df, used), tuple(columns), weight)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            return cached
+
+    labels = df[columns].astype(str).where(df[columns].notna(), EMPTY_LABEL)
+    if weight:
+        labels['_weight'] = pd.to_numeric(df[weight], errors='coerce').fillna(0.0)
+        table = labels.groupby(columns, sort=False).agg(count=('_weight', 'size'), weight=('_weight', 'sum'))
+    else:
+        table = labels.groupby(columns, sort=False).size().to_frame('count')
+        table['weight'] = table['count'].astype(float)
+    table = table.reset_index()
+
+    with _cache_lock:
+        _cache[key] = table
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return table
+
+
+def _cumulate(table: pd.DataFrame, value: str, cutoff: float, by: Optional[str] = None) -> pd.DataFrame:
+    """Percentual, acumulado e marcação dos "poucos vitais" (até atingir o corte)"""
+    group = table.groupby(by, sort=False)[value] if by else table[value]
+    total = group.transform('sum') if by else table[value].sum()
+    cumulative = group.cumsum()
+    table['percent'] = table[value] / total * 100
+    table['cumulative'] = cumulative / total * 100
+    # Vital: categorias cujo acumulado anterior ainda não atingiu o corte
+    previous = table['cumulative'] - table['percent']
+    table['vital'] = previous < cutoff * 100 - 1e-9
+    return table
+
+
+def pareto_table(aggregated: pd.DataFrame, category: str, measure: str = 'count',
+                 cutoff: float = DEFAULT_CUTOFF, filters: Optional[Dict[str, List[str]]] = None,
+                 max_categories: Optional[int] = None) -> pd.DataFrame:
+    """
+    Tabela de Pareto de uma categoria a partir da tabela agregada
+
+    Args:
+        measure: 'count' (ocorrências) ou 'weight' (custo)
+        filters: coluna de estratificação -> níveis mantidos
+        max_categories: categorias além desse número são somadas em "Outros"
+    """
+    data = aggregated
+    for column, levels in (filters or {}).items():
+        if levels:
+            data = data[data[column].isin(levels)]
+
+    table = (data.groupby(category, sort=False)[['count', 'weight']].sum()
+             .sort_values(measure, ascending=False).reset_index())
+
+    if max_categories and len(table) > max_categories:
+        head, tail = table.iloc[:max_categories], table.iloc[max_categories:]
+        others = pd.DataFrame([{category: OTHERS_LABEL, 'count': tail['count'].sum(), 'weight': tail['weight'].sum()}])
+        table = pd.concat([head, others], ignore_index=True)
+
+    return _cumulate(table, measure, cutoff)
+
+
+def stratified_pareto(aggregated: pd.DataFrame, category: str, stratum: str, measure: str = 'count',
+                      cutoff: float = DEFAULT_CUTOFF) -> pd.DataFrame:
+    """Pareto da categoria dentro de cada nível do estrato (um reagrupamento da tabela agregada)"""
+    table = aggregated.groupby([stratum, category], sort=False)[['count', 'weight']].sum().reset_index()
+    stratum_totals = table.groupby(stratum)[measure].transform('sum')
+    table = (table.assign(_total=stratum_totals)
+             .sort_values(['_total', stratum, measure], ascending=[False, True, False])
+             .drop(columns='_total').reset_index(drop=True))
+    return _cumulate(table, measure, cutoff, by=stratum)
+
+
+def vital_few(table: pd.DataFrame, category: str) -> List[str]:
+    """Categorias que compõem o corte (ex.: 80% do total)"""
+    return [c for c in table.loc[table['vital'], category].tolist() if c != OTHERS_LABEL]
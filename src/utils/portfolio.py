@@ -0,0 +1,86 @@
+"""
+Visão de portfólio dos pontos de controle
+
+Monta a tabela de todos os pontos de controle do usuário a partir dos
+documentos de ponto (resumo + últimas medições), sem ler os documentos dos
+projetos nem as séries de medições.
+"""
+import math
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    from src.utils.measurement_store import FirestoreMeasurementBackend, LocalMeasurementBackend, summary_std
+except ImportError:
+    from utils.measurement_store import FirestoreMeasurementBackend, LocalMeasurementBackend, summary_std
+
+
+STATUS_ORDER = {'ALERT': 0, 'WARNING': 1, 'OK': 2}
+STATUS_LABELS = {'ALERT': "🚨 Alerta", 'WARNING': "⚠️ Atenção", 'OK': "✅ OK"}
+
+
+def load_portfolio_points(db, user_uid: str) -> List[Dict]:
+    """Documentos de ponto do usuário em uma única consulta"""
+    backend = FirestoreMeasurementBackend(db) if db else LocalMeasurementBackend()
+    return backend.list_points(user_uid)
+
+
+def cpk(mean: float, std: float, lower: Optional[float], upper: Optional[float]) -> Optional[float]:
+    """Índice Cpk; None sem limites de especificação válidos ou sem variação"""
+    if lower is None or upper is None or upper <= lower or not std or std <= 0:
+        return None
+    return min(upper - mean, mean - lower) / (3 * std)
+
+
+def _recent_cpk(values: List[float], lower, upper) -> Optional[float]:
+    if len(values) < 2:
+        return None
+    return cpk(float(np.mean(values)), float(np.std(values, ddof=1)), lower, upper)
+
+
+def portfolio_frame(points: List[Dict], project_names: Dict[str, str]) -> pd.DataFrame:
+    """
+    Uma linha por ponto de controle, ordenada do pior para o melhor status
+
+    O Cpk geral vem do resumo acumulado (Welford); o recente, da janela de
+    últimas medições; a diferença entre eles indica a tendência.
+    """
+    rows = []
+    for point in points:
+        summary = point.get('summary') or {}
+        recent = point.get('recent') or []
+        values = [float(m['value']) for m in recent]
+        lower, upper = point.get('lower_limit'), point.get('upper_limit')
+
+        last_status = recent[-1]['status'] if recent else 'OK'
+        last_rules = (recent[-1].get('rules') or []) if recent else []
+
+        overall = cpk(summary.get('mean', 0.0), summary_std(summary), lower, upper) if summary.get('count') else None
+        current = _recent_cpk(values, lower, upper)
+        trend = current - overall if current is not None and overall is not None else None
+
+        rows.append({
+            'project_id': point.get('project_id'),
+            'Projeto': project_names.get(point.get('project_id'), point.get('project_id', '')),
+            'Ponto': point.get('name', ''),
+            'Unidade': point.get('unit', ''),
+            'Última': summary.get('last_value'),
+            'Status': STATUS_LABELS.get(last_status, last_status),
+            'Regras': ", ".join(str(r) for r in last_rules),
+            'Alertas': int(summary.get('alerts', 0)),
+            'Atenções': int(summary.get('warnings', 0)),
+            'Medições': int(summary.get('count', 0)),
+            'Cpk': round(overall, 2) if overall is not None and math.isfinite(overall) else None,
+            'Cpk recente': round(current, 2) if current is not None and math.isfinite(current) else None,
+            'Tendência': ('📈' if trend > 0.05 else '📉' if trend < -0.05 else '➡️') if trend is not None else '',
+            'Últimas medições': values,
+            '_order': STATUS_ORDER.get(last_status, 3),
+            'Atualizado': point.get('updated_at', '')
+        })
+
+    frame = pd.DataFrame(rows)
+    if frame.empty:
+        return frame
+    return frame.sort_values(['_order', 'Alertas'], ascending=[True, False]).drop(columns='_order').reset_index(drop=True)
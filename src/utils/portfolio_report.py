@@ -0,0 +1,167 @@
+"""
+Pacote de relatórios do portfólio (um relatório por projeto + consolidado)
+
+Os projetos vêm da projeção de resumo (ProjectManager.get_user_project_summaries),
+que já traz as flags de conclusão usadas nas estatísticas. Cada seção de
+projeto é gerada em paralelo com limite de threads e guardada no cache de
+resultados da fila de tarefas pela chave com updated_at: projetos sem
+alteração desde a última execução são reaproveitados, não regenerados. O
+resultado é um único ZIP com o consolidado e os relatórios individuais.
+"""
+import re
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from io import BytesIO
+from typing import Dict, List, Tuple
+
+import pandas as pd
+import plotly.graph_objects as go
+
+try:
+    from src.utils.formatters import format_currency
+    from src.utils.job_queue import cache_key
+    from src.utils.report_content import FOOTER, executive_report
+    from src.utils.report_export import bullets, export_report, figure, heading, paragraph, table
+except ImportError:
+    from utils.formatters import format_currency
+    from utils.job_queue import cache_key
+    from utils.report_content import FOOTER, executive_report
+    from utils.report_export import bullets, export_report, figure, heading, paragraph, table
+
+
+# Seções geradas ao mesmo tempo (cada uma já converte seus gráficos em paralelo)
+PORTFOLIO_WORKERS = 3
+
+SECTION_OPTIONS = {'charts': True, 'metrics': True, 'timeline': True, 'roi': True}
+
+STATUS_NAMES = {'active': 'Ativo', 'completed': 'Concluído', 'paused': 'Pausado'}
+
+
+def section_key(project: Dict, export_format: str) -> str:
+    return cache_key('portfolio_section', project, {'format': export_format, 'options': SECTION_OPTIONS})
+
+
+def bundle_key(entries: List[Dict], export_format: str) -> str:
+    """Chave do pacote: muda se qualquer projeto mudar (ou entrar/sair do portfólio)"""
+    signature = {'format': export_format, 'sections': sorted(entry['key'] for entry in entries)}
+    return cache_key('portfolio_bundle', {'id': 'all'}, signature)
+
+
+def rollup_row(project: Dict, stats: Dict, progress: float) -> Dict:
+    return {
+        'Projeto': project.get('name', ''),
+        'Status': STATUS_NAMES.get(project.get('status', 'active'), project.get('status', '')),
+        'Progresso (%)': round(progress, 1),
+        'Fases Completas': stats['completed_phases'],
+        'Ferramentas': f"{stats['completed_tools']}/{stats['total_tools']}",
+        'Economia Esperada': float(project.get('expected_savings', 0) or 0),
+        'Atualizado': str(project.get('updated_at', ''))[:10]
+    }
+
+
+def _section(entry: Dict, export_format: str) -> Dict:
+    title, blocks = executive_report(entry['project'], entry['stats'], entry['progress'], SECTION_OPTIONS)
+    return {
+        'row': rollup_row(entry['project'], entry['stats'], entry['progress']),
+        'export': export_report(title, blocks, export_format)
+    }
+
+
+def rollup_report(rows: List[Dict]) -> Tuple[str, List[Dict]]:
+    """Consolidado do portfólio: totais, tabela de projetos e gráficos"""
+    frame = pd.DataFrame(rows).sort_values('Progresso (%)', ascending=False)
+
+    progress = go.Figure(go.Bar(x=frame['Progresso (%)'], y=frame['Projeto'], orientation='h',
+                                marker_color='lightblue'))
+    progress.update_layout(title="Progresso por Projeto", xaxis_title="Progresso (%)", xaxis_range=[0, 100],
+                           yaxis_autorange='reversed', height=max(300, 40 * len(frame)))
+
+    savings = frame.groupby('Status')['Economia Esperada'].sum().reset_index()
+    by_status = go.Figure(go.Bar(x=savings['Status'], y=savings['Economia Esperada'], marker_color='lightgreen'))
+    by_status.update_layout(title="Economia Esperada por Status", yaxis_title="R$")
+
+    shown = frame.assign(**{'Economia Esperada': frame['Economia Esperada'].map(format_currency)})
+    blocks = [
+        paragraph(f"Gerado em: {datetime.now().strftime('%d/%m/%Y às %H:%M')}"),
+        heading("Resumo do Portfólio"),
+        bullets([
+            f"Projetos: {len(frame)}",
+            f"Concluídos: {int((frame['Progresso (%)'] == 100).sum())}",
+            f"Progresso Médio: {frame['Progresso (%)'].mean():.1f}%",
+            f"Economia Esperada Total: {format_currency(frame['Economia Esperada'].sum())}"
+        ]),
+        heading("Projetos"),
+        table(shown),
+        heading("Análise Visual"),
+        figure(progress, "Progresso de cada projeto"),
+        figure(by_status, "Economia esperada somada por status"),
+        paragraph(FOOTER)
+    ]
+    return f"Relatório de Portfólio - {datetime.now().strftime('%m/%Y')}", blocks
+
+
+def _file_name(index: int, name: str, extension: str) -> str:
+    slug = re.sub(r'[^\w\-]+', '_', name, flags=re.UNICODE).strip('_') or 'Projeto'
+    return f"{index:02d}_{slug[:60]}.{extension}"
+
+
+def portfolio_job(context, entries: List[Dict], export_format: str, cache,
+                  workers: int = PORTFOLIO_WORKERS) -> Dict:
+    """
+    Tarefa da fila: gera as seções que mudaram e monta o ZIP
+
+    Args:
+        entries: [{'key', 'project', 'stats', 'progress'}] (stats/progress só
+            precisam existir para projetos alterados)
+        cache: objeto com cached_result/store_result (a JobQueue)
+
+    Returns:
+        {'data': bytes do ZIP, 'extension', 'mime', 'projects', 'generated', 'skipped'}
+    """
+    sections: Dict[str, Dict] = {}
+    changed = []
+    for entry in entries:
+        cached = cache.cached_result(entry['key'])
+        if cached is not None:
+            sections[entry['key']] = cached
+        else:
+            changed.append(entry)
+
+    total = max(len(changed), 1)
+    context.update(0.05, f"{len(entries) - len(changed)} projeto(s) sem alteração reaproveitado(s)")
+
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="portfolio")
+    try:
+        futures = {pool.submit(_section, entry, export_format): entry for entry in changed}
+        for done, future in enumerate(as_completed(futures), start=1):
+            entry = futures[future]
+            section = future.result()
+            cache.store_result(entry['key'], section)
+            sections[entry['key']] = section
+            context.update(0.05 + 0.85 * done / total,
+                           f"{done}/{len(changed)} projeto(s) gerado(s): {entry['project'].get('name', '')}")
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    ordered = [sections[entry['key']] for entry in entries]
+    title, blocks = rollup_report([section['row'] for section in ordered])
+    rollup = export_report(title, blocks, export_format,
+                           checkpoint=lambda fraction, message: context.update(0.9 + 0.05 * fraction, message))
+
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as bundle:
+        bundle.writestr(_file_name(0, 'Consolidado_Portfolio', rollup['extension']), rollup['data'])
+        for index, section in enumerate(ordered, start=1):
+            export = section['export']
+            bundle.writestr(_file_name(index, section['row']['Projeto'], export['extension']), export['data'])
+
+    return {
+        'data': buffer.getvalue(),
+        'extension': 'zip',
+        'mime': 'application/zip',
+        'figures': 0,
+        'projects': len(entries),
+        'generated': len(changed),
+        'skipped': len(entries) - len(changed)
+    }
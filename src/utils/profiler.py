@@ -0,0 +1,170 @@
+"""
+Instrumentação de tempo: etapas do app, páginas e chamadas ao Firestore
+
+Cada rerun do Streamlit abre um registro (start_rerun/finish_rerun) e os
+trechos medidos com timed()/profiled() entram nele e nos acumulados do
+processo (contagem, soma e máximo por nome). Os dados ficam em memória, são
+exibidos no painel oculto de profiling e podem ser exportados em JSON ou no
+formato texto do Prometheus para um arquivo local.
+
+Desative com GB_PROFILING=0.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+
+ENABLED = os.getenv("GB_PROFILING", "1") != "0"
+
+# Reruns completos mantidos para o painel
+RECENT_RERUNS = 50
+
+KINDS = {
+    'stage': "Etapa do app",
+    'page': "Página/ferramenta",
+    'firestore': "Firestore"
+}
+
+_stats: Dict[tuple, Dict] = {}
+_reruns: deque = deque(maxlen=RECENT_RERUNS)
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def _record(kind: str, name: str, seconds: float):
+    with _lock:
+        stat = _stats.get((kind, name))
+        if stat is None:
+            stat = _stats[(kind, name)] = {'kind': kind, 'name': name, 'count': 0, 'total': 0.0, 'max': 0.0}
+        stat['count'] += 1
+        stat['total'] += seconds
+        stat['max'] = max(stat['max'], seconds)
+        stat['last'] = seconds
+
+    rerun = getattr(_local, 'rerun', None)
+    if rerun is not None:
+        rerun['spans'].append({'kind': kind, 'name': name, 'seconds': seconds})
+
+
+@contextmanager
+def timed(name: str, kind: str = 'stage'):
+    """Mede o bloco (também quando ele levanta exceção)"""
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(kind, name, time.perf_counter() - start)
+
+
+def profiled(name: Optional[str] = None, kind: str = 'stage') -> Callable:
+    """Decorador: mede cada chamada da função"""
+    def decorator(function: Callable) -> Callable:
+        label = name or function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with timed(label, kind):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def start_rerun(label: str = ""):
+    """Abre o registro do rerun da thread atual (uma sessão Streamlit por thread)"""
+    if ENABLED:
+        _local.rerun = {'label': label, 'started_at': datetime.now().isoformat(),
+                        'start': time.perf_counter(), 'spans': []}
+
+
+def finish_rerun():
+    rerun = getattr(_local, 'rerun', None)
+    if rerun is None:
+        return
+    _local.rerun = None
+    seconds = time.perf_counter() - rerun.pop('start')
+    _record('stage', 'rerun', seconds)
+    rerun['seconds'] = seconds
+    with _lock:
+        _reruns.append(rerun)
+
+
+def stats(kind: Optional[str] = None) -> List[Dict]:
+    """Acumulados por nome, do maior tempo total para o menor"""
+    with _lock:
+        rows = [dict(stat, mean=stat['total'] / stat['count']) for stat in _stats.values()
+                if kind is None or stat['kind'] == kind]
+    return sorted(rows, key=lambda row: row['total'], reverse=True)
+
+
+def recent_reruns() -> List[Dict]:
+    with _lock:
+        return list(reversed(_reruns))
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+        _reruns.clear()
+
+
+def to_json() -> str:
+    return json.dumps({
+        'generated_at': datetime.now().isoformat(),
+        'stats': stats(),
+        'reruns': recent_reruns()
+    }, ensure_ascii=False, indent=2)
+
+
+def _label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+
+def to_prometheus() -> str:
+    """Formato texto de exposição do Prometheus (summary sem quantis + máximo)"""
+    rows = stats()
+    lines = [
+        "# HELP greenbelt_span_seconds Tempo de parede por etapa, página ou chamada ao Firestore",
+        "# TYPE greenbelt_span_seconds summary"
+    ]
+    for row in rows:
+        labels = f'kind="{_label(row["kind"])}",name="{_label(row["name"])}"'
+        lines.append(f"greenbelt_span_seconds_sum{{{labels}}} {row['total']:.6f}")
+        lines.append(f"greenbelt_span_seconds_count{{{labels}}} {row['count']}")
+    lines += [
+        "# HELP greenbelt_span_seconds_max Maior tempo observado",
+        "# TYPE greenbelt_span_seconds_max gauge"
+    ]
+    for row in rows:
+        labels = f'kind="{_label(row["kind"])}",name="{_label(row["name"])}"'
+        lines.append(f"greenbelt_span_seconds_max{{{labels}}} {row['max']:.6f}")
+    return "\n".join(lines) + "\n"
+
+
+def export(fmt: str = 'json', path: Optional[str] = None) -> str:
+    """
+    Grava o snapshot em arquivo local
+
+    Args:
+        fmt: 'json' ou 'prometheus'
+        path: destino (padrão: GB_PROFILING_DIR/greenbelt_profile.{json,prom})
+
+    Returns:
+        caminho gravado
+    """
+    content = to_prometheus() if fmt == 'prometheus' else to_json()
+    if path is None:
+        directory = os.getenv("GB_PROFILING_DIR", "profiling")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"greenbelt_profile.{'prom' if fmt == 'prometheus' else 'json'}")
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(content)
+    return path
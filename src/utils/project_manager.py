@@ -8,6 +8,26 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 from config.firebase_config import initialize_firebase
 
+try:
+    from src.utils.profiler import profiled
+except ImportError:
+    from utils.profiler import profiled
+
+# Ferramentas reais de cada fase (as que contam no progresso)
+PHASE_TOOLS = {
+    'define': ['charter', 'stakeholders', 'voc', 'sipoc', 'timeline'],
+    'measure': ['data_collection_plan', 'baseline_data', 'msa', 'process_capability', 'file_upload'],
+    'analyze': ['statistical_analysis', 'root_cause_analysis'],
+    'improve': ['solutions', 'action_plan', 'pilot_results', 'implementation', 'validation'],
+    'control': ['control_plan', 'documentation']
+}
+
+# Campos lidos na projeção de resumo (portfólio): cadastro + flags de conclusão
+PROJECT_SUMMARY_FIELDS = [
+    'id', 'name', 'description', 'status', 'expected_savings', 'start_date', 'target_end_date',
+    'created_at', 'updated_at', 'measure.file_upload.data.dataset_info'
+] + [f"{phase}.{tool}.completed" for phase, tools in PHASE_TOOLS.items() for tool in tools]
+
 class ProjectManager:
     def __init__(self):
         self.db = initialize_firebase()
@@ -117,6 +137,7 @@ class ProjectManager:
             st.error(f"Erro ao restaurar DataFrame: {str(e)}")
             return pd.DataFrame()
     
+    @profiled('create_project', kind='firestore')
     def create_project(self, user_uid: str, project_data: Dict) -> tuple[bool, str]:
         """Cria um novo projeto"""
         try:
@@ -235,6 +256,7 @@ class ProjectManager:
             else:
                 return False, f"Erro interno: {error_msg}"
     
+    @profiled('get_user_projects', kind='firestore')
     def get_user_projects(self, user_uid: str) -> List[Dict]:
         """Obtém todos os projetos do usuário"""
         try:
@@ -261,6 +283,37 @@ class ProjectManager:
             st.error(f"❌ Erro ao carregar projetos: {str(e)}")
             return []
     
+    @profiled('get_user_project_summaries', kind='firestore')
+    def get_user_project_summaries(self, user_uid: str) -> List[Dict]:
+        """
+        Resumo dos projetos do usuário numa única consulta com projeção
+        
+        Lê apenas PROJECT_SUMMARY_FIELDS (cadastro, updated_at e flags de
+        conclusão das ferramentas): o suficiente para estatísticas e
+        relatórios de portfólio sem baixar dados das ferramentas e uploads.
+        """
+        try:
+            if not self.db or not user_uid:
+                return []
+            
+            query = (self.db.collection('projects')
+                     .where('user_uid', '==', user_uid)
+                     .select(PROJECT_SUMMARY_FIELDS))
+            
+            projects = []
+            for doc in query.stream():
+                project_data = doc.to_dict() or {}
+                project_data['id'] = doc.id
+                projects.append(project_data)
+            
+            projects.sort(key=lambda x: x.get('created_at', ''), reverse=True)
+            return projects
+            
+        except Exception as e:
+            st.error(f"❌ Erro ao carregar projetos: {str(e)}")
+            return []
+    
+    @profiled('get_project', kind='firestore')
     def get_project(self, project_id: str) -> Optional[Dict]:
         """Obtém um projeto específico com sincronização completa"""
         try:
@@ -293,6 +346,7 @@ class ProjectManager:
             st.error(f"Erro ao carregar projeto: {str(e)}")
             return None
     
+    @profiled('update_project', kind='firestore')
     def update_project(self, project_id: str, updates: Dict) -> bool:
         """Atualiza dados do projeto com sincronização melhorada"""
         try:
@@ -332,6 +386,7 @@ class ProjectManager:
             st.error(f"Erro ao atualizar projeto: {str(e)}")
             return False
     
+    @profiled('delete_project', kind='firestore')
     def delete_project(self, project_id: str, user_uid: str = None) -> bool:
         """Deleta um projeto"""
         try:
@@ -376,6 +431,7 @@ class ProjectManager:
             st.error(f"Erro ao deletar projeto: {str(e)}")
             return False
     
+    @profiled('save_uploaded_data', kind='firestore')
     def save_uploaded_data(self, project_id: str, dataframe: pd.DataFrame, filename: str, 
                           additional_info: Dict = None) -> bool:
         """Salva dados de upload no projeto com tratamento robusto de tipos"""
@@ -451,6 +507,7 @@ class ProjectManager:
             st.error(f"❌ Erro ao salvar dados de upload: {str(e)}")
             return False
     
+    @profiled('get_uploaded_data', kind='firestore')
     def get_uploaded_data(self, project_id: str) -> Optional[pd.DataFrame]:
         """Recupera dados de upload com fallback para Firebase"""
         # Primeiro tentar session state
@@ -559,16 +616,7 @@ class ProjectManager:
         total_items = 0
         completed_items = 0
         
-        # Definir explicitamente quais ferramentas existem em cada fase
-        phase_tools = {
-            'define': ['charter', 'stakeholders', 'voc', 'sipoc', 'timeline'],
-            'measure': ['data_collection_plan', 'baseline_data', 'msa', 'process_capability', 'file_upload'],
-            'analyze': ['statistical_analysis', 'root_cause_analysis'],  # ← CORRIGIDO: apenas 2 ferramentas
-            'improve': ['solutions', 'action_plan', 'pilot_results', 'implementation', 'validation'],
-            'control': ['control_plan', 'documentation']  # ← CORRIGIDO: apenas 2 ferramentas
-        }
-        
-        for phase, tools in phase_tools.items():
+        for phase, tools in PHASE_TOOLS.items():
             phase_data = project_data.get(phase, {})
             
             for tool in tools:
@@ -580,8 +628,13 @@ class ProjectManager:
         
         return (completed_items / total_items) * 100 if total_items > 0 else 0
     
-    def get_project_statistics(self, project_data: Dict) -> Dict:
-        """Obtém estatísticas detalhadas do projeto"""
+    def get_project_statistics(self, project_data: Dict, check_upload: bool = True) -> Dict:
+        """
+        Obtém estatísticas detalhadas do projeto
+        
+        Com check_upload=False a disponibilidade de dados vem do próprio
+        documento (sem consultar sessão/Firebase), para uso em lote.
+        """
         stats = {
             'total_phases': 5,
             'completed_phases': 0,
@@ -592,16 +645,7 @@ class ProjectManager:
             'data_info': None
         }
         
-        # Definir ferramentas reais de cada fase
-        phase_tools = {
-            'define': ['charter', 'stakeholders', 'voc', 'sipoc', 'timeline'],
-            'measure': ['data_collection_plan', 'baseline_data', 'msa', 'process_capability', 'file_upload'],
-            'analyze': ['statistical_analysis', 'root_cause_analysis'],
-            'improve': ['solutions', 'action_plan', 'pilot_results', 'implementation', 'validation'],
-            'control': ['control_plan', 'documentation']
-        }
-        
-        for phase, tools in phase_tools.items():
+        for phase, tools in PHASE_TOOLS.items():
             phase_data = project_data.get(phase, {})
             phase_total = len(tools)
             phase_completed = 0
@@ -626,7 +670,11 @@ class ProjectManager:
         
         # Verificar dados carregados
         project_id = project_data.get('id')
-        if project_id:
+        if not check_upload:
+            upload_info = project_data.get('measure', {}).get('file_upload', {}).get('data', {}).get('dataset_info')
+            stats['has_uploaded_data'] = bool(upload_info)
+            stats['data_info'] = upload_info
+        elif project_id:
             upload_info = self.get_upload_info(project_id)
             if upload_info:
                 stats['has_uploaded_data'] = True
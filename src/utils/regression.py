@@ -0,0 +1,288 @@
+"""
+Regressão linear múltipla
+
+Fórmulas no estilo "y ~ a + b + a:b" (a*b expande para a + b + a:b; colunas
+não numéricas viram variáveis indicadoras). O ajuste usa mínimos quadrados por
+decomposição QR, opcionalmente em float32 para bases grandes (1M+ linhas), e
+fica em cache pela versão dos dados + fórmula: a seleção stepwise e as
+reexecuções da página reaproveitam os ajustes já feitos.
+"""
+import re
+import threading
+from collections import OrderedDict
+from itertools import combinations
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+from scipy.linalg import solve_triangular
+
+try:
+    from src.utils.hypothesis_tests import dataset_version
+except ImportError:
+    from utils.hypothesis_tests import dataset_version
+
+
+CACHE_SIZE = 256
+
+# Pontos (ajustado, resíduo) guardados para os gráficos de diagnóstico
+RESIDUAL_SAMPLE = 2000
+
+_cache: OrderedDict = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class RegressionError(ValueError):
+    """Modelo que não pode ser ajustado (dados insuficientes, colinearidade...)"""
+
+
+def parse_formula(formula: str) -> Tuple[str, List[str]]:
+    """Separa resposta e termos; a*b vira a + b + a:b"""
+    if '~' not in formula:
+        raise RegressionError("Fórmula deve ter o formato 'resposta ~ termos'")
+    response, rhs = (part.strip() for part in formula.split('~', 1))
+
+    terms: List[str] = []
+    for chunk in re.split(r'\s*\+\s*', rhs):
+        if not chunk or chunk == '1':
+            continue
+        factors = [f.strip() for f in chunk.split('*')]
+        if len(factors) == 1:
+            expanded = [chunk]
+        else:
+            expanded = [
+                ':'.join(combo)
+                for size in range(1, len(factors) + 1) for combo in combinations(factors, size)
+            ]
+        terms.extend(term for term in expanded if term not in terms)
+    return response, terms
+
+
+def build_formula(response: str, terms: List[str]) -> str:
+    return f"{response} ~ {' + '.join(terms) if terms else '1'}"
+
+
+def _variables(terms: List[str]) -> List[str]:
+    return list(dict.fromkeys(var for term in terms for var in term.split(':')))
+
+
+def _encode(column: pd.Series, dtype) -> Tuple[np.ndarray, List[str]]:
+    """Coluna numérica como está; categórica em indicadoras (primeiro nível como referência)"""
+    if pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column):
+        return column.to_numpy(dtype=dtype)[:, None], [column.name]
+    dummies = pd.get_dummies(column.astype(str), prefix=column.name, prefix_sep='[', drop_first=True, dtype=dtype)
+    return dummies.to_numpy(), [f"{name}]" for name in dummies.columns]
+
+
+def design_matrix(data: pd.DataFrame, terms: List[str], dtype=np.float64) -> Tuple[np.ndarray, List[str], List[str]]:
+    """
+    Matriz do modelo com intercepto
+
+    Returns:
+        (X, nomes das colunas, termo de origem de cada coluna)
+    """
+    encoded = {var: _encode(data[var], dtype) for var in _variables(terms)}
+    blocks = [np.ones((len(data), 1), dtype=dtype)]
+    names, owners = ['Intercepto'], ['Intercepto']
+
+    for term in terms:
+        parts = [encoded[var] for var in term.split(':')]
+        matrix, labels = parts[0]
+        for other, other_labels in parts[1:]:
+            matrix = (matrix[:, :, None] * other[:, None, :]).reshape(len(data), -1)
+            labels = [f"{a}:{b}" for a in labels for b in other_labels]
+        blocks.append(matrix)
+        names.extend(labels)
+        owners.extend([term] * len(labels))
+
+    return np.hstack(blocks), names, owners
+
+
+def _vif(X: np.ndarray) -> np.ndarray:
+    """VIF de cada coluna (sem intercepto) pela diagonal da inversa da matriz de correlação"""
+    if X.shape[1] < 2:
+        return np.ones(X.shape[1])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = np.corrcoef(X.astype(np.float64, copy=False), rowvar=False)
+        return np.diag(np.linalg.pinv(np.atleast_2d(corr)))
+
+
+def _fit(data: pd.DataFrame, response: str, terms: List[str], dtype) -> Dict:
+    columns = list(dict.fromkeys([response] + _variables(terms)))
+    data = data[columns].dropna()
+    X, names, owners = design_matrix(data, terms, dtype)
+    y = data[response].to_numpy(dtype=dtype)
+    n, p = X.shape
+
+    if n <= p:
+        raise RegressionError(f"Observações insuficientes ({n}) para {p} coeficientes")
+
+    q, r = np.linalg.qr(X)
+    # |r_jj| / ||x_j||: seno do ângulo entre a coluna j e as anteriores
+    independence = np.abs(np.diag(r)) / np.maximum(np.linalg.norm(X, axis=0), np.finfo(r.dtype).tiny)
+    aliased = [names[i] for i in np.flatnonzero(independence < np.sqrt(np.finfo(r.dtype).eps))]
+    if aliased:
+        raise RegressionError(f"Termos colineares (aliased): {', '.join(aliased)}")
+
+    beta = solve_triangular(r, q.T @ y).astype(np.float64)
+    residuals = (y - X @ beta.astype(dtype)).astype(np.float64)
+    rss = float(residuals @ residuals)
+    y64 = y.astype(np.float64)
+    tss = float(((y64 - y64.mean()) ** 2).sum())
+
+    df_resid = n - p
+    sigma2 = rss / df_resid
+    r_inv = solve_triangular(r.astype(np.float64), np.eye(p))
+    se = np.sqrt(np.sum(r_inv ** 2, axis=1) * sigma2)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t_stat = beta / se
+        p_values = 2 * stats.t.sf(np.abs(t_stat), df_resid)
+        r2 = 1 - rss / tss if tss > 0 else np.nan
+        adj_r2 = 1 - (1 - r2) * (n - 1) / df_resid
+        f_stat = ((tss - rss) / (p - 1)) / sigma2 if p > 1 else np.nan
+        f_p = stats.f.sf(f_stat, p - 1, df_resid) if p > 1 else np.nan
+
+    vif = np.concatenate([[np.nan], _vif(X[:, 1:])]) if p > 1 else np.array([np.nan])
+
+    sample = np.unique(np.linspace(0, n - 1, min(n, RESIDUAL_SAMPLE)).astype(int))
+    fitted = y64[sample] - residuals[sample]
+
+    def clean(value):
+        value = float(value)
+        return value if np.isfinite(value) else None
+
+    return {
+        'formula': build_formula(response, terms),
+        'response': response,
+        'terms': terms,
+        'dtype': np.dtype(dtype).name,
+        'n': int(n),
+        'df_resid': int(df_resid),
+        'rss': rss,
+        'sigma': float(np.sqrt(sigma2)),
+        'r2': clean(r2),
+        'adj_r2': clean(adj_r2),
+        'f_stat': clean(f_stat),
+        'f_p_value': clean(f_p),
+        'coefficients': [
+            {'name': names[i], 'term': owners[i], 'coef': clean(beta[i]), 'se': clean(se[i]),
+             't': clean(t_stat[i]), 'p_value': clean(p_values[i]), 'vif': clean(vif[i])}
+            for i in range(p)
+        ],
+        'residual_sample': {
+            'fitted': fitted.tolist(),
+            'residual': residuals[sample].tolist()
+        }
+    }
+
+
+def fit_model(df: pd.DataFrame, formula: str, float32: bool = False) -> Dict:
+    """
+    Ajusta (ou recupera do cache) um modelo linear
+
+    Raises:
+        RegressionError: fórmula inválida, dados insuficientes ou termos colineares
+    """
+    response, terms = parse_formula(formula)
+    columns = list(dict.fromkeys([response] + _variables(terms)))
+    missing = [c for c in columns if c not in df.columns]
+    if missing:
+        raise RegressionError(f"Colunas não encontradas: {', '.join(missing)}")
+
+    dtype = np.float32 if float32 else np.float64
+    key = (dataset_version(df, columns), build_formula(response, terms), np.dtype(dtype).name)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            return cached
+
+    result = _fit(df, response, terms, dtype)
+
+    with _cache_lock:
+        _cache[key] = result
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
+
+
+def _partial_f(reduced: Dict, full: Dict) -> float:
+    """p-valor do teste F parcial entre modelos aninhados (mesmas linhas)"""
+    df_num = reduced['df_resid'] - full['df_resid']
+    if df_num <= 0 or full['df_resid'] <= 0:
+        return 1.0
+    f_stat = ((reduced['rss'] - full['rss']) / df_num) / (full['rss'] / full['df_resid'])
+    return float(stats.f.sf(f_stat, df_num, full['df_resid'])) if np.isfinite(f_stat) else 1.0
+
+
+def stepwise(df: pd.DataFrame, response: str, candidates: List[str], alpha_in: float = 0.05,
+             alpha_out: float = 0.10, float32: bool = False, max_steps: int = 50) -> Dict:
+    """
+    Seleção stepwise (entrada/saída por teste F parcial)
+
+    As linhas com valores ausentes em qualquer candidato são removidas antes,
+    para que os modelos comparados sejam aninhados.
+
+    Returns:
+        {'terms': termos selecionados, 'history': passos, 'model': ajuste final}
+    """
+    data = df[list(dict.fromkeys([response] + _variables(candidates)))].dropna()
+    selected: List[str] = []
+    history: List[Dict] = []
+
+    current = fit_model(data, build_formula(response, selected), float32)
+    for _ in range(max_steps):
+        # Entrada: candidato com menor p-valor
+        entering = []
+        for term in candidates:
+            if term in selected:
+                continue
+            if ':' in term and any(part not in selected for part in term.split(':')):
+                continue  # interação só entra depois dos efeitos principais
+            try:
+                model = fit_model(data, build_formula(response, selected + [term]), float32)
+            except RegressionError:
+                continue
+            entering.append((_partial_f(current, model), term, model))
+
+        changed = False
+        if entering:
+            p_value, term, model = min(entering, key=lambda item: item[0])
+            if p_value < alpha_in:
+                selected.append(term)
+                current = model
+                history.append({'step': len(history) + 1, 'action': 'entrada', 'term': term, 'p_value': p_value})
+                changed = True
+
+        # Saída: termo selecionado com maior p-valor
+        leaving = []
+        for term in selected:
+            reduced_terms = [t for t in selected if t != term]
+            if any(term in t.split(':') for t in reduced_terms if ':' in t):
+                continue  # mantém efeitos principais de interações selecionadas
+            reduced = fit_model(data, build_formula(response, reduced_terms), float32)
+            leaving.append((_partial_f(reduced, current), term, reduced))
+
+        if leaving:
+            p_value, term, reduced = max(leaving, key=lambda item: item[0])
+            if p_value > alpha_out:
+                selected.remove(term)
+                current = reduced
+                history.append({'step': len(history) + 1, 'action': 'saída', 'term': term, 'p_value': p_value})
+                changed = True
+
+        if not changed:
+            break
+
+    return {'terms': selected, 'history': history, 'model': current}
+
+
+def coefficients_frame(model: Dict) -> pd.DataFrame:
+    """Tabela de coeficientes para exibição"""
+    return pd.DataFrame([
+        {'Termo': c['name'], 'Coeficiente': c['coef'], 'Erro padrão': c['se'], 't': c['t'],
+         'p-valor': c['p_value'], 'VIF': c['vif']}
+        for c in model['coefficients']
+    ])
@@ -0,0 +1,234 @@
+"""
+Conteúdo dos relatórios do projeto em blocos exportáveis
+
+Monta executivo, por fase e customizado a partir do documento do projeto e
+das estatísticas do ProjectManager (get_project_statistics), sem Streamlit,
+para que a página de relatórios e exportações em lote usem o mesmo conteúdo.
+"""
+import json
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+import plotly.graph_objects as go
+
+try:
+    from src.utils.formatters import format_currency, format_date_br
+    from src.utils.report_export import bullets, figure, heading, paragraph, table
+except ImportError:
+    from utils.formatters import format_currency, format_date_br
+    from utils.report_export import bullets, figure, heading, paragraph, table
+
+
+PHASES = ['define', 'measure', 'analyze', 'improve', 'control']
+
+PHASE_TITLES = {
+    'define': 'Define - Definição do Projeto',
+    'measure': 'Measure - Medição e Coleta de Dados',
+    'analyze': 'Analyze - Análise Estatística',
+    'improve': 'Improve - Implementação de Melhorias',
+    'control': 'Control - Controle e Sustentação'
+}
+
+# Linhas de dados brutos incluídas no relatório
+DATA_ROWS = 50
+
+FOOTER = "Relatório gerado automaticamente pelo Sistema Green Belt Six Sigma"
+
+
+def progress_figures(stats: Dict) -> List[go.Figure]:
+    """Progresso por fase (barras) e status das ferramentas (pizza)"""
+    bar = go.Figure(data=[
+        go.Bar(x=[p.title() for p in PHASES],
+               y=[stats['phase_progress'][p]['progress'] for p in PHASES],
+               marker_color='lightblue')
+    ])
+    bar.update_layout(title="Progresso por Fase DMAIC", xaxis_title="Fase", yaxis_title="Progresso (%)",
+                      yaxis_range=[0, 100])
+
+    completed = stats['completed_tools']
+    pie = go.Figure(data=[
+        go.Pie(labels=['Completas', 'Pendentes'], values=[completed, stats['total_tools'] - completed],
+               marker_colors=['lightgreen', 'lightcoral'])
+    ])
+    pie.update_layout(title="Status das Ferramentas")
+    return [bar, pie]
+
+
+def _generated_at() -> Dict:
+    return paragraph(f"Gerado em: {datetime.now().strftime('%d/%m/%Y às %H:%M')}")
+
+
+def _conclusion(progress: float) -> str:
+    if progress == 100:
+        return "Projeto Concluído - Todas as fases e ferramentas foram completadas."
+    if progress >= 75:
+        return "Projeto em Fase Final - Últimas etapas em andamento."
+    if progress >= 50:
+        return "Projeto em Andamento - Metade do caminho percorrido."
+    return "Projeto Inicial - Primeiras fases em desenvolvimento."
+
+
+def _summary(project: Dict, progress: float) -> List[Dict]:
+    return [
+        heading("Resumo Executivo"),
+        bullets([
+            f"Projeto: {project.get('name', '')}",
+            f"Objetivo: {project.get('description') or 'Não informado'}",
+            f"Status: {project.get('status', 'active').title()}",
+            f"Progresso: {progress:.1f}%",
+            f"Economia Esperada: {format_currency(project.get('expected_savings', 0))}"
+        ])
+    ]
+
+
+def _metrics(stats: Dict, progress: float) -> List[Dict]:
+    rows = [
+        {'Fase': p.title(), 'Progresso (%)': f"{stats['phase_progress'][p]['progress']:.1f}",
+         'Ferramentas': f"{stats['phase_progress'][p]['completed']}/{stats['phase_progress'][p]['total']}"}
+        for p in PHASES
+    ]
+    return [
+        heading("Métricas Principais"),
+        bullets([
+            f"Fases Completas: {stats['completed_phases']}/5",
+            f"Ferramentas Completas: {stats['completed_tools']}/{stats['total_tools']}",
+            f"Progresso Geral: {progress:.1f}%",
+            f"Dados: {'Disponíveis' if stats['has_uploaded_data'] else 'Pendente'}"
+        ]),
+        table(pd.DataFrame(rows))
+    ]
+
+
+def _charts(stats: Dict) -> List[Dict]:
+    bar, pie = progress_figures(stats)
+    return [heading("Análise Visual"), figure(bar, "Progresso por fase DMAIC"),
+            figure(pie, "Ferramentas completas e pendentes")]
+
+
+def _timeline(project: Dict) -> List[Dict]:
+    start, target = project.get('start_date', ''), project.get('target_end_date', '')
+    items = [
+        f"Início: {format_date_br(start) if start else 'Não definido'}",
+        f"Conclusão Prevista: {format_date_br(target) if target else 'Não definida'}"
+    ]
+    if start and target:
+        try:
+            duration = (datetime.fromisoformat(target.replace('Z', '+00:00'))
+                        - datetime.fromisoformat(start.replace('Z', '+00:00'))).days
+            items.append(f"Duração: {duration} dias")
+        except (ValueError, TypeError):
+            pass
+    return [heading("Cronograma do Projeto"), bullets(items)]
+
+
+def _roi(project: Dict) -> List[Dict]:
+    return [
+        heading("Retorno sobre Investimento (ROI)"),
+        paragraph(f"Economia Esperada: {format_currency(project.get('expected_savings', 0))}"),
+        paragraph("Os valores de investimento e ROI podem ser configurados nas ferramentas específicas do projeto.")
+    ]
+
+
+def _tool_fields(data: Dict) -> pd.DataFrame:
+    """Campos de uma ferramenta como tabela Campo/Valor (estruturas aninhadas resumidas em JSON)"""
+    rows = []
+    for field, value in data.items():
+        if isinstance(value, (dict, list)):
+            value = json.dumps(value, ensure_ascii=False, default=str)
+            value = value if len(value) <= 200 else value[:197] + '...'
+        rows.append({'Campo': field.replace('_', ' ').title(), 'Valor': value})
+    return pd.DataFrame(rows, columns=['Campo', 'Valor'])
+
+
+def _phase(project: Dict, phase: str, stats: Dict, details: bool = True, level: int = 1) -> List[Dict]:
+    phase_stats = stats['phase_progress'].get(phase, {})
+    progress = phase_stats.get('progress', 0)
+    status = "Concluída" if progress == 100 else "Em Andamento" if progress > 0 else "Não Iniciada"
+    blocks = [
+        heading(PHASE_TITLES[phase], level),
+        bullets([
+            f"Progresso: {progress:.1f}%",
+            f"Ferramentas Completadas: {phase_stats.get('completed', 0)}/{phase_stats.get('total', 0)}",
+            f"Status: {status}"
+        ])
+    ]
+
+    tools = {name: data for name, data in project.get(phase, {}).items() if isinstance(data, dict)}
+    if tools:
+        blocks.append(table(pd.DataFrame([
+            {'Ferramenta': name.replace('_', ' ').title(),
+             'Status': 'Concluída' if data.get('completed') else 'Pendente'}
+            for name, data in tools.items()
+        ])))
+
+    if details:
+        for name, data in tools.items():
+            fields = data.get('data') if data.get('completed') else None
+            if isinstance(fields, dict) and fields:
+                blocks.append(heading(name.replace('_', ' ').title(), level + 1))
+                blocks.append(table(_tool_fields(fields)))
+    return blocks
+
+
+def executive_report(project: Dict, stats: Dict, progress: float, options: Dict) -> Tuple[str, List[Dict]]:
+    """Relatório executivo; options: {'charts', 'metrics', 'timeline', 'roi'}"""
+    blocks = [_generated_at()] + _summary(project, progress)
+    if options.get('metrics'):
+        blocks += _metrics(stats, progress)
+    if options.get('charts'):
+        blocks += _charts(stats)
+    if options.get('timeline'):
+        blocks += _timeline(project)
+    if options.get('roi'):
+        blocks += _roi(project)
+    blocks += [heading("Conclusões e Próximos Passos"), paragraph(_conclusion(progress)), paragraph(FOOTER)]
+    return f"Relatório Executivo: {project.get('name', '')}", blocks
+
+
+def phase_report(project: Dict, phase: str, stats: Dict) -> Tuple[str, List[Dict]]:
+    """Relatório de uma fase DMAIC com os dados das ferramentas concluídas"""
+    blocks = [paragraph(f"Projeto: {project.get('name', '')}"), _generated_at()]
+    blocks += _phase(project, phase, stats)
+    blocks.append(paragraph(FOOTER))
+    return f"Relatório da Fase {PHASE_TITLES[phase]}", blocks
+
+
+def custom_report(project: Dict, stats: Dict, progress: float, sections: List[str],
+                  data: Optional[pd.DataFrame] = None) -> Tuple[str, List[Dict]]:
+    """
+    Relatório customizado
+
+    Args:
+        sections: chaves escolhidas entre 'summary', as fases DMAIC, 'results',
+            'charts', 'data' e 'appendix'
+        data: dados carregados do projeto (para 'data')
+    """
+    blocks = [_generated_at()]
+    if 'summary' in sections:
+        blocks += _summary(project, progress)
+    if 'charts' in sections:
+        blocks += _charts(stats)
+    for phase in PHASES:
+        if phase in sections:
+            blocks += _phase(project, phase, stats, details='appendix' not in sections)
+    if 'results' in sections:
+        blocks += _metrics(stats, progress) + _roi(project)
+        blocks += [heading("Conclusões", 2), paragraph(_conclusion(progress))]
+    if 'data' in sections:
+        blocks.append(heading("Dados Brutos"))
+        if data is not None and not data.empty:
+            blocks.append(paragraph(f"{len(data)} linhas x {len(data.columns)} colunas"))
+            blocks.append(table(data, max_rows=DATA_ROWS))
+        else:
+            blocks.append(paragraph("Nenhum dado carregado no projeto."))
+    if 'appendix' in sections:
+        blocks.append(heading("Anexos"))
+        for phase in PHASES:
+            for name, tool in project.get(phase, {}).items():
+                fields = tool.get('data') if isinstance(tool, dict) and tool.get('completed') else None
+                if isinstance(fields, dict) and fields:
+                    blocks.append(heading(f"{phase.title()} - {name.replace('_', ' ').title()}", 2))
+                    blocks.append(table(_tool_fields(fields)))
+    blocks.append(paragraph(FOOTER))
+    return f"Relatório: {project.get('name', '')}", blocks
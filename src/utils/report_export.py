@@ -0,0 +1,429 @@
+"""
+Exportação de relatórios (PDF, HTML, Word e Markdown)
+
+Um relatório é uma lista de blocos simples (dicts): título, parágrafo, lista,
+tabela e figura. As figuras (Plotly ou matplotlib) são convertidas em PNG em
+paralelo num pool de threads e cada imagem fica em cache pelo hash da
+especificação da figura + dimensões: reexportar um projeto sem alterações
+reaproveita todas as imagens e só remonta o documento.
+
+Dependências opcionais: kaleido (imagens Plotly), fpdf2 (PDF) e python-docx
+(Word). Sem kaleido o HTML usa gráficos interativos e PDF/Word trazem apenas
+a legenda do gráfico. Uma figura cuja conversão falhou só é tentada de novo
+depois de FAILED_RETRY_SECONDS; se o kaleido está ausente ou é incompatível
+com o Plotly instalado, as figuras Plotly deixam de ser convertidas até
+reiniciar o processo.
+"""
+import base64
+import hashlib
+import html
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from io import BytesIO
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+try:
+    from fpdf import FPDF
+    from fpdf.enums import XPos, YPos
+    FPDF_AVAILABLE = True
+except ImportError:
+    FPDF_AVAILABLE = False
+
+try:
+    import docx
+    from docx.shared import Inches
+    DOCX_AVAILABLE = True
+except ImportError:
+    DOCX_AVAILABLE = False
+
+
+EXPORT_FORMATS = {
+    'PDF': ('pdf', 'application/pdf'),
+    'HTML': ('html', 'text/html'),
+    'Word': ('docx', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'),
+    'Markdown': ('md', 'text/markdown')
+}
+
+# Dimensões das imagens (px) e escala do PNG
+IMAGE_WIDTH = 900
+IMAGE_HEIGHT = 450
+IMAGE_SCALE = 2
+
+# A conversão espera o kaleido/navegador (E/S), não a CPU do processo
+RENDER_WORKERS = 4
+
+# Orçamento do cache de imagens em bytes (LRU)
+IMAGE_CACHE_BYTES = 64 * 1024 * 1024
+
+# Figuras cuja conversão falhou: quantas lembrar e por quanto tempo (s) até tentar de novo
+FAILED_CACHE_SIZE = 1000
+FAILED_RETRY_SECONDS = 300
+
+_images: OrderedDict = OrderedDict()
+_images_size = 0
+_images_lock = threading.Lock()
+_failed: OrderedDict = OrderedDict()
+_plotly_engine_ok = True
+
+
+class ReportExportError(RuntimeError):
+    """Formato indisponível (dependência opcional ausente) ou inválido"""
+
+
+def heading(text: str, level: int = 1) -> Dict:
+    return {'kind': 'heading', 'text': text, 'level': level}
+
+
+def paragraph(text: str) -> Dict:
+    return {'kind': 'paragraph', 'text': text}
+
+
+def bullets(items: List[str]) -> Dict:
+    return {'kind': 'bullets', 'items': list(items)}
+
+
+def table(frame: pd.DataFrame, max_rows: Optional[int] = None) -> Dict:
+    shown = frame.head(max_rows) if max_rows else frame
+    return {
+        'kind': 'table',
+        'columns': [str(c) for c in shown.columns],
+        'rows': [['' if pd.isna(v) else str(v) for v in row] for row in shown.itertuples(index=False)],
+        'truncated': len(frame) - len(shown)
+    }
+
+
+def figure(fig, caption: str = "") -> Dict:
+    return {'kind': 'figure', 'figure': fig, 'caption': caption}
+
+
+def figure_key(fig, width: int = IMAGE_WIDTH, height: int = IMAGE_HEIGHT, scale: int = IMAGE_SCALE) -> str:
+    """Hash da especificação da figura (JSON Plotly ou pickle matplotlib) + dimensões"""
+    spec = fig.to_json().encode() if hasattr(fig, 'to_json') else pickle.dumps(fig)
+    digest = hashlib.sha1(spec)
+    digest.update(f"{width}x{height}@{scale}".encode())
+    return digest.hexdigest()
+
+
+def _render(fig, width: int, height: int, scale: int) -> Optional[bytes]:
+    global _plotly_engine_ok
+    try:
+        if hasattr(fig, 'to_image'):
+            if not _plotly_engine_ok:
+                return None
+            return fig.to_image(format='png', width=width, height=height, scale=scale)
+        buffer = BytesIO()
+        fig.savefig(buffer, format='png', dpi=100 * scale, bbox_inches='tight')
+        return buffer.getvalue()
+    except (ImportError, ValueError) as e:
+        # Plotly recusa exportar antes de renderizar: kaleido ausente ou de versão incompatível
+        if hasattr(fig, 'to_image') and (isinstance(e, ImportError) or 'kaleido' in str(e).lower()):
+            _plotly_engine_ok = False
+        return None
+    except Exception:
+        # Falha da conversão desta figura (tempo esgotado, navegador ausente...): sem imagem estática
+        return None
+
+
+def _remember_failure(key: str):
+    with _images_lock:
+        _failed[key] = time.monotonic()
+        _failed.move_to_end(key)
+        while len(_failed) > FAILED_CACHE_SIZE:
+            _failed.popitem(last=False)
+
+
+def _remember(key: str, image: bytes):
+    global _images_size
+    with _images_lock:
+        if key in _images:
+            return
+        _images[key] = image
+        _images_size += len(image)
+        while _images_size > IMAGE_CACHE_BYTES and len(_images) > 1:
+            _, evicted = _images.popitem(last=False)
+            _images_size -= len(evicted)
+
+
+def render_images(figures: List, width: int = IMAGE_WIDTH, height: int = IMAGE_HEIGHT,
+                  scale: int = IMAGE_SCALE, checkpoint: Optional[Callable[[float, str], None]] = None) -> Dict:
+    """
+    Converte as figuras em PNG, em paralelo e com cache
+
+    Args:
+        checkpoint: chamado com (fração, mensagem) a cada imagem gerada; uma
+            exceção nele (ex.: JobCancelled) descarta as conversões pendentes
+
+    Returns:
+        {'images': PNG (ou None) na ordem das figuras, 'cached': quantas vieram
+         do cache, 'rendered': quantas foram geradas agora}
+    """
+    keys = [figure_key(fig, width, height, scale) for fig in figures]
+    images: List[Optional[bytes]] = [None] * len(figures)
+
+    pending = {}
+    with _images_lock:
+        for i, key in enumerate(keys):
+            if key in _images:
+                _images.move_to_end(key)
+                images[i] = _images[key]
+            elif time.monotonic() - _failed.get(key, float('-inf')) >= FAILED_RETRY_SECONDS:
+                pending.setdefault(key, []).append(i)
+    cached = sum(1 for image in images if image is not None)
+
+    if pending:
+        pool = ThreadPoolExecutor(max_workers=min(RENDER_WORKERS, len(pending)))
+        try:
+            futures = {
+                pool.submit(_render, figures[positions[0]], width, height, scale): key
+                for key, positions in pending.items()
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                key = futures[future]
+                image = future.result()
+                if image is not None:
+                    _remember(key, image)
+                else:
+                    _remember_failure(key)
+                for i in pending[key]:
+                    images[i] = image
+                if checkpoint:
+                    checkpoint(done / len(futures), f"{done}/{len(futures)} gráfico(s) gerado(s)")
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    return {
+        'images': images,
+        'cached': cached,
+        'rendered': sum(1 for key in pending if images[pending[key][0]] is not None)
+    }
+
+
+def _figures(blocks: List[Dict]) -> List:
+    return [block['figure'] for block in blocks if block['kind'] == 'figure']
+
+
+def to_html(title: str, blocks: List[Dict], images: List[Optional[bytes]]) -> bytes:
+    parts = [
+        "<!DOCTYPE html><html lang='pt-BR'><head><meta charset='utf-8'>",
+        f"<title>{html.escape(title)}</title>",
+        "<style>body{font-family:Arial,sans-serif;max-width:960px;margin:2em auto;color:#222}"
+        "table{border-collapse:collapse;margin:1em 0}td,th{border:1px solid #ccc;padding:4px 8px}"
+        "th{background:#f0f4f8}figure{margin:1em 0}figcaption{color:#666;font-size:.9em}"
+        "img{max-width:100%}</style>",
+        "</head><body>",
+        f"<h1>{html.escape(title)}</h1>"
+    ]
+    plotly_loaded = False
+    figure_index = 0
+
+    for block in blocks:
+        kind = block['kind']
+        if kind == 'heading':
+            level = min(block['level'] + 1, 6)
+            parts.append(f"<h{level}>{html.escape(block['text'])}</h{level}>")
+        elif kind == 'paragraph':
+            parts.append(f"<p>{html.escape(block['text'])}</p>")
+        elif kind == 'bullets':
+            parts.append("<ul>" + ''.join(f"<li>{html.escape(item)}</li>" for item in block['items']) + "</ul>")
+        elif kind == 'table':
+            header = ''.join(f"<th>{html.escape(c)}</th>" for c in block['columns'])
+            rows = ''.join(
+                "<tr>" + ''.join(f"<td>{html.escape(v)}</td>" for v in row) + "</tr>" for row in block['rows']
+            )
+            parts.append(f"<table><thead><tr>{header}</tr></thead><tbody>{rows}</tbody></table>")
+            if block.get('truncated'):
+                parts.append(f"<p><em>... {block['truncated']} linhas omitidas</em></p>")
+        elif kind == 'figure':
+            image = images[figure_index]
+            figure_index += 1
+            parts.append("<figure>")
+            if image is not None:
+                encoded = base64.b64encode(image).decode('ascii')
+                parts.append(f"<img src='data:image/png;base64,{encoded}' alt='{html.escape(block['caption'])}'>")
+            elif hasattr(block['figure'], 'to_html'):
+                parts.append(block['figure'].to_html(full_html=False,
+                                                     include_plotlyjs='cdn' if not plotly_loaded else False))
+                plotly_loaded = True
+            if block['caption']:
+                parts.append(f"<figcaption>{html.escape(block['caption'])}</figcaption>")
+            parts.append("</figure>")
+
+    parts.append("</body></html>")
+    return '\n'.join(parts).encode('utf-8')
+
+
+def _latin1(text: str) -> str:
+    """Fontes padrão do PDF são Latin-1: remove emojis e símbolos fora dela"""
+    return text.encode('latin-1', 'ignore').decode('latin-1').strip()
+
+
+def to_pdf(title: str, blocks: List[Dict], images: List[Optional[bytes]]) -> bytes:
+    if not FPDF_AVAILABLE:
+        raise ReportExportError("Exportação PDF requer o pacote fpdf2 (pip install fpdf2)")
+
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+    width = pdf.epw
+
+    def write(text: str, size: int = 10, style: str = '', height: float = 5):
+        pdf.set_font('Helvetica', style, size)
+        pdf.multi_cell(width, height, _latin1(text), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+
+    write(title, 18, 'B', 9)
+    pdf.ln(2)
+    figure_index = 0
+
+    for block in blocks:
+        kind = block['kind']
+        if kind == 'heading':
+            pdf.ln(2)
+            write(block['text'], {1: 14, 2: 12}.get(block['level'], 11), 'B', 7)
+        elif kind == 'paragraph':
+            write(block['text'])
+            pdf.ln(1)
+        elif kind == 'bullets':
+            for item in block['items']:
+                write(f"- {item}")
+            pdf.ln(1)
+        elif kind == 'table':
+            pdf.set_font('Helvetica', '', 8)
+            with pdf.table(text_align='LEFT', line_height=4.5) as grid:
+                for row in [block['columns']] + block['rows']:
+                    cells = grid.row()
+                    for value in row:
+                        cells.cell(_latin1(value))
+            if block.get('truncated'):
+                write(f"... {block['truncated']} linhas omitidas", 8, 'I')
+            pdf.ln(2)
+        elif kind == 'figure':
+            image = images[figure_index]
+            figure_index += 1
+            if image is not None:
+                pdf.image(BytesIO(image), w=width)
+            else:
+                write("[Gráfico indisponível: instale o kaleido para imagens estáticas]", 8, 'I')
+            if block['caption']:
+                write(block['caption'], 8, 'I')
+            pdf.ln(2)
+
+    return bytes(pdf.output())
+
+
+def to_docx(title: str, blocks: List[Dict], images: List[Optional[bytes]]) -> bytes:
+    if not DOCX_AVAILABLE:
+        raise ReportExportError("Exportação Word requer o pacote python-docx (pip install python-docx)")
+
+    document = docx.Document()
+    document.add_heading(title, level=0)
+    figure_index = 0
+
+    for block in blocks:
+        kind = block['kind']
+        if kind == 'heading':
+            document.add_heading(block['text'], level=min(block['level'], 9))
+        elif kind == 'paragraph':
+            document.add_paragraph(block['text'])
+        elif kind == 'bullets':
+            for item in block['items']:
+                document.add_paragraph(item, style='List Bullet')
+        elif kind == 'table':
+            grid = document.add_table(rows=1, cols=len(block['columns']), style='Table Grid')
+            for cell, value in zip(grid.rows[0].cells, block['columns']):
+                cell.text = value
+            for row in block['rows']:
+                for cell, value in zip(grid.add_row().cells, row):
+                    cell.text = value
+            if block.get('truncated'):
+                document.add_paragraph(f"... {block['truncated']} linhas omitidas")
+        elif kind == 'figure':
+            image = images[figure_index]
+            figure_index += 1
+            if image is not None:
+                document.add_picture(BytesIO(image), width=Inches(6))
+            else:
+                document.add_paragraph("[Gráfico indisponível: instale o kaleido para imagens estáticas]")
+            if block['caption']:
+                document.add_paragraph(block['caption'], style='Caption')
+
+    buffer = BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def to_markdown(title: str, blocks: List[Dict]) -> bytes:
+    lines = [f"# {title}", ""]
+    for block in blocks:
+        kind = block['kind']
+        if kind == 'heading':
+            lines += ['#' * min(block['level'] + 1, 6) + ' ' + block['text'], ""]
+        elif kind == 'paragraph':
+            lines += [block['text'], ""]
+        elif kind == 'bullets':
+            lines += [f"- {item}" for item in block['items']] + [""]
+        elif kind == 'table':
+            lines.append("| " + " | ".join(block['columns']) + " |")
+            lines.append("|" + "---|" * len(block['columns']))
+            lines += ["| " + " | ".join(v.replace('|', '\\|') for v in row) + " |" for row in block['rows']]
+            lines.append("")
+        elif kind == 'figure' and block['caption']:
+            lines += [f"*Figura: {block['caption']}*", ""]
+    return '\n'.join(lines).encode('utf-8')
+
+
+def export_report(title: str, blocks: List[Dict], fmt: str,
+                  checkpoint: Optional[Callable[[float, str], None]] = None) -> Dict:
+    """
+    Monta o relatório no formato pedido
+
+    Args:
+        fmt: chave de EXPORT_FORMATS ('PDF', 'HTML', 'Word', 'Markdown')
+        checkpoint: chamado com (fração, mensagem) durante os gráficos e antes
+            de montar o documento (ponto de cancelamento das tarefas da fila)
+
+    Returns:
+        {'data': bytes, 'extension', 'mime', 'figures', 'cached', 'rendered'}
+
+    Raises:
+        ReportExportError: formato desconhecido ou dependência ausente
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ReportExportError(f"Formato não suportado: {fmt}")
+    if fmt == 'PDF' and not FPDF_AVAILABLE:
+        raise ReportExportError("Exportação PDF requer o pacote fpdf2 (pip install fpdf2)")
+    if fmt == 'Word' and not DOCX_AVAILABLE:
+        raise ReportExportError("Exportação Word requer o pacote python-docx (pip install python-docx)")
+
+    figures = _figures(blocks)
+    rendered = {'images': [None] * len(figures), 'cached': 0, 'rendered': 0}
+    if figures and fmt != 'Markdown':
+        images_checkpoint = None
+        if checkpoint:
+            images_checkpoint = lambda fraction, message: checkpoint(0.8 * fraction, message)
+        rendered = render_images(figures, checkpoint=images_checkpoint)
+    if checkpoint:
+        checkpoint(0.8, "Montando documento")
+
+    if fmt == 'PDF':
+        data = to_pdf(title, blocks, rendered['images'])
+    elif fmt == 'Word':
+        data = to_docx(title, blocks, rendered['images'])
+    elif fmt == 'HTML':
+        data = to_html(title, blocks, rendered['images'])
+    else:
+        data = to_markdown(title, blocks)
+
+    extension, mime = EXPORT_FORMATS[fmt]
+    return {
+        'data': data,
+        'extension': extension,
+        'mime': mime,
+        'figures': len(figures),
+        'cached': rendered['cached'],
+        'rendered': rendered['rendered']
+    }
@@ -0,0 +1,705 @@
+"""
+Motor de Controle Estatístico de Processo (CEP/SPC)
+
+Calcula limites de controle a partir dos dados para cartas I-MR, Xbar-R,
+Xbar-S, p, np, c, u, EWMA e CUSUM, avalia as regras de Nelson de forma
+vetorizada e mantém um estado incremental (SPCMonitor) para que cada nova
+medição seja avaliada sem reprocessar o histórico.
+"""
+import math
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+SPC_CHART_TYPES = {
+    'imr': "I-MR (Individuais)",
+    'xbar_r': "Xbar-R (Subgrupos)",
+    'xbar_s': "Xbar-S (Subgrupos)",
+    'p': "p (Proporção de defeituosos)",
+    'np': "np (Número de defeituosos)",
+    'c': "c (Número de defeitos)",
+    'u': "u (Defeitos por unidade)",
+    'ewma': "EWMA",
+    'cusum': "CUSUM"
+}
+
+NELSON_RULES = {
+    1: "1 ponto além de 3σ",
+    2: "9 pontos seguidos do mesmo lado da média",
+    3: "6 pontos seguidos crescendo ou decrescendo",
+    4: "14 pontos seguidos alternando para cima e para baixo",
+    5: "2 de 3 pontos além de 2σ do mesmo lado",
+    6: "4 de 5 pontos além de 1σ do mesmo lado",
+    7: "15 pontos seguidos dentro de 1σ",
+    8: "8 pontos seguidos fora de 1σ (ambos os lados)"
+}
+
+# Quantidade de pontos necessária para avaliar todas as regras
+NELSON_WINDOW = 15
+
+# Cartas em que apenas a regra 1 se aplica (estatística autocorrelacionada)
+_RULE1_ONLY = ('ewma', 'cusum')
+
+# Constante d2 por tamanho de subgrupo (2..25)
+_D2 = {
+    2: 1.128, 3: 1.693, 4: 2.059, 5: 2.326, 6: 2.534, 7: 2.704, 8: 2.847,
+    9: 2.970, 10: 3.078, 11: 3.173, 12: 3.258, 13: 3.336, 14: 3.407,
+    15: 3.472, 16: 3.532, 17: 3.588, 18: 3.640, 19: 3.689, 20: 3.735,
+    21: 3.778, 22: 3.819, 23: 3.858, 24: 3.895, 25: 3.931
+}
+
+# Constante d3 por tamanho de subgrupo (2..25)
+_D3 = {
+    2: 0.853, 3: 0.888, 4: 0.880, 5: 0.864, 6: 0.848, 7: 0.833, 8: 0.820,
+    9: 0.808, 10: 0.797, 11: 0.787, 12: 0.778, 13: 0.770, 14: 0.763,
+    15: 0.756, 16: 0.750, 17: 0.744, 18: 0.739, 19: 0.734, 20: 0.729,
+    21: 0.724, 22: 0.720, 23: 0.716, 24: 0.712, 25: 0.708
+}
+
+
+def _c4(n: int) -> float:
+    """Constante c4 (viés do desvio padrão amostral)"""
+    return math.sqrt(2.0 / (n - 1)) * math.exp(math.lgamma(n / 2.0) - math.lgamma((n - 1) / 2.0))
+
+
+def _validate_subgroup_size(n: int) -> int:
+    n = int(n)
+    if n < 2 or n > 25:
+        raise ValueError("Tamanho do subgrupo deve estar entre 2 e 25")
+    return n
+
+
+def _rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """Soma móvel alinhada à direita; posições sem janela completa recebem -1"""
+    result = np.full(len(values), -1, dtype=np.int64)
+    if len(values) >= window:
+        cumsum = np.concatenate(([0], np.cumsum(values, dtype=np.int64)))
+        result[window - 1:] = cumsum[window:] - cumsum[:-window]
+    return result
+
+
+def evaluate_nelson_rules(statistic, center, sigma, rules: Optional[List[int]] = None) -> Dict[int, np.ndarray]:
+    """
+    Avalia as regras de Nelson sobre toda a série de uma só vez
+
+    Args:
+        statistic: Valores plotados na carta
+        center: Linha central (escalar ou vetor)
+        sigma: Desvio padrão da estatística plotada (escalar ou vetor)
+        rules: Regras a avaliar (padrão: todas)
+
+    Returns:
+        Dict regra -> vetor booleano marcando o ponto em que a regra disparou
+    """
+    x = np.asarray(statistic, dtype=float)
+    center = np.broadcast_to(np.asarray(center, dtype=float), x.shape)
+    sigma = np.broadcast_to(np.asarray(sigma, dtype=float), x.shape)
+    rules = rules or list(NELSON_RULES.keys())
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = np.where(sigma > 0, (x - center) / sigma, 0.0)
+
+    above = (z > 0).astype(np.int8)
+    below = (z < 0).astype(np.int8)
+
+    diff = np.diff(x, prepend=np.nan)
+    up = (diff > 0).astype(np.int8)
+    down = (diff < 0).astype(np.int8)
+
+    # Alternância: sinal da diferença troca em relação ao ponto anterior
+    alternating = np.zeros(len(x), dtype=np.int8)
+    if len(x) > 2:
+        alternating[2:] = (np.sign(diff[2:]) * np.sign(diff[1:-1]) < 0)
+
+    results = {}
+    for rule in rules:
+        if rule == 1:
+            flags = np.abs(z) > 3
+        elif rule == 2:
+            flags = (_rolling_sum(above, 9) == 9) | (_rolling_sum(below, 9) == 9)
+        elif rule == 3:
+            flags = (_rolling_sum(up, 5) == 5) | (_rolling_sum(down, 5) == 5)
+        elif rule == 4:
+            flags = _rolling_sum(alternating, 12) == 12
+        elif rule == 5:
+            flags = ((_rolling_sum((z > 2).astype(np.int8), 3) >= 2) |
+                     (_rolling_sum((z < -2).astype(np.int8), 3) >= 2))
+        elif rule == 6:
+            flags = ((_rolling_sum((z > 1).astype(np.int8), 5) >= 4) |
+                     (_rolling_sum((z < -1).astype(np.int8), 5) >= 4))
+        elif rule == 7:
+            flags = _rolling_sum((np.abs(z) < 1).astype(np.int8), 15) == 15
+        elif rule == 8:
+            flags = _rolling_sum((np.abs(z) > 1).astype(np.int8), 8) == 8
+        else:
+            continue
+        results[rule] = np.asarray(flags, dtype=bool)
+
+    return results
+
+
+def violated_rules(rule_flags: Dict[int, np.ndarray]) -> List[List[int]]:
+    """Converte o resultado de evaluate_nelson_rules em lista de regras por ponto"""
+    if not rule_flags:
+        return []
+    length = len(next(iter(rule_flags.values())))
+    matrix = np.column_stack([rule_flags[r] for r in sorted(rule_flags)])
+    rule_ids = np.array(sorted(rule_flags))
+    return [rule_ids[row].tolist() for row in matrix[:length]]
+
+
+def _subgroups(values: np.ndarray, n: int) -> np.ndarray:
+    """Agrupa valores consecutivos em subgrupos completos (k × n)"""
+    k = len(values) // n
+    return values[:k * n].reshape(k, n)
+
+
+def _moving_range_sigma(values: np.ndarray) -> float:
+    if len(values) < 2:
+        return 0.0
+    return float(np.mean(np.abs(np.diff(values)))) / _D2[2]
+
+
+def compute_chart(chart_type: str, values, sample_sizes=None, subgroup_size: int = 5,
+                  target: Optional[float] = None, ewma_lambda: float = 0.2,
+                  ewma_l: float = 3.0, cusum_k: float = 0.5, cusum_h: float = 5.0) -> Dict:
+    """
+    Calcula a carta de controle completa a partir dos dados
+
+    Args:
+        chart_type: Chave de SPC_CHART_TYPES
+        values: Medições individuais (ou contagens para cartas de atributos)
+        sample_sizes: Tamanho da amostra por ponto (p, np, u) - escalar ou vetor
+        subgroup_size: Tamanho do subgrupo (Xbar-R/Xbar-S)
+        target: Média de referência para EWMA/CUSUM (padrão: média dos dados)
+
+    Returns:
+        Dict com estatística plotada, linhas central/limites, sigma por ponto,
+        flags das regras de Nelson, carta secundária (quando houver) e o
+        estado incremental equivalente
+    """
+    if chart_type not in SPC_CHART_TYPES:
+        raise ValueError(f"Tipo de carta inválido: {chart_type}")
+
+    x = np.asarray(values, dtype=float)
+    x = x[~np.isnan(x)]
+    secondary = None
+
+    if chart_type == 'imr':
+        if len(x) < 2:
+            raise ValueError("São necessárias pelo menos 2 medições")
+        mr = np.abs(np.diff(x))
+        mr_bar = float(mr.mean())
+        center = float(x.mean())
+        sigma = mr_bar / _D2[2]
+        statistic = x
+        stat_sigma = np.full(len(x), sigma)
+        secondary = {
+            'name': 'MR',
+            'statistic': np.concatenate(([np.nan], mr)),
+            'center': mr_bar,
+            'ucl': 3.267 * mr_bar,
+            'lcl': 0.0
+        }
+        state = {'count': len(x), 'sum': float(x.sum()), 'mr_count': len(mr),
+                 'mr_sum': float(mr.sum()), 'last': float(x[-1])}
+
+    elif chart_type in ('xbar_r', 'xbar_s'):
+        n = _validate_subgroup_size(subgroup_size)
+        groups = _subgroups(x, n)
+        if len(groups) < 2:
+            raise ValueError(f"São necessários pelo menos 2 subgrupos de {n} medições")
+        statistic = groups.mean(axis=1)
+        center = float(statistic.mean())
+
+        if chart_type == 'xbar_r':
+            spread = np.ptp(groups, axis=1)
+            spread_bar = float(spread.mean())
+            sigma = spread_bar / _D2[n]
+            d3_ratio = 3 * _D3[n] / _D2[n]
+            secondary = {'name': 'R', 'statistic': spread, 'center': spread_bar,
+                         'ucl': (1 + d3_ratio) * spread_bar,
+                         'lcl': max(0.0, 1 - d3_ratio) * spread_bar}
+        else:
+            spread = groups.std(axis=1, ddof=1)
+            spread_bar = float(spread.mean())
+            c4 = _c4(n)
+            sigma = spread_bar / c4
+            b_ratio = 3 * math.sqrt(1 - c4 ** 2) / c4
+            secondary = {'name': 'S', 'statistic': spread, 'center': spread_bar,
+                         'ucl': (1 + b_ratio) * spread_bar,
+                         'lcl': max(0.0, 1 - b_ratio) * spread_bar}
+
+        stat_sigma = np.full(len(statistic), sigma / math.sqrt(n))
+        state = {'count': len(groups), 'sum': float(statistic.sum()),
+                 'spread_sum': float(spread.sum()), 'buffer': x[len(groups) * n:].tolist()}
+
+    elif chart_type in ('p', 'np', 'u'):
+        if sample_sizes is None:
+            raise ValueError("Informe o tamanho da amostra")
+        sizes = np.broadcast_to(np.asarray(sample_sizes, dtype=float), x.shape)
+        if np.any(sizes <= 0):
+            raise ValueError("Tamanho da amostra deve ser positivo")
+        rate = float(x.sum() / sizes.sum())
+
+        if chart_type == 'p':
+            statistic = x / sizes
+            center = rate
+            stat_sigma = np.sqrt(rate * (1 - rate) / sizes)
+        elif chart_type == 'np':
+            statistic = x
+            center = float(sizes.mean() * rate)
+            stat_sigma = np.sqrt(sizes * rate * (1 - rate))
+        else:
+            statistic = x / sizes
+            center = rate
+            stat_sigma = np.sqrt(rate / sizes)
+
+        sigma = float(stat_sigma.mean()) if len(stat_sigma) else 0.0
+        state = {'count': len(x), 'sum': float(x.sum()), 'size_sum': float(sizes.sum())}
+
+    elif chart_type == 'c':
+        statistic = x
+        center = float(x.mean())
+        sigma = math.sqrt(center)
+        stat_sigma = np.full(len(x), sigma)
+        state = {'count': len(x), 'sum': float(x.sum())}
+
+    else:
+        # EWMA / CUSUM: média de referência e sigma por amplitude móvel
+        if len(x) < 2:
+            raise ValueError("São necessárias pelo menos 2 medições")
+        mu0 = float(target) if target is not None else float(x.mean())
+        sigma = _moving_range_sigma(x)
+        mr = np.abs(np.diff(x))
+        state = {'count': len(x), 'sum': float(x.sum()), 'mr_count': len(mr),
+                 'mr_sum': float(mr.sum()), 'last': float(x[-1]), 'target': target}
+
+        if chart_type == 'ewma':
+            z = pd.Series(np.concatenate(([mu0], x))).ewm(alpha=ewma_lambda, adjust=False).mean().to_numpy()[1:]
+            t = np.arange(1, len(x) + 1)
+            width = ewma_l * sigma * np.sqrt(ewma_lambda / (2 - ewma_lambda) * (1 - (1 - ewma_lambda) ** (2 * t)))
+            statistic = z
+            center = mu0
+            stat_sigma = width / ewma_l
+            state.update({'ewma': float(z[-1]), 't': len(x)})
+        else:
+            k_val, h_val = cusum_k * sigma, cusum_h * sigma
+            # Recursão de Page vetorizada: C_t = S_t - min(0, min_{j<=t} S_j)
+            s_plus = np.cumsum(x - mu0 - k_val)
+            s_minus = np.cumsum(mu0 - k_val - x)
+            c_plus = s_plus - np.minimum(0.0, np.minimum.accumulate(s_plus))
+            c_minus = s_minus - np.minimum(0.0, np.minimum.accumulate(s_minus))
+            statistic = c_plus
+            center = 0.0
+            stat_sigma = np.full(len(x), h_val / 3 if h_val > 0 else 0.0)
+            secondary = {'name': 'C-', 'statistic': c_minus, 'center': 0.0,
+                         'ucl': h_val, 'lcl': 0.0}
+            state.update({'c_plus': float(c_plus[-1]), 'c_minus': float(c_minus[-1])})
+
+    statistic = np.asarray(statistic, dtype=float)
+    center_line = np.full(len(statistic), center, dtype=float)
+
+    if chart_type == 'cusum':
+        ucl = np.full(len(statistic), cusum_h * sigma)
+        lcl = np.zeros(len(statistic))
+    else:
+        ucl = center_line + 3 * stat_sigma
+        lcl = center_line - 3 * stat_sigma
+        if chart_type in ('p', 'np', 'c', 'u'):
+            lcl = np.maximum(lcl, 0.0)
+
+    if chart_type in _RULE1_ONLY:
+        rule_flags = {1: (statistic > ucl) | (statistic < lcl)}
+        if secondary is not None:
+            rule_flags[1] |= secondary['statistic'] > secondary['ucl']
+    else:
+        rule_flags = evaluate_nelson_rules(statistic, center_line, stat_sigma)
+
+    params = {'subgroup_size': int(subgroup_size), 'sample_size': _scalar_size(sample_sizes),
+              'ewma_lambda': ewma_lambda, 'ewma_l': ewma_l,
+              'cusum_k': cusum_k, 'cusum_h': cusum_h}
+
+    return {
+        'chart_type': chart_type,
+        'statistic': statistic,
+        'center': center_line,
+        'ucl': ucl,
+        'lcl': lcl,
+        'sigma': stat_sigma,
+        'process_sigma': float(sigma),
+        'rules': rule_flags,
+        'secondary': secondary,
+        'state': _build_monitor_state(chart_type, params, state, statistic, center_line, stat_sigma)
+    }
+
+
+def _scalar_size(sample_sizes) -> Optional[float]:
+    if sample_sizes is None:
+        return None
+    sizes = np.asarray(sample_sizes, dtype=float)
+    return float(sizes.flat[-1]) if sizes.size else None
+
+
+def _build_monitor_state(chart_type: str, params: Dict, sums: Dict, statistic: np.ndarray,
+                         center: np.ndarray, sigma: np.ndarray) -> Dict:
+    """Monta o estado serializável do SPCMonitor a partir do cálculo completo"""
+    tail = slice(-NELSON_WINDOW, None)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = np.where(sigma > 0, (statistic - center) / sigma, 0.0)
+    return {
+        'chart_type': chart_type,
+        'params': params,
+        'sums': sums,
+        'frozen': False,
+        'tail_stat': statistic[tail].tolist(),
+        'tail_z': z[tail].tolist()
+    }
+
+
+class SPCMonitor:
+    """
+    Avaliação incremental de uma carta de controle
+
+    Mantém somas acumuladas (para recalcular limites em O(1)) e apenas os
+    últimos NELSON_WINDOW pontos, suficientes para todas as regras de Nelson.
+    Com `frozen=True` os limites da Fase I ficam fixos (Fase II).
+    """
+
+    def __init__(self, state: Dict):
+        self.chart_type = state['chart_type']
+        self.params = dict(state.get('params', {}))
+        self.sums = dict(state.get('sums', {}))
+        self.frozen = bool(state.get('frozen', False))
+        self.frozen_limits = state.get('frozen_limits')
+        self.tail_stat = deque(state.get('tail_stat', []), maxlen=NELSON_WINDOW)
+        self.tail_z = deque(state.get('tail_z', []), maxlen=NELSON_WINDOW)
+
+    @classmethod
+    def fit(cls, chart_type: str, values, **kwargs) -> 'SPCMonitor':
+        """Cria o monitor a partir do histórico (Fase I)"""
+        return cls(compute_chart(chart_type, values, **kwargs)['state'])
+
+    @classmethod
+    def empty(cls, chart_type: str, subgroup_size: int = 5, sample_size: Optional[float] = None,
+              target: Optional[float] = None, **kwargs) -> 'SPCMonitor':
+        """Cria um monitor sem histórico"""
+        params = {'subgroup_size': int(subgroup_size), 'sample_size': sample_size,
+                  'ewma_lambda': kwargs.get('ewma_lambda', 0.2), 'ewma_l': kwargs.get('ewma_l', 3.0),
+                  'cusum_k': kwargs.get('cusum_k', 0.5), 'cusum_h': kwargs.get('cusum_h', 5.0)}
+        sums = {'count': 0, 'sum': 0.0}
+        if chart_type in ('imr', 'ewma', 'cusum'):
+            sums.update({'mr_count': 0, 'mr_sum': 0.0, 'last': None})
+        if chart_type in ('xbar_r', 'xbar_s'):
+            sums.update({'spread_sum': 0.0, 'buffer': []})
+        if chart_type in ('p', 'np', 'u'):
+            sums['size_sum'] = 0.0
+        if chart_type in ('ewma', 'cusum'):
+            sums.update({'target': target, 't': 0, 'ewma': target, 'c_plus': 0.0, 'c_minus': 0.0})
+        return cls({'chart_type': chart_type, 'params': params, 'sums': sums})
+
+    def to_state(self) -> Dict:
+        """Estado serializável (compatível com Firestore)"""
+        state = {
+            'chart_type': self.chart_type,
+            'params': self.params,
+            'sums': self.sums,
+            'frozen': self.frozen,
+            'tail_stat': [float(v) for v in self.tail_stat],
+            'tail_z': [float(v) for v in self.tail_z]
+        }
+        if self.frozen_limits:
+            state['frozen_limits'] = self.frozen_limits
+        return state
+
+    def freeze(self, frozen: bool = True):
+        """Fixa (ou libera) os limites atuais"""
+        self.frozen = frozen
+        self.frozen_limits = self.limits() if frozen else None
+
+    def _process_sigma(self) -> float:
+        s = self.sums
+        if self.chart_type in ('imr', 'ewma', 'cusum'):
+            return (s['mr_sum'] / s['mr_count']) / _D2[2] if s.get('mr_count') else 0.0
+        if self.chart_type in ('xbar_r', 'xbar_s'):
+            n = self.params['subgroup_size']
+            if not s['count']:
+                return 0.0
+            spread_bar = s['spread_sum'] / s['count']
+            return spread_bar / (_D2[n] if self.chart_type == 'xbar_r' else _c4(n))
+        return 0.0
+
+    def _mean(self) -> float:
+        s = self.sums
+        return s['sum'] / s['count'] if s['count'] else 0.0
+
+    def limits(self, sample_size: Optional[float] = None) -> Dict:
+        """Linha central, sigma da estatística e limites atuais"""
+        if self.frozen and self.frozen_limits and self.chart_type not in ('p', 'u', 'np'):
+            return dict(self.frozen_limits)
+
+        ct = self.chart_type
+        s = self.sums
+        sigma = self._process_sigma()
+
+        if ct == 'imr':
+            center, stat_sigma = self._mean(), sigma
+        elif ct in ('xbar_r', 'xbar_s'):
+            center, stat_sigma = self._mean(), sigma / math.sqrt(self.params['subgroup_size'])
+        elif ct in ('p', 'np', 'u'):
+            if self.frozen and self.frozen_limits:
+                rate = self.frozen_limits['rate']
+            else:
+                rate = s['sum'] / s['size_sum'] if s.get('size_sum') else 0.0
+            n = float(sample_size or self.params.get('sample_size') or 1)
+            if ct == 'p':
+                center, stat_sigma = rate, math.sqrt(rate * (1 - rate) / n)
+            elif ct == 'np':
+                center, stat_sigma = n * rate, math.sqrt(n * rate * (1 - rate))
+            else:
+                center, stat_sigma = rate, math.sqrt(rate / n)
+            limits = {'center': center, 'sigma': stat_sigma, 'rate': rate,
+                      'ucl': center + 3 * stat_sigma, 'lcl': max(0.0, center - 3 * stat_sigma)}
+            return limits
+        elif ct == 'c':
+            center = self._mean()
+            stat_sigma = math.sqrt(center)
+        elif ct == 'ewma':
+            lam, L = self.params['ewma_lambda'], self.params['ewma_l']
+            t = max(int(s.get('t', 0)), 1)
+            center = s['target'] if s.get('target') is not None else self._mean()
+            stat_sigma = sigma * math.sqrt(lam / (2 - lam) * (1 - (1 - lam) ** (2 * t)))
+            return {'center': center, 'sigma': stat_sigma, 'process_sigma': sigma,
+                    'ucl': center + L * stat_sigma, 'lcl': center - L * stat_sigma}
+        else:
+            h_val = self.params['cusum_h'] * sigma
+            center = s['target'] if s.get('target') is not None else self._mean()
+            return {'center': 0.0, 'reference': center, 'sigma': h_val / 3, 'process_sigma': sigma,
+                    'ucl': h_val, 'lcl': 0.0}
+
+        lcl = center - 3 * stat_sigma
+        if ct == 'c':
+            lcl = max(0.0, lcl)
+        return {'center': center, 'sigma': stat_sigma, 'process_sigma': sigma,
+                'ucl': center + 3 * stat_sigma, 'lcl': lcl}
+
+    def append(self, value: float, sample_size: Optional[float] = None) -> Optional[Dict]:
+        """
+        Incorpora uma nova medição e avalia as regras apenas para o novo ponto
+
+        Returns:
+            Dict com estatística, limites e regras violadas; None enquanto um
+            subgrupo (Xbar-R/Xbar-S) ainda não está completo
+        """
+        ct = self.chart_type
+        s = self.sums
+        value = float(value)
+        secondary = None
+
+        if ct in ('xbar_r', 'xbar_s'):
+            s['buffer'] = list(s.get('buffer', [])) + [value]
+            n = self.params['subgroup_size']
+            if len(s['buffer']) < n:
+                return None
+            group = np.asarray(s['buffer'], dtype=float)
+            s['buffer'] = []
+            statistic = float(group.mean())
+            secondary = float(np.ptp(group)) if ct == 'xbar_r' else float(group.std(ddof=1))
+            if not self.frozen:
+                s['spread_sum'] += secondary
+        elif ct in ('p', 'np', 'u'):
+            n = float(sample_size or self.params.get('sample_size') or 1)
+            statistic = value if ct == 'np' else value / n
+            if not self.frozen:
+                s['size_sum'] = s.get('size_sum', 0.0) + n
+        else:
+            statistic = value
+            if ct in ('imr', 'ewma', 'cusum') and s.get('last') is not None:
+                secondary = abs(value - s['last'])
+                if not self.frozen:
+                    s['mr_count'] += 1
+                    s['mr_sum'] += secondary
+            if ct in ('imr', 'ewma', 'cusum'):
+                s['last'] = value
+
+        if not self.frozen:
+            s['count'] += 1
+            s['sum'] += statistic if ct in ('xbar_r', 'xbar_s') else value
+
+        if ct == 'ewma':
+            s['t'] = int(s.get('t', 0)) + 1
+            limits = self.limits()
+            lam = self.params['ewma_lambda']
+            previous = s.get('ewma')
+            if previous is None:
+                previous = limits['center']
+            statistic = lam * value + (1 - lam) * previous
+            s['ewma'] = statistic
+        elif ct == 'cusum':
+            limits = self.limits()
+            k_val = self.params['cusum_k'] * limits['process_sigma']
+            mu0 = limits['reference']
+            s['c_plus'] = max(0.0, s.get('c_plus', 0.0) + value - mu0 - k_val)
+            s['c_minus'] = max(0.0, s.get('c_minus', 0.0) + mu0 - k_val - value)
+            statistic, secondary = s['c_plus'], s['c_minus']
+        else:
+            limits = self.limits(sample_size)
+
+        stat_sigma = limits['sigma']
+        z = (statistic - limits['center']) / stat_sigma if stat_sigma > 0 else 0.0
+        self.tail_stat.append(statistic)
+        self.tail_z.append(z)
+
+        if ct in _RULE1_ONLY:
+            out = statistic > limits['ucl'] or statistic < limits['lcl']
+            if ct == 'cusum':
+                out = out or secondary > limits['ucl']
+            rules = [1] if out else []
+        else:
+            flags = evaluate_nelson_rules(np.asarray(self.tail_z), 0.0, 1.0)
+            # Regras de tendência (3 e 4) usam a estatística original
+            trend = evaluate_nelson_rules(np.asarray(self.tail_stat), 0.0, 1.0, rules=[3, 4])
+            flags.update(trend)
+            rules = [rule for rule, values in sorted(flags.items()) if values[-1]]
+
+        return {
+            'statistic': float(statistic),
+            'secondary': secondary,
+            'center': float(limits['center']),
+            'ucl': float(limits['ucl']),
+            'lcl': float(limits['lcl']),
+            'rules': rules
+        }
+
+    def append_many(self, values, sample_size: Optional[float] = None) -> List[List[int]]:
+        """
+        Incorpora um lote de medições e retorna as regras violadas por medição
+
+        Para cartas de um ponto por medição (I-MR, p, np, c, u) o lote é
+        avaliado em uma única passada vetorizada: as somas acumuladas são
+        atualizadas de uma vez (limites já incluindo o lote inteiro) e as
+        regras de Nelson rodam sobre a cauda anterior + lote. As demais cartas (subgrupos, EWMA, CUSUM) são
+        recursivas e usam append ponto a ponto.
+        """
+        x = np.asarray(values, dtype=float)
+        if len(x) == 0:
+            return []
+
+        ct = self.chart_type
+        if ct not in ('imr', 'p', 'np', 'c', 'u'):
+            results = [self.append(v, sample_size) for v in x]
+            return [r['rules'] if r else [] for r in results]
+
+        s = self.sums
+        n = float(sample_size or self.params.get('sample_size') or 1)
+        statistic = x / n if ct in ('p', 'u') else x
+
+        if not self.frozen:
+            s['count'] += len(x)
+            s['sum'] += float(x.sum())
+            if ct in ('p', 'np', 'u'):
+                s['size_sum'] = s.get('size_sum', 0.0) + n * len(x)
+        if ct == 'imr':
+            previous = s.get('last')
+            chain = np.concatenate(([previous], x)) if previous is not None else x
+            moving_ranges = np.abs(np.diff(chain))
+            if not self.frozen:
+                s['mr_count'] += len(moving_ranges)
+                s['mr_sum'] += float(moving_ranges.sum())
+            s['last'] = float(x[-1])
+
+        limits = self.limits(sample_size)
+        stat_sigma = limits['sigma']
+        z = (statistic - limits['center']) / stat_sigma if stat_sigma > 0 else np.zeros(len(x))
+
+        previous_z = np.asarray(self.tail_z, dtype=float)
+        previous_stat = np.asarray(self.tail_stat, dtype=float)
+        flags = evaluate_nelson_rules(np.concatenate((previous_z, z)), 0.0, 1.0)
+        flags.update(evaluate_nelson_rules(np.concatenate((previous_stat, statistic)), 0.0, 1.0, rules=[3, 4]))
+        batch_flags = {rule: values[len(previous_z):] for rule, values in flags.items()}
+
+        self.tail_stat.extend(statistic.tolist())
+        self.tail_z.extend(np.asarray(z, dtype=float).tolist())
+
+        return violated_rules(batch_flags)
+
+
+def measurement_status(value: float, point: Dict, rules: Optional[List[int]] = None) -> str:
+    """
+    Classifica uma medição do plano de controle
+
+    ALERT quando sai dos limites de especificação do ponto ou viola a regra 1;
+    WARNING quando outra regra de Nelson dispara; OK caso contrário.
+    """
+    upper = point.get('upper_limit')
+    lower = point.get('lower_limit')
+    has_limits = upper is not None and lower is not None and upper > lower
+
+    if has_limits and (value > upper or value < lower):
+        return 'ALERT'
+    if rules:
+        return 'ALERT' if 1 in rules else 'WARNING'
+    return 'OK'
+
+
+def measurement_statuses(values, point: Dict, rule_lists: Optional[List[List[int]]] = None) -> np.ndarray:
+    """Versão vetorizada de measurement_status para um lote de medições"""
+    x = np.asarray(values, dtype=float)
+    status = np.full(len(x), 'OK', dtype=object)
+
+    if rule_lists:
+        has_rule = np.array([bool(r) for r in rule_lists], dtype=bool)
+        has_rule1 = np.array([1 in r for r in rule_lists], dtype=bool)
+        status[has_rule] = 'WARNING'
+        status[has_rule1] = 'ALERT'
+
+    upper = point.get('upper_limit')
+    lower = point.get('lower_limit')
+    if upper is not None and lower is not None and upper > lower:
+        status[(x > upper) | (x < lower)] = 'ALERT'
+
+    return status
+
+
+def point_spc_params(point: Dict) -> Dict:
+    """Parâmetros da carta de controle de um ponto do plano de controle"""
+    chart_type = point.get('chart_type', 'imr')
+    size = int(point.get('subgroup_size', 5) or 1)
+    params = {'subgroup_size': min(max(size, 2), 25)}
+    if chart_type in ('p', 'np', 'u'):
+        params['sample_sizes'] = max(size, 1)
+    if chart_type in ('ewma', 'cusum') and point.get('target'):
+        params['target'] = float(point['target'])
+    return params
+
+
+def monitor_for_point(point: Dict, load_history: Callable[[], List[float]]) -> SPCMonitor:
+    """
+    Recupera o monitor incremental de um ponto
+
+    Usa o estado salvo (spc_state); sem ele, ajusta a carta no histórico
+    retornado por load_history (chamado apenas nesse caso).
+    """
+    if point.get('spc_state'):
+        return SPCMonitor(point['spc_state'])
+
+    chart_type = point.get('chart_type', 'imr')
+    params = point_spc_params(point)
+    values = [float(v) for v in load_history()]
+
+    try:
+        return SPCMonitor.fit(chart_type, values, **params)
+    except ValueError:
+        # Histórico insuficiente: acumular a partir do zero
+        monitor = SPCMonitor.empty(
+            chart_type,
+            subgroup_size=params['subgroup_size'],
+            sample_size=params.get('sample_sizes'),
+            target=params.get('target')
+        )
+        for value in values:
+            monitor.append(value)
+        return monitor